@@ -1,21 +1,41 @@
-"""Agent module for CoScientist."""
+"""Agent module for CoScientist.
 
-from src.agent.agent import BioinformaticsAgent, ScientificAgent, AgentPersona, create_agent
-from src.agent.meeting import VirtualLabMeeting, run_virtual_lab
-from src.agent.team_manager import (
-    create_research_team,
-    create_pi_persona,
-    create_critic_persona,
-)
+Names are imported from their submodules on first access, so importing one
+submodule (e.g. src.agent.usage) does not load the rest.
+"""
 
-__all__ = [
-    "BioinformaticsAgent",
-    "ScientificAgent",
-    "AgentPersona",
-    "create_agent",
-    "VirtualLabMeeting",
-    "run_virtual_lab",
-    "create_research_team",
-    "create_pi_persona",
-    "create_critic_persona",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "BioinformaticsAgent": "agent",
+    "ScientificAgent": "agent",
+    "AgentPersona": "agent",
+    "create_agent": "agent",
+    "VirtualLabMeeting": "meeting",
+    "run_virtual_lab": "meeting",
+    "create_research_team": "team_manager",
+    "create_pi_persona": "team_manager",
+    "create_critic_persona": "team_manager",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from src.agent.agent import BioinformaticsAgent, ScientificAgent, AgentPersona, create_agent
+    from src.agent.meeting import VirtualLabMeeting, run_virtual_lab
+    from src.agent.team_manager import (
+        create_research_team,
+        create_pi_persona,
+        create_critic_persona,
+    )
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
@@ -1,12 +1,20 @@
 """Core agent loop for the bioinformatics AI system."""
 
+import copy
 import json
 import os
 import asyncio
-from typing import Any, Optional
+import contextvars
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
 from dataclasses import dataclass
-from src.agent.openrouter_client import OpenRouterClient
-from src.agent.anthropic_client import AnthropicClient
+from src.agent.compaction import ConversationCompactor
+from src.agent.fallback import create_llm_client
+from src.agent.session_recording import get_session_recorder, get_session_replayer
+from src.agent.usage import budget_exhausted, question_scope, usage_scope
+from src.tools.tool_cache import ToolCache
+from src.utils.tracing import span
 from src.tools.implementations import (
     execute_python,
     search_pubmed,
@@ -18,6 +26,12 @@ from src.tools.implementations import (
 )
 
 
+# Tools that are safe to start while the rest of a streamed response is still
+# arriving. execute_python is excluded: it redirects the process-wide stdout and
+# mutates the persistent interpreter state, so it must run in order on the main loop.
+EARLY_START_TOOLS = {"find_files", "read_file", "query_database", "search_pubmed", "search_literature"}
+
+
 def get_max_tokens_for_model(model_name: str) -> int:
     """Determine appropriate max_tokens based on model name.
 
@@ -46,7 +60,7 @@ class AgentPersona:
 class BioinformaticsAgent:
     """Agent for answering complex bioinformatics questions."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514", provider: str = "anthropic", data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data", input_dir: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514", provider: str = "anthropic", data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data", input_dir: Optional[str] = None, context_token_budget: Optional[int] = None, stream: bool = False, role: Optional[str] = None):
         """Initialize the agent.
 
         Args:
@@ -55,11 +69,13 @@ class BioinformaticsAgent:
             provider: 'anthropic' or 'openrouter'
             data_dir: Path to database directory (Drug databases, PPI, GWAS, etc.)
             input_dir: Path to question-specific input data (defaults to data_dir)
+            context_token_budget: Token budget for conversation history before old
+                tool results are compacted (defaults to AGENT_CONTEXT_TOKEN_BUDGET env var)
+            stream: Stream LLM responses and start tool calls as soon as they are complete
+            role: 'pi', 'specialist', 'critic' or 'classifier'; selects the model
+                fallback chain configured for that role (see src.agent.fallback)
         """
-        if provider == "anthropic":
-            self.client = AnthropicClient(api_key=api_key, model=model)
-        else:
-            self.client = OpenRouterClient(api_key=api_key, model=model)
+        self.client = create_llm_client(provider, model, api_key=api_key, role=role)
         self.data_dir = data_dir
         self.input_dir = input_dir if input_dir is not None else data_dir
         self.tools = {
@@ -72,6 +88,15 @@ class BioinformaticsAgent:
         }
         self.conversation_history = []
         self.max_iterations = 30  # Increased from 10 to allow complex multi-step analyses
+        self.compactor = ConversationCompactor(token_budget=context_token_budget)
+        self.last_run_stats: dict[str, Any] = {}
+        self._run_usage: dict[str, int] = {}
+        self._run_queue_wait = 0.0  # Seconds spent waiting in the rate governor this run
+        self.usage_label = "Agent"  # Agent name in usage attribution
+        self.stream = stream
+        self.on_text: Optional[Callable[[str], None]] = None  # Receives streamed text deltas
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+        self.tool_cache: Optional[ToolCache] = None  # Shared by the agents of a meeting
 
     def get_system_prompt(self) -> str:
         """Get the system prompt for scientific reasoning.
@@ -147,6 +172,43 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
         Returns:
             Tool result as dict
         """
+        replayer = get_session_replayer()
+        recorder = get_session_recorder()
+        if recorder is not None:
+            recorded_input = copy.deepcopy(tool_input)
+        with span("tool.call", tool=tool_name, agent=self.usage_label) as tool_span:
+            start = time.monotonic()
+            result = replayer.tool_result(tool_name, tool_input) if replayer is not None else None
+            if result is None and self.tool_cache is not None:
+                result, cache_status = self.tool_cache.call(
+                    tool_name,
+                    self._tool_arguments(tool_name, tool_input),
+                    lambda: self._call_tool(tool_name, tool_input),
+                )
+                tool_span.set_attribute("cache", cache_status)
+            elif result is None:
+                result = self._call_tool(tool_name, tool_input)
+            tool_span.set_attribute("success", result.get("success"))
+        if recorder is not None:
+            recorder.record_tool(self.usage_label, tool_name, recorded_input, result, time.monotonic() - start)
+        return result
+
+    def _tool_arguments(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any]:
+        """Tool arguments with the agent's data directories filled in."""
+        tool_input = dict(tool_input)
+        # Add data_dir to query_database calls
+        if tool_name == "query_database":
+            tool_input["data_dir"] = self.data_dir
+        # Add input_dir to read_file calls
+        elif tool_name == "read_file":
+            tool_input["input_dir"] = self.input_dir
+        # Add data_dir to find_files calls
+        elif tool_name == "find_files":
+            tool_input["data_dir"] = self.data_dir
+        return tool_input
+
+    def _call_tool(self, tool_name: str, tool_input: dict[str, Any]) -> dict[str, Any]:
+        """Dispatch a tool call (see call_tool)."""
         if tool_name not in self.tools:
             return {
                 "success": False,
@@ -156,16 +218,7 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
 
         try:
             tool_func = self.tools[tool_name]
-            # Add data_dir to query_database calls
-            if tool_name == "query_database":
-                tool_input["data_dir"] = self.data_dir
-            # Add input_dir to read_file calls
-            elif tool_name == "read_file":
-                tool_input["input_dir"] = self.input_dir
-            # Add data_dir to find_files calls
-            elif tool_name == "find_files":
-                tool_input["data_dir"] = self.data_dir
-            result = tool_func(**tool_input)
+            result = tool_func(**self._tool_arguments(tool_name, tool_input))
             return result.to_dict()
         except TypeError as e:
             return {
@@ -180,6 +233,23 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
                 "error": f"Tool execution error: {str(e)}",
             }
 
+    def _start_tool_early(self, tool_call: dict[str, Any], pending: dict[str, Future]) -> None:
+        """Begin executing a streamed tool call before the full response arrives.
+
+        Args:
+            tool_call: Tool call dict with 'id', 'name', 'input'
+            pending: Map of tool_call_id to the running Future (updated in place)
+        """
+        tool_id = tool_call.get("id")
+        if not tool_id or tool_call.get("name") not in EARLY_START_TOOLS:
+            return
+        if self._tool_executor is None:
+            # One worker keeps tool execution in the order the model emitted the calls
+            self._tool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="early-tool")
+        pending[tool_id] = self._tool_executor.submit(
+            contextvars.copy_context().run, self.call_tool, tool_call["name"], dict(tool_call["input"])
+        )
+
     def process_response(self, response: dict[str, Any]) -> tuple[Optional[str], list[dict[str, Any]]]:
         """Process API response and extract text and tool calls.
 
@@ -196,6 +266,9 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
     def run(self, user_question: str, verbose: bool = False) -> str:
         """Run the agent loop for a user question.
 
+        Token usage is recorded in the enclosing question ledger (a new one if
+        the agent runs standalone), and the loop stops early once its budget is spent.
+
         Args:
             user_question: The question to answer
             verbose: Print intermediate steps
@@ -203,7 +276,15 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
         Returns:
             Final response from the agent
         """
+        with question_scope(user_question), span("agent.run", agent=self.usage_label):
+            return self._run(user_question, verbose)
+
+    def _run(self, user_question: str, verbose: bool = False) -> str:
+        """Agent loop body of run()."""
         self.conversation_history = []
+        self.compactor.reset()
+        self._run_usage: dict[str, int] = {}
+        self._run_queue_wait = 0.0
         self.add_message("user", user_question)
 
         if verbose:
@@ -211,105 +292,142 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
             print(f"Question: {user_question}")
             print(f"{'='*60}\n")
 
+        iterations_run = self.max_iterations
         for iteration in range(self.max_iterations):
-            if verbose:
-                print(f"[Iteration {iteration + 1}/{self.max_iterations}]")
-
-            # Get response from LLM
-            # Anthropic API requires system prompt separately
-            call_params = {
-                "messages": self.conversation_history,
-                "tools": get_tool_definitions(),
-                "temperature": 0.7,
-                "max_tokens": get_max_tokens_for_model(self.client.model),
-            }
-
-            # Add system prompt for Anthropic
-            if isinstance(self.client, AnthropicClient):
-                call_params["system"] = self.get_system_prompt()
-
-            response = self.client.create_message(**call_params)
+            # Every call gets at least one LLM turn; later iterations stop once
+            # the question's token/cost budget is spent
+            if iteration > 0 and budget_exhausted():
+                if verbose:
+                    print("\n[Usage budget exhausted - stopping early]")
+                iterations_run = iteration
+                break
 
-            text, tool_calls = self.process_response(response)
+            with span("agent.iteration", agent=self.usage_label, iteration=iteration + 1):
+                if verbose:
+                    print(f"[Iteration {iteration + 1}/{self.max_iterations}]")
+
+                # Keep the re-sent history under the token budget
+                saved = self.compactor.compact(self.conversation_history)
+                if saved and verbose:
+                    print(f"[Compacted old tool results: ~{saved} tokens saved]")
+
+                # Get response from LLM
+                # Anthropic API requires system prompt separately
+                call_params = {
+                    "messages": self.conversation_history,
+                    "tools": get_tool_definitions(),
+                    "temperature": 0.7,
+                    "max_tokens": get_max_tokens_for_model(self.client.model),
+                }
 
-            # Check if response was truncated (hit token limit)
-            finish_reason = None
-            if response.get("choices") and len(response["choices"]) > 0:
-                finish_reason = response["choices"][0].get("finish_reason")
+                pending_tools: dict[str, Future] = {}
+                if self.stream:
+                    call_params["stream"] = True
+                    call_params["on_text"] = self.on_text
+                    call_params["on_tool_call"] = lambda tc: self._start_tool_early(tc, pending_tools)
+
+                # Anthropic takes the system prompt separately; for OpenRouter it is
+                # sent as a leading system message (not stored in the history)
+                if self.client.provider == "anthropic":
+                    call_params["system"] = self.get_system_prompt()
+                else:
+                    call_params["messages"] = [{"role": "system", "content": self.get_system_prompt()}] + self.conversation_history
+
+                with usage_scope(agent=self.usage_label, iteration=iteration + 1):
+                    response = self.client.create_message(**call_params)
+
+                usage = self.client.get_usage(response)
+                for key, value in usage.items():
+                    self._run_usage[key] = self._run_usage.get(key, 0) + value
+                self._run_queue_wait += getattr(self.client, "last_queue_wait", 0.0)
+                if verbose and usage.get("input_tokens"):
+                    print(f"[Tokens: {usage['input_tokens']} in ({usage['cached_input_tokens']} cached, "
+                          f"{usage['uncached_input_tokens']} uncached), {usage['output_tokens']} out]")
+
+                text, tool_calls = self.process_response(response)
+
+                # Check if response was truncated (hit token limit)
+                finish_reason = None
+                if response.get("choices") and len(response["choices"]) > 0:
+                    finish_reason = response["choices"][0].get("finish_reason")
 
-            if text:
-                if verbose:
-                    print(f"Assistant: {text[:200]}..." if len(text) > 200 else f"Assistant: {text}")
-                    if finish_reason:
-                        print(f"[Finish reason: {finish_reason}]")
-
-            # If no tool calls, we're done
-            if not tool_calls:
-                # Warn if response was truncated due to length
-                if finish_reason == "length":
-                    if verbose:
-                        print("\n[WARNING: Response was truncated due to max_tokens limit]")
-                        print("[Agent completed - no more tools needed]")
-                elif verbose:
-                    print("\n[Agent completed - no more tools needed]")
-                # Add the final assistant message
                 if text:
-                    self.add_message("assistant", text)
-                return text
+                    if verbose:
+                        print(f"Assistant: {text[:200]}..." if len(text) > 200 else f"Assistant: {text}")
+                        if finish_reason:
+                            print(f"[Finish reason: {finish_reason}]")
+
+                # If no tool calls, we're done
+                if not tool_calls:
+                    # Warn if response was truncated due to length
+                    if finish_reason == "length":
+                        if verbose:
+                            print("\n[WARNING: Response was truncated due to max_tokens limit]")
+                            print("[Agent completed - no more tools needed]")
+                    elif verbose:
+                        print("\n[Agent completed - no more tools needed]")
+                    # Add the final assistant message
+                    if text:
+                        self.add_message("assistant", text)
+                    self._record_run_stats(iteration + 1, verbose)
+                    return text
 
-            if verbose:
-                print(f"[Tools to call: {[tc['name'] for tc in tool_calls]}]")
+                if verbose:
+                    print(f"[Tools to call: {[tc['name'] for tc in tool_calls]}]")
 
-            # Add assistant message with tool calls (required for proper conversation flow)
-            # Store the raw response message which includes tool_calls
-            if response.get("choices") and response["choices"][0].get("message"):
-                assistant_message = response["choices"][0]["message"]
-                self.conversation_history.append(assistant_message)
+                # Add assistant message with tool calls (required for proper conversation flow)
+                # Store the raw response message which includes tool_calls
+                if response.get("choices") and response["choices"][0].get("message"):
+                    assistant_message = response["choices"][0]["message"]
+                    self.conversation_history.append(assistant_message)
 
-            # Process tool calls
-            tool_results = []
-            for tool_call in tool_calls:
-                tool_name = tool_call["name"]
-                tool_input = tool_call["input"]
-                tool_call_id = tool_call.get("id", "")
+                # Process tool calls
+                tool_results = []
+                for tool_call in tool_calls:
+                    tool_name = tool_call["name"]
+                    tool_input = tool_call["input"]
+                    tool_call_id = tool_call.get("id", "")
 
-                if verbose:
-                    print(f"  Calling {tool_name}({json.dumps(tool_input)})...")
+                    if verbose:
+                        print(f"  Calling {tool_name}({json.dumps(tool_input)})...")
 
-                # Execute tool
-                result = self.call_tool(tool_name, tool_input)
+                    # Execute tool (or collect the result if it was started while streaming)
+                    early = pending_tools.pop(tool_call_id, None) if tool_call_id else None
+                    result = early.result() if early is not None else self.call_tool(tool_name, tool_input)
 
-                if verbose:
-                    if result["success"]:
-                        result_preview = str(result["output"])[:200]
-                        print(f"    → Success: {result_preview}...")
-                    else:
-                        print(f"    → Error: {result['error']}")
-
-                # Format tool result according to OpenAI spec
-                # Truncate large results to avoid context overflow
-                result_str = json.dumps(result)
-                if len(result_str) > 5000:
-                    result_truncated = {
-                        "success": result.get("success"),
-                        "output": str(result.get("output"))[:4500] + "...[truncated]",
-                        "error": result.get("error")
+                    if verbose:
+                        if result["success"]:
+                            result_preview = str(result["output"])[:200]
+                            print(f"    → Success: {result_preview}...")
+                        else:
+                            print(f"    → Error: {result['error']}")
+
+                    # Format tool result according to OpenAI spec
+                    # Truncate large results to avoid context overflow
+                    result_str = json.dumps(result)
+                    if len(result_str) > 5000:
+                        result_truncated = {
+                            "success": result.get("success"),
+                            "output": str(result.get("output"))[:4500] + "...[truncated]",
+                            "error": result.get("error")
+                        }
+                        result_str = json.dumps(result_truncated)
+
+                    tool_result = {
+                        "role": "tool",
+                        "tool_call_id": tool_call_id,
+                        "name": tool_name,
+                        "content": result_str
                     }
-                    result_str = json.dumps(result_truncated)
-
-                tool_result = {
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "name": tool_name,
-                    "content": result_str
-                }
-                tool_results.append(tool_result)
+                    tool_results.append(tool_result)
 
-            # Add all tool results to conversation
-            self.conversation_history.extend(tool_results)
+                # Add all tool results to conversation
+                self.conversation_history.extend(tool_results)
 
-        if verbose:
-            print("\n[Max iterations reached]")
+        else:
+            if verbose:
+                print("\n[Max iterations reached]")
+        self._record_run_stats(iterations_run, verbose)
 
         # Return last assistant message or empty string
         for msg in reversed(self.conversation_history):
@@ -318,6 +436,24 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
 
         return ""
 
+    def _record_run_stats(self, iterations: int, verbose: bool = False):
+        """Store per-run statistics (iterations, context size, compaction savings, token usage, queue wait).
+
+        Args:
+            iterations: Number of loop iterations executed
+            verbose: Print the compaction report
+        """
+        self.last_run_stats = {
+            "iterations": iterations,
+            "history_tokens": self.compactor.total_tokens(self.conversation_history),
+            **self.compactor.get_stats(),
+            "usage": dict(self._run_usage),
+            "queue_wait_s": round(self._run_queue_wait, 3),
+        }
+        if verbose and self.last_run_stats["tokens_saved"]:
+            print(f"[Compaction: ~{self.last_run_stats['tokens_saved']} tokens saved "
+                  f"across {self.last_run_stats['results_compacted']} tool results]")
+
     async def run_async(self, user_question: str, verbose: bool = False) -> str:
         """Async version of run() for parallel specialist execution.
 
@@ -328,9 +464,11 @@ Remember: Your goal is to help scientists make informed decisions, not to provid
         Returns:
             Final response from the agent
         """
-        # Run the synchronous version in a thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.run, user_question, verbose)
+        # Run the synchronous version in a thread pool to avoid blocking; the
+        # context is copied so usage is attributed to the caller's scope
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(None, ctx.run, self.run, user_question, verbose)
 
     def get_critic_prompt(self) -> str:
         """Get the system prompt for the scientific critic.
@@ -392,6 +530,12 @@ If the answer is of high quality and scientifically sound, you may approve it wi
         Returns:
             Tuple of (initial_answer, critique, final_answer)
         """
+        # One ledger (and budget) for the answer, critique and refinement
+        with question_scope(user_question):
+            return self._run_with_critic(user_question, verbose, max_refinement_rounds)
+
+    def _run_with_critic(self, user_question: str, verbose: bool, max_refinement_rounds: int) -> tuple[str, str, str]:
+        """Body of run_with_critic()."""
         if verbose:
             print(f"\n{'='*60}")
             print(f"RUNNING WITH CRITIC FEEDBACK")
@@ -415,7 +559,8 @@ If the answer is of high quality and scientifically sound, you may approve it wi
         critic_agent = BioinformaticsAgent(
             api_key=None,  # Reuse existing credentials
             model=self.client.model if hasattr(self.client, 'model') else "claude-sonnet-4-20250514",
-            provider="anthropic" if isinstance(self.client, AnthropicClient) else "openrouter"
+            provider=self.client.provider,
+            role="critic"
         )
 
         # Build critic prompt
@@ -449,10 +594,11 @@ If the answer is high quality and scientifically sound, you may approve it."""
             "max_tokens": get_max_tokens_for_model(self.client.model),
         }
 
-        if isinstance(self.client, AnthropicClient):
+        if self.client.provider == "anthropic":
             call_params["system"] = self.get_critic_prompt()
 
-        response = self.client.create_message(**call_params)
+        with usage_scope(agent="Critic", phase="critique"):
+            response = self.client.create_message(**call_params)
         critique = self.client.get_response_text(response)
 
         if verbose:
@@ -503,7 +649,7 @@ Please provide an improved answer that addresses the critique's suggestions. Foc
         return initial_answer, critique, final_answer
 
 
-def create_agent(api_key: Optional[str] = None, model: Optional[str] = None, provider: Optional[str] = None, data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data", input_dir: Optional[str] = None) -> BioinformaticsAgent:
+def create_agent(api_key: Optional[str] = None, model: Optional[str] = None, provider: Optional[str] = None, data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data", input_dir: Optional[str] = None, stream: bool = False) -> BioinformaticsAgent:
     """Factory function to create an agent.
 
     Args:
@@ -512,6 +658,7 @@ def create_agent(api_key: Optional[str] = None, model: Optional[str] = None, pro
         provider: 'anthropic' or 'openrouter' (defaults to API_PROVIDER env var)
         data_dir: Path to database directory (Drug databases, PPI, GWAS, etc.)
         input_dir: Path to question-specific input data (defaults to data_dir)
+        stream: Stream responses and start tool calls early
 
     Returns:
         BioinformaticsAgent instance
@@ -527,7 +674,7 @@ def create_agent(api_key: Optional[str] = None, model: Optional[str] = None, pro
         else:
             model = "anthropic/claude-sonnet-4"
 
-    return BioinformaticsAgent(api_key=api_key, model=model, provider=provider, data_dir=data_dir, input_dir=input_dir)
+    return BioinformaticsAgent(api_key=api_key, model=model, provider=provider, data_dir=data_dir, input_dir=input_dir, stream=stream)
 
 
 class ScientificAgent(BioinformaticsAgent):
@@ -545,7 +692,9 @@ class ScientificAgent(BioinformaticsAgent):
         model: str = "claude-sonnet-4-20250514",
         provider: str = "anthropic",
         data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data",
-        input_dir: Optional[str] = None
+        input_dir: Optional[str] = None,
+        context_token_budget: Optional[int] = None,
+        role: Optional[str] = None
     ):
         """Initialize a scientific agent with a specific persona.
 
@@ -556,9 +705,12 @@ class ScientificAgent(BioinformaticsAgent):
             provider: 'anthropic' or 'openrouter'
             data_dir: Path to database directory (Drug databases, PPI, GWAS, etc.)
             input_dir: Path to question-specific input data (defaults to data_dir)
+            context_token_budget: Token budget for conversation history compaction
+            role: 'pi', 'specialist' or 'critic'; selects the model fallback chain
         """
-        super().__init__(api_key, model, provider, data_dir, input_dir)
+        super().__init__(api_key, model, provider, data_dir, input_dir, context_token_budget, role=role)
         self.persona = persona
+        self.usage_label = persona.title
 
     def get_system_prompt(self) -> str:
         """Get dynamic system prompt based on the agent's persona.
@@ -1,32 +1,54 @@
 """Anthropic API client with tool calling support."""
 
+import copy
 import json
 import os
+import time
 from typing import Any, Optional
 import requests
+from src.agent.rate_limiter import estimate_request_tokens, get_rate_governor
+from src.agent.resilience import LLMAPIError, StreamGuard, get_http_session, get_resilience_registry, parse_retry_after
+from src.agent.session_recording import get_session_recorder, get_session_replayer
+from src.agent.usage import record_usage
+from src.utils.tracing import span
+from src.agent.streaming import AnthropicStreamParser, TextCallback, ToolCallCallback, iter_sse_events
+
+
+# Marks the end of a prompt prefix that Anthropic should cache (5 minute TTL)
+CACHE_CONTROL = {"type": "ephemeral"}
 
 
 class AnthropicClient:
     """Client for Anthropic API with tool calling support."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514"):
+    provider = "anthropic"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514", prompt_caching: Optional[bool] = None):
         """Initialize Anthropic client.
 
         Args:
             api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
             model: Model identifier (default: Claude Sonnet 4)
+            prompt_caching: Add cache-control breakpoints to system prompt, tools and
+                conversation prefix (defaults to PROMPT_CACHING env var, enabled)
         """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
         self.model = model
-        self.base_url = "https://api.anthropic.com/v1"
+        # ANTHROPIC_BASE_URL (host only, as in the Anthropic SDK) points at a proxy or the mock server
+        self.base_url = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com").rstrip("/") + "/v1"
         self.headers = {
             "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01",
             "content-type": "application/json",
         }
+        if prompt_caching is None:
+            prompt_caching = os.getenv("PROMPT_CACHING", "1").lower() not in ("0", "false", "no")
+        self.prompt_caching = prompt_caching
+        self.last_usage: dict[str, int] = {}
+        self.last_queue_wait = 0.0  # Seconds the last call waited in the rate governor
 
     def create_message(
         self,
@@ -35,6 +57,9 @@ class AnthropicClient:
         temperature: float = 0.7,
         max_tokens: int = 4096,
         system: Optional[str] = None,
+        stream: bool = False,
+        on_text: Optional[TextCallback] = None,
+        on_tool_call: Optional[ToolCallCallback] = None,
     ) -> dict[str, Any]:
         """Send a message to Anthropic with optional tool definitions.
 
@@ -44,9 +69,12 @@ class AnthropicClient:
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
             system: System prompt
+            stream: Use the SSE streaming endpoint
+            on_text: Called with each streamed text delta
+            on_tool_call: Called with each tool_use block as soon as it is complete
 
         Returns:
-            Response dict from Anthropic API
+            Response dict from Anthropic API (same shape when streaming)
         """
         # Anthropic API requires system prompt separate from messages
         # Extract system message if present
@@ -70,17 +98,186 @@ class AnthropicClient:
         if tools:
             payload["tools"] = tools
 
-        response = requests.post(
+        if self.prompt_caching:
+            self._add_cache_breakpoints(payload)
+
+        if stream:
+            payload["stream"] = True
+
+        replayer = get_session_replayer()
+        if replayer is not None:
+            # Replaying a recorded session: no API call, but usage still reaches the ledger
+            result = replayer.llm_response(payload)
+            self.last_usage = self.get_usage(result)
+            self.last_queue_wait = 0.0
+            record_usage(self.provider, self.model, self.last_usage)
+            text = self.get_response_text(result)
+            if on_text and text:
+                on_text(text)
+            return result
+
+        key = f"anthropic:{self.model}"
+        governor = get_rate_governor()
+        reserve = estimate_request_tokens(payload)
+
+        def attempt():
+            # Each attempt (retry or hedge) takes its own rate-limit slot, held
+            # until the response body or stream has been read. A stream that
+            # already reached the callbacks is not retried (see StreamGuard)
+            guard = StreamGuard(on_text, on_tool_call)
+            with guard, span("llm.attempt", model=self.model) as attempt_span, \
+                    governor.acquire(key, reserve) as permit:
+                attempt_span.set_attribute("queue_wait_ms", round(permit.wait_time * 1000, 1))
+                result = self._read_response(self._post(payload, stream), stream, guard.on_text, guard.on_tool_call)
+                usage = self.get_usage(result)
+                if usage["input_tokens"] or usage["output_tokens"]:
+                    permit.used_tokens = usage["input_tokens"] + usage["output_tokens"]
+            return result, permit.wait_time
+
+        def record_discarded(discarded):
+            # A losing hedge was billed too; keep the ledger and its budgets honest
+            record_usage(self.provider, self.model, self.get_usage(discarded[0]), queue_wait_s=discarded[1])
+
+        # Retries with backoff, per-model circuit breaking and (non-streaming) hedging
+        with span("llm.call", provider=self.provider, model=self.model, stream=stream) as call_span:
+            start = time.monotonic()
+            result, self.last_queue_wait = get_resilience_registry().call(
+                key, attempt, hedge=not stream, on_discarded=record_discarded
+            )
+            usage = self.get_usage(result)
+            call_span.set_attribute("input_tokens", usage["input_tokens"])
+            call_span.set_attribute("cached_input_tokens", usage["cached_input_tokens"])
+            call_span.set_attribute("output_tokens", usage["output_tokens"])
+        latency = time.monotonic() - start
+        record_usage(
+            self.provider,
+            self.model,
+            usage,
+            latency_s=latency,
+            queue_wait_s=self.last_queue_wait,
+        )
+        recorder = get_session_recorder()
+        if recorder is not None:
+            recorder.record_llm(self.provider, self.model, payload, result, latency)
+        return result
+
+    def _read_response(
+        self,
+        response: requests.Response,
+        stream: bool,
+        on_text: Optional[TextCallback] = None,
+        on_tool_call: Optional[ToolCallCallback] = None,
+    ) -> dict[str, Any]:
+        """Decode a successful response, assembling it from SSE events if streaming.
+
+        Args:
+            response: HTTP response with status 200
+            stream: Whether the request was made with stream=True
+            on_text: Called with each streamed text delta
+            on_tool_call: Called with each completed tool_use block
+
+        Returns:
+            Response dict in the non-streaming format
+        """
+        if stream:
+            parser = AnthropicStreamParser(on_text=on_text, on_tool_call=on_tool_call)
+            for event in iter_sse_events(response.iter_lines(decode_unicode=True)):
+                if event.get("type") == "error":
+                    raise RuntimeError(f"Anthropic stream error: {event.get('error')}")
+                parser.feed(event)
+            result = parser.get_response()
+        else:
+            with span("llm.deserialize"):
+                result = response.json()
+
+        self.last_usage = self.get_usage(result)
+        return result
+
+    def _post(self, payload: dict[str, Any], stream: bool = False) -> requests.Response:
+        """Send a single messages request.
+
+        Args:
+            payload: Request body
+            stream: Request an SSE stream
+
+        Returns:
+            HTTP response with status 200
+
+        Raises:
+            LLMAPIError: For any non-200 response (429/5xx/529 are retried by the caller)
+        """
+        response = get_http_session().post(
             f"{self.base_url}/messages",
             headers=self.headers,
-            json=payload,
+            data=self._encode_payload(payload),
             timeout=120,
+            stream=stream,
         )
 
         if response.status_code != 200:
-            raise RuntimeError(f"Anthropic API error {response.status_code}: {response.text}")
+            raise LLMAPIError(
+                f"Anthropic API error {response.status_code}: {response.text}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+            )
+
+        return response
+
+    def _encode_payload(self, payload: dict[str, Any]) -> bytes:
+        """Serialize the request body (timed separately from the network call)."""
+        with span("llm.serialize"):
+            return json.dumps(payload).encode("utf-8")
+
+    def _add_cache_breakpoints(self, payload: dict[str, Any]) -> None:
+        """Mark the stable prompt prefix for provider-side caching.
+
+        The system prompt and tool list are identical across iterations and
+        specialists, and the conversation only grows at the end, so breakpoints
+        go on the system prompt, the last tool and the last message. Messages
+        are copied so the caller's conversation history is not modified.
+
+        Args:
+            payload: Request payload (modified in place)
+        """
+        if isinstance(payload.get("system"), str):
+            payload["system"] = [{"type": "text", "text": payload["system"], "cache_control": CACHE_CONTROL}]
 
-        return response.json()
+        if payload.get("tools"):
+            tools = list(payload["tools"])
+            tools[-1] = {**tools[-1], "cache_control": CACHE_CONTROL}
+            payload["tools"] = tools
+
+        messages = payload.get("messages") or []
+        if messages:
+            last = copy.deepcopy(messages[-1])
+            content = last.get("content")
+            if isinstance(content, str) and content:
+                last["content"] = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+            elif isinstance(content, list) and content and isinstance(content[-1], dict):
+                content[-1]["cache_control"] = CACHE_CONTROL
+            payload["messages"] = messages[:-1] + [last]
+
+    def get_usage(self, response: dict[str, Any]) -> dict[str, int]:
+        """Extract token usage, split into cached and uncached input tokens.
+
+        Args:
+            response: Response dict from create_message
+
+        Returns:
+            Dict with input_tokens, cached_input_tokens, cache_write_tokens,
+            uncached_input_tokens and output_tokens
+        """
+        usage = response.get("usage") or {}
+        uncached = usage.get("input_tokens", 0) or 0
+        cached = usage.get("cache_read_input_tokens", 0) or 0
+        cache_write = usage.get("cache_creation_input_tokens", 0) or 0
+        return {
+            "input_tokens": uncached + cached + cache_write,
+            "cached_input_tokens": cached,
+            "cache_write_tokens": cache_write,
+            "uncached_input_tokens": uncached + cache_write,
+            "output_tokens": usage.get("output_tokens", 0) or 0,
+        }
 
     def extract_tool_calls(self, response: dict[str, Any]) -> list[dict[str, Any]]:
         """Extract tool calls from API response.
@@ -0,0 +1,236 @@
+"""Token-budget-aware compaction of the agent conversation history."""
+
+import json
+import os
+from typing import Any, Optional
+
+
+# Rough characters-per-token ratio for English text and JSON. Good enough to
+# decide when to compact; we never need exact provider token counts here.
+CHARS_PER_TOKEN = 4
+
+# Fixed per-message overhead (role, separators) added by chat templates.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+ELIDED_MARKER = "[elided by compaction]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a string.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(message: dict[str, Any]) -> int:
+    """Estimate the token cost of a single conversation message.
+
+    Handles both OpenAI-style messages (string content, ``tool_calls``) and
+    Anthropic-style messages (list of content blocks).
+
+    Args:
+        message: Message dict as stored in conversation_history
+
+    Returns:
+        Approximate token count
+    """
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    content = message.get("content")
+
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif isinstance(content, list):
+        for block in content:
+            if isinstance(block, dict):
+                tokens += estimate_tokens(json.dumps(block.get("text") or block.get("content") or block.get("input") or ""))
+            else:
+                tokens += estimate_tokens(str(block))
+
+    for call in message.get("tool_calls") or []:
+        func = call.get("function", {})
+        tokens += estimate_tokens(func.get("name", "")) + estimate_tokens(func.get("arguments", ""))
+
+    return tokens
+
+
+def _summarize_tool_content(content: str, summary_chars: int) -> str:
+    """Reduce a serialized tool result to a short summary string.
+
+    Args:
+        content: JSON string produced by the agent loop for a tool result
+        summary_chars: Number of output characters to keep
+
+    Returns:
+        JSON string with success/error preserved and output shortened
+    """
+    try:
+        result = json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return json.dumps({"summary": str(content)[:summary_chars], "note": ELIDED_MARKER})
+
+    if not isinstance(result, dict):
+        return json.dumps({"summary": str(result)[:summary_chars], "note": ELIDED_MARKER})
+
+    output = result.get("output")
+    return json.dumps({
+        "success": result.get("success"),
+        "summary": str(output)[:summary_chars] if output is not None else None,
+        "error": result.get("error"),
+        "note": ELIDED_MARKER,
+    })
+
+
+class ConversationCompactor:
+    """Keeps the conversation history under a token budget.
+
+    Old tool results are the bulk of the history (up to 5KB each), so once the
+    estimated size exceeds the budget the oldest tool results are replaced by a
+    short summary. The tool message itself, its ``tool_call_id`` (OpenAI) or
+    ``tool_use_id`` block (Anthropic) is kept so every tool call still has a
+    matching result and both providers accept the history.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        keep_recent_results: int = 3,
+        summary_chars: int = 200,
+    ):
+        """Initialize the compactor.
+
+        Args:
+            token_budget: Maximum estimated tokens for the history
+                (defaults to AGENT_CONTEXT_TOKEN_BUDGET env var or 16000)
+            keep_recent_results: Number of most recent tool results never compacted
+            summary_chars: Characters of tool output kept in a compacted result
+        """
+        if token_budget is None:
+            token_budget = int(os.getenv("AGENT_CONTEXT_TOKEN_BUDGET", "16000"))
+        self.token_budget = token_budget
+        self.keep_recent_results = keep_recent_results
+        self.summary_chars = summary_chars
+        self.reset()
+
+    def reset(self):
+        """Clear per-run bookkeeping."""
+        self._token_counts: dict[int, int] = {}
+        self.tokens_saved = 0
+        self.results_compacted = 0
+
+    def count(self, message: dict[str, Any]) -> int:
+        """Return the (cached) token estimate for a message.
+
+        Args:
+            message: Message dict from the conversation history
+
+        Returns:
+            Approximate token count
+        """
+        key = id(message)
+        if key not in self._token_counts:
+            self._token_counts[key] = estimate_message_tokens(message)
+        return self._token_counts[key]
+
+    def total_tokens(self, messages: list[dict[str, Any]]) -> int:
+        """Estimate the total token count of a conversation.
+
+        Args:
+            messages: Conversation history
+
+        Returns:
+            Approximate token count
+        """
+        return sum(self.count(m) for m in messages)
+
+    def compact(self, messages: list[dict[str, Any]]) -> int:
+        """Compact the history in place if it exceeds the budget.
+
+        Args:
+            messages: Conversation history (modified in place)
+
+        Returns:
+            Number of tokens saved by this call
+        """
+        total = self.total_tokens(messages)
+        if total <= self.token_budget:
+            return 0
+
+        result_indices = [i for i, m in enumerate(messages) if self._is_tool_result(m)]
+        if self.keep_recent_results > 0:
+            result_indices = result_indices[:-self.keep_recent_results]
+
+        saved = 0
+        for i in result_indices:
+            if total - saved <= self.token_budget:
+                break
+            message = messages[i]
+            before = self.count(message)
+            if not self._elide(message):
+                continue
+            self._token_counts.pop(id(message), None)
+            after = self.count(message)
+            saved += max(0, before - after)
+            self.results_compacted += 1
+
+        self.tokens_saved += saved
+        return saved
+
+    def _is_tool_result(self, message: dict[str, Any]) -> bool:
+        """Check whether a message carries tool output."""
+        if message.get("role") == "tool":
+            return True
+        content = message.get("content")
+        if message.get("role") == "user" and isinstance(content, list):
+            return any(isinstance(b, dict) and b.get("type") == "tool_result" for b in content)
+        return False
+
+    def _elide(self, message: dict[str, Any]) -> bool:
+        """Replace a tool result's payload with a summary.
+
+        Returns:
+            True if the message was changed
+        """
+        content = message.get("content")
+
+        # OpenAI format: {"role": "tool", "tool_call_id": ..., "content": "<json>"}
+        if isinstance(content, str):
+            if ELIDED_MARKER in content:
+                return False
+            summary = _summarize_tool_content(content, self.summary_chars)
+            if len(summary) >= len(content):
+                return False
+            message["content"] = summary
+            return True
+
+        # Anthropic format: user message with tool_result blocks
+        changed = False
+        for block in content or []:
+            if not (isinstance(block, dict) and block.get("type") == "tool_result"):
+                continue
+            block_content = block.get("content")
+            if not isinstance(block_content, str) or ELIDED_MARKER in block_content:
+                continue
+            summary = _summarize_tool_content(block_content, self.summary_chars)
+            if len(summary) < len(block_content):
+                block["content"] = summary
+                changed = True
+        return changed
+
+    def get_stats(self) -> dict[str, int]:
+        """Get compaction statistics for the current run.
+
+        Returns:
+            Dict with token_budget, tokens_saved and results_compacted
+        """
+        return {
+            "token_budget": self.token_budget,
+            "tokens_saved": self.tokens_saved,
+            "results_compacted": self.results_compacted,
+        }
@@ -0,0 +1,176 @@
+"""Convergence detection and round budgets for Virtual Lab meetings.
+
+A meeting used to run exactly ``num_rounds`` rounds even when the critic had
+nothing new to say. The RoundController decides after each round whether
+another round is worth running:
+
+- Critic verdict: the critic ends its review with ``VERDICT: CONVERGED`` or
+  ``VERDICT: CONTINUE``. The meeting converges when every critique of the
+  round says CONVERGED.
+- Summary similarity: if the PI's round summary barely differs from the
+  previous round's (cosine similarity of word counts >= threshold), the
+  discussion is going in circles.
+- Budgets: a wall-clock budget (stop when the next round, at the average
+  round duration so far, would overrun it) and a token budget for the meeting.
+
+Configuration comes from constructor arguments or the MEETING_EARLY_STOP,
+MEETING_MIN_ROUNDS, MEETING_CONVERGENCE_THRESHOLD, MEETING_TIME_BUDGET and
+MEETING_TOKEN_BUDGET environment variables.
+"""
+
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Optional
+
+
+VERDICT_INSTRUCTION = """
+End your review with a final line that is exactly one of:
+VERDICT: CONVERGED   (the team's answer is sound; another round would not change it)
+VERDICT: CONTINUE    (there are open issues another round should address)"""
+
+_VERDICT_PATTERN = re.compile(r"VERDICT:\s*\**\s*(CONVERGED|CONTINUE)", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def parse_critic_verdict(critique: str) -> Optional[bool]:
+    """Read the critic's verdict.
+
+    Returns:
+        True for CONVERGED, False for CONTINUE, None if the critic gave no verdict
+    """
+    matches = _VERDICT_PATTERN.findall(critique or "")
+    if not matches:
+        return None
+    return matches[-1].upper() == "CONVERGED"
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Cosine similarity of word-count vectors (0.0 to 1.0)."""
+    counts_a = Counter(_WORD_PATTERN.findall(a.lower()))
+    counts_b = Counter(_WORD_PATTERN.findall(b.lower()))
+    if not counts_a or not counts_b:
+        return 0.0
+    dot = sum(counts_a[w] * counts_b[w] for w in counts_a.keys() & counts_b.keys())
+    norm = math.sqrt(sum(v * v for v in counts_a.values())) * math.sqrt(sum(v * v for v in counts_b.values()))
+    return dot / norm
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+class RoundController:
+    """Decides whether a meeting should run another discussion round."""
+
+    def __init__(
+        self,
+        early_stop: Optional[bool] = None,
+        min_rounds: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        time_budget_s: Optional[float] = None,
+        token_budget: Optional[int] = None,
+    ):
+        """Initialize the controller.
+
+        Args:
+            early_stop: Stop when the discussion converges (defaults to MEETING_EARLY_STOP, on)
+            min_rounds: Rounds always run before convergence may stop the meeting
+                (defaults to MEETING_MIN_ROUNDS, 1)
+            similarity_threshold: Round-summary similarity that counts as converged
+                (defaults to MEETING_CONVERGENCE_THRESHOLD, 0.9)
+            time_budget_s: Wall-clock budget for the meeting (defaults to MEETING_TIME_BUDGET, none)
+            token_budget: Token budget for the meeting (defaults to MEETING_TOKEN_BUDGET, none)
+        """
+        if early_stop is None:
+            early_stop = os.getenv("MEETING_EARLY_STOP", "1").lower() not in ("0", "false", "no")
+        self.early_stop = early_stop
+        self.min_rounds = min_rounds if min_rounds is not None else int(os.getenv("MEETING_MIN_ROUNDS", "1"))
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else float(os.getenv("MEETING_CONVERGENCE_THRESHOLD", "0.9"))
+        )
+        self.time_budget_s = time_budget_s if time_budget_s is not None else _env_float("MEETING_TIME_BUDGET")
+        env_tokens = _env_float("MEETING_TOKEN_BUDGET")
+        self.token_budget = token_budget if token_budget is not None else (int(env_tokens) if env_tokens else None)
+        self.cancelled = False
+        self.reset()
+
+    def reset(self, start_tokens: int = 0) -> None:
+        """Start tracking a new meeting run.
+
+        Args:
+            start_tokens: Tokens already in the usage ledger (the meeting's share starts here)
+        """
+        self.started_at = time.monotonic()
+        self.start_tokens = start_tokens
+        self.round_durations: list[float] = []
+        self.summaries: list[str] = []
+        self._round_started = self.started_at
+        self.stop_reason = "max_rounds"
+
+    def start_round(self) -> None:
+        self._round_started = time.monotonic()
+
+    def end_round(self) -> None:
+        self.round_durations.append(time.monotonic() - self._round_started)
+
+    def critics_converged(self, critiques: list[str], rounds_done: int) -> bool:
+        """Whether every critique of the round says CONVERGED.
+
+        Args:
+            critiques: The critic's reviews of the round just finished
+            rounds_done: Rounds completed including this one
+
+        Returns:
+            False before min_rounds or when early stopping is off
+        """
+        if not self.early_stop or rounds_done < self.min_rounds or not critiques:
+            return False
+        if all(parse_critic_verdict(c) for c in critiques):
+            self.stop_reason = "critic_converged"
+            return True
+        return False
+
+    def summary_converged(self, summary: str, rounds_done: int) -> bool:
+        """Record the PI's round summary and check it against the previous one.
+
+        Args:
+            summary: The PI's interim synthesis of the round just finished
+            rounds_done: Rounds completed including this one
+        """
+        previous = self.summaries[-1] if self.summaries else None
+        self.summaries.append(summary)
+        if not self.early_stop or previous is None or rounds_done < self.min_rounds:
+            return False
+        if text_similarity(previous, summary) >= self.similarity_threshold:
+            self.stop_reason = "summary_converged"
+            return True
+        return False
+
+    def cancel(self) -> None:
+        """Start no further rounds (e.g. the caller stopped waiting for the meeting)."""
+        self.cancelled = True
+
+    def budget_exceeded(self, meeting_tokens: int) -> bool:
+        """Whether the meeting's time or token budget leaves no room for another round.
+
+        Args:
+            meeting_tokens: Tokens the meeting has used so far (including before reset())
+        """
+        if self.cancelled:
+            self.stop_reason = "cancelled"
+            return True
+        if self.token_budget is not None and meeting_tokens - self.start_tokens >= self.token_budget:
+            self.stop_reason = "token_budget"
+            return True
+        if self.time_budget_s is not None and self.round_durations:
+            elapsed = time.monotonic() - self.started_at
+            expected_round = sum(self.round_durations) / len(self.round_durations)
+            if elapsed + expected_round > self.time_budget_s:
+                self.stop_reason = "time_budget"
+                return True
+        return False
@@ -0,0 +1,246 @@
+"""Per-role model fallback chains for LLM calls.
+
+Each role (PI, specialist, critic, classifier) can be given an ordered list of
+backup models via environment variables:
+
+    FALLBACK_MODELS_PI="anthropic/claude-sonnet-4,openai/gpt-4o"
+    FALLBACK_MODELS_SPECIALIST="meta-llama/llama-3.3-70b-instruct:free"
+    LLM_LATENCY_BUDGET_CLASSIFIER=20      # seconds, per role
+    LLM_LATENCY_BUDGET=90                 # seconds, default for all roles
+
+A call that raises, or that has not returned within the latency budget, is
+retried on the next model in the chain. The model that produced the response is
+available as ``client.last_model``.
+
+A call that overruns its budget cannot be interrupted, so it keeps running on
+its own thread. At most LLM_MAX_ABANDONED_CALLS (default 16) such calls may be
+outstanding; beyond that, calls run without a budget until some finish.
+"""
+
+import contextvars
+import os
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from src.agent.anthropic_client import AnthropicClient
+from src.agent.openrouter_client import OpenRouterClient
+from src.agent.resilience import StreamInterruptedError
+
+
+ROLES = ("pi", "specialist", "critic", "classifier")
+
+# Recent fallbacks kept per client (clients live as long as a server process)
+MAX_FALLBACK_EVENTS = 100
+
+# Calls that overran their budget and are still running in the background
+_abandoned_lock = threading.Lock()
+_abandoned_calls = 0
+
+
+def get_abandoned_calls() -> int:
+    """Number of budget-overrunning calls still running in the background."""
+    with _abandoned_lock:
+        return _abandoned_calls
+
+
+def _max_abandoned_calls() -> int:
+    return int(os.getenv("LLM_MAX_ABANDONED_CALLS", "16"))
+
+
+class _BudgetExceeded(Exception):
+    """Raised when a call has not returned within its latency budget."""
+
+
+def _call_with_budget(create_message, budget: float, kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Run create_message on its own thread and wait at most `budget` seconds.
+
+    The thread starts immediately, so the whole budget goes to the call itself.
+    If the budget runs out the call is left running and counted in
+    get_abandoned_calls() until it finishes.
+    """
+    global _abandoned_calls
+    outcome: dict[str, Any] = {}
+    finished = threading.Event()
+    abandoned = [False]
+    # Copy the context so usage is attributed to the caller's scope
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        global _abandoned_calls
+        try:
+            outcome["response"] = context.run(create_message, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            with _abandoned_lock:
+                finished.set()
+                if abandoned[0]:
+                    _abandoned_calls -= 1
+
+    # Daemon thread, so an abandoned call cannot keep the process alive
+    threading.Thread(target=run, name="llm-fallback", daemon=True).start()
+    finished.wait(budget)
+    with _abandoned_lock:
+        if not finished.is_set():
+            abandoned[0] = True
+            _abandoned_calls += 1
+    if abandoned[0]:
+        raise _BudgetExceeded()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["response"]
+
+
+def get_fallback_models(role: Optional[str], primary_model: str) -> list[str]:
+    """Get the ordered model chain for a role.
+
+    Args:
+        role: 'pi', 'specialist', 'critic', 'classifier' or None
+        primary_model: The model configured for the call
+
+    Returns:
+        Primary model followed by configured fallbacks (deduplicated)
+    """
+    chain = [primary_model]
+    if role:
+        extra = os.getenv(f"FALLBACK_MODELS_{role.upper()}", "")
+        for model in extra.split(","):
+            model = model.strip()
+            if model and model not in chain:
+                chain.append(model)
+    return chain
+
+
+def get_latency_budget(role: Optional[str]) -> Optional[float]:
+    """Get the latency budget (seconds) for a role, or None for no budget."""
+    value = None
+    if role:
+        value = os.getenv(f"LLM_LATENCY_BUDGET_{role.upper()}")
+    value = value or os.getenv("LLM_LATENCY_BUDGET")
+    return float(value) if value else None
+
+
+def _make_client(provider: str, api_key: Optional[str], model: str):
+    if provider == "anthropic":
+        return AnthropicClient(api_key=api_key, model=model)
+    return OpenRouterClient(api_key=api_key, model=model)
+
+
+class FallbackClient:
+    """Client that tries an ordered chain of models for each call.
+
+    Exposes the same interface as AnthropicClient/OpenRouterClient. All models
+    in the chain use the same provider, so responses share one format.
+    """
+
+    def __init__(self, clients: list[Any], latency_budget: Optional[float] = None, role: Optional[str] = None):
+        """Initialize the fallback client.
+
+        Args:
+            clients: Clients in priority order (same provider)
+            latency_budget: Seconds to wait for a model before moving to the next one
+            role: Role name, used in error messages
+        """
+        if not clients:
+            raise ValueError("FallbackClient needs at least one client")
+        self.clients = clients
+        self.latency_budget = latency_budget
+        self.role = role
+        self.provider = clients[0].provider
+        self.last_model = clients[0].model
+        self._last_client = clients[0]
+        self.fallback_events: deque[dict[str, Any]] = deque(maxlen=MAX_FALLBACK_EVENTS)
+        self.fallback_count = 0
+
+    @property
+    def model(self) -> str:
+        """Primary model identifier."""
+        return self.clients[0].model
+
+    @property
+    def last_usage(self) -> dict[str, int]:
+        """Usage of the most recent successful call."""
+        return self._last_client.last_usage
+
+    @property
+    def last_queue_wait(self) -> float:
+        """Rate-limiter queue wait of the most recent successful call."""
+        return self._last_client.last_queue_wait
+
+    def create_message(self, **kwargs) -> dict[str, Any]:
+        """Send the request to each model in turn until one succeeds in time.
+
+        Args:
+            **kwargs: Arguments for the underlying client's create_message
+
+        Returns:
+            Response dict from the first model that succeeded
+        """
+        errors = []
+        # A stream cannot be abandoned halfway (text was already forwarded), so
+        # latency budgets only apply to non-streaming calls
+        budget = None if kwargs.get("stream") else self.latency_budget
+
+        for i, client in enumerate(self.clients):
+            is_last = i == len(self.clients) - 1
+            try:
+                if budget is None or is_last or get_abandoned_calls() >= _max_abandoned_calls():
+                    response = client.create_message(**kwargs)
+                else:
+                    response = _call_with_budget(client.create_message, budget, kwargs)
+            except StreamInterruptedError:
+                raise  # Part of the answer was already streamed; another model would repeat it
+            except _BudgetExceeded:
+                errors.append(f"{client.model}: exceeded {budget:.0f}s latency budget")
+                self.fallback_events.append({"model": client.model, "reason": "latency_budget"})
+                self.fallback_count += 1
+                continue
+            except Exception as e:
+                errors.append(f"{client.model}: {e}")
+                self.fallback_events.append({"model": client.model, "reason": str(e)[:200]})
+                self.fallback_count += 1
+                if is_last:
+                    break
+                continue
+
+            self.last_model = client.model
+            self._last_client = client
+            return response
+
+        raise RuntimeError(f"All models failed for role {self.role or 'default'}: " + " | ".join(errors))
+
+    def extract_tool_calls(self, response: dict[str, Any]) -> list[dict[str, Any]]:
+        return self.clients[0].extract_tool_calls(response)
+
+    def get_response_text(self, response: dict[str, Any]) -> str:
+        return self.clients[0].get_response_text(response)
+
+    def get_usage(self, response: dict[str, Any]) -> dict[str, int]:
+        return self.clients[0].get_usage(response)
+
+
+def create_llm_client(provider: str, model: str, api_key: Optional[str] = None, role: Optional[str] = None):
+    """Create a client for a role, wrapping it in a fallback chain if configured.
+
+    Args:
+        provider: 'anthropic' or 'openrouter'
+        model: Primary model
+        api_key: API key (defaults to the provider's env var)
+        role: 'pi', 'specialist', 'critic', 'classifier' or None
+
+    Returns:
+        AnthropicClient/OpenRouterClient, or FallbackClient when the role has
+        fallback models or a latency budget configured
+    """
+    models = get_fallback_models(role, model)
+    budget = get_latency_budget(role)
+    if len(models) == 1 and budget is None:
+        return _make_client(provider, api_key, model)
+    clients = [_make_client(provider, api_key, m) for m in models]
+    return FallbackClient(clients, latency_budget=budget, role=role)
+
+
+def get_client_model(client: Any) -> str:
+    """Model that served the client's most recent call."""
+    return getattr(client, "last_model", None) or client.model
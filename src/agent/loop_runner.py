@@ -0,0 +1,134 @@
+"""Long-lived background event loop for parallel agent work.
+
+Meetings fan specialists (and pipelined critiques) out as coroutines. Rather
+than creating an event loop per round with ``asyncio.run`` (which fails when
+the caller already runs a loop, and pays loop and thread-pool setup every
+round), all such work is submitted to one loop in a daemon thread:
+
+    runner = get_loop_runner()
+    results = runner.run(gather_specialists())          # from sync code
+    results = await runner.run_async(gather_specialists())  # from another loop
+
+The caller's context variables (usage scope, tracing span) are carried into
+the submitted coroutine, so attribution works as if it ran inline.
+"""
+
+import asyncio
+import atexit
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class BackgroundLoopRunner:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self, name: str = "agent-loop", max_workers: Optional[int] = None):
+        """Initialize the runner (the loop starts on first use).
+
+        Args:
+            name: Thread name of the loop
+            max_workers: Size of the loop's default executor, which runs the
+                blocking agent loops (defaults to AGENT_LOOP_WORKERS env var, 32)
+        """
+        self.name = name
+        self.max_workers = max_workers or int(os.getenv("AGENT_LOOP_WORKERS", "32"))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running background loop (started if needed)."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                started = threading.Event()
+                loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.name}-worker")
+                loop.set_default_executor(self._executor)
+
+                def serve():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=serve, name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def in_loop_thread(self) -> bool:
+        """Whether the caller is running on the background loop itself."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """Schedule a coroutine on the background loop.
+
+        Returns:
+            A concurrent.futures.Future with the coroutine's result
+        """
+        # run_coroutine_threadsafe creates the task in the context that is
+        # current when it is called, so run it inside a copy of ours
+        return contextvars.copy_context().run(asyncio.run_coroutine_threadsafe, coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the background loop and block for its result.
+
+        Safe to call from plain threads and from code running inside another
+        event loop (that loop's thread blocks, but nothing deadlocks).
+
+        Raises:
+            RuntimeError: If called from the background loop itself, which would deadlock
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("BackgroundLoopRunner.run() called from its own loop; await the coroutine instead")
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """Await a coroutine on the background loop from another event loop."""
+        if self.in_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self) -> None:
+        """Stop the loop and its executor (a new loop starts on next use)."""
+        with self._lock:
+            loop, thread, executor = self._loop, self._thread, self._executor
+            self._loop = self._thread = self._executor = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if not loop.is_running():
+            loop.close()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Singleton shared by every meeting in the process
+_runner: Optional[BackgroundLoopRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_loop_runner() -> BackgroundLoopRunner:
+    """Get or create the process-wide background loop runner."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = BackgroundLoopRunner()
+            atexit.register(_runner.close)
+        return _runner
+
+
+def run_coroutine(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared background loop and wait for the result."""
+    return get_loop_runner().run(coro, timeout)
@@ -2,14 +2,25 @@
 
 import os
 import asyncio
+import contextvars
 from typing import Optional, List, Dict
 from src.agent.agent import ScientificAgent, AgentPersona
+from src.agent.convergence import VERDICT_INSTRUCTION, RoundController
+from src.agent.transcript import TranscriptStore
+from src.agent.fallback import get_client_model
+from src.agent.loop_runner import get_loop_runner
+from src.agent.usage import budget_exhausted, format_usage_summary, get_usage_ledger, question_scope, usage_scope
+from src.tools.tool_cache import ToolCache
+from src.utils.tracing import span
 from src.agent.team_manager import (
     create_research_team,
     create_pi_persona,
     create_critic_persona,
 )
 
+# Returned by a meeting cancelled before its final synthesis
+CANCELLED_ANSWER = "Meeting cancelled before a final answer was reached."
+
 
 class VirtualLabMeeting:
     """Manages a Virtual Lab research meeting with multiple specialist agents.
@@ -33,7 +44,12 @@ class VirtualLabMeeting:
         max_team_size: int = 3,
         verbose: bool = False,
         data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data",
-        input_dir: Optional[str] = None
+        input_dir: Optional[str] = None,
+        pipelined: Optional[bool] = None,
+        tool_cache: Optional[ToolCache] = None,
+        early_stop: Optional[bool] = None,
+        time_budget_s: Optional[float] = None,
+        token_budget: Optional[int] = None
     ):
         """Initialize a Virtual Lab meeting.
 
@@ -46,7 +62,17 @@ class VirtualLabMeeting:
             verbose: Print detailed meeting transcript
             data_dir: Path to database directory (Drug databases, PPI, GWAS, etc.)
             input_dir: Path to question-specific input data (defaults to data_dir)
+            pipelined: Critique each specialist as soon as they finish instead of
+                reviewing the whole round at once (defaults to MEETING_PIPELINE env var, off)
+            tool_cache: Tool-result cache shared by all agents in the meeting (a new
+                one by default; set TOOL_CACHE=0 to disable, TOOL_CACHE_PATH to persist)
+            early_stop: End the discussion when it converges (defaults to MEETING_EARLY_STOP env var, on)
+            time_budget_s: Wall-clock budget for the meeting (defaults to MEETING_TIME_BUDGET env var)
+            token_budget: Token budget for the meeting (defaults to MEETING_TOKEN_BUDGET env var)
         """
+        if pipelined is None:
+            pipelined = os.getenv("MEETING_PIPELINE", "").lower() in ("1", "true", "yes")
+        self.pipelined = pipelined
         self.user_question = user_question
         self.verbose = verbose
         self.api_key = api_key
@@ -67,18 +93,21 @@ class VirtualLabMeeting:
             model=model,
             provider=provider,
             data_dir=data_dir,
-            input_dir=self.input_dir
+            input_dir=self.input_dir,
+            role="pi"
         )
 
         # PI designs the research team
         if self.verbose:
             print("\n[PI is designing the research team...]")
 
-        team_specs = create_research_team(
-            user_question,
-            self.pi.client,
-            max_team_size=max_team_size
-        )
+        with usage_scope(meeting=self.model, phase="team_design", agent=self.pi.usage_label), \
+                span("meeting.team_design", model=self.model, max_team_size=max_team_size):
+            team_specs = create_research_team(
+                user_question,
+                self.pi.client,
+                max_team_size=max_team_size
+            )
 
         if self.verbose:
             print(f"\n[Team designed: {len(team_specs)} specialists]")
@@ -93,33 +122,67 @@ class VirtualLabMeeting:
                 model=model,
                 provider=provider,
                 data_dir=data_dir,
-                input_dir=self.input_dir
+                input_dir=self.input_dir,
+                role="specialist"
             )
             for spec in team_specs
         ]
 
         # Add the Scientific Critic (static role)
-        self.critic = ScientificAgent(
+        self.critic = self._create_critic()
+
+        # Pipelined rounds review specialists concurrently; an agent holds one
+        # conversation at a time, so each specialist gets its own critic instance
+        self.specialist_critics = [self._create_critic() for _ in self.specialists] if self.pipelined else []
+
+        # Specialists often repeat each other's lookups; share their results
+        if tool_cache is None and os.getenv("TOOL_CACHE", "1").lower() not in ("0", "false", "no"):
+            tool_cache = ToolCache()
+        self.tool_cache = tool_cache
+        for agent in [self.pi, *self.specialists, self.critic, *self.specialist_critics]:
+            agent.tool_cache = tool_cache
+
+        self.meeting_transcript = TranscriptStore()
+        self.usage_summary: dict = {}  # Token/cost breakdown of the last run_meeting()
+        self.round_controller = RoundController(
+            early_stop=early_stop, time_budget_s=time_budget_s, token_budget=token_budget
+        )
+        self.rounds_completed = 0
+
+    def _create_critic(self) -> ScientificAgent:
+        """Create a Scientific Critic agent."""
+        return ScientificAgent(
             persona=create_critic_persona(),
-            api_key=api_key,
-            model=model,
-            provider=provider,
-            data_dir=data_dir,
-            input_dir=self.input_dir
+            api_key=self.api_key,
+            model=self.model,
+            provider=self.provider,
+            data_dir=self.data_dir,
+            input_dir=self.input_dir,
+            role="critic"
         )
 
-        self.meeting_transcript = []
+    def _run_coroutine(self, coro):
+        """Run a coroutine to completion from synchronous meeting code.
 
-    def _run_specialists_parallel(self) -> List[str]:
-        """Run all specialists in parallel for efficiency.
-        
-        Returns:
-            List of specialist responses in the same order as self.specialists
+        Parallel work goes to the process-wide background loop, so this works
+        the same whether or not the caller is itself inside an event loop.
         """
+        return get_loop_runner().run(coro)
+
+    def _meeting_tokens(self) -> int:
+        """Tokens this meeting has used so far.
+
+        The question's ledger may be shared with other meetings (consensus
+        runs one per model), so only calls attributed to this one count.
+        """
+        return get_usage_ledger().tokens_for(meeting=self.model)
+
+    def _specialist_prompt(self) -> str:
+        """Build the prompt all specialists answer in a round."""
         # Build context that all specialists will see
         context = self._build_context(last_n=5)
-        
-        specialist_prompt = f"""Research Question: "{self.user_question}"
+
+        return f"""Research Question: "{self.user_question}"
 
 Meeting Context (recent discussion):
 {context}
@@ -133,6 +196,14 @@ Contribute your specialized analysis. You may:
 
 Be concise (3-5 sentences or a specific analysis). Focus on YOUR expertise."""
 
+    def _run_specialists_parallel(self) -> List[str]:
+        """Run all specialists in parallel for efficiency.
+        
+        Returns:
+            List of specialist responses in the same order as self.specialists
+        """
+        specialist_prompt = self._specialist_prompt()
+
         async def run_all():
             """Run all specialists concurrently."""
             tasks = [
@@ -140,26 +211,180 @@ Be concise (3-5 sentences or a specific analysis). Focus on YOUR expertise."""
                 for agent in self.specialists
             ]
             return await asyncio.gather(*tasks)
-        
-        # Run the async function
-        if asyncio.get_event_loop().is_running():
-            # If we're already in an async context, create new task
-            loop = asyncio.get_event_loop()
-            future = asyncio.run_coroutine_threadsafe(run_all(), loop)
-            return future.result()
-        else:
-            # Otherwise, use asyncio.run()
-            return asyncio.run(run_all())
+
+        return self._run_coroutine(run_all())
+
+    def _run_round(self, round_num: int) -> int:
+        """Run a discussion round: all specialists in parallel, then one critique of the round.
+
+        Args:
+            round_num: Zero-based round index
+
+        Returns:
+            Number of transcript entries the round added
+        """
+        # Run specialists in PARALLEL for efficiency
+        with usage_scope(round=round_num + 1, phase="specialists"), \
+                span("meeting.specialists", round=round_num + 1):
+            specialist_responses = self._run_specialists_parallel()
+
+        # Add responses to transcript
+        for agent, response in zip(self.specialists, specialist_responses):
+            if self.verbose:
+                print(f"\n--- {agent.persona.title} ---")
+                print(f"{response[:300]}..." if len(response) > 300 else response)
+
+            self.meeting_transcript.append({
+                "speaker": agent.persona.title,
+                "role": agent.persona.role,
+                "content": response,
+                "model": get_client_model(agent.client)
+            })
+
+        # Phase 3: Critic reviews the round
+        if self.verbose:
+            print(f"\n--- Scientific Critic Review ---")
+
+        recent_discussion = self._build_context(last_n=len(self.specialists))
+        critique_prompt = f"""Review the most recent contributions from the team.
+
+Recent Discussion:
+{recent_discussion}
+
+Your task:
+- Identify errors, logical flaws, or unsupported claims
+- Point out missing analyses or gaps
+- Highlight strong points worth pursuing
+- DO NOT provide solutions - only critique
+
+Be specific and constructive (2-4 sentences)."""
+        if self.round_controller.early_stop:
+            critique_prompt += "\n" + VERDICT_INSTRUCTION
+
+        with usage_scope(round=round_num + 1, phase="critic"), span("meeting.critic", round=round_num + 1):
+            critique = self.critic.run(critique_prompt, verbose=False)  # Critic doesn't need verbose
+        self.meeting_transcript.append({
+            "speaker": "Critic",
+            "role": "Quality Review",
+            "content": critique,
+            "model": get_client_model(self.critic.client)
+        })
+
+        if self.verbose:
+            print(f"Critic: {critique[:200]}..." if len(critique) > 200 else f"Critic: {critique}")
+
+        return len(self.specialists) + 1
+
+    def _run_round_pipelined(self, round_num: int) -> None:
+        """Run a discussion round with per-specialist critiques.
+
+        Each specialist's contribution is handed to its critic as soon as it
+        arrives, so the round takes max(specialist + critique) rather than
+        max(specialist) + critique of the whole round. Contributions and
+        critiques are added to the transcript in completion order.
+
+        Args:
+            round_num: Zero-based round index
+        """
+        specialist_prompt = self._specialist_prompt()
+
+        async def run_pair(agent: ScientificAgent, critic: ScientificAgent) -> None:
+            with usage_scope(round=round_num + 1, phase="specialists"):
+                response = await agent.run_async(specialist_prompt, verbose=self.verbose)
+            self.meeting_transcript.append({
+                "speaker": agent.persona.title,
+                "role": agent.persona.role,
+                "content": response,
+                "model": get_client_model(agent.client)
+            })
+            if self.verbose:
+                print(f"\n--- {agent.persona.title} ---")
+                print(f"{response[:300]}..." if len(response) > 300 else response)
+
+            critique_prompt = f"""Review the most recent contribution from the {agent.persona.title}.
+
+Contribution:
+[{agent.persona.title}]: {response}
+
+Your task:
+- Identify errors, logical flaws, or unsupported claims
+- Point out missing analyses or gaps
+- Highlight strong points worth pursuing
+- DO NOT provide solutions - only critique
+
+Be specific and constructive (2-4 sentences)."""
+            if self.round_controller.early_stop:
+                critique_prompt += "\n" + VERDICT_INSTRUCTION
+
+            with usage_scope(round=round_num + 1, phase="critic"):
+                critique = await critic.run_async(critique_prompt, verbose=False)
+            self.meeting_transcript.append({
+                "speaker": "Critic",
+                "role": f"Review of {agent.persona.title}",
+                "content": critique,
+                "model": get_client_model(critic.client)
+            })
+            if self.verbose:
+                print(f"Critic on {agent.persona.title}: {critique[:200]}..." if len(critique) > 200
+                      else f"Critic on {agent.persona.title}: {critique}")
+
+        async def run_all():
+            await asyncio.gather(*(
+                run_pair(agent, critic) for agent, critic in zip(self.specialists, self.specialist_critics)
+            ))
+
+        self._run_coroutine(run_all())
 
     def run_meeting(self, num_rounds: int = 2) -> str:
         """Run the Virtual Lab meeting.
 
+        LLM usage is attributed to the meeting, round and phase; if the
+        question's token/cost budget runs out, the remaining discussion
+        rounds are skipped and the PI goes straight to the final synthesis.
+        The discussion also ends early once it converges or the meeting's
+        own time/token budget is spent (see src.agent.convergence);
+        ``stop_reason`` records why it ended.
+
+        Args:
+            num_rounds: Maximum number of discussion rounds (default: 2)
+
+        Returns:
+            Final synthesized answer from the PI
+        """
+        with question_scope(self.user_question, meeting=self.model) as ledger, \
+                span("meeting", model=self.model, rounds=num_rounds, team_size=len(self.specialists)) as meeting_span:
+            answer = self._run_meeting(num_rounds)
+            self.usage_summary = ledger.summary()
+            meeting_span.set_attribute("rounds_completed", self.rounds_completed)
+            meeting_span.set_attribute("stop_reason", self.stop_reason)
+        if self.verbose:
+            print("\n[Usage]\n" + format_usage_summary(self.usage_summary))
+            if self.tool_cache is not None:
+                print(f"[Tool cache] {self.tool_cache.summary()}")
+        return answer
+
+    async def run_meeting_async(self, num_rounds: int = 2) -> str:
+        """Async version of run_meeting() for async servers and LangGraph async nodes.
+
+        The meeting runs in a worker thread (with the caller's context), so the
+        caller's event loop keeps serving other requests meanwhile.
+
         Args:
             num_rounds: Number of discussion rounds (default: 2)
 
         Returns:
             Final synthesized answer from the PI
         """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(None, ctx.run, self.run_meeting, num_rounds)
+
+    def _run_meeting(self, num_rounds: int) -> str:
+        """Meeting phases of run_meeting()."""
+        if self.round_controller.cancelled:
+            self.round_controller.stop_reason = "cancelled"
+            return CANCELLED_ANSWER
+
         if self.verbose:
             print("\n" + "=" * 60)
             print("STARTING MEETING")
@@ -183,69 +408,72 @@ Provide a brief opening (2-3 sentences) that:
 
 Keep it concise - this is just the opening."""
 
-        pi_intro = self.pi.run(pi_intro_prompt, verbose=self.verbose)
+        with usage_scope(phase="opening"), span("meeting.opening"):
+            pi_intro = self.pi.run(pi_intro_prompt, verbose=self.verbose)
         self.meeting_transcript.append({
             "speaker": "PI",
             "role": "Opening Remarks",
-            "content": pi_intro
+            "content": pi_intro,
+            "model": get_client_model(self.pi.client)
         })
 
         # Phase 2: Round-robin specialist discussions
+        self.round_controller.reset(start_tokens=self._meeting_tokens())
+        self.rounds_completed = 0
         for round_num in range(num_rounds):
+            if self.round_controller.cancelled:
+                self.round_controller.stop_reason = "cancelled"
+                if self.verbose:
+                    print(f"\n[Meeting cancelled - skipping rounds {round_num + 1}-{num_rounds}]")
+                break
+            if round_num > 0 and budget_exhausted():
+                self.round_controller.stop_reason = "usage_budget"
+                if self.verbose:
+                    print(f"\n[Usage budget exhausted - skipping rounds {round_num + 1}-{num_rounds}]")
+                break
+            if round_num > 0 and self.round_controller.budget_exceeded(self._meeting_tokens()):
+                if self.verbose:
+                    print(f"\n[Meeting {self.round_controller.stop_reason.replace('_', ' ')} reached - "
+                          f"skipping rounds {round_num + 1}-{num_rounds}]")
+                break
+            self.round_controller.start_round()
+            self.meeting_transcript.begin_round(round_num + 1)
+
             if self.verbose:
                 print(f"\n{'=' * 60}")
                 print(f"[PHASE 2: DISCUSSION ROUND {round_num + 1}/{num_rounds}]")
                 print(f"{'=' * 60}")
 
-            # Run specialists in PARALLEL for efficiency
-            specialist_responses = self._run_specialists_parallel()
-            
-            # Add responses to transcript
-            for agent, response in zip(self.specialists, specialist_responses):
+            if self.pipelined:
+                # Specialists and their critiques overlap; the PI waits for the last critique
+                with span("meeting.pipelined_round", round=round_num + 1):
+                    self._run_round_pipelined(round_num)
+                round_entries = 2 * len(self.specialists)
+            else:
+                round_entries = self._run_round(round_num)
+            self.rounds_completed = round_num + 1
+            if self.round_controller.cancelled:
+                # Nobody is waiting for a synthesis of this round
+                self.round_controller.end_round()
+                continue
+
+            # Stop early when every critique says the answer has converged
+            round_critiques = [
+                entry["content"] for entry in self.meeting_transcript[-round_entries:]
+                if entry["speaker"] == "Critic"
+            ]
+            if round_num < num_rounds - 1 and self.round_controller.critics_converged(round_critiques, round_num + 1):
+                self.round_controller.end_round()
                 if self.verbose:
-                    print(f"\n--- {agent.persona.title} ---")
-                    print(f"{response[:300]}..." if len(response) > 300 else response)
-                
-                self.meeting_transcript.append({
-                    "speaker": agent.persona.title,
-                    "role": agent.persona.role,
-                    "content": response
-                })
-
-            # Phase 3: Critic reviews the round
-            if self.verbose:
-                print(f"\n--- Scientific Critic Review ---")
-
-            recent_discussion = self._build_context(last_n=len(self.specialists))
-            critique_prompt = f"""Review the most recent contributions from the team.
-
-Recent Discussion:
-{recent_discussion}
-
-Your task:
-- Identify errors, logical flaws, or unsupported claims
-- Point out missing analyses or gaps
-- Highlight strong points worth pursuing
-- DO NOT provide solutions - only critique
-
-Be specific and constructive (2-4 sentences)."""
-
-            critique = self.critic.run(critique_prompt, verbose=False)  # Critic doesn't need verbose
-            self.meeting_transcript.append({
-                "speaker": "Critic",
-                "role": "Quality Review",
-                "content": critique
-            })
-
-            if self.verbose:
-                print(f"Critic: {critique[:200]}..." if len(critique) > 200 else f"Critic: {critique}")
+                    print(f"\n[Critic found no open issues - ending discussion after round {round_num + 1}]")
+                break
 
             # PI synthesizes the round (except on last round)
             if round_num < num_rounds - 1:
                 if self.verbose:
                     print(f"\n--- PI Round Synthesis ---")
 
-                round_context = self._build_context(last_n=len(self.specialists) + 1)
+                round_context = self._build_context(last_n=round_entries)
                 synthesis_prompt = f"""Synthesize the current round of discussion.
 
 Round {round_num + 1} Discussion:
@@ -257,16 +485,35 @@ Provide a brief synthesis (2-3 sentences):
 
 Be concise - this is an interim summary."""
 
-                round_summary = self.pi.run(synthesis_prompt, verbose=False)
+                with usage_scope(round=round_num + 1, phase="round_synthesis"), \
+                        span("meeting.round_synthesis", round=round_num + 1):
+                    round_summary = self.pi.run(synthesis_prompt, verbose=False)
                 self.meeting_transcript.append({
                     "speaker": "PI",
                     "role": f"Round {round_num + 1} Synthesis",
-                    "content": round_summary
+                    "content": round_summary,
+                    "model": get_client_model(self.pi.client)
                 })
 
+                self.meeting_transcript.set_round_summary(round_num + 1, round_summary)
+
                 if self.verbose:
                     print(f"PI Summary: {round_summary}")
 
+                if self.round_controller.summary_converged(round_summary, round_num + 1):
+                    self.round_controller.end_round()
+                    if self.verbose:
+                        print(f"\n[Round summaries have converged - ending discussion after round {round_num + 1}]")
+                    break
+
+            self.round_controller.end_round()
+
+        if self.round_controller.cancelled:
+            self.round_controller.stop_reason = "cancelled"
+            if self.verbose:
+                print("\n[Meeting cancelled - skipping final synthesis]")
+            return CANCELLED_ANSWER
+
         # Phase 4: PI final synthesis
         if self.verbose:
             print("\n" + "=" * 60)
@@ -293,11 +540,13 @@ away the source attribution.
 
 Structure your answer clearly with sections if needed."""
 
-        final_answer = self.pi.run(final_prompt, verbose=self.verbose)
+        with usage_scope(phase="final_synthesis"), span("meeting.final_synthesis"):
+            final_answer = self.pi.run(final_prompt, verbose=self.verbose)
         self.meeting_transcript.append({
             "speaker": "PI",
             "role": "Final Answer",
-            "content": final_answer
+            "content": final_answer,
+            "model": get_client_model(self.pi.client)
         })
 
         # Extract and append references section
@@ -305,6 +554,21 @@ Structure your answer clearly with sections if needed."""
 
         return final_answer_with_refs
 
+    @property
+    def stop_reason(self) -> str:
+        """Why the last run_meeting() stopped discussing: max_rounds, critic_converged,
+        summary_converged, time_budget, token_budget, usage_budget or cancelled."""
+        return self.round_controller.stop_reason
+
+    def cancel(self) -> None:
+        """Ask a meeting to stop: no further rounds and no final synthesis.
+
+        Safe to call from another thread (or before run_meeting()); a round
+        already under way finishes first. run_meeting() then returns
+        CANCELLED_ANSWER.
+        """
+        self.round_controller.cancel()
+
     def _format_team_list(self) -> str:
         """Format the team member list for prompts."""
         team_list = []
@@ -313,27 +577,24 @@ Structure your answer clearly with sections if needed."""
         return "\n".join(team_list)
 
     def _build_context(self, last_n: int = 5) -> str:
-        """Build context string from last N transcript entries."""
-        recent = self.meeting_transcript[-last_n:] if len(self.meeting_transcript) >= last_n else self.meeting_transcript
-        context_parts = []
-        for entry in recent:
-            context_parts.append(f"[{entry['speaker']}]: {entry['content']}")
-        return "\n\n".join(context_parts)
+        """Build context string from last N transcript entries (bounded by MEETING_CONTEXT_TOKENS)."""
+        return self.meeting_transcript.recent_context(last_n, query=self.user_question)
 
     def _build_full_transcript(self) -> str:
-        """Build the full meeting transcript."""
-        transcript_parts = []
-        for entry in self.meeting_transcript:
-            transcript_parts.append(f"=== {entry['speaker']} ({entry['role']}) ===\n{entry['content']}")
-        return "\n\n".join(transcript_parts)
+        """Build the meeting transcript for the final synthesis.
+
+        Long meetings are condensed into round summaries plus the contributions
+        most relevant to the question (bounded by MEETING_SYNTHESIS_TOKENS).
+        """
+        return self.meeting_transcript.synthesis_context(self.user_question)
 
     def get_transcript(self) -> list[dict]:
         """Get the full meeting transcript.
 
         Returns:
-            List of transcript entries with speaker, role, and content
+            List of transcript entries with speaker, role, content and the model that produced it
         """
-        return self.meeting_transcript
+        return self.meeting_transcript.entries
 
     def _append_references_section(self, final_answer: str) -> str:
         """Extract and append a references section to the final answer.
@@ -403,7 +664,11 @@ def run_virtual_lab(
     max_team_size: int = 3,
     verbose: bool = False,
     data_dir: str = "/home.galaxy4/sumin/project/aisci/Competition_Data",
-    input_dir: Optional[str] = None
+    input_dir: Optional[str] = None,
+    pipelined: Optional[bool] = None,
+    early_stop: Optional[bool] = None,
+    time_budget_s: Optional[float] = None,
+    tool_cache: Optional[ToolCache] = None
 ) -> str:
     """Convenience function to run a Virtual Lab meeting.
 
@@ -417,6 +682,11 @@ def run_virtual_lab(
         verbose: Print detailed transcript
         data_dir: Path to database directory (Drug databases, PPI, GWAS, etc.)
         input_dir: Path to question-specific input data (defaults to data_dir)
+        pipelined: Critique each specialist as soon as they finish (defaults to MEETING_PIPELINE env var)
+        early_stop: End the discussion once it converges (defaults to MEETING_EARLY_STOP env var, on)
+        time_budget_s: Wall-clock budget for the meeting (defaults to MEETING_TIME_BUDGET env var)
+        tool_cache: Tool-result cache to use (e.g. one kept warm across questions
+            by a server); a new one per meeting if None
 
     Returns:
         Final synthesized answer
@@ -431,17 +701,22 @@ def run_virtual_lab(
         else:
             model = "anthropic/claude-sonnet-4"
 
-    # Create and run meeting
-    meeting = VirtualLabMeeting(
-        user_question=question,
-        api_key=api_key,
-        model=model,
-        provider=provider,
-        max_team_size=max_team_size,
-        verbose=verbose,
-        data_dir=data_dir,
-        input_dir=input_dir
-    )
-
-    final_answer = meeting.run_meeting(num_rounds=num_rounds)
+    # Create and run meeting (team design and discussion share one usage ledger)
+    with question_scope(question):
+        meeting = VirtualLabMeeting(
+            user_question=question,
+            api_key=api_key,
+            model=model,
+            provider=provider,
+            max_team_size=max_team_size,
+            verbose=verbose,
+            data_dir=data_dir,
+            input_dir=input_dir,
+            pipelined=pipelined,
+            early_stop=early_stop,
+            time_budget_s=time_budget_s,
+            tool_cache=tool_cache
+        )
+
+        final_answer = meeting.run_meeting(num_rounds=num_rounds)
     return final_answer
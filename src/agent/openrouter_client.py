@@ -1,9 +1,24 @@
 """OpenRouter API client with tool calling support."""
 
+import copy
 import json
 import os
+import time
 from typing import Any, Optional
 import requests
+from src.agent.rate_limiter import estimate_request_tokens, get_rate_governor
+from src.agent.resilience import LLMAPIError, StreamGuard, get_http_session, get_resilience_registry, parse_retry_after
+from src.agent.session_recording import get_session_recorder, get_session_replayer
+from src.agent.usage import record_usage
+from src.utils.tracing import span
+from src.agent.streaming import OpenAIStreamParser, TextCallback, ToolCallCallback, iter_sse_events
+
+
+# Model prefixes for which OpenRouter honours explicit cache_control breakpoints.
+# Other providers (OpenAI, DeepSeek, ...) cache prompt prefixes automatically.
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+
+CACHE_CONTROL = {"type": "ephemeral"}
 
 
 class OpenRouterPrivacyError(RuntimeError):
@@ -18,19 +33,24 @@ class OpenRouterPrivacyError(RuntimeError):
 class OpenRouterClient:
     """Client for OpenRouter API with tool calling support."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "anthropic/claude-sonnet-4"):
+    provider = "openrouter"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "anthropic/claude-sonnet-4", prompt_caching: Optional[bool] = None):
         """Initialize OpenRouter client.
 
         Args:
             api_key: OpenRouter API key (defaults to OPENROUTER_API_KEY env var)
             model: Model identifier (default: Claude Sonnet 4)
+            prompt_caching: Add cache_control breakpoints for models that support
+                them (defaults to PROMPT_CACHING env var, enabled)
         """
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY not found in environment")
 
         self.model = model
-        self.base_url = "https://openrouter.ai/api/v1"
+        # OPENROUTER_BASE_URL points at a proxy or the local mock server
+        self.base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
 
         # For free models, we need to allow data publication
         # See: https://openrouter.ai/docs#data-privacy
@@ -48,6 +68,16 @@ class OpenRouterClient:
             # Free models require allowing data to be published
             self.headers["OpenRouter-Data-Policy"] = "allow-all"
 
+        if prompt_caching is None:
+            prompt_caching = os.getenv("PROMPT_CACHING", "1").lower() not in ("0", "false", "no")
+        self.prompt_caching = prompt_caching
+        self.last_usage: dict[str, int] = {}
+        self.last_queue_wait = 0.0  # Seconds the last call waited in the rate governor
+
+    def supports_cache_control(self) -> bool:
+        """Whether the routed model accepts explicit cache_control breakpoints."""
+        return self.model.lower().startswith(CACHE_CONTROL_MODEL_PREFIXES)
+
     def create_message(
         self,
         messages: list[dict[str, str]],
@@ -55,6 +85,9 @@ class OpenRouterClient:
         temperature: float = 0.7,
         max_tokens: int = 4096,
         top_p: float = 1.0,
+        stream: bool = False,
+        on_text: Optional[TextCallback] = None,
+        on_tool_call: Optional[ToolCallCallback] = None,
     ) -> dict[str, Any]:
         """Send a message to OpenRouter with optional tool definitions.
 
@@ -64,9 +97,12 @@ class OpenRouterClient:
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
             top_p: Nucleus sampling parameter
+            stream: Use the SSE streaming endpoint
+            on_text: Called with each streamed text delta
+            on_tool_call: Called with each tool call as soon as its arguments are complete
 
         Returns:
-            Response dict from OpenRouter API
+            Response dict from OpenRouter API (same shape when streaming)
         """
         payload = {
             "model": self.model,
@@ -74,8 +110,13 @@ class OpenRouterClient:
             "temperature": temperature,
             "max_tokens": max_tokens,
             "top_p": top_p,
+            # Ask OpenRouter to report prompt/completion/cached token counts
+            "usage": {"include": True},
         }
 
+        if self.prompt_caching and self.supports_cache_control():
+            payload["messages"] = self._add_cache_breakpoints(messages)
+
         # For free models, explicitly allow data publication
         if ":free" in self.model.lower():
             payload["allow_fallback"] = True
@@ -84,11 +125,93 @@ class OpenRouterClient:
         if tools:
             payload["tools"] = tools
 
-        response = requests.post(
+        if stream:
+            payload["stream"] = True
+
+        replayer = get_session_replayer()
+        if replayer is not None:
+            # Replaying a recorded session: no API call, but usage still reaches the ledger
+            result = replayer.llm_response(payload)
+            self.last_usage = self.get_usage(result)
+            self.last_queue_wait = 0.0
+            record_usage(self.provider, self.model, self.last_usage)
+            text = self.get_response_text(result)
+            if on_text and text:
+                on_text(text)
+            return result
+
+        key = f"openrouter:{self.model}"
+        governor = get_rate_governor()
+        reserve = estimate_request_tokens(payload)
+
+        def attempt():
+            # Each attempt (retry or hedge) takes its own rate-limit slot, held
+            # until the response body or stream has been read. A stream that
+            # already reached the callbacks is not retried (see StreamGuard)
+            guard = StreamGuard(on_text, on_tool_call)
+            with guard, span("llm.attempt", model=self.model) as attempt_span, \
+                    governor.acquire(key, reserve) as permit:
+                attempt_span.set_attribute("queue_wait_ms", round(permit.wait_time * 1000, 1))
+                result = self._read_response(self._post(payload, stream), stream, guard.on_text, guard.on_tool_call)
+                usage = self.get_usage(result)
+                if usage["input_tokens"] or usage["output_tokens"]:
+                    permit.used_tokens = usage["input_tokens"] + usage["output_tokens"]
+            return result, permit.wait_time
+
+        def record_discarded(discarded):
+            # A losing hedge was billed too; keep the ledger and its budgets honest
+            record_usage(
+                self.provider,
+                self.model,
+                self.get_usage(discarded[0]),
+                queue_wait_s=discarded[1],
+                cost_usd=(discarded[0].get("usage") or {}).get("cost"),
+            )
+
+        # Retries with backoff, per-model circuit breaking and (non-streaming) hedging
+        with span("llm.call", provider=self.provider, model=self.model, stream=stream) as call_span:
+            start = time.monotonic()
+            result, self.last_queue_wait = get_resilience_registry().call(
+                key, attempt, hedge=not stream, on_discarded=record_discarded
+            )
+            usage = self.get_usage(result)
+            call_span.set_attribute("input_tokens", usage["input_tokens"])
+            call_span.set_attribute("cached_input_tokens", usage["cached_input_tokens"])
+            call_span.set_attribute("output_tokens", usage["output_tokens"])
+        latency = time.monotonic() - start
+        record_usage(
+            self.provider,
+            self.model,
+            usage,
+            latency_s=latency,
+            queue_wait_s=self.last_queue_wait,
+            cost_usd=(result.get("usage") or {}).get("cost"),  # OpenRouter reports the billed cost
+        )
+        recorder = get_session_recorder()
+        if recorder is not None:
+            recorder.record_llm(self.provider, self.model, payload, result, latency)
+        return result
+
+    def _post(self, payload: dict[str, Any], stream: bool = False) -> requests.Response:
+        """Send a single chat-completions request.
+
+        Args:
+            payload: Request body
+            stream: Request an SSE stream
+
+        Returns:
+            HTTP response with status 200
+
+        Raises:
+            OpenRouterPrivacyError: If the data-policy error persists after adding the header
+            LLMAPIError: For any other non-200 response
+        """
+        response = get_http_session().post(
             f"{self.base_url}/chat/completions",
             headers=self.headers,
-            json=payload,
+            data=self._encode_payload(payload),
             timeout=120,
+            stream=stream,
         )
         # If we get a non-200 response, try to detect the privacy/data-policy error
         # that OpenRouter returns for free models when data publication is not enabled.
@@ -126,15 +249,16 @@ class OpenRouterClient:
                 self.headers["OpenRouter-Data-Policy"] = "allow-all"
                 payload["allow_fallback"] = True
 
-                retry_resp = requests.post(
+                retry_resp = get_http_session().post(
                     f"{self.base_url}/chat/completions",
                     headers=self.headers,
-                    json=payload,
+                    data=self._encode_payload(payload),
                     timeout=120,
+                    stream=stream,
                 )
 
                 if retry_resp.status_code == 200:
-                    return retry_resp.json()
+                    return retry_resp
 
                 # If retry also failed, raise a clear, actionable error
                 raise OpenRouterPrivacyError(
@@ -143,10 +267,103 @@ class OpenRouterClient:
                     f"(server responses: first_status={response.status_code}, first_body={err_msg!r}, retry_status={retry_resp.status_code}, retry_body={retry_resp.text})"
                 )
 
-            # Fallback generic error for other status codes
-            raise RuntimeError(f"OpenRouter API error {response.status_code}: {response.text}")
+            # Fallback generic error for other status codes (retried by the resilience layer
+            # when transient: 429, 5xx, ...)
+            raise LLMAPIError(
+                f"OpenRouter API error {response.status_code}: {response.text}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+        return response
+
+    def _encode_payload(self, payload: dict[str, Any]) -> bytes:
+        """Serialize the request body (timed separately from the network call)."""
+        with span("llm.serialize"):
+            return json.dumps(payload).encode("utf-8")
+
+    def _read_response(
+        self,
+        response: requests.Response,
+        stream: bool,
+        on_text: Optional[TextCallback] = None,
+        on_tool_call: Optional[ToolCallCallback] = None,
+    ) -> dict[str, Any]:
+        """Decode a successful response, assembling it from SSE chunks if streaming.
+
+        Args:
+            response: HTTP response with status 200
+            stream: Whether the request was made with stream=True
+            on_text: Called with each streamed text delta
+            on_tool_call: Called with each completed tool call
+
+        Returns:
+            Response dict in the non-streaming format
+        """
+        if stream:
+            parser = OpenAIStreamParser(on_text=on_text, on_tool_call=on_tool_call)
+            for chunk in iter_sse_events(response.iter_lines(decode_unicode=True)):
+                if "error" in chunk:
+                    raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+                parser.feed(chunk)
+            result = parser.get_response()
+        else:
+            with span("llm.deserialize"):
+                result = response.json()
+        self.last_usage = self.get_usage(result)
+        return result
+
+    def _add_cache_breakpoints(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return a copy of messages with cache_control on the stable prefix.
+
+        Breakpoints go on the system message (persona prompt, identical across
+        iterations) and on the last message so the growing conversation prefix
+        is reused by the next call. The caller's history is not modified.
+
+        Args:
+            messages: Conversation messages
 
-        return response.json()
+        Returns:
+            New message list with cache_control content parts
+        """
+        messages = list(messages)
+        targets = [i for i, m in enumerate(messages) if m.get("role") == "system"][:1]
+        if messages:
+            targets.append(len(messages) - 1)
+
+        for i in targets:
+            message = copy.deepcopy(messages[i])
+            content = message.get("content")
+            if isinstance(content, str) and content:
+                message["content"] = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+            elif isinstance(content, list) and content and isinstance(content[-1], dict):
+                content[-1]["cache_control"] = CACHE_CONTROL
+            else:
+                continue
+            messages[i] = message
+        return messages
+
+    def get_usage(self, response: dict[str, Any]) -> dict[str, int]:
+        """Extract token usage, split into cached and uncached input tokens.
+
+        Args:
+            response: Response dict from create_message
+
+        Returns:
+            Dict with input_tokens, cached_input_tokens, cache_write_tokens,
+            uncached_input_tokens and output_tokens
+        """
+        usage = response.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0) or 0
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens", 0) or 0
+        return {
+            "input_tokens": prompt_tokens,
+            "cached_input_tokens": cached,
+            "cache_write_tokens": details.get("cache_write_tokens", 0) or 0,
+            "uncached_input_tokens": max(0, prompt_tokens - cached),
+            "output_tokens": usage.get("completion_tokens", 0) or 0,
+        }
 
     def extract_tool_calls(self, response: dict[str, Any]) -> list[dict[str, Any]]:
         """Extract tool calls from API response.
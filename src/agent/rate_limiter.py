@@ -0,0 +1,338 @@
+"""Process-wide client-side rate limiting for LLM provider calls.
+
+Every request to a provider/model pair (e.g. ``openrouter:anthropic/claude-sonnet-4``)
+passes through one ``RateGovernor``. Each pair has:
+
+- a requests-per-minute bucket,
+- a tokens-per-minute bucket (reserved from a prompt estimate plus max_tokens,
+  then corrected with the usage the provider reports), and
+- a cap on requests in flight.
+
+Limits come from environment variables:
+
+    LLM_RPM=60                  # default requests/minute per model (unset: unlimited)
+    LLM_TPM=200000              # default tokens/minute per model (unset: unlimited)
+    LLM_MAX_IN_FLIGHT=8         # default concurrent requests per model
+    LLM_RATE_LIMITS='{"openrouter:*:free": {"rpm": 20}, "anthropic:*": {"tpm": 400000}}'
+
+``LLM_RATE_LIMITS`` keys are glob patterns over ``provider:model``. The first
+matching pattern overrides the defaults. OpenRouter's free models allow
+20 requests/minute, so that limit is built in.
+
+Time spent waiting for a slot is recorded per key. ``get_stats()`` reports it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Any, Iterator, Optional
+
+from src.agent.compaction import estimate_tokens
+from src.agent.resilience import LLMAPIError
+
+
+# Built-in limits, applied before LLM_RATE_LIMITS overrides
+DEFAULT_RATE_LIMITS = {
+    "openrouter:*:free": {"rpm": 20},
+}
+
+
+@dataclass
+class RateLimits:
+    """Limits for one provider/model pair (None = unlimited)."""
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    max_in_flight: int = 8
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute / 60`` units per second.
+
+    Not thread-safe on its own; the governor serializes access under its condition lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        """Return over-reserved units (negative amounts debit extra usage)."""
+        self.level = min(self.capacity, self.level + amount)
+
+
+@dataclass
+class QueueStats:
+    """Queue-wait counters for one provider/model pair."""
+    requests: int = 0
+    throttled: int = 0  # Requests that had to wait at all
+    total_wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    pauses: int = 0  # 429 responses that paused the key
+    waits: deque = field(default_factory=lambda: deque(maxlen=200))
+
+    def record(self, wait: float) -> None:
+        self.requests += 1
+        self.total_wait_s += wait
+        self.max_wait_s = max(self.max_wait_s, wait)
+        self.waits.append(wait)
+        if wait > 0.001:
+            self.throttled += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.waits)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else 0.0
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "pauses": self.pauses,
+            "total_wait_s": round(self.total_wait_s, 3),
+            "mean_wait_s": round(self.total_wait_s / self.requests, 3) if self.requests else 0.0,
+            "p95_wait_s": round(p95, 3),
+            "max_wait_s": round(self.max_wait_s, 3),
+        }
+
+
+class _KeyState:
+    """Buckets, in-flight count and stats for one key."""
+
+    def __init__(self, limits: RateLimits):
+        self.limits = limits
+        self.requests = TokenBucket(limits.rpm) if limits.rpm else None
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.stats = QueueStats()
+
+
+@dataclass
+class Permit:
+    """A granted request slot. Set ``used_tokens`` once the provider reports usage."""
+    key: str
+    reserved_tokens: int
+    wait_time: float
+    used_tokens: Optional[int] = None
+
+
+def estimate_request_tokens(payload: dict[str, Any]) -> int:
+    """Estimate the tokens a request will consume (prompt estimate + max_tokens).
+
+    Args:
+        payload: Chat/messages request body
+
+    Returns:
+        Approximate token count to reserve
+    """
+    prompt = json.dumps(
+        [payload.get("system"), payload.get("messages"), payload.get("tools")],
+        default=str,
+    )
+    return estimate_tokens(prompt) + int(payload.get("max_tokens") or 0)
+
+
+def _load_rate_limits() -> dict[str, dict[str, Any]]:
+    """Built-in limits merged with the LLM_RATE_LIMITS JSON override."""
+    overrides = {}
+    raw = os.getenv("LLM_RATE_LIMITS")
+    if raw:
+        try:
+            overrides = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"Warning: ignoring invalid LLM_RATE_LIMITS JSON: {raw!r}")
+    # Overrides take precedence, so they are matched first
+    return {**overrides, **{k: v for k, v in DEFAULT_RATE_LIMITS.items() if k not in overrides}}
+
+
+class RateGovernor:
+    """Shared RPM/TPM/concurrency limiter for all LLM clients in the process."""
+
+    def __init__(
+        self,
+        default_limits: Optional[RateLimits] = None,
+        overrides: Optional[dict[str, dict[str, Any]]] = None,
+    ):
+        """Initialize the governor.
+
+        Args:
+            default_limits: Limits for keys without an override (defaults from
+                LLM_RPM, LLM_TPM and LLM_MAX_IN_FLIGHT env vars)
+            overrides: Glob pattern -> {"rpm", "tpm", "max_in_flight"} (defaults
+                to built-in limits plus LLM_RATE_LIMITS)
+        """
+        if default_limits is None:
+            rpm = os.getenv("LLM_RPM")
+            tpm = os.getenv("LLM_TPM")
+            default_limits = RateLimits(
+                rpm=float(rpm) if rpm else None,
+                tpm=float(tpm) if tpm else None,
+                max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+            )
+        self.default_limits = default_limits
+        self.overrides = _load_rate_limits() if overrides is None else overrides
+        self._keys: dict[str, _KeyState] = {}
+        self._cond = threading.Condition()
+
+    def limits_for(self, key: str) -> RateLimits:
+        """Resolve the limits that apply to a provider/model key."""
+        for pattern, values in self.overrides.items():
+            if fnmatch(key, pattern):
+                return RateLimits(
+                    rpm=values.get("rpm", self.default_limits.rpm),
+                    tpm=values.get("tpm", self.default_limits.tpm),
+                    max_in_flight=values.get("max_in_flight", self.default_limits.max_in_flight),
+                )
+        return self.default_limits
+
+    def _state(self, key: str) -> _KeyState:
+        # Caller holds self._cond
+        if key not in self._keys:
+            self._keys[key] = _KeyState(self.limits_for(key))
+        return self._keys[key]
+
+    @contextmanager
+    def acquire(self, key: str, tokens: int = 0, timeout: Optional[float] = None) -> Iterator[Permit]:
+        """Block until a request to ``key`` fits all limits, then hold a slot.
+
+        Args:
+            key: Provider/model key, e.g. "openrouter:anthropic/claude-sonnet-4"
+            tokens: Tokens to reserve against the TPM bucket
+            timeout: Give up after this many seconds (None waits indefinitely)
+
+        Yields:
+            Permit; set ``permit.used_tokens`` to the real usage to correct the reservation
+
+        Raises:
+            TimeoutError: If the slot was not granted within ``timeout``
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        with self._cond:
+            state = self._state(key)
+            while True:
+                now = time.monotonic()
+                delay = self._delay(state, tokens, now)
+                if delay == 0.0:
+                    break
+                if deadline is not None and now >= deadline:
+                    raise TimeoutError(f"Rate limiter: no slot for {key} within {timeout:.0f}s")
+                # Bucket waits are timed; in-flight waits are woken on release
+                wait_for = None if delay == float("inf") else delay
+                if deadline is not None:
+                    wait_for = min(wait_for if wait_for is not None else deadline - now, deadline - now)
+                self._cond.wait(wait_for)
+
+            if state.requests:
+                state.requests.take(1, now)
+            if state.tokens:
+                state.tokens.take(tokens, now)
+            state.in_flight += 1
+            wait_time = time.monotonic() - start
+            state.stats.record(wait_time)
+
+        permit = Permit(key=key, reserved_tokens=tokens, wait_time=wait_time)
+        try:
+            yield permit
+        except LLMAPIError as e:
+            if e.status_code == 429:
+                self.pause(key, e.retry_after or 1.0)
+            raise
+        finally:
+            with self._cond:
+                state.in_flight -= 1
+                if state.tokens and permit.used_tokens is not None:
+                    state.tokens.give(permit.reserved_tokens - permit.used_tokens)
+                self._cond.notify_all()
+
+    def _delay(self, state: _KeyState, tokens: int, now: float) -> float:
+        """Seconds until a request fits (inf while the in-flight cap is reached)."""
+        if state.in_flight >= state.limits.max_in_flight:
+            return float("inf")
+        delay = max(0.0, state.paused_until - now)
+        if state.requests:
+            delay = max(delay, state.requests.time_until(1, now))
+        if state.tokens:
+            delay = max(delay, state.tokens.time_until(tokens, now))
+        return delay
+
+    def pause(self, key: str, seconds: float) -> None:
+        """Hold back all requests to ``key`` after a 429, so parallel callers back off together."""
+        with self._cond:
+            state = self._state(key)
+            state.paused_until = max(state.paused_until, time.monotonic() + seconds)
+            state.stats.pauses += 1
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Queue-wait metrics and current in-flight count per provider/model key."""
+        with self._cond:
+            return {
+                key: {**state.stats.to_dict(), "in_flight": state.in_flight}
+                for key, state in self._keys.items()
+            }
+
+
+# Singleton shared by every client in the process
+_governor: Optional[RateGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_rate_governor() -> RateGovernor:
+    """Get or create the process-wide rate governor."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateGovernor()
+        return _governor
+
+
+def litellm_governor_key(model: str) -> str:
+    """Map a LiteLLM model name to the governor key used by our own clients.
+
+    ``openrouter/google/gemini-2.0-flash-exp:free`` -> ``openrouter:google/gemini-2.0-flash-exp:free``,
+    so PaperQA shares the same buckets as agents calling that model.
+    """
+    provider, _, name = model.partition("/")
+    if provider in ("openrouter", "anthropic") and name:
+        return f"{provider}:{name}"
+    return f"litellm:{model}"
+
+
+def litellm_rate_limit_config(model: str) -> dict[str, Any]:
+    """Build a PaperQA ``llm_config`` that applies the governor's TPM limit inside LiteLLM.
+
+    PaperQA issues many LLM calls per query from its own event loop, so they
+    cannot pass through ``RateGovernor.acquire``; its built-in limiter is given
+    the same tokens-per-minute budget instead.
+
+    Args:
+        model: LiteLLM model name
+
+    Returns:
+        ``{"rate_limit": {model: "<tpm> per 1 minute"}}``, or {} if no TPM limit applies
+    """
+    limits = get_rate_governor().limits_for(litellm_governor_key(model))
+    if not limits.tpm:
+        return {}
+    return {"rate_limit": {model: f"{int(limits.tpm)} per 1 minute"}}
@@ -0,0 +1,445 @@
+"""Retry, backoff, circuit breaking and request hedging for LLM provider calls.
+
+Also holds the process-wide HTTP session the LLM clients send through, so
+TCP/TLS connections are reused across calls, agents and server jobs.
+"""
+
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, asdict
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, TypeVar
+
+import requests
+
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, rate limits and transient upstream errors
+# (529 is Anthropic's "overloaded")
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+class LLMAPIError(RuntimeError):
+    """Raised when a provider returns a non-200 response.
+
+    Subclasses RuntimeError so existing ``except RuntimeError`` handlers keep working.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code in RETRYABLE_STATUS_CODES
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the provider while a model's circuit is open."""
+    pass
+
+
+class StreamInterruptedError(RuntimeError):
+    """A stream failed after part of it reached the caller's callbacks.
+
+    Not retried: a new attempt would print the text again and start the
+    already-announced tool calls a second time.
+    """
+    pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date).
+
+    Args:
+        value: Header value
+
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether a failed attempt should be retried."""
+    if isinstance(error, LLMAPIError):
+        return error.retryable
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Whether a failed attempt says the provider is unhealthy (counts toward its circuit).
+
+    Timeouts, connection errors, rate limits and 5xx do; a rejected request
+    (e.g. 400 for an over-long context) is the caller's problem and does not.
+    """
+    if isinstance(error, LLMAPIError) and error.status_code >= 500:
+        return True
+    if isinstance(error, StreamInterruptedError):
+        return True
+    return is_retryable(error)
+
+
+class StreamGuard:
+    """Tracks what one streaming attempt delivered; stops retries once it delivered anything.
+
+    Wrap an attempt's callbacks and run it inside the guard:
+
+        guard = StreamGuard(on_text, on_tool_call)
+        with guard:
+            read_stream(on_text=guard.on_text, on_tool_call=guard.on_tool_call)
+
+    A retryable error raised after the first delivered delta becomes a
+    StreamInterruptedError; before that, the attempt can be retried cleanly.
+    """
+
+    def __init__(self, on_text: Optional[Callable[..., Any]], on_tool_call: Optional[Callable[..., Any]]):
+        self.delivered = False
+        self.on_text = self._wrap(on_text)
+        self.on_tool_call = self._wrap(on_tool_call)
+
+    def _wrap(self, callback: Optional[Callable[..., Any]]) -> Optional[Callable[..., Any]]:
+        if callback is None:
+            return None
+
+        def deliver(*args: Any) -> Any:
+            self.delivered = True
+            return callback(*args)
+
+        return deliver
+
+    def __enter__(self) -> "StreamGuard":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and self.delivered and is_retryable(exc):
+            raise StreamInterruptedError(f"Stream interrupted after partial output: {exc}") from exc
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff settings."""
+    max_retries: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_retry_after: float = 120.0  # Upper bound on a server-requested wait
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to sleep before retry number ``attempt`` (0-based).
+
+        Uses "full jitter" so parallel specialists hitting the same 429 do not
+        retry in lockstep; a Retry-After from the server is a lower bound.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            return min(self.max_retry_after, max(backoff, retry_after))
+        return backoff
+
+
+class CircuitBreaker:
+    """Per-model circuit breaker (closed -> open -> half-open)."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds before a single trial call is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Record a failed call.
+
+        Returns:
+            True if this failure opened (or re-opened) the circuit
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            was_trial = self._trial_in_flight
+            self._trial_in_flight = False
+            if was_trial or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+@dataclass
+class ModelCallStats:
+    """Counters for one provider/model pair."""
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    hedges_discarded: int = 0
+    circuit_opens: int = 0
+    circuit_rejections: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=200))
+
+    def p95_latency(self) -> Optional[float]:
+        """95th percentile of recent successful call latencies (seconds)."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data.pop("latencies")
+        data["p95_latency_s"] = self.p95_latency()
+        return data
+
+
+class ResilienceRegistry:
+    """Process-wide retry/circuit-breaker/hedging layer shared by all LLM clients."""
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        hedging: Optional[bool] = None,
+        min_hedge_samples: int = 20,
+    ):
+        """Initialize the registry.
+
+        Args:
+            policy: Retry policy (defaults from LLM_MAX_RETRIES env var)
+            hedging: Send a duplicate request once a call exceeds the model's p95
+                latency (defaults to LLM_HEDGING env var, disabled because hedges
+                are billed as separate requests)
+            min_hedge_samples: Latency samples required before hedging a model
+        """
+        self.policy = policy or RetryPolicy(max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")))
+        if hedging is None:
+            hedging = os.getenv("LLM_HEDGING", "").lower() in ("1", "true", "yes")
+        self.hedging = hedging
+        self.min_hedge_samples = min_hedge_samples
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._stats: dict[str, ModelCallStats] = {}
+        self._lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker()
+            return self._breakers[key]
+
+    def stats(self, key: str) -> ModelCallStats:
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = ModelCallStats()
+            return self._stats[key]
+
+    def _count(self, stats: ModelCallStats, latency: Optional[float] = None, **increments: int) -> None:
+        """Update a model's counters (calls from many threads share them)."""
+        with self._lock:
+            for name, n in increments.items():
+                setattr(stats, name, getattr(stats, name) + n)
+            if latency is not None:
+                stats.latencies.append(latency)
+
+    def call(
+        self,
+        key: str,
+        attempt: Callable[[], T],
+        hedge: bool = True,
+        on_discarded: Optional[Callable[[T], Any]] = None,
+    ) -> T:
+        """Run ``attempt`` with retries, circuit breaking and optional hedging.
+
+        Args:
+            key: Provider/model key, e.g. "openrouter:anthropic/claude-sonnet-4"
+            attempt: Performs one request; raises LLMAPIError or requests errors on failure
+            hedge: Allow a duplicate request for tail latency (disable for streaming)
+            on_discarded: Called with the result of a losing hedge once it
+                completes (it was billed, so callers record its usage here)
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the model's circuit is open
+            Exception: The last error once retries are exhausted or it is not retryable
+        """
+        breaker = self.breaker(key)
+        stats = self.stats(key)
+
+        for retry in range(self.policy.max_retries + 1):
+            if not breaker.allow():
+                self._count(stats, circuit_rejections=1)
+                raise CircuitOpenError(f"Circuit open for {key} after {breaker.consecutive_failures} consecutive failures")
+
+            self._count(stats, calls=1)
+            start = time.monotonic()
+            try:
+                if hedge and self.hedging:
+                    result = self._hedged(attempt, stats, on_discarded)
+                else:
+                    result = attempt()
+            except Exception as e:
+                self._count(stats, failures=1)
+                if not is_provider_failure(e):
+                    # The provider answered; one bad request must not open the circuit for everyone
+                    breaker.record_success()
+                elif breaker.record_failure():
+                    self._count(stats, circuit_opens=1)
+                if not is_retryable(e) or retry >= self.policy.max_retries:
+                    raise
+                self._count(stats, retries=1)
+                time.sleep(self.policy.delay(retry, getattr(e, "retry_after", None)))
+                continue
+
+            self._count(stats, latency=time.monotonic() - start, successes=1)
+            breaker.record_success()
+            return result
+
+        raise RuntimeError(f"Retries exhausted for {key}")  # pragma: no cover - loop always returns/raises
+
+    def _hedged(
+        self,
+        attempt: Callable[[], T],
+        stats: ModelCallStats,
+        on_discarded: Optional[Callable[[T], Any]] = None,
+    ) -> T:
+        """Run attempt; if it outlives the p95 latency, race a duplicate.
+
+        The losing request cannot be interrupted mid-flight. When it finishes
+        it is counted in ``hedges_discarded`` and its result is passed to
+        ``on_discarded`` (in the caller's context, so usage lands in the
+        caller's ledger scope).
+        """
+        with self._lock:
+            threshold = stats.p95_latency() if len(stats.latencies) >= self.min_hedge_samples else None
+        if threshold is None:
+            return attempt()
+
+        # Copy the context so tracing/usage scopes follow the attempt into the pool
+        contexts = {}
+
+        def submit() -> Future:
+            context = contextvars.copy_context()
+            future = self._hedge_pool.submit(context.run, attempt)
+            contexts[future] = context
+            return future
+
+        primary = submit()
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+
+        self._count(stats, hedges=1)
+        backup = submit()
+
+        def settle(future: Future) -> None:
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._count(stats, hedges_discarded=1)
+            if on_discarded is not None:
+                contexts[future].run(on_discarded, future.result())
+
+        pending = {primary, backup}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count(stats, hedge_wins=1)
+                    for loser in {primary, backup} - {future}:
+                        loser.add_done_callback(settle)
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """Snapshot of counters per provider/model key."""
+        with self._lock:
+            snapshot = {key: s.to_dict() for key, s in self._stats.items()}
+        return {
+            key: {**data, "circuit_state": self.breaker(key).state}
+            for key, data in snapshot.items()
+        }
+
+
+# Singleton shared by every client in the process
+_registry: Optional[ResilienceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_resilience_registry() -> ResilienceRegistry:
+    """Get or create the process-wide resilience registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ResilienceRegistry()
+        return _registry
+
+
+_http_session: Optional[requests.Session] = None
+
+
+def get_http_session() -> requests.Session:
+    """Get or create the process-wide HTTP session for provider calls.
+
+    Keeps up to LLM_HTTP_POOL_SIZE (default 32, the agent loop's worker
+    count) idle connections per host, so parallel specialists do not
+    discard connections when the pool is full.
+    """
+    global _http_session
+    with _registry_lock:
+        if _http_session is None:
+            pool_size = int(os.getenv("LLM_HTTP_POOL_SIZE", "32"))
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
@@ -0,0 +1,399 @@
+"""Record and replay full agent sessions.
+
+A recording captures every LLM request/response and every tool input/output
+of a run, so a slow or surprising run can be reproduced exactly and used as a
+fixed trace for performance regression tests:
+
+    python -m src.cli --question "..." --virtual-lab --record runs/q5.jsonl.zst
+    python -m src.benchmark.replay_session runs/q5.jsonl.zst [--live-tools]
+
+Recordings are JSONL, compressed by file extension: ".zst" (needs the
+optional ``zstandard`` package), ".gz", or plain otherwise. Tool definitions
+repeat in every request and are stored once by digest.
+
+During replay the clients return recorded responses instead of calling the
+API, and tools return recorded outputs unless ``live_tools`` is set, in which
+case they run for real (to time tool changes against a fixed conversation).
+LLM responses are looked up by conversation identity: system prompt, opening
+user message and turn number, so replay works even though meeting specialists
+run concurrently and finish in a different order.
+"""
+
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+FORMAT_VERSION = 1
+
+
+class ReplayMismatchError(RuntimeError):
+    """Raised when a replayed run asks for an LLM response the recording doesn't have."""
+    pass
+
+
+def _text_of(content: Any) -> str:
+    """Flatten message content (string or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return ""
+
+
+def _is_tool_result(message: dict[str, Any]) -> bool:
+    if message.get("role") == "tool":
+        return True
+    content = message.get("content")
+    return isinstance(content, list) and any(
+        isinstance(b, dict) and b.get("type") == "tool_result" for b in content
+    )
+
+
+def conversation_step(messages: list[dict[str, Any]]) -> int:
+    """Number of completed assistant turns in a conversation.
+
+    Counts assistant messages, or runs of tool results for histories that
+    do not store the assistant turn, whichever is larger.
+    """
+    assistant_turns = sum(1 for m in messages if m.get("role") == "assistant")
+    tool_runs = 0
+    in_run = False
+    for m in messages:
+        if _is_tool_result(m):
+            if not in_run:
+                tool_runs += 1
+            in_run = True
+        else:
+            in_run = False
+    return max(assistant_turns, tool_runs)
+
+
+def conversation_key(payload: dict[str, Any]) -> str:
+    """Stable identity of an LLM request: system prompt, opening question and turn.
+
+    The model is left out on purpose, so a recorded fallback to another model
+    still replays.
+    """
+    messages = payload.get("messages") or []
+    system = _text_of(payload.get("system")) or next(
+        (_text_of(m.get("content")) for m in messages if m.get("role") == "system"), ""
+    )
+    first_user = next((_text_of(m.get("content")) for m in messages if m.get("role") == "user"), "")
+    digest = hashlib.sha256(f"{system}\x00{first_user}".encode("utf-8")).hexdigest()[:24]
+    return f"{digest}:{conversation_step(messages)}"
+
+
+def tool_key(name: str, tool_input: dict[str, Any]) -> str:
+    """Stable identity of a tool call."""
+    return f"{name}:{hashlib.sha256(json.dumps(tool_input, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:24]}"
+
+
+def _open_text(path: str, mode: str):
+    """Open a recording for text I/O, compressed according to its extension."""
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Recording to .zst needs the zstandard package (pip install zstandard)") from e
+        if mode == "w":
+            raw = zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_recording(path: str) -> list[dict[str, Any]]:
+    """Read all events of a recording.
+
+    Returns:
+        Events in recorded order (the first is the session header)
+    """
+    with _open_text(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class SessionRecorder:
+    """Appends LLM and tool events of a run to a recording file."""
+
+    def __init__(self, path: str, entrypoint: str = "agent", question: str = "", config: Optional[dict[str, Any]] = None):
+        """Open the recording and write its header.
+
+        Args:
+            path: Output file (.jsonl, .jsonl.gz or .jsonl.zst)
+            entrypoint: What replay should re-drive: "agent", "agent_with_critic" or "virtual_lab"
+            question: The question being run
+            config: Options needed to rebuild the run (model, provider, rounds, ...)
+        """
+        self.path = path
+        self._file = _open_text(path, "w")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._seq = 0
+        self._tool_digests: set[str] = set()
+        self._write({
+            "type": "session",
+            "version": FORMAT_VERSION,
+            "entrypoint": entrypoint,
+            "question": question,
+            "config": config or {},
+            "started_at": time.time(),
+        })
+
+    def _write(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            event["seq"] = self._seq
+            event["t"] = round(time.monotonic() - self._start, 4)
+            self._seq += 1
+            self._file.write(json.dumps(event, default=str) + "\n")
+
+    def record_llm(self, provider: str, model: str, payload: dict[str, Any], response: dict[str, Any], latency_s: float) -> None:
+        """Record one LLM call (after retries/hedging, i.e. the response the caller saw)."""
+        request = dict(payload)
+        tools = request.pop("tools", None)
+        if tools:
+            tools_json = json.dumps(tools, sort_keys=True)
+            digest = hashlib.sha256(tools_json.encode("utf-8")).hexdigest()[:16]
+            request["tools_digest"] = digest
+            with self._lock:
+                first_use = digest not in self._tool_digests
+                self._tool_digests.add(digest)
+            if first_use:
+                self._write({"type": "tools", "digest": digest, "tools": tools})
+        self._write({
+            "type": "llm",
+            "provider": provider,
+            "model": model,
+            "key": conversation_key(payload),
+            "latency_s": round(latency_s, 4),
+            "request": request,
+            "response": response,
+        })
+
+    def record_tool(self, agent: str, name: str, tool_input: dict[str, Any], result: dict[str, Any], duration_s: float) -> None:
+        """Record one tool call with the input the model sent."""
+        self._write({
+            "type": "tool",
+            "agent": agent,
+            "name": name,
+            "key": tool_key(name, tool_input),
+            "duration_s": round(duration_s, 4),
+            "input": tool_input,
+            "output": result,
+        })
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SessionReplayer:
+    """Serves recorded LLM responses (and optionally tool outputs) back to a run."""
+
+    def __init__(self, path: str, live_tools: bool = False, latency_scale: float = 0.0):
+        """Load a recording.
+
+        Args:
+            path: Recording written by SessionRecorder
+            live_tools: Execute tools for real instead of returning recorded outputs
+            latency_scale: Sleep this fraction of each recorded LLM latency
+                (0 replays as fast as possible, 1 reproduces the original timing)
+        """
+        events = load_recording(path)
+        if not events or events[0].get("type") != "session":
+            raise ValueError(f"Not a session recording: {path}")
+        self.header = events[0]
+        self.live_tools = live_tools
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._llm: dict[str, deque] = defaultdict(deque)
+        self._tools: dict[str, deque] = defaultdict(deque)
+        for event in events[1:]:
+            if event["type"] == "llm":
+                self._llm[event["key"]].append(event)
+            elif event["type"] == "tool":
+                self._tools[event["key"]].append(event)
+        self.llm_served = 0
+        self.tools_served = 0
+        self.tool_misses = 0
+
+    def llm_response(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Return the recorded response for a request.
+
+        Raises:
+            ReplayMismatchError: If the run diverged from the recording
+        """
+        key = conversation_key(payload)
+        with self._lock:
+            queue = self._llm.get(key)
+            if not queue:
+                raise ReplayMismatchError(
+                    f"No recorded LLM response for conversation {key} "
+                    f"(turn {key.rsplit(':', 1)[1]}); the run diverged from the recording"
+                )
+            event = queue.popleft()
+            self.llm_served += 1
+        if self.latency_scale > 0:
+            time.sleep(event.get("latency_s", 0.0) * self.latency_scale)
+        return event["response"]
+
+    def tool_result(self, name: str, tool_input: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Return the recorded tool output, or None if the tool should run live."""
+        if self.live_tools:
+            return None
+        with self._lock:
+            queue = self._tools.get(tool_key(name, tool_input))
+            if not queue:
+                # Inputs the recording never saw run live rather than failing the replay
+                self.tool_misses += 1
+                return None
+            self.tools_served += 1
+            return queue.popleft()["output"]
+
+    def unused(self) -> dict[str, int]:
+        """Recorded events the replay never consumed (non-zero means divergence)."""
+        with self._lock:
+            return {
+                "llm": sum(len(q) for q in self._llm.values()),
+                "tools": 0 if self.live_tools else sum(len(q) for q in self._tools.values()),
+            }
+
+
+_recorder: Optional[SessionRecorder] = None
+_replayer: Optional[SessionReplayer] = None
+
+
+def get_session_recorder() -> Optional[SessionRecorder]:
+    """The active recorder, or None when not recording."""
+    return _recorder
+
+
+def get_session_replayer() -> Optional[SessionReplayer]:
+    """The active replayer, or None when not replaying."""
+    return _replayer
+
+
+def start_recording(path: str, entrypoint: str = "agent", question: str = "", config: Optional[dict[str, Any]] = None) -> SessionRecorder:
+    """Record all LLM and tool calls from now until stop_recording() or interpreter exit.
+
+    Args:
+        path: Output file (.jsonl, .jsonl.gz or .jsonl.zst)
+        entrypoint: What replay should re-drive: "agent", "agent_with_critic" or "virtual_lab"
+        question: The question being run
+        config: Options needed to rebuild the run (model, provider, rounds, ...)
+
+    Returns:
+        The active recorder
+    """
+    global _recorder
+    stop_recording()
+    _recorder = SessionRecorder(path, entrypoint=entrypoint, question=question, config=config)
+    atexit.register(stop_recording)
+    return _recorder
+
+
+def stop_recording() -> None:
+    """Close the active recording, if any."""
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+@contextmanager
+def record_session(path: str, entrypoint: str = "agent", question: str = "", config: Optional[dict[str, Any]] = None) -> Iterator[SessionRecorder]:
+    """Record all LLM and tool calls made inside the block (see start_recording)."""
+    try:
+        yield start_recording(path, entrypoint=entrypoint, question=question, config=config)
+    finally:
+        stop_recording()
+
+
+@contextmanager
+def replay_session(path: str, live_tools: bool = False, latency_scale: float = 0.0) -> Iterator[SessionReplayer]:
+    """Serve LLM calls made inside the block from a recording (see SessionReplayer)."""
+    global _replayer
+    replayer = SessionReplayer(path, live_tools=live_tools, latency_scale=latency_scale)
+    previous, _replayer = _replayer, replayer
+    try:
+        yield replayer
+    finally:
+        _replayer = previous
+
+
+def replay(path: str, live_tools: bool = False, latency_scale: float = 0.0, data_dir: Optional[str] = None) -> dict[str, Any]:
+    """Re-drive the recorded entry point from a recording.
+
+    Args:
+        path: Recording file
+        live_tools: Execute tools for real
+        latency_scale: Fraction of recorded LLM latency to reproduce
+        data_dir: Override the recorded data directory (for live tools on another machine)
+
+    Returns:
+        Dict with answer, wall_s, llm_served, tools_served, tool_misses and unused
+    """
+    with replay_session(path, live_tools=live_tools, latency_scale=latency_scale) as replayer:
+        header = replayer.header
+        config = dict(header.get("config") or {})
+        if data_dir:
+            config["data_dir"] = data_dir
+        question = header["question"]
+        api_key = "replay"  # The API is never called, but the clients still require a key
+        entrypoint = header["entrypoint"]
+
+        start = time.perf_counter()
+        if entrypoint == "virtual_lab":
+            from src.agent.meeting import run_virtual_lab
+            answer = run_virtual_lab(
+                question,
+                api_key=api_key,
+                model=config.get("model"),
+                provider=config.get("provider"),
+                num_rounds=config.get("num_rounds", 2),
+                max_team_size=config.get("max_team_size", 3),
+                pipelined=config.get("pipelined"),
+                early_stop=config.get("early_stop"),
+                **{k: config[k] for k in ("data_dir", "input_dir") if config.get(k)},
+            )
+        elif entrypoint in ("agent", "agent_with_critic"):
+            from src.agent.agent import create_agent
+            agent = create_agent(
+                api_key=api_key,
+                model=config.get("model"),
+                provider=config.get("provider"),
+                **{k: config[k] for k in ("data_dir", "input_dir") if config.get(k)},
+            )
+            if entrypoint == "agent":
+                answer = agent.run(question)
+            else:
+                answer = agent.run_with_critic(question)[2]
+        else:
+            raise ValueError(f"Cannot replay entry point: {entrypoint}")
+
+        return {
+            "answer": answer,
+            "wall_s": time.perf_counter() - start,
+            "llm_served": replayer.llm_served,
+            "tools_served": replayer.tools_served,
+            "tool_misses": replayer.tool_misses,
+            "unused": replayer.unused(),
+        }
+
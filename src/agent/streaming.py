@@ -0,0 +1,229 @@
+"""Server-sent event parsing and incremental tool-call assembly for streamed responses.
+
+Both parsers rebuild a response dict in the same shape as the provider's
+non-streaming endpoint, so ``extract_tool_calls`` and ``get_response_text`` work
+unchanged on the result. While parsing, ``on_text`` receives each text delta and
+``on_tool_call`` receives every tool call as soon as its JSON arguments are
+complete, before the rest of the response has arrived.
+"""
+
+import json
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+TextCallback = Callable[[str], None]
+ToolCallCallback = Callable[[dict[str, Any]], None]
+
+
+def iter_sse_events(lines: Iterable[Any]) -> Iterator[dict[str, Any]]:
+    """Parse an SSE line stream into decoded JSON events.
+
+    Args:
+        lines: Iterable of lines (str or bytes), e.g. ``response.iter_lines()``
+
+    Yields:
+        Decoded JSON payload of each ``data:`` event. Comments (OpenRouter sends
+        ``: OPENROUTER PROCESSING`` keep-alives) and ``[DONE]`` are skipped.
+    """
+    data_lines: list[str] = []
+    for raw in lines:
+        line = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        if line is None:
+            continue
+        line = line.rstrip("\r")
+
+        if not line:
+            # Blank line terminates an event
+            if data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data.strip() == "[DONE]":
+                    continue
+                try:
+                    yield json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+            continue
+
+        if line.startswith(":"):
+            continue
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+    if data_lines:
+        data = "\n".join(data_lines)
+        if data.strip() != "[DONE]":
+            try:
+                yield json.loads(data)
+            except json.JSONDecodeError:
+                pass
+
+
+def _parse_complete_arguments(arguments: str) -> Optional[dict[str, Any]]:
+    """Return the arguments dict if the JSON text is complete, else None."""
+    if not arguments:
+        return None
+    try:
+        parsed = json.loads(arguments)
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+class OpenAIStreamParser:
+    """Assemble an OpenAI/OpenRouter chat-completions stream."""
+
+    def __init__(self, on_text: Optional[TextCallback] = None, on_tool_call: Optional[ToolCallCallback] = None):
+        """Initialize the parser.
+
+        Args:
+            on_text: Called with each content delta
+            on_tool_call: Called with {'id', 'name', 'input'} once a call's arguments are complete
+        """
+        self.on_text = on_text
+        self.on_tool_call = on_tool_call
+        self.content_parts: list[str] = []
+        self.tool_calls: dict[int, dict[str, Any]] = {}
+        self.emitted: set[int] = set()
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[dict[str, Any]] = None
+        self.meta: dict[str, Any] = {}
+
+    def feed(self, chunk: dict[str, Any]) -> None:
+        """Consume one decoded stream chunk.
+
+        Args:
+            chunk: A ``chat.completion.chunk`` object
+        """
+        if not self.meta:
+            self.meta = {k: chunk[k] for k in ("id", "model", "created") if k in chunk}
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+
+        for choice in chunk.get("choices") or []:
+            delta = choice.get("delta") or {}
+
+            text = delta.get("content")
+            if text:
+                self.content_parts.append(text)
+                if self.on_text:
+                    self.on_text(text)
+
+            for call_delta in delta.get("tool_calls") or []:
+                index = call_delta.get("index", len(self.tool_calls))
+                call = self.tool_calls.setdefault(index, {
+                    "id": "",
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""},
+                })
+                if call_delta.get("id"):
+                    call["id"] = call_delta["id"]
+                func = call_delta.get("function") or {}
+                if func.get("name"):
+                    call["function"]["name"] += func["name"]
+                if func.get("arguments"):
+                    call["function"]["arguments"] += func["arguments"]
+                self._maybe_emit(index)
+
+            if choice.get("finish_reason"):
+                self.finish_reason = choice["finish_reason"]
+                for index in list(self.tool_calls):
+                    self._maybe_emit(index)
+
+    def _maybe_emit(self, index: int) -> None:
+        """Emit a tool call once its arguments form a complete JSON object."""
+        if index in self.emitted or not self.on_tool_call:
+            return
+        call = self.tool_calls[index]
+        arguments = _parse_complete_arguments(call["function"]["arguments"])
+        if arguments is None or not call["function"]["name"]:
+            return
+        self.emitted.add(index)
+        self.on_tool_call({"id": call["id"], "name": call["function"]["name"], "input": arguments})
+
+    def get_response(self) -> dict[str, Any]:
+        """Build a response dict matching the non-streaming endpoint.
+
+        Returns:
+            Response dict with ``choices[0].message`` and ``usage``
+        """
+        message: dict[str, Any] = {"role": "assistant", "content": "".join(self.content_parts)}
+        if self.tool_calls:
+            message["tool_calls"] = [self.tool_calls[i] for i in sorted(self.tool_calls)]
+        response = {
+            **self.meta,
+            "choices": [{"index": 0, "message": message, "finish_reason": self.finish_reason}],
+        }
+        if self.usage:
+            response["usage"] = self.usage
+        return response
+
+
+class AnthropicStreamParser:
+    """Assemble an Anthropic messages stream."""
+
+    def __init__(self, on_text: Optional[TextCallback] = None, on_tool_call: Optional[ToolCallCallback] = None):
+        """Initialize the parser.
+
+        Args:
+            on_text: Called with each text delta
+            on_tool_call: Called with {'id', 'name', 'input'} when a tool_use block closes
+        """
+        self.on_text = on_text
+        self.on_tool_call = on_tool_call
+        self.message: dict[str, Any] = {"content": []}
+        self.blocks: dict[int, dict[str, Any]] = {}
+        self.partial_json: dict[int, str] = {}
+
+    def feed(self, event: dict[str, Any]) -> None:
+        """Consume one decoded stream event.
+
+        Args:
+            event: Event payload (``message_start``, ``content_block_delta``, ...)
+        """
+        event_type = event.get("type")
+
+        if event_type == "message_start":
+            self.message = {**event.get("message", {}), "content": []}
+
+        elif event_type == "content_block_start":
+            index = event.get("index", len(self.blocks))
+            block = dict(event.get("content_block") or {})
+            if block.get("type") == "tool_use":
+                block["input"] = {}
+                self.partial_json[index] = ""
+            self.blocks[index] = block
+
+        elif event_type == "content_block_delta":
+            index = event.get("index", 0)
+            delta = event.get("delta") or {}
+            block = self.blocks.setdefault(index, {"type": "text", "text": ""})
+            if delta.get("type") == "text_delta":
+                block["text"] = block.get("text", "") + delta.get("text", "")
+                if self.on_text and delta.get("text"):
+                    self.on_text(delta["text"])
+            elif delta.get("type") == "input_json_delta":
+                self.partial_json[index] = self.partial_json.get(index, "") + delta.get("partial_json", "")
+
+        elif event_type == "content_block_stop":
+            index = event.get("index", 0)
+            block = self.blocks.get(index)
+            if block and block.get("type") == "tool_use":
+                block["input"] = _parse_complete_arguments(self.partial_json.get(index, "")) or {}
+                if self.on_tool_call:
+                    self.on_tool_call({"id": block.get("id", ""), "name": block.get("name", ""), "input": block["input"]})
+
+        elif event_type == "message_delta":
+            delta = event.get("delta") or {}
+            if "stop_reason" in delta:
+                self.message["stop_reason"] = delta["stop_reason"]
+            if event.get("usage"):
+                self.message["usage"] = {**self.message.get("usage", {}), **event["usage"]}
+
+    def get_response(self) -> dict[str, Any]:
+        """Build a response dict matching the non-streaming endpoint.
+
+        Returns:
+            Response dict with ``content`` blocks, ``stop_reason`` and ``usage``
+        """
+        return {**self.message, "content": [self.blocks[i] for i in sorted(self.blocks)]}
@@ -81,8 +81,6 @@ Now design the team for the research question above. Output JSON only:"""
 
     # Call LLM to get team design
     try:
-        from src.agent.anthropic_client import AnthropicClient
-
         # Build the call parameters
         messages = [{"role": "user", "content": pi_prompt}]
 
@@ -94,7 +92,7 @@ Now design the team for the research question above. Output JSON only:"""
         }
 
         # Add system prompt if using Anthropic
-        if isinstance(client, AnthropicClient):
+        if client.provider == "anthropic":
             call_params["system"] = "You are a Principal Investigator expert at assembling research teams. Always output valid JSON."
 
         response = client.create_message(**call_params)
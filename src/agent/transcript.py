@@ -0,0 +1,194 @@
+"""Meeting transcript store with bounded, relevance-ranked prompt context.
+
+VirtualLabMeeting used to re-render the transcript for every prompt and paste
+the whole raw transcript into the final synthesis, which overflows the context
+window in long meetings. The TranscriptStore keeps, for each entry, its
+rendered forms and a token estimate computed once on append, plus a rolling
+summary per discussion round:
+
+- The PI's round synthesis when there is one, otherwise an extractive digest
+  (the lead sentence of every contribution in the round).
+- ``recent_context`` renders the last entries for specialist and critic
+  prompts, dropping the least relevant ones when they exceed the budget.
+- ``synthesis_context`` renders the full transcript when it fits; otherwise
+  it keeps the opening, every round summary and as many raw contributions as
+  fit, ranked by relevance to the question and recency, and lists the
+  citations of the contributions it left out.
+
+Budgets come from MEETING_CONTEXT_TOKENS (per-prompt context, default 4000)
+and MEETING_SYNTHESIS_TOKENS (final synthesis, default 24000).
+"""
+
+import os
+import re
+import threading
+from typing import Any, Iterator, Optional
+
+from src.agent.compaction import estimate_tokens
+from src.agent.convergence import text_similarity
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CITATION_PATTERN = re.compile(r"PMID:\s*\d+|[A-Za-z0-9_\-]+\.(?:csv|tsv|txt|bam|pod5|pdf)", re.IGNORECASE)
+
+# Most recent round counts fully; each earlier round is discounted by this much
+RECENCY_DECAY = 0.15
+
+DIGEST_SENTENCE_CHARS = 240
+
+
+def _lead_sentence(text: str) -> str:
+    """First sentence of a contribution, capped at DIGEST_SENTENCE_CHARS."""
+    first = _SENTENCE_END.split(" ".join(text.split()), maxsplit=1)[0]
+    return first if len(first) <= DIGEST_SENTENCE_CHARS else first[:DIGEST_SENTENCE_CHARS].rstrip() + "..."
+
+
+class TranscriptStore:
+    """Append-only meeting transcript with cached renders and per-round summaries.
+
+    Iterates, indexes and slices like the list of entry dicts it replaces.
+    """
+
+    def __init__(self, context_tokens: Optional[int] = None, synthesis_tokens: Optional[int] = None):
+        """Initialize an empty store.
+
+        Args:
+            context_tokens: Token budget for recent_context() (defaults to
+                MEETING_CONTEXT_TOKENS env var, 4000)
+            synthesis_tokens: Token budget for synthesis_context() (defaults to
+                MEETING_SYNTHESIS_TOKENS env var, 24000)
+        """
+        self.context_tokens = context_tokens or int(os.getenv("MEETING_CONTEXT_TOKENS", "4000"))
+        self.synthesis_tokens = synthesis_tokens or int(os.getenv("MEETING_SYNTHESIS_TOKENS", "24000"))
+        self.entries: list[dict[str, Any]] = []
+        self._meta: list[dict[str, Any]] = []  # Parallel to entries: round, renders, token counts
+        self._summaries: dict[int, str] = {}
+        self._round = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        return self.entries[index]
+
+    def begin_round(self, round_num: int) -> None:
+        """Tag subsequent entries with a discussion round (0 is the opening)."""
+        self._round = round_num
+
+    def append(self, entry: dict[str, Any]) -> None:
+        """Add a transcript entry (speaker, role, content, model)."""
+        content = entry["content"] or ""
+        brief = f"[{entry['speaker']}]: {content}"
+        full = f"=== {entry['speaker']} ({entry['role']}) ===\n{content}"
+        with self._lock:
+            self.entries.append(entry)
+            self._meta.append({
+                "round": self._round,
+                "brief": brief,
+                "full": full,
+                "brief_tokens": estimate_tokens(brief),
+                "full_tokens": estimate_tokens(full),
+            })
+
+    def set_round_summary(self, round_num: int, summary: str) -> None:
+        """Record the PI's synthesis of a round (replaces the extractive digest)."""
+        self._summaries[round_num] = summary
+
+    def round_summary(self, round_num: int) -> str:
+        """Summary of a round: the PI's synthesis, or the lead sentence of each contribution."""
+        if round_num in self._summaries:
+            return self._summaries[round_num]
+        return "\n".join(
+            f"- {entry['speaker']}: {_lead_sentence(entry['content'] or '')}"
+            for entry, meta in zip(self.entries, self._meta)
+            if meta["round"] == round_num and entry["speaker"] != "PI"
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        """Estimated tokens of the full rendered transcript."""
+        return sum(meta["full_tokens"] for meta in self._meta)
+
+    def _relevance(self, index: int, query: str, latest_round: int) -> float:
+        recency = 1.0 - RECENCY_DECAY * (latest_round - self._meta[index]["round"])
+        return text_similarity(query, self.entries[index]["content"] or "") + max(recency, 0.0)
+
+    def recent_context(self, last_n: int = 5, query: str = "", max_tokens: Optional[int] = None) -> str:
+        """Render the last ``last_n`` entries as ``[speaker]: content`` blocks.
+
+        If they exceed the token budget, the newest entry is always kept and
+        the rest are kept in order of relevance to ``query`` while they fit.
+
+        Args:
+            last_n: Number of trailing entries to consider
+            query: Text to rank entries against (usually the research question)
+            max_tokens: Budget (defaults to the store's context_tokens)
+
+        Returns:
+            Context string in chronological order
+        """
+        budget = max_tokens or self.context_tokens
+        indices = list(range(max(len(self.entries) - last_n, 0), len(self.entries)))
+        if sum(self._meta[i]["brief_tokens"] for i in indices) > budget and len(indices) > 1:
+            latest_round = self._meta[indices[-1]]["round"]
+            keep = {indices[-1]}
+            used = self._meta[indices[-1]]["brief_tokens"]
+            for i in sorted(indices[:-1], key=lambda i: self._relevance(i, query, latest_round), reverse=True):
+                if used + self._meta[i]["brief_tokens"] <= budget:
+                    keep.add(i)
+                    used += self._meta[i]["brief_tokens"]
+            indices = sorted(keep)
+        return "\n\n".join(self._meta[i]["brief"] for i in indices)
+
+    def synthesis_context(self, query: str, max_tokens: Optional[int] = None) -> str:
+        """Render the transcript for the final synthesis within a token budget.
+
+        Args:
+            query: The research question contributions are ranked against
+            max_tokens: Budget (defaults to the store's synthesis_tokens)
+
+        Returns:
+            The full transcript if it fits, otherwise a condensed one built from
+            round summaries and the most relevant contributions
+        """
+        budget = max_tokens or self.synthesis_tokens
+        if self.total_tokens <= budget:
+            return "\n\n".join(meta["full"] for meta in self._meta)
+
+        rounds = sorted({meta["round"] for meta in self._meta if meta["round"] > 0})
+        latest_round = rounds[-1] if rounds else 0
+        summaries = {r: f"=== Round {r} Summary ===\n{self.round_summary(r)}" for r in rounds}
+
+        # Always kept: the opening and the PI's own entries (round syntheses)
+        keep = {i for i, entry in enumerate(self.entries) if self._meta[i]["round"] == 0 or entry["speaker"] == "PI"}
+        used = sum(self._meta[i]["full_tokens"] for i in keep)
+        used += sum(estimate_tokens(summaries[r]) for r in rounds if r not in self._summaries)
+
+        candidates = [i for i in range(len(self.entries)) if i not in keep]
+        for i in sorted(candidates, key=lambda i: self._relevance(i, query, latest_round), reverse=True):
+            if used + self._meta[i]["full_tokens"] <= budget:
+                keep.add(i)
+                used += self._meta[i]["full_tokens"]
+
+        parts = []
+        omitted_citations: set[str] = set()
+        for r in [0, *rounds]:
+            in_round = [i for i in range(len(self.entries)) if self._meta[i]["round"] == r]
+            dropped = [i for i in in_round if i not in keep]
+            parts.extend(self._meta[i]["full"] for i in in_round if i in keep)
+            if dropped and r not in self._summaries:
+                # The PI's synthesis is already in the transcript; otherwise stand in for the dropped entries
+                parts.append(summaries[r])
+            for i in dropped:
+                omitted_citations.update(" ".join(c.split()) for c in _CITATION_PATTERN.findall(self.entries[i]["content"] or ""))
+
+        omitted = len(self.entries) - len(keep)
+        note = f"[{omitted} of {len(self.entries)} contributions condensed into round summaries to fit the context window"
+        if omitted_citations:
+            note += "; sources they cited: " + ", ".join(sorted(omitted_citations))
+        parts.append(note + "]")
+        return "\n\n".join(parts)
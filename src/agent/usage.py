@@ -0,0 +1,394 @@
+"""Token and cost accounting for LLM calls, attributed to workflow phases.
+
+Every client call is recorded in a ``UsageLedger`` together with the labels of
+the enclosing ``usage_scope`` blocks (workflow, meeting, round, phase, agent,
+iteration), so a run can be broken down by where the tokens went:
+
+    with question_scope(question) as ledger:
+        meeting.run_meeting()
+    print(ledger.summary()["by_phase"])
+
+A question ledger can carry a token and/or cost budget (QUESTION_TOKEN_BUDGET,
+QUESTION_COST_BUDGET env vars, cost in USD). Agents and meetings check
+``budget_exhausted()`` between iterations/rounds and stop early once it is hit.
+
+Costs use the ``cost`` OpenRouter reports when available, otherwise the
+USD-per-million-token prices in DEFAULT_PRICES (override with the LLM_PRICES
+env var, e.g. '{"*gpt-4o*": {"input": 2.5, "output": 10}}').
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from fnmatch import fnmatch
+from typing import Any, Callable, Iterator, Optional
+
+
+# USD per million tokens; first matching pattern wins
+DEFAULT_PRICES = {
+    "*:free": {"input": 0.0, "output": 0.0},
+    "*claude-sonnet-4*": {"input": 3.0, "output": 15.0, "cached_input": 0.30, "cache_write": 3.75},
+    "*claude-opus-4*": {"input": 15.0, "output": 75.0, "cached_input": 1.50, "cache_write": 18.75},
+    "*gemini-3-pro*": {"input": 2.0, "output": 12.0, "cached_input": 0.20},
+    "*gpt-4o*": {"input": 2.5, "output": 10.0, "cached_input": 1.25},
+}
+
+# Labels a usage record can be attributed to, outermost first
+SCOPE_LABELS = ("workflow", "question", "meeting", "round", "phase", "agent", "iteration")
+
+
+@dataclass
+class UsageRecord:
+    """One LLM call."""
+    provider: str
+    model: str
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    cache_write_tokens: int = 0
+    output_tokens: int = 0
+    latency_s: float = 0.0
+    queue_wait_s: float = 0.0
+    cost_usd: Optional[float] = None  # None if the model has no known price
+    labels: dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+def _load_prices() -> dict[str, dict[str, float]]:
+    raw = os.getenv("LLM_PRICES")
+    overrides = {}
+    if raw:
+        try:
+            overrides = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"Warning: ignoring invalid LLM_PRICES JSON: {raw!r}")
+    return {**overrides, **{k: v for k, v in DEFAULT_PRICES.items() if k not in overrides}}
+
+
+def estimate_cost(model: str, usage: dict[str, int], prices: Optional[dict[str, dict[str, float]]] = None) -> Optional[float]:
+    """Estimate the USD cost of a call from its token usage.
+
+    Args:
+        model: Model identifier
+        usage: Normalized usage dict from a client's get_usage()
+        prices: Price table (defaults to DEFAULT_PRICES plus LLM_PRICES)
+
+    Returns:
+        Cost in USD, or None if the model is not in the price table
+    """
+    for pattern, price in (prices if prices is not None else _load_prices()).items():
+        if fnmatch(model.lower(), pattern.lower()):
+            cached = usage.get("cached_input_tokens", 0)
+            written = usage.get("cache_write_tokens", 0)
+            uncached = max(0, usage.get("input_tokens", 0) - cached - written)
+            total = (
+                uncached * price.get("input", 0.0)
+                + cached * price.get("cached_input", price.get("input", 0.0))
+                + written * price.get("cache_write", price.get("input", 0.0))
+                + usage.get("output_tokens", 0) * price.get("output", 0.0)
+            )
+            return total / 1_000_000
+    return None
+
+
+class UsageLedger:
+    """Thread-safe collection of usage records with an optional budget."""
+
+    def __init__(
+        self,
+        name: str = "",
+        token_budget: Optional[int] = None,
+        cost_budget: Optional[float] = None,
+    ):
+        """Initialize the ledger.
+
+        Args:
+            name: Label for reports (e.g. the question)
+            token_budget: Stop once input+output tokens reach this (None = unlimited)
+            cost_budget: Stop once estimated cost in USD reaches this (None = unlimited)
+        """
+        self.name = name
+        self.token_budget = token_budget
+        self.cost_budget = cost_budget
+        self.records: list[UsageRecord] = []
+        # Called with each new record (e.g. to stream progress); must not raise
+        self.on_record: Optional[Callable[[UsageRecord], None]] = None
+        self._lock = threading.Lock()
+        self._prices = _load_prices()
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        usage: dict[str, int],
+        latency_s: float = 0.0,
+        queue_wait_s: float = 0.0,
+        cost_usd: Optional[float] = None,
+        labels: Optional[dict[str, Any]] = None,
+    ) -> UsageRecord:
+        """Add one call to the ledger.
+
+        Args:
+            provider: 'anthropic' or 'openrouter'
+            model: Model that served the call
+            usage: Normalized usage dict from a client's get_usage()
+            latency_s: Wall-clock time of the call including retries
+            queue_wait_s: Time spent waiting in the rate governor
+            cost_usd: Provider-reported cost (estimated from prices if None)
+            labels: Attribution labels
+
+        Returns:
+            The stored record
+        """
+        if cost_usd is None:
+            cost_usd = estimate_cost(model, usage, self._prices)
+        record = UsageRecord(
+            provider=provider,
+            model=model,
+            input_tokens=usage.get("input_tokens", 0),
+            cached_input_tokens=usage.get("cached_input_tokens", 0),
+            cache_write_tokens=usage.get("cache_write_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            latency_s=latency_s,
+            queue_wait_s=queue_wait_s,
+            cost_usd=cost_usd,
+            labels=dict(labels or {}),
+        )
+        with self._lock:
+            self.records.append(record)
+        if self.on_record is not None:
+            self.on_record(record)
+        return record
+
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return sum(r.total_tokens for r in self.records)
+
+    def tokens_for(self, **labels: Any) -> int:
+        """Total tokens of the records carrying all the given labels.
+
+        Args:
+            **labels: Attribution labels to match, e.g. meeting="openai/gpt-4o"
+        """
+        with self._lock:
+            return sum(
+                r.total_tokens for r in self.records
+                if all(r.labels.get(k) == v for k, v in labels.items())
+            )
+
+    @property
+    def total_cost(self) -> float:
+        with self._lock:
+            return sum(r.cost_usd or 0.0 for r in self.records)
+
+    def budget_exhausted(self) -> bool:
+        """Whether the token or cost budget has been reached."""
+        if self.token_budget is not None and self.total_tokens >= self.token_budget:
+            return True
+        if self.cost_budget is not None and self.total_cost >= self.cost_budget:
+            return True
+        return False
+
+    @staticmethod
+    def _totals(records: list[UsageRecord]) -> dict[str, Any]:
+        return {
+            "calls": len(records),
+            "input_tokens": sum(r.input_tokens for r in records),
+            "cached_input_tokens": sum(r.cached_input_tokens for r in records),
+            "output_tokens": sum(r.output_tokens for r in records),
+            "total_tokens": sum(r.total_tokens for r in records),
+            "cost_usd": round(sum(r.cost_usd or 0.0 for r in records), 6),
+            "unpriced_calls": sum(1 for r in records if r.cost_usd is None),
+            "latency_s": round(sum(r.latency_s for r in records), 3),
+            "queue_wait_s": round(sum(r.queue_wait_s for r in records), 3),
+        }
+
+    def breakdown(self, label: str) -> dict[str, dict[str, Any]]:
+        """Totals grouped by one attribution label (or 'model').
+
+        Args:
+            label: One of SCOPE_LABELS, or 'model'
+
+        Returns:
+            Mapping of label value -> totals (records without the label use "-")
+        """
+        with self._lock:
+            records = list(self.records)
+        groups: dict[str, list[UsageRecord]] = {}
+        for r in records:
+            key = r.model if label == "model" else r.labels.get(label, "-")
+            groups.setdefault(str(key), []).append(r)
+        return {key: self._totals(group) for key, group in groups.items()}
+
+    def summary(self) -> dict[str, Any]:
+        """Totals plus per-model, per-phase and per-agent breakdowns.
+
+        Returns:
+            JSON-serializable dict (suitable for ResearchState["usage"])
+        """
+        with self._lock:
+            records = list(self.records)
+        return {
+            **self._totals(records),
+            "token_budget": self.token_budget,
+            "cost_budget": self.cost_budget,
+            "budget_exhausted": self.budget_exhausted(),
+            "by_model": self.breakdown("model"),
+            "by_phase": self.breakdown("phase"),
+            "by_agent": self.breakdown("agent"),
+        }
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """All records as plain dicts (for export)."""
+        with self._lock:
+            return [asdict(r) for r in self.records]
+
+
+@dataclass(frozen=True)
+class _Scope:
+    ledger: UsageLedger
+    labels: dict[str, Any]
+    is_question: bool = False
+
+
+_current_scope: ContextVar[Optional[_Scope]] = ContextVar("usage_scope", default=None)
+
+# Ledger for calls made outside any question scope
+_process_ledger = UsageLedger(name="process")
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Ledger of the current scope (the process-wide ledger outside any scope)."""
+    scope = _current_scope.get()
+    return scope.ledger if scope else _process_ledger
+
+
+@contextmanager
+def usage_scope(ledger: Optional[UsageLedger] = None, **labels: Any) -> Iterator[UsageLedger]:
+    """Attribute LLM calls made inside the block to the given labels.
+
+    Labels nest: inner scopes add to (and override) the labels of outer ones.
+    The scope propagates to threads started with ``contextvars.copy_context()``
+    (asyncio.to_thread, LangGraph node executors).
+
+    Args:
+        ledger: Ledger to record into (defaults to the enclosing scope's)
+        **labels: Attribution labels, e.g. phase="critic", round=2
+
+    Yields:
+        The active ledger
+    """
+    parent = _current_scope.get()
+    merged = {**(parent.labels if parent else {}), **{k: v for k, v in labels.items() if v is not None}}
+    if ledger is None:
+        ledger = parent.ledger if parent else _process_ledger
+        is_question = bool(parent and parent.is_question)
+    else:
+        is_question = True
+    token = _current_scope.set(_Scope(ledger, merged, is_question))
+    try:
+        yield ledger
+    finally:
+        _current_scope.reset(token)
+
+
+@contextmanager
+def question_scope(
+    question: str = "",
+    token_budget: Optional[int] = None,
+    cost_budget: Optional[float] = None,
+    **labels: Any,
+) -> Iterator[UsageLedger]:
+    """Open a per-question ledger, or join the one already open.
+
+    Entry points (agent.run, run_meeting, workflows) all call this, so the
+    outermost one owns the ledger and nested ones only add labels.
+
+    Args:
+        question: Question text (used as the ledger name)
+        token_budget: Token budget (defaults to QUESTION_TOKEN_BUDGET env var)
+        cost_budget: USD budget (defaults to QUESTION_COST_BUDGET env var)
+        **labels: Attribution labels for this scope
+
+    Yields:
+        The question's ledger
+    """
+    parent = _current_scope.get()
+    if parent and parent.is_question:
+        with usage_scope(**labels) as ledger:
+            yield ledger
+        return
+
+    if token_budget is None and os.getenv("QUESTION_TOKEN_BUDGET"):
+        token_budget = int(os.getenv("QUESTION_TOKEN_BUDGET"))
+    if cost_budget is None and os.getenv("QUESTION_COST_BUDGET"):
+        cost_budget = float(os.getenv("QUESTION_COST_BUDGET"))
+    ledger = UsageLedger(name=question[:200], token_budget=token_budget, cost_budget=cost_budget)
+    with usage_scope(ledger, **labels):
+        yield ledger
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    usage: dict[str, int],
+    latency_s: float = 0.0,
+    queue_wait_s: float = 0.0,
+    cost_usd: Optional[float] = None,
+) -> UsageRecord:
+    """Record a call in the current scope's ledger with the scope's labels.
+
+    Args:
+        provider: 'anthropic' or 'openrouter'
+        model: Model that served the call
+        usage: Normalized usage dict from a client's get_usage()
+        latency_s: Wall-clock time of the call
+        queue_wait_s: Time spent waiting in the rate governor
+        cost_usd: Provider-reported cost, if any
+
+    Returns:
+        The stored record
+    """
+    scope = _current_scope.get()
+    ledger = scope.ledger if scope else _process_ledger
+    labels = scope.labels if scope else {}
+    return ledger.record(provider, model, usage, latency_s, queue_wait_s, cost_usd, labels)
+
+
+def budget_exhausted() -> bool:
+    """Whether the current question's token/cost budget has been reached."""
+    scope = _current_scope.get()
+    return bool(scope and scope.is_question and scope.ledger.budget_exhausted())
+
+
+def format_usage_summary(summary: dict[str, Any]) -> str:
+    """Human-readable one-screen usage report.
+
+    Args:
+        summary: Output of UsageLedger.summary()
+
+    Returns:
+        Multi-line report
+    """
+    lines = [
+        f"LLM calls: {summary['calls']}, tokens: {summary['total_tokens']:,} "
+        f"({summary['input_tokens']:,} in / {summary['cached_input_tokens']:,} cached / "
+        f"{summary['output_tokens']:,} out), cost: ${summary['cost_usd']:.4f}"
+    ]
+    if summary.get("budget_exhausted"):
+        lines.append("Budget exhausted - iterations were stopped early")
+    for title, key in (("By phase", "by_phase"), ("By agent", "by_agent")):
+        groups = summary.get(key) or {}
+        if len(groups) > 1 or "-" not in groups:
+            lines.append(f"{title}:")
+            for name, totals in sorted(groups.items(), key=lambda kv: -kv[1]["total_tokens"]):
+                lines.append(f"  {name}: {totals['total_tokens']:,} tokens, ${totals['cost_usd']:.4f}, {totals['calls']} calls")
+    return "\n".join(lines)
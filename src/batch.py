@@ -0,0 +1,194 @@
+"""Batch question runner: a bounded worker pool over a JSONL (or directory) of questions.
+
+Used by ``python -m src.cli --batch questions.jsonl``:
+
+- Questions come from a JSONL file (one object per line with a ``question``,
+  ``body`` or ``prompt`` field and an optional ``id``/``request_id``) or a
+  directory of ``.txt``/``.md`` files such as ``problems/`` (the file stem is
+  the ID).
+- A fixed number of worker threads pull questions from a work queue, so at
+  most ``workers`` questions are in flight (plus any timed-out runs still
+  winding down).
+- Each question has a wall-clock timeout. A timed-out question is recorded
+  and its worker moves on; the run itself cannot be killed, so it finishes in
+  a daemon thread (its late result is discarded, and the batch does not wait
+  for it before returning).
+- Results are appended to the output JSONL as they complete (one line per
+  question, flushed). Rerunning with the same output file skips questions that
+  already succeeded, so an interrupted batch resumes where it stopped; errors
+  and timeouts are retried.
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+OK, ERROR, TIMEOUT = "ok", "error", "timeout"
+
+QUESTION_FIELDS = ("question", "body", "prompt")
+ID_FIELDS = ("id", "request_id", "question_id")
+QUESTION_SUFFIXES = (".txt", ".md")
+
+
+def load_questions(path: str) -> list[dict[str, str]]:
+    """Read batch questions.
+
+    Args:
+        path: JSONL file, or a directory of .txt/.md question files
+
+    Returns:
+        List of {"id", "question"} dicts in file order
+
+    Raises:
+        ValueError: If a JSONL line has no question field or an ID repeats
+    """
+    source = Path(path)
+    questions = []
+    if source.is_dir():
+        for file in sorted(source.iterdir()):
+            if file.suffix in QUESTION_SUFFIXES:
+                questions.append({"id": file.stem, "question": file.read_text(encoding="utf-8").strip()})
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text = next((record[k] for k in QUESTION_FIELDS if record.get(k)), None)
+                if text is None:
+                    raise ValueError(f"{path}:{line_num}: no {'/'.join(QUESTION_FIELDS)} field")
+                qid = next((str(record[k]) for k in ID_FIELDS if record.get(k) is not None), f"line{line_num}")
+                questions.append({"id": qid, "question": text})
+
+    seen = set()
+    for q in questions:
+        if q["id"] in seen:
+            raise ValueError(f"Duplicate question ID in {path}: {q['id']}")
+        seen.add(q["id"])
+    return questions
+
+
+def completed_ids(output_path: str) -> set[str]:
+    """IDs of questions that already have a successful result in the output file."""
+    done = set()
+    if not Path(output_path).exists():
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Line cut short by an interruption
+            if record.get("status") == OK:
+                done.add(record["id"])
+    return done
+
+
+def run_batch(
+    questions: list[dict[str, str]],
+    solve: Callable[[str, str], str],
+    output_path: str,
+    workers: int = 4,
+    timeout_s: Optional[float] = None,
+    resume: bool = True,
+    on_result: Optional[Callable[[dict[str, Any], int, int], None]] = None,
+) -> dict[str, int]:
+    """Answer questions on a bounded worker pool, streaming results to JSONL.
+
+    Args:
+        questions: {"id", "question"} dicts (see load_questions)
+        solve: Called as solve(question_id, question) in a worker thread; returns the answer
+        output_path: JSONL file results are appended to
+        workers: Maximum questions in flight
+        timeout_s: Per-question wall-clock timeout (None for no limit)
+        resume: Skip questions already answered successfully in output_path
+        on_result: Called with (record, finished_count, total) as each question completes
+
+    Returns:
+        Counts of ok, error, timeout and skipped questions
+    """
+    skip = completed_ids(output_path) if resume else set()
+    pending = [q for q in questions if q["id"] not in skip]
+    counts = {OK: 0, ERROR: 0, TIMEOUT: 0, "skipped": len(questions) - len(pending)}
+    if not pending:
+        return counts
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    out = open(output_path, "a", encoding="utf-8")
+    if out.tell() > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, 2)
+            if f.read(1) != b"\n":
+                out.write("\n")  # Terminate a line cut short by an interruption
+    out_lock = threading.Lock()
+    finished = [0]
+
+    work: queue.Queue = queue.Queue()
+    for q in pending:
+        work.put(q)
+
+    def write(record: dict[str, Any]) -> None:
+        with out_lock:
+            if out.closed:  # Batch interrupted
+                return
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[record["status"]] += 1
+            finished[0] += 1
+            done = finished[0]
+        if on_result is not None:
+            on_result(record, done, len(pending))
+
+    def answer(q: dict[str, str], outcome: dict[str, Any]) -> None:
+        try:
+            outcome["answer"] = solve(q["id"], q["question"])
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+
+    def worker() -> None:
+        while True:
+            try:
+                q = work.get_nowait()
+            except queue.Empty:
+                return
+            started = time.monotonic()
+            outcome: dict[str, Any] = {}
+            # Daemon thread, so an abandoned run cannot keep the process alive
+            run = threading.Thread(target=answer, args=(q, outcome), name=f"batch-{q['id']}", daemon=True)
+            run.start()
+            run.join(timeout_s)
+
+            record = {
+                "id": q["id"],
+                "question": q["question"],
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+                "duration_s": round(time.monotonic() - started, 3),
+            }
+            if run.is_alive():
+                record.update(status=TIMEOUT, error=f"Timed out after {timeout_s:g}s")
+            elif "error" in outcome:
+                record.update(status=ERROR, error=outcome["error"])
+            else:
+                record.update(status=OK, answer=outcome.get("answer"))
+            write(record)
+
+    threads = [
+        threading.Thread(target=worker, name=f"batch-worker-{i}", daemon=True)
+        for i in range(max(1, min(workers, len(pending))))
+    ]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            # Poll so Ctrl-C reaches the main thread; finished lines are already on disk
+            while t.is_alive():
+                t.join(0.5)
+    finally:
+        with out_lock:
+            out.close()
+    return counts
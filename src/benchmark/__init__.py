@@ -0,0 +1 @@
+"""Offline benchmarking: a mock LLM server and a harness for the agent stack."""
@@ -0,0 +1,481 @@
+"""Deterministic mock LLM server speaking the OpenRouter and Anthropic protocols.
+
+Lets the agent stack run end-to-end offline, so orchestration overhead can be
+measured without paying for (or waiting on) real models:
+
+    python -m src.benchmark.mock_llm_server --port 8765 [--script script.json]
+    export OPENROUTER_BASE_URL=http://127.0.0.1:8765/api/v1 OPENROUTER_API_KEY=mock
+    export ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock
+
+Endpoints: POST .../chat/completions (OpenAI/OpenRouter format) and POST
+.../messages (Anthropic format), both with optional SSE streaming. GET /stats
+returns request counters and POST /reset clears them.
+
+Responses come from a script. A script holds rules, and the first rule whose
+``match`` regex matches the conversation's first user message wins. A rule
+has a list of steps. The step is picked from how many assistant turns the
+conversation already has, so concurrent agents get deterministic replies.
+A step may contain:
+
+- ``text`` and ``tool_calls`` ([{"name", "input"}]), or
+- ``team`` (a generated team-design JSON array), or
+- ``raw``: a recorded provider response returned verbatim.
+
+Steps and rules may also set ``latency`` (seconds, or a distribution such as
+{"dist": "lognormal", "median": 0.4, "sigma": 0.5}), ``status`` (return an
+HTTP error) and ``output_tokens``. The script's ``model_latency`` maps
+model-name regexes to a latency that replaces the script default for those
+models (e.g. {"slow": 5.0} to simulate a straggler). Latency samples are
+seeded from the request body, so identical runs see identical timings.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from src.agent.compaction import estimate_tokens
+from src.agent.session_recording import _text_of, conversation_step
+
+
+DEFAULT_SCRIPT: dict[str, Any] = {
+    "latency": {"dist": "lognormal", "median": 0.2, "sigma": 0.4},
+    "tokens_per_second": 400,
+    "error_rate": 0.0,
+    "rules": [
+        {
+            "name": "classifier",
+            "match": r"Respond ONLY in this exact format",
+            "steps": [{"text": "TYPE: computational\nCOMPLEXITY: moderate"}],
+        },
+        {
+            "name": "team_design",
+            "match": r"designing a research team",
+            "steps": [{"team": True}],
+        },
+        {
+            "name": "consensus_synthesis",
+            "match": r"AGREEMENT SCORE|POINTS MOST TEAMS AGREE ON",
+            "steps": [{"text": (
+                "CONSENSUS ANSWER:\nBoth teams identify TOX and PDCD1 as core exhaustion drivers "
+                "(PMID: 31207603).\n\nKEY AGREEMENTS:\n- TOX is required for exhaustion\n"
+                "- PD-1 blockade partially reverses the phenotype\n\nKEY DISAGREEMENTS:\n"
+                "- Role of TCF7 in progenitor maintenance\n\nAGREEMENT SCORE: 80\n\n"
+                "REASONING:\nThe answers overlap on mechanism and differ on secondary factors."
+            )}],
+        },
+        {
+            "name": "critic",
+            "match": r"Review the most recent contribution|Please review the following scientific answer",
+            "steps": [{"text": (
+                "The analysis is plausible but the sample size is not reported and the "
+                "pathway enrichment lacks a multiple-testing correction."
+            )}],
+        },
+        {
+            "name": "agent",
+            "match": r"",
+            "steps": [
+                {
+                    "text": "I'll start by checking the data with a quick computation.",
+                    "tool_calls": [{"name": "execute_python", "input": {
+                        "code": "import statistics\nvalues = [2.1, 3.4, 1.9, 4.2, 3.3]\nprint(statistics.mean(values), statistics.stdev(values))"
+                    }}],
+                },
+                {"text": (
+                    "Based on the computed summary statistics, expression is elevated in the "
+                    "exhausted subset (mean 2.98, sd 0.96). TOX upregulation is consistent with "
+                    "prior work (PMID: 31207603) and the expression_matrix.csv data."
+                )},
+            ],
+        },
+    ],
+}
+
+TEAM_TEMPLATE = [
+    ("Computational Biologist", "Sequence analysis, expression profiling, bioinformatics pipelines"),
+    ("Immunologist", "T-cell biology, exhaustion programs, immune checkpoints"),
+    ("Data Scientist", "Statistics, machine learning, biomedical databases"),
+    ("Systems Biologist", "Pathway analysis and network modeling"),
+    ("Clinical Translation Specialist", "Biomarkers and therapeutic strategy"),
+]
+
+
+class LatencyModel:
+    """Latency distribution in seconds."""
+
+    def __init__(self, spec: Any = None):
+        """Initialize from a spec.
+
+        Args:
+            spec: None (no delay), a number (fixed seconds) or a dict with
+                ``dist`` in fixed/uniform/normal/lognormal and its parameters
+                (value; low, high; mean, std; median, sigma)
+        """
+        if spec is None:
+            spec = {"dist": "fixed", "value": 0.0}
+        elif isinstance(spec, (int, float)):
+            spec = {"dist": "fixed", "value": float(spec)}
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        dist = self.spec.get("dist", "fixed")
+        if dist == "fixed":
+            value = self.spec.get("value", 0.0)
+        elif dist == "uniform":
+            value = rng.uniform(self.spec.get("low", 0.0), self.spec.get("high", 1.0))
+        elif dist == "normal":
+            value = rng.gauss(self.spec.get("mean", 0.5), self.spec.get("std", 0.1))
+        elif dist == "lognormal":
+            value = rng.lognormvariate(math.log(self.spec.get("median", 0.5)), self.spec.get("sigma", 0.5))
+        else:
+            raise ValueError(f"Unknown latency distribution: {dist}")
+        return max(0.0, min(value, self.spec.get("max", 60.0)))
+
+
+class MockLLMServer:
+    """Threaded HTTP server replaying a script in both provider protocols."""
+
+    def __init__(self, script: Optional[dict[str, Any]] = None, host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        """Initialize the server (call start() to serve).
+
+        Args:
+            script: Response script (defaults to DEFAULT_SCRIPT)
+            host: Bind address
+            port: Port (0 picks a free one)
+            seed: Seed for latency sampling
+        """
+        self.script = script or DEFAULT_SCRIPT
+        self.seed = seed
+        self._rules = [(re.compile(r.get("match", ""), re.IGNORECASE | re.DOTALL), r) for r in self.script.get("rules", [])]
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def openrouter_base_url(self) -> str:
+        return f"http://{self._httpd.server_address[0]}:{self.port}/api/v1"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return f"http://{self._httpd.server_address[0]}:{self.port}"
+
+    def client_env(self) -> dict[str, str]:
+        """Environment variables that point both clients at this server."""
+        return {
+            "OPENROUTER_BASE_URL": self.openrouter_base_url,
+            "ANTHROPIC_BASE_URL": self.anthropic_base_url,
+            "OPENROUTER_API_KEY": "mock",
+            "ANTHROPIC_API_KEY": "mock",
+        }
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats: dict[str, Any] = {"requests": 0, "errors": 0, "connections": 0, "injected_latency_s": 0.0,
+                                          "by_rule": {}}
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    # --- Script evaluation -------------------------------------------------
+
+    def plan(self, request: dict[str, Any], raw_body: bytes) -> dict[str, Any]:
+        """Choose the step for a request and sample its latency.
+
+        Args:
+            request: Decoded request body
+            raw_body: Raw body (seeds the latency sample)
+
+        Returns:
+            Dict with rule, step, latency, prompt_tokens and output_tokens
+        """
+        messages = request.get("messages") or []
+        first_user = next((m for m in messages if m.get("role") == "user"), {})
+        prompt = _text_of(first_user.get("content"))
+
+        rule = next((r for pattern, r in self._rules if pattern.search(prompt)), {"name": "empty", "steps": [{"text": ""}]})
+        steps = rule.get("steps") or [{"text": ""}]
+        step = steps[min(conversation_step(messages), len(steps) - 1)]
+
+        digest = hashlib.sha256(raw_body).hexdigest()
+        rng = random.Random(f"{self.seed}:{digest}")
+        default_latency = self.script.get("latency")
+        for model_pattern, spec in (self.script.get("model_latency") or {}).items():
+            if re.search(model_pattern, str(request.get("model", ""))):
+                default_latency = spec
+                break
+        latency_spec = step.get("latency", rule.get("latency", default_latency))
+        latency = LatencyModel(latency_spec).sample(rng)
+
+        text = self._step_text(step, prompt)
+        output_tokens = step.get("output_tokens") or estimate_tokens(text + json.dumps(step.get("tool_calls", [])))
+        tps = self.script.get("tokens_per_second")
+        generation = output_tokens / tps if tps else 0.0
+
+        error_rate = step.get("error_rate", rule.get("error_rate", self.script.get("error_rate", 0.0)))
+        status = step.get("status") or (503 if error_rate and rng.random() < error_rate else 200)
+
+        return {
+            "rule": rule.get("name", "unnamed"),
+            "step": step,
+            "text": text,
+            "status": status,
+            "latency": latency,
+            "generation": generation,
+            "prompt_tokens": estimate_tokens(raw_body.decode("utf-8", "replace")),
+            "output_tokens": output_tokens,
+        }
+
+    @staticmethod
+    def _step_text(step: dict[str, Any], prompt: str) -> str:
+        if step.get("team"):
+            size_match = re.search(r"team of (\d+)", prompt)
+            size = int(size_match.group(1)) if size_match else 3
+            team = [
+                {"title": title, "expertise": expertise,
+                 "goal": f"Contribute {title.lower()} analysis to the question",
+                 "role": f"Lead the {title.lower()} part of the discussion"}
+                for title, expertise in TEAM_TEMPLATE[:size]
+            ]
+            return json.dumps(team, indent=2)
+        return step.get("text", "")
+
+    def _record(self, plan: dict[str, Any]) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["injected_latency_s"] += plan["latency"] + plan["generation"]
+            by_rule = self.stats["by_rule"].setdefault(plan["rule"], {"requests": 0, "latency_s": 0.0})
+            by_rule["requests"] += 1
+            by_rule["latency_s"] += plan["latency"] + plan["generation"]
+            if plan["status"] != 200:
+                self.stats["errors"] += 1
+
+    # --- Response builders -------------------------------------------------
+
+    @staticmethod
+    def _tool_calls(step: dict[str, Any]) -> list[dict[str, Any]]:
+        return [
+            {"id": f"call_{uuid.uuid4().hex[:12]}", "name": tc["name"], "input": tc.get("input", {})}
+            for tc in step.get("tool_calls", [])
+        ]
+
+    def openai_response(self, request: dict[str, Any], plan: dict[str, Any]) -> dict[str, Any]:
+        if "raw" in plan["step"]:
+            return plan["step"]["raw"]
+        calls = self._tool_calls(plan["step"])
+        message: dict[str, Any] = {"role": "assistant", "content": plan["text"]}
+        if calls:
+            message["tool_calls"] = [
+                {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": json.dumps(c["input"])}}
+                for c in calls
+            ]
+        return {
+            "id": f"gen-mock-{uuid.uuid4().hex[:12]}",
+            "model": request.get("model", "mock"),
+            "created": int(time.time()),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if calls else "stop"}],
+            "usage": {
+                "prompt_tokens": plan["prompt_tokens"],
+                "completion_tokens": plan["output_tokens"],
+                "total_tokens": plan["prompt_tokens"] + plan["output_tokens"],
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+
+    def anthropic_response(self, request: dict[str, Any], plan: dict[str, Any]) -> dict[str, Any]:
+        if "raw" in plan["step"]:
+            return plan["step"]["raw"]
+        calls = self._tool_calls(plan["step"])
+        content: list[dict[str, Any]] = []
+        if plan["text"]:
+            content.append({"type": "text", "text": plan["text"]})
+        content.extend({"type": "tool_use", "id": c["id"], "name": c["name"], "input": c["input"]} for c in calls)
+        return {
+            "id": f"msg_mock_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "mock"),
+            "content": content,
+            "stop_reason": "tool_use" if calls else "end_turn",
+            "usage": {"input_tokens": plan["prompt_tokens"], "output_tokens": plan["output_tokens"]},
+        }
+
+    @staticmethod
+    def _chunks(text: str, size: int = 16) -> list[str]:
+        return [text[i:i + size] for i in range(0, len(text), size)] or []
+
+    def openai_stream(self, response: dict[str, Any]) -> list[dict[str, Any]]:
+        """Split a chat completion into chat.completion.chunk events."""
+        meta = {k: response[k] for k in ("id", "model", "created") if k in response}
+        choice = response["choices"][0]
+        message = choice["message"]
+        events = [{**meta, "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}}]}
+                  for piece in self._chunks(message.get("content") or "")]
+        for index, call in enumerate(message.get("tool_calls") or []):
+            args = call["function"]["arguments"]
+            half = len(args) // 2
+            events.append({**meta, "choices": [{"index": 0, "delta": {"tool_calls": [
+                {"index": index, "id": call["id"], "type": "function",
+                 "function": {"name": call["function"]["name"], "arguments": args[:half]}}]}}]})
+            events.append({**meta, "choices": [{"index": 0, "delta": {"tool_calls": [
+                {"index": index, "function": {"arguments": args[half:]}}]}}]})
+        events.append({**meta, "choices": [{"index": 0, "delta": {}, "finish_reason": choice["finish_reason"]}],
+                       "usage": response.get("usage")})
+        return events
+
+    def anthropic_stream(self, response: dict[str, Any]) -> list[dict[str, Any]]:
+        """Split a message into Anthropic streaming events."""
+        start = {k: v for k, v in response.items() if k not in ("content", "stop_reason")}
+        start["usage"] = {"input_tokens": response["usage"]["input_tokens"]}
+        events: list[dict[str, Any]] = [{"type": "message_start", "message": {**start, "content": []}}]
+        for index, block in enumerate(response["content"]):
+            if block["type"] == "text":
+                events.append({"type": "content_block_start", "index": index, "content_block": {"type": "text", "text": ""}})
+                events.extend({"type": "content_block_delta", "index": index, "delta": {"type": "text_delta", "text": piece}}
+                              for piece in self._chunks(block["text"]))
+            else:
+                events.append({"type": "content_block_start", "index": index,
+                               "content_block": {"type": "tool_use", "id": block["id"], "name": block["name"], "input": {}}})
+                events.append({"type": "content_block_delta", "index": index,
+                               "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])}})
+            events.append({"type": "content_block_stop", "index": index})
+        events.append({"type": "message_delta", "delta": {"stop_reason": response["stop_reason"]},
+                       "usage": {"output_tokens": response["usage"]["output_tokens"]}})
+        events.append({"type": "message_stop"})
+        return events
+
+    # --- HTTP handler ------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # Keep benchmark output clean
+                pass
+
+            def setup(self):
+                # One handler per TCP connection (keep-alive requests share it)
+                super().setup()
+                with server._lock:
+                    server.stats["connections"] += 1
+
+            def _send_json(self, status: int, body: dict[str, Any], headers: Optional[dict[str, str]] = None) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.get_stats())
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                path = self.path.rstrip("/")
+                if path.endswith("/reset"):
+                    server.reset_stats()
+                    self._send_json(200, {"ok": True})
+                    return
+                if not (path.endswith("/chat/completions") or path.endswith("/messages")):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                request = json.loads(raw or b"{}")
+                anthropic = path.endswith("/messages")
+                plan = server.plan(request, raw)
+                server._record(plan)
+
+                time.sleep(plan["latency"])
+                if plan["status"] != 200:
+                    self._send_json(plan["status"], {"error": {"type": "mock_error", "message": f"Mock error {plan['status']}"}},
+                                    {"Retry-After": "0"})
+                    return
+
+                response = server.anthropic_response(request, plan) if anthropic else server.openai_response(request, plan)
+                if not request.get("stream"):
+                    time.sleep(plan["generation"])
+                    self._send_json(200, response)
+                    return
+
+                events = server.anthropic_stream(response) if anthropic else server.openai_stream(response)
+                delay = plan["generation"] / max(1, len(events))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for event in events:
+                    time.sleep(delay)
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                if not anthropic:
+                    self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenRouter/Anthropic server for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--script", type=str, help="JSON response script (defaults to the built-in scenario)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency sampling")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+
+    server = MockLLMServer(script=script, host=args.host, port=args.port, seed=args.seed)
+    print(f"Mock LLM server listening on http://{args.host}:{server.port}")
+    for key, value in server.client_env().items():
+        print(f"  export {key}={value}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Replay a recorded session and time it (see src.agent.session_recording).
+
+    python -m src.benchmark.replay_session runs/q5.jsonl.zst --repeat 5
+    python -m src.benchmark.replay_session runs/q5.jsonl.zst --live-tools
+
+Without --live-tools both LLM responses and tool outputs come from the
+recording, so wall time is pure orchestration overhead; with it, tools run
+for real against a fixed conversation.
+"""
+
+import argparse
+
+from src.agent.session_recording import replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded agent session")
+    parser.add_argument("recording", help="Recording written with --record")
+    parser.add_argument("--live-tools", action="store_true", help="Execute tools instead of using recorded outputs")
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="Reproduce this fraction of recorded LLM latency (default: 0, as fast as possible)")
+    parser.add_argument("--data-dir", type=str, help="Override the recorded data directory")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay several times and report each wall time")
+    args = parser.parse_args()
+
+    for i in range(args.repeat):
+        result = replay(args.recording, live_tools=args.live_tools, latency_scale=args.latency_scale, data_dir=args.data_dir)
+        print(
+            f"Run {i + 1}: {result['wall_s']:.3f}s, {result['llm_served']} LLM responses, "
+            f"{result['tools_served']} recorded tool outputs, {result['tool_misses']} live tool misses, "
+            f"unused={result['unused']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
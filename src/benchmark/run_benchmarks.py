@@ -0,0 +1,267 @@
+"""Offline benchmark suite for the agent stack.
+
+Runs the single-agent, virtual-lab and consensus modes against the mock LLM
+server and reports wall-clock time, time spent in LLM calls and tools,
+request serialization/deserialization time, and peak memory. Latency
+injected by the mock server is reported alongside, so what remains is
+orchestration overhead:
+
+    python -m src.benchmark.run_benchmarks --modes single virtual-lab --repeat 3
+    python -m src.benchmark.run_benchmarks --script my_script.json --output bench.json
+    python -m src.benchmark.run_benchmarks --modes workflow-compile
+
+The workflow-compile mode needs no LLM: it times building and compiling each
+LangGraph workflow configuration from scratch against fetching the process's
+cached compiled graph, which is what every question after the first pays.
+
+The server is started in-process on a free port and both clients are pointed
+at it through OPENROUTER_BASE_URL / ANTHROPIC_BASE_URL, so nothing leaves the
+machine and no API key is needed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+from src.benchmark.mock_llm_server import MockLLMServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+DEFAULT_QUESTION = (
+    "Which transcription factors drive T-cell exhaustion in chronic infection, "
+    "and how would you test them computationally?"
+)
+MODES = ("single", "virtual-lab", "consensus", "workflow-compile")
+
+
+def _span_time(spans: list, *names: str) -> float:
+    """Total duration in seconds of finished spans with the given names."""
+    return sum(s.duration_ms for s in spans if s.name in names) / 1000
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _mode_runner(mode: str, question: str, provider: str, data_dir: str, args: argparse.Namespace) -> Callable[[], Any]:
+    """Build a zero-argument callable that runs one benchmark iteration."""
+    model = f"mock/{mode}"
+    if mode == "single":
+        from src.agent.agent import create_agent
+
+        def run():
+            agent = create_agent(model=model, provider=provider, data_dir=data_dir)
+            agent.max_iterations = args.max_iterations
+            return agent.run(question)
+        return run
+
+    if mode == "virtual-lab":
+        from src.agent.meeting import run_virtual_lab
+
+        def run():
+            return run_virtual_lab(
+                question, model=model, provider=provider, num_rounds=args.rounds,
+                max_team_size=args.team_size, data_dir=data_dir, pipelined=args.pipelined,
+            )
+        return run
+
+    if mode == "consensus":
+        # Callers report an ImportError (missing optional dependency) as a skip
+        from src.virtuallab_workflow.consensus import run_consensus_meeting
+
+        def run():
+            return run_consensus_meeting(
+                question, models=[f"mock/consensus-{i}" for i in range(args.consensus_models)],
+                provider=provider, team_size=args.team_size, num_rounds=args.rounds,
+                max_iterations=args.max_iterations, data_dir=data_dir, verbose=False,
+            )
+        return run
+
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def benchmark_mode(
+    mode: str,
+    server: MockLLMServer,
+    repeat: int,
+    question: str,
+    provider: str,
+    data_dir: str,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    """Run one mode ``repeat`` times and collect per-run metrics.
+
+    Returns:
+        Dict with per-run metrics and their medians, or a "skipped" reason
+    """
+    from src.utils.tracing import enable_tracing
+
+    try:
+        run = _mode_runner(mode, question, provider, data_dir, args)
+    except ImportError as e:
+        return {"mode": mode, "skipped": f"missing dependency: {e}"}
+
+    tracer = enable_tracing()
+    runs = []
+    for _ in range(repeat):
+        tracer.spans.clear()
+        server.reset_stats()
+        tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        spans = list(tracer.spans)
+        stats = server.get_stats()
+        runs.append({
+            "wall_s": wall,
+            "llm_s": _span_time(spans, "llm.call"),
+            "tool_s": _span_time(spans, "tool.call"),
+            "serialization_s": _span_time(spans, "llm.serialize", "llm.deserialize"),
+            "injected_latency_s": stats["injected_latency_s"],
+            "llm_requests": stats["requests"],
+            "tool_calls": sum(1 for s in spans if s.name == "tool.call"),
+            "peak_traced_mb": peak / (1024 * 1024),
+        })
+
+    medians = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    return {"mode": mode, "runs": runs, "median": medians, "max_rss_mb": _max_rss_mb()}
+
+
+def benchmark_workflow_compile(repeat: int) -> dict[str, Any]:
+    """Time compiling each workflow configuration versus reusing the cached graph.
+
+    Returns:
+        Dict with median milliseconds per configuration for a cold compile and
+        a cached lookup, or a "skipped" reason
+    """
+    mode = "workflow-compile"
+    try:
+        from src.virtuallab_workflow.workflow import (
+            clear_workflow_cache,
+            create_consensus_workflow,
+            create_research_workflow,
+            get_consensus_workflow,
+            get_research_workflow,
+        )
+    except ImportError as e:
+        return {"mode": mode, "skipped": f"missing dependency: {e}"}
+
+    configs = {
+        "research": (lambda: create_research_workflow(False), lambda: get_research_workflow(False)),
+        "research+review": (lambda: create_research_workflow(True), lambda: get_research_workflow(True)),
+        "consensus": (create_consensus_workflow, get_consensus_workflow),
+    }
+    # Create the checkpointer outside the timed region
+    get_consensus_workflow()
+
+    compile_ms, cached_ms = {}, {}
+    for name, (compile_fresh, get_cached) in configs.items():
+        cold = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            compile_fresh()
+            cold.append((time.perf_counter() - start) * 1000)
+        get_cached()
+        warm = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            get_cached()
+            warm.append((time.perf_counter() - start) * 1000)
+        compile_ms[name] = statistics.median(cold)
+        cached_ms[name] = statistics.median(warm)
+    clear_workflow_cache()
+    return {"mode": mode, "compile_ms": compile_ms, "cached_ms": cached_ms}
+
+
+def format_results(results: list[dict[str, Any]]) -> str:
+    """Render benchmark medians as a fixed-width table."""
+    header = f"{'mode':<12} {'wall':>8} {'llm':>8} {'tools':>8} {'serde':>8} {'injected':>9} {'reqs':>5} {'peak MB':>8}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        if "skipped" in result:
+            lines.append(f"{result['mode']:<12} skipped ({result['skipped']})")
+            continue
+        if "compile_ms" in result:
+            for name, ms in result["compile_ms"].items():
+                lines.append(f"{'compile':<12} {name}: {ms:.1f}ms cold, {result['cached_ms'][name]:.3f}ms cached")
+            continue
+        m = result["median"]
+        lines.append(
+            f"{result['mode']:<12} {m['wall_s']:>7.2f}s {m['llm_s']:>7.2f}s {m['tool_s']:>7.2f}s "
+            f"{m['serialization_s'] * 1000:>6.1f}ms {m['injected_latency_s']:>8.2f}s "
+            f"{int(m['llm_requests']):>5} {m['peak_traced_mb']:>8.1f}"
+        )
+    lines.append("llm = summed LLM call time (overlaps across threads); injected = mock server latency")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against the mock LLM server")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (medians are reported)")
+    parser.add_argument("--question", type=str, default=DEFAULT_QUESTION)
+    parser.add_argument("--provider", choices=["openrouter", "anthropic"], default="openrouter",
+                        help="Protocol the clients use to talk to the mock server")
+    parser.add_argument("--script", type=str, help="JSON response script for the mock server")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for mock latency sampling")
+    parser.add_argument("--rounds", type=int, default=2, help="Discussion rounds per meeting")
+    parser.add_argument("--team-size", type=int, default=3)
+    parser.add_argument("--pipelined", action="store_true", default=None,
+                        help="Use pipelined meeting rounds in virtual-lab mode (defaults to MEETING_PIPELINE)")
+    parser.add_argument("--consensus-models", type=int, default=3)
+    parser.add_argument("--max-iterations", type=int, default=10)
+    parser.add_argument("--data-dir", type=str, help="Data directory for tools (defaults to an empty temp dir)")
+    parser.add_argument("--output", type=str, help="Write full results as JSON")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+
+    with MockLLMServer(script=script, seed=args.seed) as server, tempfile.TemporaryDirectory() as tmp:
+        # Must happen before the first client and the rate governor are created
+        os.environ.update(server.client_env())
+        os.environ.setdefault("LLM_MAX_IN_FLIGHT", "64")
+        # Keep benchmark workflow threads out of the on-disk checkpoint store
+        os.environ.setdefault("WORKFLOW_CHECKPOINTER", "memory")
+
+        results = []
+        for mode in args.modes:
+            print(f"Running {mode} x{args.repeat}...")
+            if mode == "workflow-compile":
+                results.append(benchmark_workflow_compile(args.repeat))
+                continue
+            results.append(benchmark_mode(
+                mode, server, args.repeat, args.question, args.provider, args.data_dir or tmp, args,
+            ))
+
+    print("\n" + "=" * 60)
+    print(format_results(results))
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""CLI startup benchmark based on ``python -X importtime``.
+
+Imports an entry-point module in fresh interpreters and reports:
+
+- the module's cumulative import time (median over runs) against a budget;
+- the slowest modules by self time, to see where startup goes;
+- heavy optional dependencies that were imported although no mode needs
+  them yet (DEFERRED_MODULES: langgraph, pandas, paperqa,
+  sentence-transformers, ...). Those belong behind a function-level import;
+- anything printed during import (imports must be silent).
+
+    python -m src.benchmark.startup_time
+    python -m src.benchmark.startup_time --module src.server --budget-ms 400
+
+Exits with status 1 if the budget is exceeded, a deferred module is loaded
+or the import prints something, so it can gate CI.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+
+# Median cumulative import time of src.cli, in milliseconds (STARTUP_BUDGET_MS
+# or --budget-ms override). Most of it is requests/urllib3 for the LLM clients.
+DEFAULT_BUDGET_MS = 250.0
+
+# Top-level packages no entry point may import before a mode needs them
+DEFERRED_MODULES = ("langgraph", "langchain_core", "pandas", "numpy", "paperqa", "litellm", "sentence_transformers", "torch")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def measure_imports(module: str = "src.cli") -> dict[str, Any]:
+    """Import ``module`` in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Dict with the module's cumulative import time (ms), every imported
+        module's self time (ms), the deferred modules that were loaded, and
+        any other output the import produced
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    self_ms: dict[str, float] = {}
+    cumulative_ms = None
+    output = [line for line in proc.stdout.splitlines() if line.strip()]
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            if line.strip() and not line.startswith("import time:"):
+                output.append(line)
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        self_ms[name] = int(self_us) / 1000
+        if name == module and len(indent) <= 1:
+            cumulative_ms = int(cumulative_us) / 1000
+
+    loaded = sorted({name.split(".")[0] for name in self_ms} & set(DEFERRED_MODULES))
+    return {"module": module, "cumulative_ms": cumulative_ms, "self_ms": self_ms, "deferred_loaded": loaded, "output": output}
+
+
+def run_startup_benchmark(module: str = "src.cli", runs: int = 5, budget_ms: float = DEFAULT_BUDGET_MS) -> dict[str, Any]:
+    """Measure ``module``'s import time over several fresh interpreters.
+
+    Returns:
+        Dict with the median and per-run times, the slowest modules of the
+        median run, deferred modules loaded, import output and ``ok``
+    """
+    results = [measure_imports(module) for _ in range(runs)]
+    times = [r["cumulative_ms"] for r in results]
+    median = statistics.median(times)
+    typical = min(results, key=lambda r: abs(r["cumulative_ms"] - median))
+    slowest = sorted(typical["self_ms"].items(), key=lambda item: item[1], reverse=True)[:15]
+    deferred = typical["deferred_loaded"]
+    output = typical["output"]
+    return {
+        "module": module,
+        "median_ms": median,
+        "runs_ms": times,
+        "budget_ms": budget_ms,
+        "slowest": slowest,
+        "deferred_loaded": deferred,
+        "output": output,
+        "ok": median <= budget_ms and not deferred and not output,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry-point import time against a startup budget")
+    parser.add_argument("--module", default="src.cli", help="Entry-point module to import (default: src.cli)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (the median is checked)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+                        help=f"Budget for the median cumulative import time (default: STARTUP_BUDGET_MS or {DEFAULT_BUDGET_MS:g})")
+    args = parser.parse_args()
+
+    result = run_startup_benchmark(args.module, args.runs, args.budget_ms)
+    print(f"import {result['module']}: {result['median_ms']:.1f}ms median "
+          f"(runs: {', '.join(f'{t:.0f}' for t in result['runs_ms'])}ms; budget {result['budget_ms']:g}ms)")
+    print("\nSlowest modules (self time):")
+    for name, ms in result["slowest"]:
+        print(f"  {ms:>8.1f}ms  {name}")
+    if result["deferred_loaded"]:
+        print(f"\n✗ Heavy modules imported at startup: {', '.join(result['deferred_loaded'])}")
+    if result["output"]:
+        print("\n✗ Import printed output:")
+        for line in result["output"]:
+            print(f"  {line}")
+    if result["median_ms"] > result["budget_ms"]:
+        print(f"\n✗ Over budget by {result['median_ms'] - result['budget_ms']:.1f}ms")
+    if result["ok"]:
+        print("\n✓ Startup within budget")
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,13 @@ from dotenv import load_dotenv
 # available before importing modules that may read them during import-time.
 load_dotenv()
 
+# The meeting and LangGraph workflow modules are imported by the modes that
+# use them, so single-agent runs never load langgraph
+# (python -m src.benchmark.startup_time checks the startup budget)
 from src.agent.agent import create_agent
-from src.agent.meeting import run_virtual_lab
-from src.virtuallab_workflow.workflow import run_consensus_workflow, run_research_workflow
+from src.agent.session_recording import start_recording
+from src.batch import load_questions, run_batch
+from src.utils.tracing import enable_tracing
 
 
 def save_answer_to_file(answer: str, question: str, output_path: str = None, mode: str = "single") -> str:
@@ -68,6 +72,47 @@ def save_answer_to_file(answer: str, question: str, output_path: str = None, mod
     return str(output_file.absolute())
 
 
+def _batch_solver(args, provider: str):
+    """Build solve(question_id, question) for --batch in the selected mode.
+
+    Every question gets its own agent (agents keep per-run state), and
+    workflow runs use the question ID as their thread ID so a rerun resumes them.
+    """
+    def solve(question_id: str, question: str) -> str:
+        if args.combined:
+            from src.virtuallab_workflow.workflow import run_consensus_workflow
+            result = run_consensus_workflow(
+                question=question, team_size=args.team_size, num_rounds=args.rounds,
+                thread_id=f"batch_{question_id}", verbose=False,
+            )
+            return result.get("final_answer", "No answer generated")
+        if args.langgraph:
+            from src.virtuallab_workflow.workflow import run_research_workflow
+            result = run_research_workflow(
+                question=question, enable_human_review=False,
+                thread_id=f"batch_{question_id}", verbose=False,
+            )
+            return result.get("final_answer", "No answer generated")
+        if args.virtual_lab:
+            from src.agent.meeting import run_virtual_lab
+            return run_virtual_lab(
+                question=question, api_key=args.api_key, model=args.model, provider=provider,
+                num_rounds=args.rounds, max_team_size=args.team_size, verbose=False,
+                data_dir=args.data_dir, input_dir=args.input_dir, pipelined=args.pipelined,
+                early_stop=args.early_stop,
+                # Let the meeting wind down on its own before the batch gives up on it
+                time_budget_s=args.time_budget or args.question_timeout,
+            )
+        agent = create_agent(
+            api_key=args.api_key, model=args.model, provider=provider,
+            data_dir=args.data_dir, input_dir=args.input_dir,
+        )
+        if args.with_critic:
+            return agent.run_with_critic(question, verbose=False)[2]
+        return agent.run(question, verbose=False)
+    return solve
+
+
 def main():
     """Main CLI entry point."""
 
@@ -102,6 +147,20 @@ Examples:
 
   # Verbose output to see tool calls
   python -m src.cli --question "..." --verbose
+
+  # Stream the answer as it is generated
+  python -m src.cli --question "..." --stream
+
+  # Record a flame chart of the run (open in chrome://tracing or ui.perfetto.dev)
+  python -m src.cli --question "..." --virtual-lab --trace trace.json
+
+  # Answer every question in a JSONL file (or problems/ directory), 4 at a time;
+  # rerun the same command to resume after an interruption
+  python -m src.cli --batch questions.jsonl --workers 4 --question-timeout 1800 --virtual-lab
+
+  # Record every LLM response and tool output, then replay the run offline
+  python -m src.cli --question "..." --virtual-lab --record runs/q5.jsonl.gz
+  python -m src.benchmark.replay_session runs/q5.jsonl.gz --live-tools
         """,
     )
 
@@ -117,6 +176,35 @@ Examples:
         action="store_true",
         help="Run in interactive mode",
     )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="Answer every question in a JSONL file (question/body field, optional id) or a directory of "
+             ".txt/.md questions, writing results to --batch-output as they complete",
+    )
+    parser.add_argument(
+        "--batch-output",
+        type=str,
+        help="Results JSONL for --batch; questions already answered there are skipped (default: <batch>.results.jsonl)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BATCH_WORKERS", "4")),
+        help="Questions answered concurrently in --batch mode (default: BATCH_WORKERS env var or 4)",
+    )
+    parser.add_argument(
+        "--question-timeout",
+        type=float,
+        default=float(os.getenv("BATCH_QUESTION_TIMEOUT", "0")) or None,
+        help="Per-question timeout in seconds for --batch mode (default: BATCH_QUESTION_TIMEOUT env var, none)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="Rerun every --batch question, even those already answered in the output file",
+    )
     parser.add_argument(
         "--model",
         "-m",
@@ -130,6 +218,22 @@ Examples:
         action="store_true",
         help="Print verbose output with tool calls",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream model output as it is generated and start tool calls early (single agent mode)",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=os.getenv("TRACE_FILE"),
+        help="Write tracing spans (LLM calls, tool calls, meeting phases) to this Chrome trace JSON file",
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        help="Record LLM requests/responses and tool inputs/outputs to this file (.jsonl, .jsonl.gz, .jsonl.zst) for replay",
+    )
     parser.add_argument(
         "--with-critic",
         "-c",
@@ -152,6 +256,12 @@ Examples:
         action="store_true",
         help="Enable LangGraph workflow (without consensus)",
     )
+    parser.add_argument(
+        "--thread-id",
+        type=str,
+        help="Workflow thread ID for --langgraph/--combined; rerun an interrupted run with the same ID "
+             "and question to resume it after the last completed node (default: timestamped)",
+    )
     parser.add_argument(
         "--rounds",
         "-r",
@@ -166,6 +276,24 @@ Examples:
         default=3,
         help="Maximum number of specialist agents in Virtual Lab mode (default: 3)",
     )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        default=None,
+        help="Critique each specialist as soon as they finish instead of once per round (Virtual Lab mode)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        help="Wall-clock budget in seconds for a Virtual Lab meeting; no new round starts that would overrun it",
+    )
+    parser.add_argument(
+        "--no-early-stop",
+        dest="early_stop",
+        action="store_false",
+        default=None,
+        help="Always run every discussion round, even when the discussion has converged (Virtual Lab mode)",
+    )
     parser.add_argument(
         "--api-key",
         type=str,
@@ -193,6 +321,10 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.trace:
+        # Spans are written to the file when the process exits
+        enable_tracing(args.trace)
+
     # Set default input directory if not specified
     if args.input_dir is None:
         args.input_dir = args.data_dir
@@ -211,6 +343,48 @@ Examples:
     else:
         provider = "anthropic"
 
+    if args.batch:
+        output_path = args.batch_output or f"{Path(args.batch).with_suffix('')}.results.jsonl"
+        try:
+            questions = load_questions(args.batch)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Batch: {len(questions)} questions, {args.workers} workers -> {output_path}")
+
+        def report(record, done, total):
+            detail = record.get("error", "")
+            print(f"[{done}/{total}] {record['id']}: {record['status']} ({record['duration_s']:.1f}s) {detail}".rstrip())
+
+        counts = run_batch(
+            questions, _batch_solver(args, provider), output_path, workers=args.workers,
+            timeout_s=args.question_timeout, resume=args.resume, on_result=report,
+        )
+        print(f"✓ Batch done: {counts['ok']} ok, {counts['error']} errors, "
+              f"{counts['timeout']} timed out, {counts['skipped']} already answered")
+        sys.exit(0 if counts["error"] == counts["timeout"] == 0 else 1)
+
+    if args.record and args.question:
+        if args.combined or args.langgraph:
+            entrypoint = "workflow"  # Recorded for inspection; replay re-drives agent and meeting runs
+        elif args.virtual_lab:
+            entrypoint = "virtual_lab"
+        elif args.with_critic:
+            entrypoint = "agent_with_critic"
+        else:
+            entrypoint = "agent"
+        start_recording(args.record, entrypoint=entrypoint, question=args.question, config={
+            "model": args.model,
+            "provider": provider,
+            "num_rounds": args.rounds,
+            "max_team_size": args.team_size,
+            "pipelined": args.pipelined,
+            "early_stop": args.early_stop,
+            "time_budget_s": args.time_budget,
+            "data_dir": args.data_dir,
+            "input_dir": args.input_dir,
+        })
+
     # Only create agent for non-virtual-lab modes
     if not args.virtual_lab:
         try:
@@ -219,8 +393,12 @@ Examples:
                 model=args.model,
                 provider=provider,
                 data_dir=args.data_dir,
-                input_dir=args.input_dir
+                input_dir=args.input_dir,
+                stream=args.stream
             )
+            if args.stream:
+                # Forward streamed text to the terminal for lower time-to-first-output
+                agent.on_text = lambda text: print(text, end="", flush=True)
         except ValueError as e:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
@@ -235,11 +413,12 @@ Examples:
             print(f"Question: {args.question}")
             print("=" * 60)
 
+            from src.virtuallab_workflow.workflow import run_consensus_workflow
             result = run_consensus_workflow(
                 question=args.question,
                 team_size=args.team_size,
                 num_rounds=args.rounds,
-                thread_id=f"cli_combined_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                thread_id=args.thread_id or f"cli_combined_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 verbose=args.verbose
             )
             
@@ -261,10 +440,11 @@ Examples:
             print(f"Question: {args.question}")
             print("=" * 60)
 
+            from src.virtuallab_workflow.workflow import run_research_workflow
             result = run_research_workflow(
                 question=args.question,
                 enable_human_review=False,
-                thread_id=f"cli_langgraph_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                thread_id=args.thread_id or f"cli_langgraph_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 verbose=args.verbose
             )
             
@@ -287,6 +467,7 @@ Examples:
             print(f"Configuration: {args.rounds} rounds, max {args.team_size} specialists")
             print("=" * 60)
 
+            from src.agent.meeting import run_virtual_lab
             final_answer = run_virtual_lab(
                 question=args.question,
                 api_key=args.api_key,
@@ -296,7 +477,10 @@ Examples:
                 max_team_size=args.team_size,
                 verbose=args.verbose,
                 data_dir=args.data_dir,
-                input_dir=args.input_dir
+                input_dir=args.input_dir,
+                pipelined=args.pipelined,
+                early_stop=args.early_stop,
+                time_budget_s=args.time_budget
             )
 
             print("\n" + "=" * 60)
@@ -365,6 +549,7 @@ Examples:
                 print("VIRTUAL LAB MEETING")
                 print("=" * 60)
 
+                from src.agent.meeting import run_virtual_lab
                 final_answer = run_virtual_lab(
                     question=question,
                     api_key=args.api_key,
@@ -374,7 +559,10 @@ Examples:
                     max_team_size=args.team_size,
                     verbose=args.verbose,
                     data_dir=args.data_dir,
-                    input_dir=args.input_dir
+                    input_dir=args.input_dir,
+                    pipelined=args.pipelined,
+                    early_stop=args.early_stop,
+                    time_budget_s=args.time_budget
                 )
 
                 print("\n" + "=" * 60)
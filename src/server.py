@@ -0,0 +1,440 @@
+"""Long-running HTTP service that answers questions with warm caches.
+
+Every CLI invocation pays for imports, config, the file index build and
+cold caches. The server pays once and keeps them for every request:
+
+    python -m src.server --port 8000 --workers 4
+
+    curl -X POST localhost:8000/ask -d '{"question": "..."}'
+    curl -X POST localhost:8000/virtual-lab -d '{"question": "...", "rounds": 2, "team_size": 3}'
+    curl -X POST localhost:8000/consensus -d '{"question": "...", "models": ["a/b", "c/d"]}'
+    curl localhost:8000/jobs/<job_id>/events      # NDJSON progress stream
+    curl localhost:8000/jobs/<job_id>             # status and result
+
+POST returns 202 with a job ID; jobs run on a fixed pool of worker threads
+(--workers) and queue beyond that. Progress events are emitted as each LLM
+call completes, labelled with the meeting phase, round and agent from the
+question's usage ledger.
+
+Kept warm across requests: the file index (built or loaded from its disk
+cache at startup, then kept current from filesystem events when watchdog is
+installed; FILE_INDEX_WATCH=0 turns that off), the compiled
+LangGraph workflows, one tool-result cache shared by every job (database
+queries, file reads, PubMed and literature searches), the rate governor and
+the LLM clients' shared HTTP connection pool, and everything imported once (pandas,
+paperqa, langgraph).
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+
+# Before importing modules that read the environment at import time
+load_dotenv()
+
+from src.agent.agent import create_agent
+from src.agent.meeting import run_virtual_lab
+from src.agent.usage import UsageRecord, question_scope
+from src.tools.tool_cache import ToolCache
+from src.utils.file_index import get_file_index
+
+
+JOB_KINDS = ("ask", "virtual-lab", "consensus")
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+# Finished jobs kept for GET /jobs/<id> (oldest dropped first)
+MAX_FINISHED_JOBS = 200
+
+# How long an events stream waits for news before checking the connection again
+EVENT_POLL_S = 15.0
+
+
+class Job:
+    """One question submitted to the server, with its progress events."""
+
+    def __init__(self, kind: str, params: dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.usage: dict[str, Any] = {}
+        self.events: list[dict[str, Any]] = []
+        self._tokens = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        """Append a progress event and wake up event streams."""
+        with self._cond:
+            self.events.append({"seq": len(self.events), "time": round(time.time(), 3), "type": event_type, **data})
+            self._cond.notify_all()
+
+    def on_usage(self, record: UsageRecord) -> None:
+        """Usage ledger listener: one progress event per LLM call."""
+        with self._cond:
+            self._tokens += record.total_tokens
+            job_tokens = self._tokens
+        labels = {k: record.labels[k] for k in ("meeting", "round", "phase", "agent") if k in record.labels}
+        self.emit("llm_call", model=record.model, tokens=record.total_tokens,
+                  latency_s=round(record.latency_s, 3), job_tokens=job_tokens, **labels)
+
+    def finish(self, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        # One locked step, so a stream that sees the job finished also sees its final event
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.emit(status, duration_s=round(self.finished_at - (self.started_at or self.created_at), 3), error=error)
+
+    def wait_events(self, after: int, timeout: float) -> tuple[list[dict[str, Any]], bool]:
+        """Events with seq >= ``after``, waiting up to ``timeout`` for new ones.
+
+        Returns:
+            Tuple of (events, finished)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > after or self.finished, timeout)
+            return self.events[after:], self.finished
+
+    def to_dict(self, include_result: bool = True) -> dict[str, Any]:
+        with self._cond:
+            info = {
+                "job_id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "question": self.params.get("question"),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "events": len(self.events),
+                "error": self.error,
+            }
+            if include_result:
+                info["result"] = self.result
+                info["usage"] = self.usage
+            return info
+
+
+class ResearchServer:
+    """Threaded HTTP front end over a bounded pool of question workers."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int = 4,
+        model: Optional[str] = None,
+        data_dir: Optional[str] = None,
+        input_dir: Optional[str] = None,
+    ):
+        """Initialize the server (call start() or serve_forever() to serve).
+
+        Args:
+            host: Bind address
+            port: Port (0 picks a free one)
+            workers: Questions answered at the same time; more are queued
+            model: Default model (defaults to OPENROUTER_MODEL env var or claude-sonnet-4)
+            data_dir: Database directory (defaults to DATABASE_DIR env var)
+            input_dir: Default question-specific input directory (defaults to INPUT_DIR, then data_dir)
+        """
+        self.model = model or os.getenv("OPENROUTER_MODEL", "anthropic/claude-sonnet-4")
+        self.data_dir = data_dir or os.getenv("DATABASE_DIR", "/home.galaxy4/sumin/project/aisci/Competition_Data")
+        self.input_dir = input_dir or os.getenv("INPUT_DIR") or self.data_dir
+        self.workers = workers
+        self.started_at = time.time()
+        self.warm: dict[str, Any] = {}
+
+        # Shared by every job; keys include data file fingerprints, so edits are never served stale
+        self.tool_cache = ToolCache() if os.getenv("TOOL_CACHE", "1").lower() not in ("0", "false", "no") else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._httpd.server_address[0]}:{self.port}"
+
+    def start(self) -> "ResearchServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="research-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.tool_cache is not None:
+            self.tool_cache.close()
+
+    def __enter__(self) -> "ResearchServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- Caches --------------------------------------------------------------
+
+    def warm_up(self) -> dict[str, Any]:
+        """Build the process-wide caches before the first request needs them.
+
+        Returns:
+            Seconds spent per cache, or the reason it was skipped
+        """
+        start = time.perf_counter()
+        index = get_file_index(workspace_root=".", data_dir=self.data_dir)
+        self.warm["file_index_s"] = round(time.perf_counter() - start, 3)
+        self.warm["indexed_files"] = len(index.index)
+        if os.getenv("FILE_INDEX_WATCH", "1").lower() not in ("0", "false", "no"):
+            self.warm["file_index_watch"] = index.watch()
+
+        start = time.perf_counter()
+        try:
+            from src.virtuallab_workflow.workflow import get_consensus_workflow, get_research_workflow
+        except ImportError as e:
+            self.warm["workflows"] = f"skipped ({e})"
+        else:
+            get_research_workflow(enable_human_review=False)
+            get_consensus_workflow()
+            self.warm["workflows_s"] = round(time.perf_counter() - start, 3)
+        return self.warm
+
+    # --- Jobs ----------------------------------------------------------------
+
+    def submit(self, kind: str, params: dict[str, Any]) -> Job:
+        """Queue a question.
+
+        Raises:
+            ValueError: If the kind is unknown or the question is missing
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if not isinstance(params.get("question"), str) or not params["question"].strip():
+            raise ValueError("Request body needs a non-empty 'question'")
+
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [j for j in self._jobs.values() if j.finished]
+            for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[old.id]
+        job.emit(QUEUED, kind=kind)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _run(self, job: Job) -> None:
+        job.started_at = time.time()
+        job.status = RUNNING
+        job.emit(RUNNING)
+        try:
+            with question_scope(job.params["question"], workflow=f"server-{job.kind}") as ledger:
+                ledger.on_record = job.on_usage
+                try:
+                    result = self._solve(job)
+                finally:
+                    job.usage = ledger.summary()
+        except Exception as e:
+            job.finish(FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            job.finish(SUCCEEDED, result=result)
+
+    def _solve(self, job: Job) -> Any:
+        params = job.params
+        question = params["question"]
+        model = params.get("model") or self.model
+        # Same rule as the CLI: "vendor/model" names go through OpenRouter
+        provider = params.get("provider") or ("openrouter" if "/" in model else "anthropic")
+        input_dir = params.get("input_dir") or self.input_dir
+
+        if job.kind == "ask":
+            agent = create_agent(model=model, provider=provider, data_dir=self.data_dir, input_dir=input_dir)
+            agent.tool_cache = self.tool_cache
+            if params.get("with_critic"):
+                initial, critique, final = agent.run_with_critic(question)
+                return {"answer": final, "initial_answer": initial, "critique": critique}
+            return {"answer": agent.run(question)}
+
+        if job.kind == "virtual-lab":
+            answer = run_virtual_lab(
+                question=question, model=model, provider=provider,
+                num_rounds=int(params.get("rounds", 2)), max_team_size=int(params.get("team_size", 3)),
+                data_dir=self.data_dir, input_dir=input_dir, pipelined=params.get("pipelined"),
+                early_stop=params.get("early_stop"), time_budget_s=params.get("time_budget"),
+                tool_cache=self.tool_cache,
+            )
+            return {"answer": answer}
+
+        # Imported on first use, like the CLI's workflow modes
+        from src.virtuallab_workflow.consensus import run_consensus_meeting
+
+        return run_consensus_meeting(
+            question, models=params.get("models"), provider=params.get("provider", "openrouter"),
+            team_size=int(params.get("team_size", 3)), num_rounds=int(params.get("rounds", 2)),
+            data_dir=self.data_dir, verbose=False, adaptive=params.get("adaptive"),
+            tool_cache=self.tool_cache,
+        )
+
+    def health(self) -> dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "workers": self.workers,
+            "jobs": dict(Counter(job.status for job in self.list_jobs())),
+            "warm": self.warm,
+            "tool_cache": dict(self.tool_cache.stats) if self.tool_cache is not None else None,
+        }
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # Progress goes to the events stream
+                pass
+
+            def _send_json(self, status: int, body: Any) -> None:
+                data = json.dumps(body, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream_events(self, job: Job, after: int) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    while True:
+                        events, done = job.wait_events(after, EVENT_POLL_S)
+                        for event in events:
+                            self.wfile.write((json.dumps(event, default=str) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                        after += len(events)
+                        if done:
+                            return
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # Client stopped listening; the job keeps running
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                if parts == ["health"]:
+                    self._send_json(200, server.health())
+                elif parts == ["jobs"]:
+                    self._send_json(200, {"jobs": [job.to_dict(include_result=False) for job in server.list_jobs()]})
+                elif len(parts) in (2, 3) and parts[0] == "jobs":
+                    job = server.get_job(parts[1])
+                    if job is None:
+                        self._send_json(404, {"error": f"Unknown job {parts[1]}"})
+                    elif len(parts) == 2:
+                        self._send_json(200, job.to_dict())
+                    elif parts[2] == "events":
+                        raw_after = parse_qs(url.query).get("after", ["0"])[0]
+                        try:
+                            after = int(raw_after)
+                            if after < 0:
+                                raise ValueError
+                        except ValueError:
+                            self._send_json(400, {"error": f"after must be a non-negative integer, got {raw_after!r}"})
+                            return
+                        self._stream_events(job, after)
+                    else:
+                        self._send_json(404, {"error": f"Unknown path {url.path}"})
+                else:
+                    self._send_json(404, {"error": f"Unknown path {url.path}"})
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                kind = urlsplit(self.path).path.strip("/")
+                if kind not in JOB_KINDS:
+                    self._send_json(404, {"error": f"Unknown path {self.path}; POST to /ask, /virtual-lab or /consensus"})
+                    return
+                try:
+                    params = json.loads(raw or b"{}")
+                    if not isinstance(params, dict):
+                        raise ValueError("Request body must be a JSON object")
+                    job = server.submit(kind, params)
+                except ValueError as e:  # Includes JSONDecodeError
+                    self._send_json(400, {"error": str(e)})
+                    return
+                self._send_json(202, {
+                    "job_id": job.id,
+                    "status_url": f"/jobs/{job.id}",
+                    "events_url": f"/jobs/{job.id}/events",
+                })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CoScientist HTTP service (ask, virtual-lab and consensus jobs)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SERVER_WORKERS", "4")),
+                        help="Questions answered concurrently; more are queued (default: SERVER_WORKERS or 4)")
+    parser.add_argument("--model", type=str, help="Default model (defaults to OPENROUTER_MODEL or claude-sonnet-4)")
+    parser.add_argument("--data-dir", type=str, help="Database directory (defaults to DATABASE_DIR)")
+    parser.add_argument("--input-dir", type=str, help="Default question input directory (defaults to INPUT_DIR, then --data-dir)")
+    parser.add_argument("--no-warm", dest="warm", action="store_false",
+                        help="Skip building the file index and compiling workflows at startup")
+    args = parser.parse_args()
+
+    server = ResearchServer(args.host, args.port, args.workers, args.model, args.data_dir, args.input_dir)
+    if args.warm:
+        print("Warming caches...")
+        print(f"  {server.warm_up()}")
+    print(f"CoScientist server listening on {server.url} ({args.workers} workers)")
+    print("  POST /ask, /virtual-lab, /consensus   GET /jobs/<id>, /jobs/<id>/events, /health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,20 +9,35 @@ import requests
 import sys
 from io import StringIO
 import signal
+import threading
 from contextlib import contextmanager
 import os
 
-# CRITICAL: Set environment variables at module level BEFORE any PaperQA imports
-# LiteLLM reads these at import time, not runtime!
 from dotenv import load_dotenv
-load_dotenv()  # Load .env file to get OPENROUTER_KEY
 
-# Ensure OPENROUTER_KEY is available for PaperQA/LiteLLM
-# Note: LiteLLM expects OPENROUTER_KEY (not OPENROUTER_API_KEY) based on constants.py
-if not os.getenv("OPENROUTER_KEY"):
-    print("WARNING: OPENROUTER_KEY not set - PaperQA will fail", file=sys.stderr)
-else:
-    print(f"✓ OPENROUTER_KEY loaded: {os.getenv('OPENROUTER_KEY')[:15]}...", file=sys.stderr)
+
+_paperqa_env_loaded = False
+
+
+def _load_paperqa_env() -> None:
+    """Load .env before the first PaperQA import (once per process).
+
+    CRITICAL: LiteLLM reads its keys at import time, not at runtime, so this
+    must run BEFORE any PaperQA import. It used to run when this module was
+    imported, which every CLI start paid for even without a literature search.
+    """
+    global _paperqa_env_loaded
+    if _paperqa_env_loaded:
+        return
+    _paperqa_env_loaded = True
+    load_dotenv()  # Load .env file to get OPENROUTER_KEY
+
+    # Ensure OPENROUTER_KEY is available for PaperQA/LiteLLM
+    # Note: LiteLLM expects OPENROUTER_KEY (not OPENROUTER_API_KEY) based on constants.py
+    if not os.getenv("OPENROUTER_KEY"):
+        print("WARNING: OPENROUTER_KEY not set - PaperQA will fail", file=sys.stderr)
+    else:
+        print(f"✓ OPENROUTER_KEY loaded: {os.getenv('OPENROUTER_KEY')[:15]}...", file=sys.stderr)
 
 
 class ToolResult:
@@ -41,6 +56,52 @@ class ToolResult:
         }
 
 
+class _ThreadCapturedStream:
+    """Stand-in for sys.stdout/sys.stderr that captures per thread.
+
+    Agents run execute_python concurrently; swapping the global sys.stdout
+    per call let one thread restore another's buffer, losing console output
+    for the rest of the process. Threads with an active capture write to
+    their own buffer, every other thread to the real stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self) -> StringIO:
+        self._local.buffer = StringIO()
+        return self._local.buffer
+
+    def release(self) -> None:
+        self._local.buffer = None
+
+    def _target(self):
+        return getattr(self._local, "buffer", None) or self._stream
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+_capture_lock = threading.Lock()
+
+
+def _captured_streams() -> tuple[_ThreadCapturedStream, _ThreadCapturedStream]:
+    """Install the per-thread capturing streams (once) and return them."""
+    with _capture_lock:
+        if not isinstance(sys.stdout, _ThreadCapturedStream):
+            sys.stdout = _ThreadCapturedStream(sys.stdout)
+        if not isinstance(sys.stderr, _ThreadCapturedStream):
+            sys.stderr = _ThreadCapturedStream(sys.stderr)
+        return sys.stdout, sys.stderr
+
+
 class PersistentPythonExecutor:
     """Maintains a persistent Python environment across execute_python calls.
 
@@ -65,23 +126,18 @@ class PersistentPythonExecutor:
         Returns:
             Tuple of (success, output, error)
         """
-        # Capture stdout/stderr
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
+        # Capture stdout/stderr (of this thread only)
+        stdout, stderr = _captured_streams()
+        stdout_buffer = stdout.capture()
+        stderr_buffer = stderr.capture()
 
         try:
             # Execute code in persistent namespace
             exec(code, self.globals_dict, self.locals_dict)
 
             # Get output
-            output = sys.stdout.getvalue()
-            error = sys.stderr.getvalue()
-
-            # Restore stdout/stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
+            output = stdout_buffer.getvalue()
+            error = stderr_buffer.getvalue()
 
             if error:
                 return False, None, error
@@ -89,12 +145,13 @@ class PersistentPythonExecutor:
             return True, output.strip() if output else "Code executed successfully (no output)", None
 
         except Exception as e:
-            # Restore stdout/stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
-
             return False, None, f"Execution error: {type(e).__name__}: {str(e)}"
 
+        finally:
+            # Restore stdout/stderr
+            stdout.release()
+            stderr.release()
+
     def reset(self):
         """Reset the persistent environment (clears all variables)."""
         self.globals_dict = {
@@ -138,9 +195,81 @@ def execute_python(code: str, timeout: int = 30, reset: bool = False) -> ToolRes
         return ToolResult(False, None, f"Error executing code: {str(e)}")
 
 
+# Parsed PubMed articles by PMID. Abstracts do not change, so every search in
+# the process (every agent, every consensus meeting) reuses earlier fetches.
+_pubmed_articles: dict[str, dict[str, Any]] = {}
+_pubmed_articles_lock = threading.Lock()
+PUBMED_ARTICLE_CACHE_SIZE = 5000
+
+
+def _parse_pubmed_articles(content: bytes) -> list[dict[str, Any]]:
+    """Parse an efetch XML response into article dicts."""
+    import xml.etree.ElementTree as ET
+
+    # Parse XML response
+    root = ET.fromstring(content)
+
+    articles = []
+    for article in root.findall(".//PubmedArticle"):
+        # Extract PMID
+        pmid_elem = article.find(".//PMID")
+        pmid = pmid_elem.text if pmid_elem is not None else "N/A"
+        
+        # Extract title
+        title_elem = article.find(".//ArticleTitle")
+        title = title_elem.text if title_elem is not None else "N/A"
+        
+        # Extract abstract (combine all AbstractText elements)
+        abstract_parts = []
+        for abstract_text in article.findall(".//AbstractText"):
+            # Check for labeled sections (e.g., BACKGROUND, METHODS)
+            label = abstract_text.get("Label", "")
+            text = abstract_text.text or ""
+            if label:
+                abstract_parts.append(f"{label}: {text}")
+            else:
+                abstract_parts.append(text)
+        abstract = " ".join(abstract_parts) if abstract_parts else "N/A"
+        
+        # Extract authors (first 3)
+        authors = []
+        for author in article.findall(".//Author")[:3]:
+            last_name = author.find(".//LastName")
+            initials = author.find(".//Initials")
+            if last_name is not None:
+                author_name = last_name.text
+                if initials is not None:
+                    author_name += f" {initials.text}"
+                authors.append(author_name)
+        
+        # Extract publication date
+        pub_date = article.find(".//PubDate")
+        date_str = "N/A"
+        if pub_date is not None:
+            year = pub_date.find("Year")
+            month = pub_date.find("Month")
+            if year is not None:
+                date_str = year.text
+                if month is not None:
+                    date_str = f"{year.text} {month.text}"
+
+        articles.append({
+            "pmid": pmid,
+            "title": title,
+            "abstract": abstract,
+            "authors": authors,
+            "pubdate": date_str,
+        })
+
+    return articles
+
+
 def search_pubmed(query: str, max_results: int = 10, retmax: int = 100) -> ToolResult:
     """Search PubMed for articles.
 
+    Articles fetched by earlier searches are served from memory; only PMIDs
+    not seen before are fetched from NCBI.
+
     Args:
         query: Search query string
         max_results: Maximum results to return
@@ -149,8 +278,6 @@ def search_pubmed(query: str, max_results: int = 10, retmax: int = 100) -> ToolR
     Returns:
         ToolResult with list of articles
     """
-    import xml.etree.ElementTree as ET
-    
     try:
         # NCBI E-utilities endpoints
         search_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
@@ -173,72 +300,32 @@ def search_pubmed(query: str, max_results: int = 10, retmax: int = 100) -> ToolR
         if not pmids:
             return ToolResult(True, [])
 
-        # Fetch full article details using efetch (includes abstracts)
-        fetch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-        fetch_params = {
-            "db": "pubmed",
-            "id": ",".join(pmids),
-            "retmode": "xml",
-            "rettype": "abstract",
-        }
+        with _pubmed_articles_lock:
+            known = {pmid: _pubmed_articles[pmid] for pmid in pmids if pmid in _pubmed_articles}
+        missing = [pmid for pmid in pmids if pmid not in known]
+
+        fetched = []
+        if missing:
+            # Fetch full article details using efetch (includes abstracts)
+            fetch_params = {
+                "db": "pubmed",
+                "id": ",".join(missing),
+                "retmode": "xml",
+                "rettype": "abstract",
+            }
 
-        fetch_response = requests.get(fetch_url, params=fetch_params, timeout=15)
-        fetch_response.raise_for_status()
-        
-        # Parse XML response
-        root = ET.fromstring(fetch_response.content)
-
-        articles = []
-        for article in root.findall(".//PubmedArticle"):
-            # Extract PMID
-            pmid_elem = article.find(".//PMID")
-            pmid = pmid_elem.text if pmid_elem is not None else "N/A"
-            
-            # Extract title
-            title_elem = article.find(".//ArticleTitle")
-            title = title_elem.text if title_elem is not None else "N/A"
-            
-            # Extract abstract (combine all AbstractText elements)
-            abstract_parts = []
-            for abstract_text in article.findall(".//AbstractText"):
-                # Check for labeled sections (e.g., BACKGROUND, METHODS)
-                label = abstract_text.get("Label", "")
-                text = abstract_text.text or ""
-                if label:
-                    abstract_parts.append(f"{label}: {text}")
-                else:
-                    abstract_parts.append(text)
-            abstract = " ".join(abstract_parts) if abstract_parts else "N/A"
-            
-            # Extract authors (first 3)
-            authors = []
-            for author in article.findall(".//Author")[:3]:
-                last_name = author.find(".//LastName")
-                initials = author.find(".//Initials")
-                if last_name is not None:
-                    author_name = last_name.text
-                    if initials is not None:
-                        author_name += f" {initials.text}"
-                    authors.append(author_name)
-            
-            # Extract publication date
-            pub_date = article.find(".//PubDate")
-            date_str = "N/A"
-            if pub_date is not None:
-                year = pub_date.find("Year")
-                month = pub_date.find("Month")
-                if year is not None:
-                    date_str = year.text
-                    if month is not None:
-                        date_str = f"{year.text} {month.text}"
-
-            articles.append({
-                "pmid": pmid,
-                "title": title,
-                "abstract": abstract,
-                "authors": authors,
-                "pubdate": date_str,
-            })
+            fetch_response = requests.get(fetch_url, params=fetch_params, timeout=15)
+            fetch_response.raise_for_status()
+            fetched = _parse_pubmed_articles(fetch_response.content)
+
+            with _pubmed_articles_lock:
+                for article in fetched:
+                    _pubmed_articles[article["pmid"]] = article
+                while len(_pubmed_articles) > PUBMED_ARTICLE_CACHE_SIZE:
+                    _pubmed_articles.pop(next(iter(_pubmed_articles)))
+
+        by_pmid = {**known, **{article["pmid"]: article for article in fetched}}
+        articles = [dict(by_pmid[pmid]) for pmid in pmids if pmid in by_pmid]
 
         return ToolResult(True, articles)
 
@@ -650,6 +737,7 @@ def search_literature(
     """
     try:
         # Lazy import to avoid loading PaperQA unless needed
+        _load_paperqa_env()
         from paperqa import Docs, Settings
         from paperqa.settings import AnswerSettings
         from pathlib import Path
@@ -657,6 +745,7 @@ def search_literature(
 
         # Get configuration
         from src.config import get_global_config
+        from src.agent.rate_limiter import get_rate_governor, litellm_governor_key, litellm_rate_limit_config
         config = get_global_config()
 
         # IMPORTANT: Check embedding config format
@@ -777,7 +866,14 @@ def search_literature(
                 evidence_k=10
             )
 
+        # Apply the shared rate governor's TPM limit to PaperQA's internal LiteLLM calls
+        rate_limit_config = litellm_rate_limit_config(config.paperqa_llm)
+        if rate_limit_config:
+            settings_kwargs["llm_config"] = rate_limit_config
+            settings_kwargs["summary_llm_config"] = rate_limit_config
+
         settings = Settings(**settings_kwargs)
+        governor_key = litellm_governor_key(config.paperqa_llm)
         print(f"[DEBUG] Parsing config: use_doc_details={settings.parsing.use_doc_details} (LLM disabled during PDF loading)", file=sys.stderr)
 
         # Create document collection
@@ -854,7 +950,9 @@ def search_literature(
                 try:
                     print(f"[DEBUG] Querying with LLM: {settings.llm}", file=sys.stderr)
                     print(f"[DEBUG] Querying with embedding: {settings.embedding}", file=sys.stderr)
-                    local_answer = docs.query(question, settings=settings)
+                    # Hold a governor slot so queries count against the model's in-flight cap
+                    with get_rate_governor().acquire(governor_key):
+                        local_answer = docs.query(question, settings=settings)
                     
                     # Check if local answer is sufficient (has contexts and not "I cannot answer")
                     has_good_local_answer = (
@@ -1049,7 +1147,8 @@ def search_literature(
                 pass
 
         # Query the combined document collection
-        answer_obj = docs.query(question, settings=settings)
+        with get_rate_governor().acquire(governor_key):
+            answer_obj = docs.query(question, settings=settings)
 
         # Extract contexts and references
         contexts = [
@@ -0,0 +1,262 @@
+"""Shared tool-result cache for agents in the same meeting.
+
+Specialists in a round often issue identical ``query_database``, ``find_files``,
+``read_file`` and ``search_pubmed`` calls. A ToolCache shared by the meeting's
+agents memoizes those tools:
+
+- Keys are the tool name, the normalized arguments (including the data
+  directories the agent injects) and the modification time and size of the
+  data files the call reads (for ``find_files``, the file index's
+  fingerprint), so edited data is never served stale. Only free-text search
+  arguments are whitespace-normalized; paths and database queries are kept
+  exactly, since whitespace changes what they refer to.
+- Single-flight: concurrent identical calls execute once and every waiter
+  gets a copy of the same result.
+- Only successful results are cached, so transient failures are retried.
+- Optionally persistent (SQLite, TOOL_CACHE_PATH), so repeated runs over the
+  same data skip the work entirely. Network tools expire after TOOL_CACHE_TTL.
+
+execute_python is never cached: it has side effects and persistent state.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+CACHEABLE_TOOLS = {"query_database", "find_files", "read_file", "search_pubmed", "search_literature"}
+
+# Tools whose results come from the network rather than local files
+NETWORK_TOOLS = {"search_pubmed", "search_literature"}
+
+# Free-text arguments where runs of whitespace do not change the result
+FREE_TEXT_ARGS = {
+    "search_pubmed": {"query"},
+    "search_literature": {"question"},
+    "find_files": {"question_context"},
+}
+
+# Files read by query_database, relative to data_dir (mirrors implementations.query_database)
+DATABASE_PATHS = {
+    "bindingdb": ["Drug/BindingDB/BindingDB_All.tsv"],
+    "drugbank": ["Drug/DrugBank"],
+    "pharos": ["Drug/Pharos"],
+    "gwas": ["GWAS/gwas_catalog_association.tsv"],
+    "string": ["PPI/StringDB", "StringDB"],
+    "stringdb": ["PPI/StringDB", "StringDB"],
+}
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of an argument value (sorted keys, unset entries dropped)."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def normalize_args(tool_name: str, args: dict[str, Any]) -> dict[str, Any]:
+    """Canonical form of a tool call's arguments.
+
+    Whitespace is collapsed only in the tool's FREE_TEXT_ARGS; file paths,
+    code and database queries are compared exactly.
+    """
+    free_text = FREE_TEXT_ARGS.get(tool_name, set())
+    return {
+        k: " ".join(v.split()) if k in free_text and isinstance(v, str) else _normalize(v)
+        for k, v in sorted(args.items()) if v is not None
+    }
+
+
+def dependency_paths(tool_name: str, args: dict[str, Any]) -> list[Path]:
+    """Local files and directories a tool call reads.
+
+    Args:
+        tool_name: Tool name
+        args: Tool arguments including injected data_dir/input_dir
+
+    Returns:
+        Paths whose modification invalidates the cached result
+    """
+    if tool_name == "read_file":
+        return [Path(args.get("input_dir", "./data")) / str(args.get("file_path", ""))]
+    if tool_name == "query_database":
+        data_dir = Path(args.get("data_dir") or ".")
+        return [data_dir / p for p in DATABASE_PATHS.get(str(args.get("db_name", "")).lower(), [])]
+    return []
+
+
+def _file_index_fingerprint(args: dict[str, Any]) -> str:
+    """State of the file index a find_files call searches.
+
+    Gets the index the same way find_files does and brings it up to date, so
+    a file added or removed anywhere in the tree changes the key.
+    """
+    from src.utils.file_index import get_file_index
+
+    return get_file_index(args.get("workspace_root", "."), args.get("data_dir")).fingerprint()
+
+
+def _fingerprint(path: Path) -> list[Any]:
+    """(name, mtime_ns, size) of a file, or of a directory and its direct entries."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return [str(path), None]
+    entries = [str(path), stat.st_mtime_ns, stat.st_size]
+    if path.is_dir():
+        try:
+            with os.scandir(path) as it:
+                for entry in sorted(it, key=lambda e: e.name):
+                    if entry.is_file():
+                        s = entry.stat()
+                        entries.append((entry.name, s.st_mtime_ns, s.st_size))
+        except OSError:
+            pass
+    return entries
+
+
+def cache_key(tool_name: str, args: dict[str, Any]) -> str:
+    """Cache key for a tool call: name, normalized arguments and data file fingerprints."""
+    material = {
+        "tool": tool_name,
+        "args": normalize_args(tool_name, args),
+        "files": [_fingerprint(p) for p in dependency_paths(tool_name, args)],
+    }
+    if tool_name == "find_files":
+        material["file_index"] = _file_index_fingerprint(args)
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """Thread-safe, single-flight memoization of tool results."""
+
+    def __init__(self, persist_path: Optional[str] = None, ttl: Optional[float] = None, max_entries: int = 2048):
+        """Initialize the cache.
+
+        Args:
+            persist_path: SQLite file to persist results across runs (defaults to
+                TOOL_CACHE_PATH env var; in-memory only if unset)
+            ttl: Seconds before network tool results expire (defaults to
+                TOOL_CACHE_TTL env var, 1 day); local tools rely on file fingerprints
+            max_entries: In-memory entries kept (oldest evicted first)
+        """
+        self.persist_path = persist_path if persist_path is not None else os.getenv("TOOL_CACHE_PATH")
+        self.ttl = ttl if ttl is not None else float(os.getenv("TOOL_CACHE_TTL", "86400"))
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, dict[str, Any]]] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "uncacheable": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if self.persist_path:
+            Path(self.persist_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.persist_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_results "
+                "(key TEXT PRIMARY KEY, tool TEXT, created REAL, result TEXT)"
+            )
+            self._db.commit()
+
+    def _expired(self, tool_name: str, created: float) -> bool:
+        return tool_name in NETWORK_TOOLS and time.time() - created > self.ttl
+
+    def _lookup(self, tool_name: str, key: str) -> Optional[dict[str, Any]]:
+        """Find a fresh entry in memory or on disk (caller holds the lock)."""
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute("SELECT created, result FROM tool_results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._entries[key] = entry
+        if entry is None:
+            return None
+        if self._expired(tool_name, entry[0]):
+            self._entries.pop(key, None)
+            return None
+        return entry[1]
+
+    def _store(self, tool_name: str, key: str, result: dict[str, Any]) -> None:
+        created = time.time()
+        with self._lock:
+            self._entries[key] = (created, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO tool_results (key, tool, created, result) VALUES (?, ?, ?, ?)",
+                    (key, tool_name, created, json.dumps(result, default=str)),
+                )
+                self._db.commit()
+
+    def call(self, tool_name: str, args: dict[str, Any], compute: Callable[[], dict[str, Any]]) -> tuple[dict[str, Any], str]:
+        """Return the cached result for a tool call, computing it at most once.
+
+        Args:
+            tool_name: Tool name
+            args: Tool arguments including injected data directories
+            compute: Runs the tool and returns its result dict
+
+        Returns:
+            Tuple of (result, status) where status is "hit", "shared", "miss" or "uncacheable"
+        """
+        if tool_name not in CACHEABLE_TOOLS:
+            with self._lock:
+                self.stats["uncacheable"] += 1
+            return compute(), "uncacheable"
+
+        key = cache_key(tool_name, args)
+        with self._lock:
+            cached = self._lookup(tool_name, key)
+            if cached is not None:
+                self.stats["hits"] += 1
+                return copy.deepcopy(cached), "hit"
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = self._inflight[key] = Future()
+                leader = True
+                self.stats["misses"] += 1
+            else:
+                leader = False
+                self.stats["shared"] += 1
+
+        if not leader:
+            # Another agent is running the identical call; wait for its result
+            return copy.deepcopy(inflight.result()), "shared"
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.set_exception(e)
+            raise
+
+        if result.get("success"):
+            self._store(tool_name, key, result)
+        with self._lock:
+            self._inflight.pop(key, None)
+        inflight.set_result(result)
+        return copy.deepcopy(result), "miss"
+
+    def summary(self) -> str:
+        """One-line hit/miss summary."""
+        s = self.stats
+        lookups = s["hits"] + s["misses"] + s["shared"]
+        saved = s["hits"] + s["shared"]
+        return f"{saved}/{lookups} tool calls served from cache ({s['hits']} hits, {s['shared']} shared in flight)"
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
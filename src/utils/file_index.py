@@ -1,9 +1,52 @@
-"""Smart file discovery and indexing system for efficient data access."""
+"""Smart file discovery and indexing system for efficient data access.
 
+The index is persisted to SQLite (FILE_INDEX_DB, default
+.cache/file_index.sqlite; empty to keep it in memory only) together with the
+modification time of every indexed directory, so a new process loads it
+instead of walking the workspace and the data directory again:
+
+- Refreshing stats each known directory and re-lists only those whose mtime
+  changed (entries added, removed or renamed in them); new subdirectories are
+  scanned, removed ones dropped with their subtree.
+- The initial build lists directories level by level with ``os.scandir`` on a
+  thread pool (FILE_INDEX_WORKERS, default 8), which overlaps the filesystem
+  round trips on network storage.
+- ``get_file_index()`` refreshes an index older than FILE_INDEX_MAX_AGE_S
+  (default 30). With ``watch()`` (server mode; needs the optional watchdog
+  package, inotify on Linux) changed directories are queued as events arrive
+  and only those are re-listed.
+
+File sizes are refreshed when their directory is re-listed; a file rewritten in
+place without touching its directory keeps its old size until then.
+"""
+
+import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, asdict, field
+
+
+DEFAULT_INDEX_DB = ".cache/file_index.sqlite"
+
+# A directory modified this recently may change again within the same
+# timestamp tick, so its mtime is not trusted until a later listing
+_RACY_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (root TEXT PRIMARY KEY, config TEXT, indexed_at REAL);
+CREATE TABLE IF NOT EXISTS dirs (
+    root TEXT, rel TEXT, depth INTEGER, mtime_ns INTEGER, PRIMARY KEY (root, rel)
+);
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT, rel_dir TEXT, name TEXT, size INTEGER, PRIMARY KEY (root, rel_dir, name)
+);
+"""
 
 
 @dataclass
@@ -17,6 +60,16 @@ class FileMetadata:
     subcategory: Optional[str] = None  # e.g., 'csv', 'parquet', 'bam', 'pod5'
 
 
+@dataclass
+class _DirState:
+    """An indexed directory and what it contained at ``mtime_ns``."""
+    rel: str  # Path relative to its root ("" for the root itself)
+    depth: int
+    mtime_ns: int
+    files: List[str] = field(default_factory=list)  # Absolute file paths
+    subdirs: List[str] = field(default_factory=list)  # Absolute directory paths
+
+
 class FileIndex:
     """Index files in workspace for efficient discovery."""
     
@@ -25,83 +78,431 @@ class FileIndex:
     CONFIG_EXTENSIONS = {'.env', '.yaml', '.yml', '.toml', '.ini', '.cfg'}
     SCRIPT_EXTENSIONS = {'.py', '.r', '.sh', '.bash', '.ipynb'}
     DOC_EXTENSIONS = {'.md', '.rst', '.pdf', '.html', '.tex'}
+
+    # Skip common irrelevant directories
+    SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', '.tox',
+                 'dist', 'build', '.pytest_cache', '.mypy_cache', 'egg-info'}
     
-    def __init__(self, workspace_root: str, data_dir: Optional[str] = None):
+    def __init__(self, workspace_root: str, data_dir: Optional[str] = None,
+                 persist_path: Optional[str] = None, workers: Optional[int] = None):
         """Initialize file indexer.
         
         Args:
             workspace_root: Root directory of workspace
             data_dir: Optional separate data directory to index
+            persist_path: SQLite file the index is kept in (defaults to FILE_INDEX_DB
+                env var, .cache/file_index.sqlite; "" keeps the index in memory only)
+            workers: Threads listing directories (defaults to FILE_INDEX_WORKERS env var, 8)
         """
         self.workspace_root = Path(workspace_root)
         self.data_dir = Path(data_dir) if data_dir else None
         self.index: Dict[str, FileMetadata] = {}
+        self._state_hash = 0  # XOR of _entry_hash() over the index; see fingerprint()
         self._indexed = False
+        self.persist_path = persist_path if persist_path is not None else os.getenv("FILE_INDEX_DB", DEFAULT_INDEX_DB)
+        self.workers = workers or int(os.getenv("FILE_INDEX_WORKERS", "8"))
+        self.max_age_s = float(os.getenv("FILE_INDEX_MAX_AGE_S", "30"))
+        self.last_refresh = 0.0
+        self.stats = {"loaded": 0, "listed": 0}  # Directories read from disk cache / listed
+        # Absolute root -> (root as given, max depth, absolute paths not to descend into)
+        self._roots: Dict[str, Tuple[Path, int, Set[str]]] = {}
+        self._dirs: Dict[str, Dict[str, _DirState]] = {}  # Absolute root -> absolute directory -> state
+        self._changed: Set[Tuple[str, str]] = set()  # (root, directory) to write to disk
+        self._removed: Set[Tuple[str, str]] = set()  # (root, rel) to delete from disk
+        self._pending: Set[str] = set()  # Directories the watcher reported changed
+        self._pending_lock = threading.Lock()
+        self._observer = None
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
         
     def build_index(self, force_refresh: bool = False) -> None:
-        """Build file index by scanning workspace.
+        """Build file index, loading it from disk when possible.
+        
+        Roots indexed by an earlier process are loaded and then refreshed
+        incrementally; others are scanned in parallel.
         
         Args:
-            force_refresh: Rebuild even if already indexed
+            force_refresh: Bring an existing index up to date (re-lists only
+                directories whose mtime changed)
         """
-        if self._indexed and not force_refresh:
-            return
-            
-        self.index.clear()
-        
-        # Index workspace
-        self._scan_directory(self.workspace_root, max_depth=5)
+        with self._lock:
+            if self._indexed:
+                if force_refresh:
+                    self.refresh()
+                return
+
+            self._open_db()
+            # The data directory is indexed as its own root (with its own depth),
+            # so the workspace scan does not descend into it
+            specs = [(self.workspace_root, 5, {str(self.data_dir.absolute())} if self.data_dir else set())]
+            if self.data_dir and self.data_dir.exists():
+                specs.append((self.data_dir, 4, set()))
+
+            loaded = []
+            for root_path, max_depth, exclude in specs:
+                root = str(root_path.absolute())
+                self._roots[root] = (root_path, max_depth, exclude)
+                self._dirs[root] = {}
+                if self._load_root(root):
+                    loaded.append(root)
+                else:
+                    self._scan_trees(root, [(root, 0)])
+
+            self._indexed = True
+            self._refresh_roots(loaded)
+
+    def refresh(self) -> int:
+        """Re-list the directories whose mtime changed since they were indexed.
         
-        # Index separate data directory if specified
-        if self.data_dir and self.data_dir.exists():
-            self._scan_directory(self.data_dir, max_depth=4)
-            
-        self._indexed = True
+        Returns:
+            Number of directories re-listed
+        """
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
+                return self.stats["listed"]
+            return self._refresh_roots(list(self._dirs))
+
+    def refresh_if_stale(self) -> int:
+        """Cheaply bring the index up to date before a query.
         
-    def _scan_directory(self, root_path: Path, max_depth: int, current_depth: int = 0) -> None:
-        """Recursively scan directory and index files.
+        While watching, re-lists the directories the watcher reported;
+        otherwise refreshes if the last refresh is older than max_age_s.
         
-        Args:
-            root_path: Directory to scan
-            max_depth: Maximum recursion depth
-            current_depth: Current recursion level
+        Returns:
+            Number of directories re-listed
         """
-        if current_depth > max_depth:
-            return
-            
-        # Skip common irrelevant directories
-        skip_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'env', '.tox', 
-                    'dist', 'build', '.pytest_cache', '.mypy_cache', 'egg-info'}
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
+                return self.stats["listed"]
+            if self._observer is not None:
+                with self._pending_lock:
+                    pending, self._pending = self._pending, set()
+                targets = [
+                    (root, path, dirs[path].depth)
+                    for path in pending for root, dirs in self._dirs.items() if path in dirs
+                ]
+                return self._relist(targets) if targets else 0
+            if time.monotonic() - self.last_refresh >= self.max_age_s:
+                return self.refresh()
+            return 0
+
+    def watch(self) -> bool:
+        """Queue changed directories for re-listing as the filesystem reports them.
+        
+        Needs the optional watchdog package (inotify on Linux). While
+        watching, refresh_if_stale() only re-lists the queued directories.
         
+        Returns:
+            True if live updates are running, False if watchdog is not installed
+        """
         try:
-            for item in root_path.iterdir():
-                # Skip hidden files and directories at root level
-                if item.name.startswith('.') and current_depth == 0:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        with self._lock:
+            if self._observer is not None:
+                return True
+            self.build_index()
+            index = self
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    index._queue_change(event)
+
+            observer = Observer()
+            observer.daemon = True
+            for root in self._dirs:
+                if os.path.isdir(root):
+                    observer.schedule(_Handler(), root, recursive=True)
+            observer.start()
+            self._observer = observer
+        return True
+
+    def _queue_change(self, event) -> None:
+        """Watcher callback: mark the directories whose listing the event changed."""
+        with self._pending_lock:
+            for path in (event.src_path, getattr(event, "dest_path", "")):
+                if not path:
                     continue
-                    
-                if item.is_dir():
-                    # Skip irrelevant directories
-                    if item.name in skip_dirs:
+                path = os.fsdecode(path)
+                self._pending.add(os.path.dirname(path))
+                if event.is_directory:
+                    self._pending.add(path)
+
+    def close(self) -> None:
+        """Stop watching and close the disk cache."""
+        with self._lock:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- Scanning -------------------------------------------------------------
+
+    def _list_dir(self, root: str, path: str, depth: int) -> Optional[Tuple[int, List[Tuple[str, int]], List[str]]]:
+        """One ``os.scandir`` pass over a directory (runs on the worker pool).
+        
+        Returns:
+            (mtime_ns, [(file name, size)], [subdirectory names]), or None if
+            the directory no longer exists
+        """
+        _, max_depth, exclude = self._roots[root]
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # Skip hidden files and directories at root level
+                    if depth == 0 and entry.name.startswith('.'):
                         continue
-                    # Recurse into subdirectory
-                    self._scan_directory(item, max_depth, current_depth + 1)
-                    
-                elif item.is_file():
-                    # Index this file
-                    metadata = self._create_metadata(item)
-                    # Use absolute path as key to handle files from different root directories
-                    abs_path = str(item.absolute())
-                    self.index[abs_path] = metadata
-                    
-        except PermissionError:
+                    try:
+                        if entry.is_dir():
+                            if entry.name in self.SKIP_DIRS or depth + 1 > max_depth or entry.path in exclude:
+                                continue
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append((entry.name, entry.stat().st_size))
+                    except OSError:
+                        continue  # Broken symlink or entry removed while listing
+        except OSError:
             # Skip directories we can't read
             pass
-            
-    def _create_metadata(self, file_path: Path) -> FileMetadata:
+        if time.time_ns() - mtime_ns < _RACY_NS:
+            mtime_ns = -1  # Re-listed by the next refresh
+        return mtime_ns, files, subdirs
+
+    def _apply_listing(self, root: str, path: str, depth: int,
+                       listing: Tuple[int, List[Tuple[str, int]], List[str]]) -> List[str]:
+        """Replace a directory's files and subdirectories with a fresh listing.
+        
+        Returns:
+            Absolute paths of subdirectories not indexed before
+        """
+        mtime_ns, files, subdirs = listing
+        root_path = self._roots[root][0]
+        old = self._dirs[root].get(path)
+        rel = os.path.relpath(path, root) if path != root else ""
+
+        file_paths = []
+        for name, size in files:
+            abs_path = os.path.join(path, name)
+            self._set_entry(abs_path, self._create_metadata(root_path / rel / name, size))
+            file_paths.append(abs_path)
+        subdir_paths = [os.path.join(path, name) for name in subdirs]
+
+        if old is not None:
+            for abs_path in set(old.files) - set(file_paths):
+                self._pop_entry(abs_path)
+            for gone in set(old.subdirs) - set(subdir_paths):
+                self._drop_tree(root, gone)
+
+        self._dirs[root][path] = _DirState(rel, depth, mtime_ns, file_paths, subdir_paths)
+        self._changed.add((root, path))
+        known = set(old.subdirs) if old is not None else set()
+        return [p for p in subdir_paths if p not in known]
+
+    @staticmethod
+    def _entry_hash(abs_path: str, metadata: FileMetadata) -> int:
+        digest = hashlib.blake2b(f"{abs_path}\0{metadata.size_bytes}".encode("utf-8", "surrogateescape"), digest_size=8)
+        return int.from_bytes(digest.digest(), "big")
+
+    def _set_entry(self, abs_path: str, metadata: FileMetadata) -> None:
+        self._pop_entry(abs_path)
+        self.index[abs_path] = metadata
+        self._state_hash ^= self._entry_hash(abs_path, metadata)
+
+    def _pop_entry(self, abs_path: str) -> None:
+        metadata = self.index.pop(abs_path, None)
+        if metadata is not None:
+            self._state_hash ^= self._entry_hash(abs_path, metadata)
+
+    def fingerprint(self) -> str:
+        """Digest of the indexed paths and sizes, for keying cached searches.
+        
+        Brings the index up to date first (re-lists changed directories, or
+        applies the watcher's queued changes). The digest is maintained
+        incrementally (an XOR of per-file hashes) and is the same in every
+        process for the same files, so it can key persisted results.
+        """
+        with self._lock:
+            if self._observer is None:
+                self.refresh()
+            else:
+                self.refresh_if_stale()
+            return f"{self._state_hash:016x}"
+
+    def _drop_tree(self, root: str, path: str) -> None:
+        """Remove a directory and everything below it from the index."""
+        state = self._dirs[root].pop(path, None)
+        if state is None:
+            return
+        for abs_path in state.files:
+            self._pop_entry(abs_path)
+        for sub in state.subdirs:
+            self._drop_tree(root, sub)
+        self._changed.discard((root, path))
+        self._removed.add((root, state.rel))
+
+    def _scan_trees(self, root: str, frontier: List[Tuple[str, int]]) -> None:
+        """Scan directory trees level by level, listing each level in parallel.
+        
+        Args:
+            root: Absolute root the trees belong to
+            frontier: (absolute directory, depth) pairs to start from
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="file-index") as pool:
+            while frontier:
+                listings = list(pool.map(lambda item: self._list_dir(root, *item), frontier))
+                self.stats["listed"] += len(frontier)
+                next_frontier = []
+                for (path, depth), listing in zip(frontier, listings):
+                    if listing is not None:
+                        next_frontier.extend((sub, depth + 1) for sub in self._apply_listing(root, path, depth, listing))
+                frontier = next_frontier
+        self.last_refresh = time.monotonic()
+        self._save()
+
+    def _refresh_roots(self, roots: List[str]) -> int:
+        """Re-list the directories of ``roots`` whose mtime changed."""
+        targets = []
+        for root in roots:
+            for path, state in list(self._dirs[root].items()):
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    mtime_ns = None
+                if mtime_ns != state.mtime_ns:
+                    targets.append((root, path, state.depth))
+        return self._relist(targets)
+
+    def _relist(self, targets: List[Tuple[str, str, int]]) -> int:
+        """Re-list known directories in parallel, then scan any new subtrees.
+        
+        Args:
+            targets: (root, absolute directory, depth) triples
+        
+        Returns:
+            Number of directories re-listed
+        """
+        new_trees: Dict[str, List[Tuple[str, int]]] = {}
+        if targets:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="file-index") as pool:
+                listings = list(pool.map(lambda target: self._list_dir(*target), targets))
+            self.stats["listed"] += len(targets)
+            for (root, path, depth), listing in zip(targets, listings):
+                if path not in self._dirs[root]:
+                    continue  # Dropped with its parent
+                if listing is None:
+                    self._drop_tree(root, path)
+                    continue
+                for sub in self._apply_listing(root, path, depth, listing):
+                    new_trees.setdefault(root, []).append((sub, depth + 1))
+        for root, frontier in new_trees.items():
+            self._scan_trees(root, frontier)
+        self.last_refresh = time.monotonic()
+        self._save()
+        return len(targets)
+
+    # --- Disk cache -----------------------------------------------------------
+
+    def _open_db(self) -> None:
+        if self._db is not None or not self.persist_path:
+            return
+        try:
+            Path(self.persist_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.persist_path, check_same_thread=False, timeout=30)
+            self._db.executescript(_SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠ File index cache unavailable ({e}); indexing in memory")
+            self._db = None
+
+    def _root_config(self, root: str) -> str:
+        _, max_depth, exclude = self._roots[root]
+        return json.dumps({"max_depth": max_depth, "exclude": sorted(exclude)})
+
+    def _load_root(self, root: str) -> bool:
+        """Load a root's directories and files as an earlier process indexed them.
+        
+        Returns:
+            False if the root is not on disk or was indexed with other settings
+        """
+        if self._db is None:
+            return False
+        row = self._db.execute("SELECT config FROM roots WHERE root = ?", (root,)).fetchone()
+        if row is None or row[0] != self._root_config(root):
+            return False
+
+        dirs: Dict[str, _DirState] = {}
+        for rel, depth, mtime_ns in self._db.execute("SELECT rel, depth, mtime_ns FROM dirs WHERE root = ?", (root,)):
+            dirs[os.path.join(root, rel) if rel else root] = _DirState(rel, depth, mtime_ns)
+        if root not in dirs:
+            return False
+        for path, state in dirs.items():
+            parent = dirs.get(os.path.dirname(path)) if state.rel else None
+            if parent is not None:
+                parent.subdirs.append(path)
+
+        root_path = self._roots[root][0]
+        for rel_dir, name, size in self._db.execute("SELECT rel_dir, name, size FROM files WHERE root = ?", (root,)):
+            path = os.path.join(root, rel_dir) if rel_dir else root
+            state = dirs.get(path)
+            if state is not None:
+                abs_path = os.path.join(path, name)
+                self._set_entry(abs_path, self._create_metadata(root_path / rel_dir / name, size))
+                state.files.append(abs_path)
+
+        self._dirs[root] = dirs
+        self.stats["loaded"] += len(dirs)
+        return True
+
+    def _save(self) -> None:
+        """Write changed and removed directories to disk in one transaction."""
+        if self._db is None or not (self._changed or self._removed):
+            return
+        try:
+            with self._db:
+                for root, rel in self._removed:
+                    self._db.execute("DELETE FROM dirs WHERE root = ? AND rel = ?", (root, rel))
+                    self._db.execute("DELETE FROM files WHERE root = ? AND rel_dir = ?", (root, rel))
+                for root, path in self._changed:
+                    state = self._dirs[root].get(path)
+                    if state is None:
+                        continue
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO dirs (root, rel, depth, mtime_ns) VALUES (?, ?, ?, ?)",
+                        (root, state.rel, state.depth, state.mtime_ns),
+                    )
+                    self._db.execute("DELETE FROM files WHERE root = ? AND rel_dir = ?", (root, state.rel))
+                    self._db.executemany(
+                        "INSERT INTO files (root, rel_dir, name, size) VALUES (?, ?, ?, ?)",
+                        [(root, state.rel, os.path.basename(f), self.index[f].size_bytes) for f in state.files],
+                    )
+                for root in {root for root, _ in self._changed}:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO roots (root, config, indexed_at) VALUES (?, ?, ?)",
+                        (root, self._root_config(root), time.time()),
+                    )
+        except sqlite3.Error as e:
+            print(f"⚠ Could not save file index ({e})")
+        self._changed.clear()
+        self._removed.clear()
+
+    def _create_metadata(self, file_path: Path, size_bytes: Optional[int] = None) -> FileMetadata:
         """Create metadata entry for a file.
         
         Args:
             file_path: Path to file
+            size_bytes: File size if already known (from the directory listing)
             
         Returns:
             FileMetadata object
@@ -129,7 +530,7 @@ class FileIndex:
             path=str(file_path),
             name=file_path.name,
             extension=ext,
-            size_bytes=file_path.stat().st_size,
+            size_bytes=file_path.stat().st_size if size_bytes is None else size_bytes,
             category=category,
             subcategory=subcategory
         )
@@ -152,10 +553,12 @@ class FileIndex:
         """
         if not self._indexed:
             self.build_index()
+        with self._lock:
+            entries = list(self.index.items())
             
         results = []
         
-        for abs_path, metadata in self.index.items():
+        for abs_path, metadata in entries:
             # Apply filters
             if category and metadata.category != category:
                 continue
@@ -236,7 +639,8 @@ class FileIndex:
         Returns:
             JSON string representation
         """
-        index_dict = {path: asdict(meta) for path, meta in self.index.items()}
+        with self._lock:
+            index_dict = {path: asdict(meta) for path, meta in self.index.items()}
         json_str = json.dumps(index_dict, indent=2)
         
         if output_path:
@@ -250,19 +654,22 @@ class FileIndex:
         Returns:
             Dictionary with category counts
         """
+        with self._lock:
+            entries = list(self.index.values())
         summary = {}
-        for metadata in self.index.values():
+        for metadata in entries:
             cat = metadata.category
             summary[cat] = summary.get(cat, 0) + 1
         return summary
 
 
-# Singleton instance for workspace
-_file_index: Optional[FileIndex] = None
+# One index per (workspace, data directory) pair
+_file_indexes: Dict[Tuple[str, Optional[str]], FileIndex] = {}
+_file_index_lock = threading.Lock()
 
 
 def get_file_index(workspace_root: str = ".", data_dir: Optional[str] = None) -> FileIndex:
-    """Get or create the global file index.
+    """Get or create the file index for a workspace, refreshed if stale.
     
     Args:
         workspace_root: Workspace root directory
@@ -271,13 +678,13 @@ def get_file_index(workspace_root: str = ".", data_dir: Optional[str] = None) ->
     Returns:
         FileIndex instance
     """
-    global _file_index
-    
-    if _file_index is None:
-        _file_index = FileIndex(workspace_root, data_dir)
-        _file_index.build_index()
-        
-    return _file_index
+    key = (str(Path(workspace_root).absolute()), str(Path(data_dir).absolute()) if data_dir else None)
+    with _file_index_lock:
+        index = _file_indexes.get(key)
+        if index is None:
+            index = _file_indexes[key] = FileIndex(workspace_root, data_dir)
+    index.refresh_if_stale()
+    return index
 
 
 def smart_find_files(question: str, workspace_root: str = ".", data_dir: Optional[str] = None) -> List[str]:
@@ -0,0 +1,224 @@
+"""Lightweight tracing spans for the question pipeline.
+
+Spans follow the OpenTelemetry model (trace id, span id, parent, attributes,
+status) but need no SDK or collector. Finished spans are kept in memory and
+written to a Chrome trace file, which can be opened in chrome://tracing or
+https://ui.perfetto.dev to get a flame chart per thread:
+
+    TRACE_FILE=trace.json python -m src.cli --virtual-lab --question "..."
+
+or programmatically:
+
+    enable_tracing("trace.json")
+    with span("question", question=q):
+        ...
+    export_trace()
+
+When tracing is disabled ``span()`` is a cheap no-op.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+
+@dataclass
+class Span:
+    """A timed operation."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    thread_id: int = 0
+    thread_name: str = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Returned by span() when tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Collects finished spans and exports them as a Chrome trace."""
+
+    def __init__(self, path: Optional[str] = None, max_spans: int = 200_000):
+        """Initialize the tracer.
+
+        Args:
+            path: Default export path
+            max_spans: Stop recording after this many spans (bounds memory in long runs)
+        """
+        self.path = path
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+        # perf_counter has an arbitrary origin; anchor it to wall-clock time once
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def start(self, name: str, attributes: dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        thread = threading.current_thread()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.perf_counter_ns(),
+            attributes=attributes,
+            thread_id=thread.ident or 0,
+            thread_name=thread.name,
+        )
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.perf_counter_ns()
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Build a Chrome trace-event document ("X" complete events, µs timestamps)."""
+        with self._lock:
+            spans = list(self.spans)
+
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        threads: dict[int, str] = {}
+        for s in spans:
+            threads.setdefault(s.thread_id, s.thread_name)
+            events.append({
+                "name": s.name,
+                "cat": s.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (s.start_ns + self._epoch_offset_ns) / 1000,
+                "dur": ((s.end_ns or s.start_ns) - s.start_ns) / 1000,
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": {
+                    **{k: _json_safe(v) for k, v in s.attributes.items()},
+                    "trace_id": s.trace_id,
+                    "span_id": s.span_id,
+                    "parent_id": s.parent_id,
+                    "status": s.status,
+                },
+            })
+        for tid, name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}
+
+    def export(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the Chrome trace to ``path`` (defaults to the tracer's path).
+
+        Returns:
+            The path written, or None if there is nowhere to write
+        """
+        path = path or self.path
+        if not path:
+            return None
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)[:500]
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable_tracing(path: Optional[str] = None) -> Tracer:
+    """Start recording spans (idempotent).
+
+    Args:
+        path: Where export_trace() writes by default; also written at interpreter exit
+
+    Returns:
+        The active tracer
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+        atexit.register(export_trace)
+    elif path:
+        _tracer.path = path
+    return _tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """The active tracer, or None if tracing is disabled."""
+    return _tracer
+
+
+def export_trace(path: Optional[str] = None) -> Optional[str]:
+    """Write collected spans as a Chrome trace.
+
+    Returns:
+        The path written, or None if tracing is disabled or no path is set
+    """
+    return _tracer.export(path) if _tracer else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Time the enclosed block as a child of the current span.
+
+    Exceptions are recorded on the span (status="error") and re-raised.
+
+    Args:
+        name: Dotted span name, e.g. "llm.call" or "meeting.critic"
+        **attributes: Span attributes (model, agent, round, ...)
+
+    Yields:
+        The Span (or a no-op object with set_attribute when tracing is off)
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+
+    current = tracer.start(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer.finish(current)
+
+
+# Opt in from the environment, so any entry point can be traced without code changes
+if os.getenv("TRACE_FILE"):
+    enable_tracing(os.getenv("TRACE_FILE"))
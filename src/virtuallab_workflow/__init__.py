@@ -1,40 +1,65 @@
-"""LangGraph integration for Virtual Lab workflow orchestration."""
-
-from src.virtuallab_workflow.workflow import (
-    create_research_workflow,
-    run_research_workflow,
-    continue_after_human_review
-)
-from src.virtuallab_workflow.visualization import (
-    visualize_workflow,
-    export_execution_trace,
-    print_workflow_summary,
-    compare_workflows
-)
-from src.virtuallab_workflow.state import ResearchState
-from src.virtuallab_workflow.consensus import (
-    run_consensus_meeting,
-    compare_model_answers,
-    DEFAULT_CONSENSUS_MODELS
-)
-
-__all__ = [
+"""LangGraph integration for Virtual Lab workflow orchestration.
+
+Names are imported from their submodules on first access, so importing the
+package, or its LangGraph-free modules (consensus, agreement), does not load
+langgraph.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+# Public name -> submodule defining it
+_EXPORTS = {
     # Workflow execution
-    "create_research_workflow",
-    "run_research_workflow",
-    "continue_after_human_review",
-    
+    "create_research_workflow": "workflow",
+    "get_research_workflow": "workflow",
+    "get_consensus_workflow": "workflow",
+    "run_research_workflow": "workflow",
+    "continue_after_human_review": "workflow",
+
     # Visualization
-    "visualize_workflow",
-    "export_execution_trace",
-    "print_workflow_summary",
-    "compare_workflows",
-    
+    "visualize_workflow": "visualization",
+    "export_execution_trace": "visualization",
+    "print_workflow_summary": "visualization",
+    "compare_workflows": "visualization",
+
     # Consensus
-    "run_consensus_meeting",
-    "compare_model_answers",
-    "DEFAULT_CONSENSUS_MODELS",
-    
+    "run_consensus_meeting": "consensus",
+    "compare_model_answers": "consensus",
+    "DEFAULT_CONSENSUS_MODELS": "consensus",
+
     # State
-    "ResearchState"
-]
+    "ResearchState": "state",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from src.virtuallab_workflow.workflow import (
+        create_research_workflow,
+        get_research_workflow,
+        get_consensus_workflow,
+        run_research_workflow,
+        continue_after_human_review
+    )
+    from src.virtuallab_workflow.visualization import (
+        visualize_workflow,
+        export_execution_trace,
+        print_workflow_summary,
+        compare_workflows
+    )
+    from src.virtuallab_workflow.state import ResearchState
+    from src.virtuallab_workflow.consensus import (
+        run_consensus_meeting,
+        compare_model_answers,
+        DEFAULT_CONSENSUS_MODELS
+    )
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
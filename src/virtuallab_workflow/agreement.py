@@ -0,0 +1,282 @@
+"""Local, deterministic agreement scoring across consensus answers.
+
+Instead of asking an LLM to print an agreement score, each model's answer is
+split into claims, the claims are embedded and clustered across models, and
+agreement is computed from which models support each cluster:
+
+- A cluster supported by more than one model is a corroborated claim; those
+  supported by every model (or a majority, with three or more models) are
+  reported as key agreements.
+- Claims only one model makes are the disagreements the meta-synthesis has
+  to resolve.
+- The agreement score is the mean, over models, of the share of that model's
+  claims corroborated by at least one other model.
+
+Embeddings come from a local sentence-transformers model when the package is
+installed (CONSENSUS_EMBEDDING_MODEL, default all-MiniLM-L6-v2; the model is
+loaded once and embeddings are cached by text). Otherwise a lexical
+bag-of-words embedding is used, with a lower similarity threshold.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Cosine similarity at which two claims count as the same point
+EMBEDDING_THRESHOLD = 0.72
+LEXICAL_THRESHOLD = 0.45
+
+MIN_CLAIM_WORDS = 5
+
+_STOPWORDS = frozenset(
+    "a an and are as at be been by can could for from has have in into is it its may might more "
+    "most not of on or our such than that the their there these they this those to was we were "
+    "which while will with would also both other".split()
+)
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-]*")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(])")
+_REFERENCES_HEADER = re.compile(r"^#+\s*references\b", re.IGNORECASE | re.MULTILINE)
+
+
+def split_claims(answer: str) -> list[str]:
+    """Split an answer into individual claims.
+
+    Bullets and sentences become claims; headings, the appended references
+    section and fragments shorter than MIN_CLAIM_WORDS words are dropped.
+
+    Args:
+        answer: A model's final answer (markdown)
+
+    Returns:
+        Claims in the order they appear
+    """
+    references = _REFERENCES_HEADER.search(answer or "")
+    text = answer[:references.start()] if references else (answer or "")
+
+    claims = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or set(line) <= set("-=*_|: "):
+            continue
+        line = re.sub(r"^(?:[-*+•]|\d+[.)])\s+", "", line)
+        line = line.replace("**", "").replace("__", "")
+        for sentence in _SENTENCE_SPLIT.split(line):
+            sentence = sentence.strip()
+            if len(sentence.split()) >= MIN_CLAIM_WORDS:
+                claims.append(sentence)
+    return claims
+
+
+def _lexical_embedding(text: str) -> dict[str, float]:
+    """Unit-normalized bag of content words."""
+    counts = Counter(w for w in _WORD_PATTERN.findall(text.lower()) if w not in _STOPWORDS)
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {w: v / norm for w, v in counts.items()}
+
+
+def _cosine(a: Any, b: Any) -> float:
+    """Cosine similarity of two unit vectors (lists or sparse dicts)."""
+    if isinstance(a, dict):
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(v * b.get(w, 0.0) for w, v in a.items())
+    return sum(x * y for x, y in zip(a, b))
+
+
+class ClaimEmbedder:
+    """Embeds claims with sentence-transformers, or lexically if it is unavailable."""
+
+    def __init__(self, model_name: Optional[str] = None, cache_size: int = 4096):
+        """Initialize the embedder (the model is loaded on first use).
+
+        Args:
+            model_name: sentence-transformers model (defaults to
+                CONSENSUS_EMBEDDING_MODEL env var, all-MiniLM-L6-v2); "lexical"
+                forces the bag-of-words fallback
+            cache_size: Embeddings kept in the LRU cache
+        """
+        self.model_name = model_name or os.getenv("CONSENSUS_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def method(self) -> str:
+        """"embedding" or "lexical" (loads the model if needed)."""
+        self._load()
+        return "embedding" if self._model is not None else "lexical"
+
+    @property
+    def threshold(self) -> float:
+        return EMBEDDING_THRESHOLD if self.method == "embedding" else LEXICAL_THRESHOLD
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.model_name == "lexical":
+                return
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                return
+            try:
+                self._model = SentenceTransformer(self.model_name)
+            except Exception as e:  # Model not downloadable offline, etc.
+                print(f"⚠ Could not load embedding model {self.model_name} ({e}); using lexical agreement")
+
+    def embed(self, texts: list[str]) -> list[Any]:
+        """Embed texts, reusing cached embeddings.
+
+        Returns:
+            Unit vectors (lists of floats, or sparse dicts for the lexical fallback)
+        """
+        self._load()
+        keys = [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts]
+        # Vectors come from this call's lookups and encodes, never from a second
+        # cache read (the cache may evict them in between)
+        found: dict[str, Any] = {}
+        with self._lock:
+            for k in keys:
+                if k in self._cache:
+                    self._cache.move_to_end(k)
+                    found[k] = self._cache[k]
+
+        # First position of each text not in the cache (duplicates embed once)
+        missing: dict[str, int] = {}
+        for i, k in enumerate(keys):
+            if k not in found:
+                missing.setdefault(k, i)
+
+        if missing:
+            if self._model is not None:
+                vectors = self._model.encode([texts[i] for i in missing.values()], normalize_embeddings=True)
+                new = [v.tolist() for v in vectors]
+            else:
+                new = [_lexical_embedding(texts[i]) for i in missing.values()]
+            with self._lock:
+                for k, vector in zip(missing, new):
+                    found[k] = vector
+                    self._cache[k] = vector
+                    self._cache.move_to_end(k)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [found[k] for k in keys]
+
+
+_embedder: Optional[ClaimEmbedder] = None
+_embedder_lock = threading.Lock()
+
+
+def get_claim_embedder() -> ClaimEmbedder:
+    """Get or create the process-wide claim embedder (the model loads once)."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            _embedder = ClaimEmbedder()
+        return _embedder
+
+
+@dataclass
+class ClaimCluster:
+    """Claims from one or more models that make the same point."""
+
+    claims: list[tuple[str, str]] = field(default_factory=list)  # (model, claim)
+    vectors: list[Any] = field(default_factory=list)
+
+    @property
+    def models(self) -> list[str]:
+        return list(dict.fromkeys(model for model, _ in self.claims))
+
+    @property
+    def representative(self) -> str:
+        """The first claim made (in model order)."""
+        return self.claims[0][1]
+
+
+@dataclass
+class AgreementReport:
+    """Numeric agreement across the models' answers."""
+
+    agreement_score: float
+    agreements: list[str]
+    disagreements: list[dict[str, str]]  # {"model", "claim"} made by only one model
+    clusters: list[ClaimCluster]
+    method: str
+
+    @property
+    def key_disagreements(self) -> list[str]:
+        return [f"{d['model']}: {d['claim']}" for d in self.disagreements]
+
+
+def analyze_agreement(
+    answers: list[tuple[str, str]],
+    embedder: Optional[ClaimEmbedder] = None,
+    threshold: Optional[float] = None,
+) -> AgreementReport:
+    """Cluster the models' claims and measure how much they agree.
+
+    Args:
+        answers: (model, answer) pairs in model order
+        embedder: Claim embedder (defaults to the shared one)
+        threshold: Similarity at which claims join a cluster (defaults to the
+            embedder's: EMBEDDING_THRESHOLD or LEXICAL_THRESHOLD)
+
+    Returns:
+        AgreementReport with the score, agreed claims and single-model claims
+    """
+    embedder = embedder or get_claim_embedder()
+    threshold = threshold if threshold is not None else embedder.threshold
+
+    claims = [(model, claim) for model, answer in answers for claim in split_claims(answer)]
+    vectors = embedder.embed([claim for _, claim in claims]) if claims else []
+
+    # Greedy single-pass clustering in model order; a claim joins the cluster
+    # holding its most similar claim, if that is similar enough
+    clusters: list[ClaimCluster] = []
+    for (model, claim), vector in zip(claims, vectors):
+        best, best_sim = None, threshold
+        for cluster in clusters:
+            sim = max(_cosine(vector, v) for v in cluster.vectors)
+            if sim >= best_sim:
+                best, best_sim = cluster, sim
+        if best is None:
+            best = ClaimCluster()
+            clusters.append(best)
+        best.claims.append((model, claim))
+        best.vectors.append(vector)
+
+    models = list(dict.fromkeys(model for model, _ in answers))
+    if len(models) < 2:
+        return AgreementReport(1.0, [c.representative for c in clusters], [], clusters, embedder.method)
+
+    corroborated = {m: 0 for m in models}
+    totals = {m: 0 for m in models}
+    for cluster in clusters:
+        supporters = set(cluster.models)
+        for model, _ in cluster.claims:
+            totals[model] += 1
+            if len(supporters) > 1:
+                corroborated[model] += 1
+    scored = [corroborated[m] / totals[m] for m in models if totals[m]]
+    score = sum(scored) / len(scored) if scored else 0.0
+
+    quorum = len(models) if len(models) == 2 else len(models) // 2 + 1
+    agreements = [c.representative for c in clusters if len(c.models) >= quorum]
+    disagreements = [
+        {"model": c.claims[0][0], "claim": c.representative}
+        for c in clusters if len(c.models) == 1
+    ]
+    return AgreementReport(score, agreements, disagreements, clusters, embedder.method)
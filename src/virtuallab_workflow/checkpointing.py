@@ -0,0 +1,189 @@
+"""Durable checkpoints for the LangGraph workflows.
+
+The workflows used to compile with a fresh ``MemorySaver`` each time, so a
+crashed multi-hour consensus run was lost and ``continue_after_human_review``
+resumed an empty thread. ``get_checkpointer()`` returns one process-wide
+checkpointer instead:
+
+- ``SqliteSaver`` on a local file (WORKFLOW_CHECKPOINT_DB, default
+  .checkpoints/workflow.sqlite) when langgraph-checkpoint-sqlite is installed.
+  LangGraph writes a checkpoint after every node, so re-running a thread ID
+  resumes after the last completed node.
+- ``MemorySaver`` otherwise (with a warning), or with
+  WORKFLOW_CHECKPOINTER=memory (state then survives only within the
+  process, shared by every compiled workflow).
+
+A ``workflow_threads`` table next to LangGraph's tables records each thread's
+workflow, question, status and last update, for listing resumable runs and
+for ``compact_checkpoints()``, which drops threads idle for longer than
+WORKFLOW_CHECKPOINT_MAX_AGE_DAYS (default 14) and all but the latest
+checkpoint of finished threads.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # langgraph-checkpoint-sqlite not installed
+    SqliteSaver = None
+
+
+DEFAULT_CHECKPOINT_DB = ".checkpoints/workflow.sqlite"
+
+# Thread statuses recorded by the workflow runners
+RUNNING, INTERRUPTED, COMPLETED, FAILED = "running", "interrupted", "completed", "failed"
+
+_THREADS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_threads (
+    thread_id TEXT PRIMARY KEY,
+    workflow TEXT,
+    question TEXT,
+    status TEXT,
+    updated_at REAL
+)"""
+
+_checkpointer = None
+# Thread records and compaction use their own connection; SqliteSaver's is
+# only ever touched under SqliteSaver's lock
+_threads_db: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def get_checkpointer():
+    """Get or create the process-wide workflow checkpointer.
+
+    Returns:
+        A SqliteSaver on WORKFLOW_CHECKPOINT_DB, or a MemorySaver if SQLite
+        checkpointing is unavailable or disabled
+    """
+    global _checkpointer, _threads_db
+    with _lock:
+        if _checkpointer is not None:
+            return _checkpointer
+
+        if os.getenv("WORKFLOW_CHECKPOINTER", "sqlite").lower() == "memory":
+            _checkpointer = MemorySaver()
+            return _checkpointer
+        if SqliteSaver is None:
+            print("⚠ langgraph-checkpoint-sqlite not installed; workflow checkpoints are kept in memory "
+                  "only (--thread-id runs cannot resume in another process)")
+            _checkpointer = MemorySaver()
+            return _checkpointer
+
+        path = Path(os.getenv("WORKFLOW_CHECKPOINT_DB", DEFAULT_CHECKPOINT_DB))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Nodes may run in worker threads; SqliteSaver serializes access itself
+        connection = sqlite3.connect(str(path), check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        _checkpointer = SqliteSaver(connection)
+        _checkpointer.setup()
+        _threads_db = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        _threads_db.execute(_THREADS_SCHEMA)
+        _threads_db.commit()
+
+    max_age_days = float(os.getenv("WORKFLOW_CHECKPOINT_MAX_AGE_DAYS", "14"))
+    if max_age_days > 0:
+        compact_checkpoints(max_age_days)
+    return _checkpointer
+
+
+def record_thread(thread_id: str, status: str, workflow: Optional[str] = None, question: Optional[str] = None) -> None:
+    """Record a thread's status (no-op for the in-memory checkpointer).
+
+    Args:
+        thread_id: LangGraph thread ID
+        status: running, interrupted, completed or failed
+        workflow: Workflow name (kept from an earlier record if None)
+        question: Research question (kept from an earlier record if None)
+    """
+    if _threads_db is None:
+        return
+    with _lock:
+        _threads_db.execute(
+            """INSERT INTO workflow_threads (thread_id, workflow, question, status, updated_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(thread_id) DO UPDATE SET
+                   workflow = COALESCE(excluded.workflow, workflow),
+                   question = COALESCE(excluded.question, question),
+                   status = excluded.status,
+                   updated_at = excluded.updated_at""",
+            (thread_id, workflow, question, status, time.time()),
+        )
+        _threads_db.commit()
+
+
+def list_threads(status: Optional[str] = None) -> list[dict[str, Any]]:
+    """Recorded threads, most recently updated first.
+
+    Args:
+        status: Only threads with this status (e.g. "running" for crashed runs)
+    """
+    if _threads_db is None:
+        return []
+    query = "SELECT thread_id, workflow, question, status, updated_at FROM workflow_threads"
+    params: tuple = ()
+    if status is not None:
+        query += " WHERE status = ?"
+        params = (status,)
+    with _lock:
+        rows = _threads_db.execute(query + " ORDER BY updated_at DESC", params).fetchall()
+    return [dict(zip(("thread_id", "workflow", "question", "status", "updated_at"), row)) for row in rows]
+
+
+def compact_checkpoints(max_age_days: float = 14.0) -> dict[str, int]:
+    """Delete stale threads and superseded checkpoints.
+
+    Threads not updated for ``max_age_days`` are removed entirely. Completed
+    threads keep only their latest checkpoint (enough to read the final
+    state); interrupted and running threads keep their history so they can
+    still be resumed.
+
+    Returns:
+        Counts of deleted threads and checkpoints
+    """
+    if _threads_db is None:
+        return {"threads": 0, "checkpoints": 0}
+
+    cutoff = time.time() - max_age_days * 86400
+    with _lock:
+        conn = _threads_db
+        stale = [row[0] for row in conn.execute(
+            "SELECT thread_id FROM workflow_threads WHERE updated_at < ?", (cutoff,)
+        )]
+        completed = [row[0] for row in conn.execute(
+            "SELECT thread_id FROM workflow_threads WHERE status = ? AND updated_at >= ?", (COMPLETED, cutoff)
+        )]
+        deleted = 0
+        if _table_exists(conn, "checkpoints"):
+            has_writes = _table_exists(conn, "writes")
+            for thread_id in stale:
+                deleted += conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)).rowcount
+                if has_writes:
+                    conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            # Checkpoint IDs are time-ordered; LangGraph reads the greatest as the latest
+            for thread_id in completed:
+                latest = conn.execute(
+                    "SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ''",
+                    (thread_id,),
+                ).fetchone()[0]
+                if latest is None:
+                    continue
+                deleted += conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id != ?", (thread_id, latest)
+                ).rowcount
+                if has_writes:
+                    conn.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_id != ?", (thread_id, latest))
+        conn.executemany("DELETE FROM workflow_threads WHERE thread_id = ?", [(t,) for t in stale])
+        conn.commit()
+    return {"threads": len(stale), "checkpoints": deleted}
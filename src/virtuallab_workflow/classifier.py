@@ -2,8 +2,9 @@
 
 import os
 from src.virtuallab_workflow.state import ResearchState
-from src.agent.openrouter_client import OpenRouterClient
-from src.agent.anthropic_client import AnthropicClient
+from src.agent.fallback import create_llm_client
+from src.agent.usage import get_usage_ledger, usage_scope
+from src.utils.tracing import span
 
 
 def classify_question_node(state: ResearchState) -> dict:
@@ -26,10 +27,8 @@ def classify_question_node(state: ResearchState) -> dict:
     model = os.getenv("LANGGRAPH_MODEL", os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free"))
     api_key = os.getenv("OPENROUTER_API_KEY") if provider == "openrouter" else os.getenv("ANTHROPIC_API_KEY")
     
-    if provider == "openrouter":
-        client = OpenRouterClient(api_key=api_key, model=model)
-    else:
-        client = AnthropicClient(api_key=api_key, model=model)
+    # Uses the classifier fallback chain (FALLBACK_MODELS_CLASSIFIER) if configured
+    client = create_llm_client(provider, model, api_key=api_key, role="classifier")
     
     # Classification prompt
     classification_prompt = f"""Analyze this biomedical research question and classify it:
@@ -55,11 +54,12 @@ COMPLEXITY: <simple|moderate|complex>"""
 
     try:
         # Call LLM
-        response = client.create_message(
-            messages=[{"role": "user", "content": classification_prompt}],
-            max_tokens=100,
-            temperature=0.3  # Low temperature for consistent classification
-        )
+        with usage_scope(phase="classification", agent="Classifier"), span("classifier", model=model):
+            response = client.create_message(
+                messages=[{"role": "user", "content": classification_prompt}],
+                max_tokens=100,
+                temperature=0.3  # Low temperature for consistent classification
+            )
         
         # Extract text from response
         text = client.get_response_text(response)
@@ -95,6 +95,7 @@ COMPLEXITY: <simple|moderate|complex>"""
             "question_complexity": complexity,
             "team_size": team_size,
             "num_rounds": num_rounds,
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["classifier"]
         }
         
@@ -105,6 +106,7 @@ COMPLEXITY: <simple|moderate|complex>"""
             "question_complexity": "moderate",
             "team_size": 3,
             "num_rounds": 2,
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["classifier"],
             "errors": [f"Classification error: {str(e)}"]
         }
@@ -1,10 +1,18 @@
 """Consensus mechanism for running multiple Virtual Lab meetings with different models."""
 
+import asyncio
+import contextvars
 import os
-from typing import List, Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from src.agent.loop_runner import get_loop_runner
 from src.agent.meeting import VirtualLabMeeting
-from src.agent.openrouter_client import OpenRouterClient
-from src.agent.anthropic_client import AnthropicClient
+from src.agent.fallback import create_llm_client, get_client_model
+from src.agent.usage import budget_exhausted, estimate_cost, usage_scope
+from src.tools.tool_cache import ToolCache
+from src.utils.tracing import span
+from src.virtuallab_workflow.agreement import analyze_agreement
 
 
 # Model configurations for consensus
@@ -13,6 +21,13 @@ DEFAULT_CONSENSUS_MODELS = [
     "anthropic/claude-sonnet-4",
 ]
 
+# Agreed and single-model claims listed in the synthesis prompt and the result
+MAX_PROMPT_CLAIMS = 30
+
+# Adaptive consensus stops adding models once this many answers agree this much
+DEFAULT_AGREEMENT_THRESHOLD = 0.7
+DEFAULT_MIN_MODELS = 2
+
 
 def run_consensus_meeting(
     question: str,
@@ -22,9 +37,29 @@ def run_consensus_meeting(
     num_rounds: int = 2,
     max_iterations: int = 10,
     data_dir: Optional[str] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    max_parallel: Optional[int] = None,
+    model_timeout: Optional[float] = None,
+    adaptive: Optional[bool] = None,
+    agreement_threshold: Optional[float] = None,
+    min_models: int = DEFAULT_MIN_MODELS,
+    tool_cache: Optional[ToolCache] = None
 ) -> Dict[str, Any]:
     """Run multiple Virtual Lab meetings with different models and synthesize consensus.
+
+    The per-model meetings run concurrently (at most ``max_parallel`` at a
+    time). A meeting that exceeds ``model_timeout`` is reported as failed and
+    asked to stop after its current round; the consensus is synthesized from
+    the meetings that finished in time.
+
+    In adaptive mode the models run cheapest first: ``min_models`` meetings,
+    then one more model at a time only while the answers' agreement score is
+    below ``agreement_threshold``.
+
+    All meetings share one tool cache for the question: files found, database
+    queries, PubMed searches and literature contexts retrieved by one meeting
+    are served to the others (identical in-flight calls run once), so only
+    the models' reasoning differs between consensus members.
     
     Configuration Priority:
         1. Explicit parameters (highest)
@@ -35,6 +70,10 @@ def run_consensus_meeting(
         - OPENROUTER_API_KEY: Required for authentication
         - DATABASE_DIR: Data directory (if data_dir not provided)
         - OPENROUTER_MODEL: NOT used (consensus needs multiple models)
+        - CONSENSUS_MAX_PARALLEL: Concurrent meetings (if max_parallel not provided)
+        - CONSENSUS_MODEL_TIMEOUT: Seconds per meeting (if model_timeout not provided)
+        - CONSENSUS_ADAPTIVE: Adaptive mode (if adaptive not provided)
+        - CONSENSUS_AGREEMENT_THRESHOLD: Agreement that ends adaptive mode (if agreement_threshold not provided)
     
     Args:
         question: Research question
@@ -46,16 +85,27 @@ def run_consensus_meeting(
         max_iterations: Maximum iterations per specialist. Default: 10 (reduce to save credits)
         data_dir: Database directory. If None, uses DATABASE_DIR from .env
         verbose: Print progress. Default: True
+        max_parallel: Meetings run at the same time. Default: all models
+        model_timeout: Seconds to wait for each model's meeting. Default: no limit
+        adaptive: Escalate to more (and more expensive) models only while they disagree. Default: False
+        agreement_threshold: Agreement score (0.0-1.0) at which adaptive mode stops. Default: 0.7
+        min_models: Models run before adaptive mode may stop. Default: 2
+        tool_cache: Caller-owned tool cache to share (e.g. kept warm across questions by
+                a server; evidence_cache then reports its lifetime counts). Default: a new
+                cache for this question, closed afterwards
         
     Returns:
         Dictionary with:
-        - individual_answers: List of answers from each model
+        - individual_answers: List of answers from each model, in model order
         - consensus_answer: Synthesized consensus
         - agreement_score: How much models agree (0.0-1.0)
         - key_agreements: List of agreed-upon points
         - key_disagreements: List of disagreement areas
         - successful_models: Number of successful executions
-        - total_models: Total number of models attempted
+        - total_models: Total number of models configured
+        - models_run: Number of models whose meetings ran (fewer than total_models in adaptive mode)
+        - agreement_trace: Agreement after each adaptive stage (empty otherwise)
+        - evidence_cache: Hit/miss counts of the tool cache shared by the meetings
         
     Example:
         >>> result = run_consensus_meeting(
@@ -84,51 +134,50 @@ def run_consensus_meeting(
         print(f"Models: {', '.join(models)}")
         print("="*80 + "\n")
     
+    if max_parallel is None:
+        max_parallel = int(os.getenv("CONSENSUS_MAX_PARALLEL", "0")) or len(models)
+    if model_timeout is None and os.getenv("CONSENSUS_MODEL_TIMEOUT"):
+        model_timeout = float(os.getenv("CONSENSUS_MODEL_TIMEOUT"))
+    if adaptive is None:
+        adaptive = os.getenv("CONSENSUS_ADAPTIVE", "0").lower() in ("1", "true", "yes")
+    if agreement_threshold is None:
+        agreement_threshold = float(os.getenv("CONSENSUS_AGREEMENT_THRESHOLD", str(DEFAULT_AGREEMENT_THRESHOLD)))
+
+    meeting_options = dict(
+        question=question,
+        provider=provider,
+        api_key=api_key,
+        team_size=team_size,
+        num_rounds=num_rounds,
+        data_dir=data_dir,
+        verbose=verbose,
+        max_parallel=max_parallel,
+        model_timeout=model_timeout,
+        # Evidence gathered by one meeting is served to the others
+        tool_cache=tool_cache
+    )
+    owns_cache = tool_cache is None and os.getenv("TOOL_CACHE", "1").lower() not in ("0", "false", "no")
+    if owns_cache:
+        meeting_options["tool_cache"] = ToolCache()
+
     # Run meetings with each model
-    individual_results = []
-    
-    for i, model in enumerate(models, 1):
-        if verbose:
-            print(f"\n{'='*80}")
-            print(f"MEETING {i}/{len(models)}: {model}")
-            print(f"{'='*80}\n")
-        
+    agreement_trace = []
+    with span("consensus.meetings", models=len(models), max_parallel=max_parallel, adaptive=adaptive) as meetings_span:
         try:
-            meeting = VirtualLabMeeting(
-                user_question=question,
-                model=model,
-                provider=provider,
-                api_key=api_key,
-                max_team_size=team_size,
-                verbose=verbose,
-                data_dir=data_dir
-            )
-            
-            answer = meeting.run_meeting(num_rounds=num_rounds)
-            
-            individual_results.append({
-                "model": model,
-                "answer": answer,
-                "success": True,
-                "error": None
-            })
-            
-            if verbose:
-                print(f"\n✓ Meeting {i} complete ({model})")
-                print(f"Answer length: {len(answer)} characters\n")
-                
-        except Exception as e:
-            error_msg = str(e)
-            individual_results.append({
-                "model": model,
-                "answer": None,
-                "success": False,
-                "error": error_msg
-            })
-            
-            if verbose:
-                print(f"\n❌ Meeting {i} failed ({model})")
-                print(f"Error: {error_msg}\n")
+            if adaptive:
+                individual_results, agreement_trace = _run_meetings_adaptive(
+                    models, agreement_threshold, min_models, meeting_options
+                )
+            else:
+                individual_results = get_loop_runner().run(_run_meetings_parallel(models=models, **meeting_options))
+        finally:
+            if owns_cache:
+                meeting_options["tool_cache"].close()
+        meetings_span.set_attribute("models_run", len(individual_results))
+
+    evidence_cache = dict(meeting_options["tool_cache"].stats) if meeting_options["tool_cache"] is not None else {}
+    if verbose and meeting_options["tool_cache"] is not None:
+        print(f"\n[Evidence cache] {meeting_options['tool_cache'].summary()}")
     
     # Filter successful results
     successful_results = [r for r in individual_results if r["success"]]
@@ -140,7 +189,10 @@ def run_consensus_meeting(
             "agreement_score": 0.0,
             "model_votes": {},
             "successful_models": 0,
-            "total_models": len(models)
+            "total_models": len(models),
+            "models_run": len(individual_results),
+            "agreement_trace": agreement_trace,
+            "evidence_cache": evidence_cache
         }
     
     # Synthesize consensus
@@ -164,11 +216,192 @@ def run_consensus_meeting(
         "agreement_score": consensus["agreement_score"],
         "key_agreements": consensus["key_agreements"],
         "key_disagreements": consensus["key_disagreements"],
+        "agreement_method": consensus["agreement_method"],
         "successful_models": len(successful_results),
-        "total_models": len(models)
+        "total_models": len(models),
+        "models_run": len(individual_results),
+        "agreement_trace": agreement_trace,
+        "evidence_cache": evidence_cache
     }
 
 
+def order_by_cost(models: List[str]) -> List[str]:
+    """Order models cheapest first by their price table entry.
+
+    Models missing from the price table (see src.agent.usage) count as the
+    most expensive; ties keep their configured order.
+    """
+    def price(model: str) -> float:
+        cost = estimate_cost(model, {"input_tokens": 1_000_000, "output_tokens": 1_000_000})
+        return cost if cost is not None else float("inf")
+
+    return sorted(models, key=price)
+
+
+def _run_meetings_adaptive(
+    models: List[str],
+    agreement_threshold: float,
+    min_models: int,
+    meeting_options: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Run meetings cheapest model first until the answers agree.
+
+    Starts with the ``min_models`` cheapest models (in parallel), then adds
+    one model at a time while fewer than ``min_models`` answers succeeded or
+    their agreement score is below ``agreement_threshold``.
+
+    Returns:
+        Tuple of (results in configured model order, agreement after each stage)
+    """
+    verbose = meeting_options["verbose"]
+    ordered = order_by_cost(models)
+    results: Dict[str, Dict[str, Any]] = {}
+    trace = []
+
+    batch = ordered[:max(1, min_models)]
+    remaining = ordered[len(batch):]
+    while batch:
+        for result in get_loop_runner().run(_run_meetings_parallel(models=batch, **meeting_options)):
+            results[result["model"]] = result
+
+        successful = [r for r in results.values() if r["success"]]
+        if len(successful) >= 2:
+            score = analyze_agreement([(r["model"], r["answer"]) for r in successful]).agreement_score
+            trace.append({"models": [r["model"] for r in successful], "agreement_score": score})
+            if verbose:
+                print(f"\n[Adaptive consensus] {len(successful)} answers, agreement {score:.0%} "
+                      f"(threshold {agreement_threshold:.0%})")
+            if len(successful) >= min_models and score >= agreement_threshold:
+                if verbose and remaining:
+                    print(f"[Adaptive consensus] Converged - skipping {', '.join(remaining)}")
+                break
+
+        if budget_exhausted() and successful:
+            break
+        batch, remaining = remaining[:1], remaining[1:]
+
+    return [results[m] for m in dict.fromkeys(models) if m in results], trace
+
+
+async def _run_meetings_parallel(
+    question: str,
+    models: List[str],
+    provider: str,
+    api_key: Optional[str],
+    team_size: int,
+    num_rounds: int,
+    data_dir: str,
+    verbose: bool,
+    max_parallel: int,
+    model_timeout: Optional[float],
+    tool_cache: Optional[ToolCache] = None
+) -> List[Dict[str, Any]]:
+    """Run one Virtual Lab meeting per model with bounded parallelism.
+
+    Each meeting runs in a thread of its own pool (team design and the
+    meeting itself are blocking). Not the background loop's default executor:
+    a meeting blocks its thread until its specialists finish, and they run on
+    that executor, so meetings holding every worker would deadlock. Results
+    come back in model order; models skipped because the usage budget ran
+    out are left out.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    # A timed-out meeting keeps its thread until its next round boundary, so
+    # with a timeout every model may need a thread of its own
+    meeting_pool = ThreadPoolExecutor(
+        max_workers=max(1, len(models) if model_timeout else min(max_parallel, len(models))),
+        thread_name_prefix="consensus-meeting"
+    )
+    results: List[Optional[Dict[str, Any]]] = [None] * len(models)
+    # Interleaved meeting logs are unreadable; only a sequential run prints them
+    meeting_verbose = verbose and max_parallel == 1
+
+    def run_meeting(model: str, holder: Dict[str, Any]) -> str:
+        with span("consensus.meeting", model=model):
+            meeting = VirtualLabMeeting(
+                user_question=question,
+                model=model,
+                provider=provider,
+                api_key=api_key,
+                max_team_size=team_size,
+                verbose=meeting_verbose,
+                data_dir=data_dir,
+                tool_cache=tool_cache
+            )
+            holder["meeting"] = meeting
+            if holder.get("cancelled"):
+                meeting.cancel()
+            return meeting.run_meeting(num_rounds=num_rounds)
+
+    async def run_one(i: int, model: str) -> None:
+        async with semaphore:
+            # Once the question's budget is spent, start no more meetings (keep at least one answer)
+            if budget_exhausted() and any(r and r["success"] for r in results):
+                if verbose:
+                    print(f"\n[Usage budget exhausted - skipping {model}]")
+                return
+
+            if verbose:
+                print(f"\n[Meeting {i + 1}/{len(models)} started: {model}]")
+
+            holder: Dict[str, Any] = {}
+            started = time.monotonic()
+            loop = asyncio.get_running_loop()
+            ctx = contextvars.copy_context()
+            try:
+                answer = await asyncio.wait_for(
+                    loop.run_in_executor(meeting_pool, ctx.run, run_meeting, model, holder),
+                    timeout=model_timeout
+                )
+                meeting = holder["meeting"]
+                results[i] = {
+                    "model": model,
+                    "answer": answer,
+                    "success": True,
+                    "error": None,
+                    "rounds_completed": meeting.rounds_completed,
+                    "stop_reason": meeting.stop_reason,
+                    "duration_s": round(time.monotonic() - started, 3)
+                }
+                if verbose:
+                    print(f"\n✓ Meeting {i + 1} complete ({model}) in {time.monotonic() - started:.1f}s")
+                    print(f"Answer length: {len(answer)} characters\n")
+
+            except asyncio.TimeoutError:
+                # The worker thread cannot be interrupted; stop it at the next round boundary
+                holder["cancelled"] = True
+                if "meeting" in holder:
+                    holder["meeting"].cancel()
+                results[i] = {
+                    "model": model,
+                    "answer": None,
+                    "success": False,
+                    "error": f"Timed out after {model_timeout:g}s",
+                    "timed_out": True
+                }
+                if verbose:
+                    print(f"\n⏱ Meeting {i + 1} timed out ({model}) - continuing without it")
+
+            except Exception as e:
+                error_msg = str(e)
+                results[i] = {
+                    "model": model,
+                    "answer": None,
+                    "success": False,
+                    "error": error_msg
+                }
+                if verbose:
+                    print(f"\n❌ Meeting {i + 1} failed ({model})")
+                    print(f"Error: {error_msg}\n")
+
+    try:
+        await asyncio.gather(*(run_one(i, model) for i, model in enumerate(models)))
+    finally:
+        # Don't wait for timed-out meetings; they stop at their next round boundary
+        meeting_pool.shutdown(wait=False)
+    return [r for r in results if r is not None]
+
+
 def _synthesize_consensus(
     question: str,
     individual_results: List[Dict[str, Any]],
@@ -178,77 +411,86 @@ def _synthesize_consensus(
 ) -> Dict[str, Any]:
     """Synthesize consensus from multiple model outputs.
     
-    Uses a meta-model to analyze agreements and disagreements.
+    Agreements, disagreements and the agreement score are computed locally
+    (see agreement.py); the meta-model only writes the consensus answer and
+    resolves the claims the models disagree on.
     """
     # Use a strong model for synthesis (Gemini 2.0 or fallback)
     synthesis_model = "google/gemini-2.0-flash-exp:free"
-    
-    # Create synthesis prompt
-    answers_text = "\n\n".join([
-        f"MODEL {i+1} ({r['model']}):\n{r['answer']}"
-        for i, r in enumerate(individual_results)
-    ])
-    
+
+    with span("consensus.agreement", answers=len(individual_results)) as agreement_span:
+        report = analyze_agreement([(r["model"], r["answer"]) for r in individual_results])
+        agreement_span.set_attribute("method", report.method)
+        agreement_span.set_attribute("clusters", len(report.clusters))
+    key_agreements = report.agreements[:MAX_PROMPT_CLAIMS]
+    key_disagreements = report.key_disagreements[:MAX_PROMPT_CLAIMS]
+
+    if verbose:
+        print(f"Agreement ({report.method}): {report.agreement_score:.0%} - "
+              f"{len(report.agreements)} shared claims, {len(report.disagreements)} single-model claims")
+
+    if len(individual_results) == 1:
+        # Nothing to reconcile
+        return {
+            "answer": individual_results[0]["answer"],
+            "key_agreements": key_agreements,
+            "key_disagreements": [],
+            "agreement_score": report.agreement_score,
+            "reasoning": "Only one model answered; its answer is the consensus.",
+            "agreement_method": report.method
+        }
+
+    agreements_text = "\n".join(f"- {claim}" for claim in key_agreements) or "- (no claim is shared by most teams)"
+    disagreements_text = "\n".join(
+        f"- [{d['model']}] {d['claim']}" for d in report.disagreements[:MAX_PROMPT_CLAIMS]
+    ) or "- (none)"
+
     synthesis_prompt = f"""You are synthesizing consensus from multiple AI research teams that independently analyzed the same question.
 
 ORIGINAL QUESTION:
 {question}
 
-INDIVIDUAL TEAM ANSWERS:
-{answers_text}
+POINTS MOST TEAMS AGREE ON (already established):
+{agreements_text}
+
+CLAIMS MADE BY ONLY ONE TEAM (resolve these):
+{disagreements_text}
 
 Your task is to:
-1. Identify key points where ALL or MOST teams AGREE
-2. Identify points where teams DISAGREE
-3. Synthesize a CONSENSUS answer that:
-   - Incorporates agreed-upon facts and conclusions
-   - Notes areas of uncertainty or disagreement
-   - Provides the most accurate and comprehensive answer
+1. Decide which single-team claims are well supported, which conflict with the agreed points, and which remain uncertain
+2. Synthesize a CONSENSUS answer that:
+   - Builds on the agreed points
+   - Keeps supported single-team claims and notes uncertain or conflicting ones
+   - Preserves citations (PMIDs, data files, databases)
    
 Format your response as:
 
 CONSENSUS ANSWER:
-[Your synthesized answer incorporating agreements]
-
-KEY AGREEMENTS:
-- [Point 1 where most/all teams agree]
-- [Point 2 where most/all teams agree]
-...
-
-KEY DISAGREEMENTS:
-- [Point 1 where teams differ]
-- [Point 2 where teams differ]
-...
-
-AGREEMENT SCORE: [0-100, where 100 = complete agreement, 0 = no agreement]
+[Your synthesized answer]
 
 REASONING:
-[Brief explanation of how you synthesized the consensus]
+[Brief explanation of how you resolved the disagreements]
 """
 
     if verbose:
         print("Running meta-synthesis with consensus model...")
     
-    # Call synthesis model
-    if provider == "openrouter":
-        client = OpenRouterClient(api_key=api_key, model=synthesis_model)
-    else:
-        client = AnthropicClient(api_key=api_key, model=synthesis_model)
+    # Call synthesis model (the meta-synthesis acts as PI, so it uses the PI fallback chain)
+    client = create_llm_client(provider, synthesis_model, api_key=api_key, role="pi")
     
     try:
-        response = client.create_message(
-            messages=[{"role": "user", "content": synthesis_prompt}],
-            max_tokens=4000,
-            temperature=0.3  # Lower temperature for consistent synthesis
-        )
+        with usage_scope(phase="consensus_synthesis", agent="Consensus Synthesizer"), \
+                span("consensus.synthesis", model=synthesis_model, answers=len(individual_results)):
+            response = client.create_message(
+                messages=[{"role": "user", "content": synthesis_prompt}],
+                max_tokens=4000,
+                temperature=0.3  # Lower temperature for consistent synthesis
+            )
         
         synthesis_text = client.get_response_text(response)
         
         # Parse response
         consensus_answer = ""
-        key_agreements = []
-        key_disagreements = []
-        agreement_score = 0.5
         reasoning = ""
         
         current_section = None
@@ -258,22 +500,9 @@ REASONING:
             if line.startswith("CONSENSUS ANSWER:"):
                 current_section = "consensus"
                 continue
-            elif line.startswith("KEY AGREEMENTS:"):
-                current_section = "agreements"
-                continue
-            elif line.startswith("KEY DISAGREEMENTS:"):
-                current_section = "disagreements"
-                continue
-            elif line.startswith("AGREEMENT SCORE:"):
-                current_section = "score"
-                try:
-                    score_text = line.split("AGREEMENT SCORE:")[1].strip()
-                    # Extract number (handles formats like "85" or "85/100" or "85%")
-                    score_num = ''.join(c for c in score_text if c.isdigit())
-                    if score_num:
-                        agreement_score = int(score_num) / 100.0
-                except:
-                    agreement_score = 0.5
+            elif line.startswith(("KEY AGREEMENTS:", "KEY DISAGREEMENTS:", "AGREEMENT SCORE:")):
+                # Computed locally; ignore if the model adds them anyway
+                current_section = None
                 continue
             elif line.startswith("REASONING:"):
                 current_section = "reasoning"
@@ -282,10 +511,6 @@ REASONING:
             # Append to current section
             if current_section == "consensus" and line:
                 consensus_answer += line + "\n"
-            elif current_section == "agreements" and line.startswith("-"):
-                key_agreements.append(line[1:].strip())
-            elif current_section == "disagreements" and line.startswith("-"):
-                key_disagreements.append(line[1:].strip())
             elif current_section == "reasoning" and line:
                 reasoning += line + "\n"
         
@@ -293,8 +518,10 @@ REASONING:
             "answer": consensus_answer.strip() or synthesis_text,  # Fallback to full text
             "key_agreements": key_agreements,
             "key_disagreements": key_disagreements,
-            "agreement_score": min(1.0, max(0.0, agreement_score)),  # Clamp to [0, 1]
-            "reasoning": reasoning.strip()
+            "agreement_score": report.agreement_score,
+            "reasoning": reasoning.strip(),
+            "synthesis_model": get_client_model(client),
+            "agreement_method": report.method
         }
         
     except Exception as e:
@@ -302,13 +529,14 @@ REASONING:
             print(f"⚠ Consensus synthesis failed: {e}")
             print("Falling back to first successful answer")
         
-        # Fallback: return first successful answer
+        # Fallback: return first successful answer (the agreement analysis still stands)
         return {
             "answer": individual_results[0]["answer"],
-            "key_agreements": ["Could not synthesize - using first model's answer"],
-            "key_disagreements": [],
-            "agreement_score": 0.0,
-            "reasoning": f"Synthesis failed: {str(e)}"
+            "key_agreements": key_agreements,
+            "key_disagreements": key_disagreements,
+            "agreement_score": report.agreement_score,
+            "reasoning": f"Synthesis failed: {str(e)}",
+            "agreement_method": report.method
         }
 
 
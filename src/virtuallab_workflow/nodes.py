@@ -2,6 +2,7 @@
 
 import os
 from src.virtuallab_workflow.state import ResearchState
+from src.agent.usage import get_usage_ledger
 from src.agent.meeting import VirtualLabMeeting
 
 
@@ -134,6 +135,7 @@ def virtual_lab_wetlab_node(state: ResearchState) -> dict:
             "final_answer": result,  # The meeting result is the answer
             "confidence_score": 0.7,
             "team_composition": ["Experimental Design", "Molecular Biology", "Cell Biology"][:team_size],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_wetlab"]
         }
     except Exception as e:
@@ -142,6 +144,7 @@ def virtual_lab_wetlab_node(state: ResearchState) -> dict:
             "final_answer": f"Error executing wet lab meeting: {str(e)}",
             "confidence_score": 0.0,
             "team_composition": [],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_wetlab"],
             "errors": [str(e)]
         }
@@ -164,6 +167,7 @@ def virtual_lab_computational_node(state: ResearchState) -> dict:
             "final_answer": result,
             "confidence_score": 0.7,
             "team_composition": ["Bioinformatics", "Biostatistics", "Data Science"][:team_size],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_computational"]
         }
     except Exception as e:
@@ -172,6 +176,7 @@ def virtual_lab_computational_node(state: ResearchState) -> dict:
             "final_answer": f"Error executing computational meeting: {str(e)}",
             "confidence_score": 0.0,
             "team_composition": [],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_computational"],
             "errors": [str(e)]
         }
@@ -194,6 +199,7 @@ def virtual_lab_literature_node(state: ResearchState) -> dict:
             "final_answer": result,
             "confidence_score": 0.7,
             "team_composition": ["Literature Review", "Mechanism Expert", "Clinical Translation"][:team_size],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_literature"]
         }
     except Exception as e:
@@ -202,6 +208,7 @@ def virtual_lab_literature_node(state: ResearchState) -> dict:
             "final_answer": f"Error executing literature meeting: {str(e)}",
             "confidence_score": 0.0,
             "team_composition": [],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_literature"],
             "errors": [str(e)]
         }
@@ -224,6 +231,7 @@ def virtual_lab_general_node(state: ResearchState) -> dict:
             "final_answer": result,
             "confidence_score": 0.7,
             "team_composition": ["Generalist Researcher", "Methodology Expert", "Integration Specialist"][:team_size],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_general"]
         }
     except Exception as e:
@@ -232,6 +240,7 @@ def virtual_lab_general_node(state: ResearchState) -> dict:
             "final_answer": f"Error executing general meeting: {str(e)}",
             "confidence_score": 0.0,
             "team_composition": [],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_general"],
             "errors": [str(e)]
         }
@@ -2,6 +2,7 @@
 
 import os
 from src.virtuallab_workflow.state import ResearchState
+from src.agent.usage import get_usage_ledger
 from src.virtuallab_workflow.consensus import run_consensus_meeting, DEFAULT_CONSENSUS_MODELS
 
 
@@ -45,8 +46,10 @@ def virtual_lab_consensus_node(state: ResearchState) -> dict:
                 "key_agreements": result.get('key_agreements', []),
                 "key_disagreements": result.get('key_disagreements', []),
                 "successful_models": result['successful_models'],
-                "total_models": result['total_models']
+                "total_models": result['total_models'],
+                "models_run": result.get('models_run', result['total_models'])
             },
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_consensus"]
         }
     except Exception as e:
@@ -55,6 +58,7 @@ def virtual_lab_consensus_node(state: ResearchState) -> dict:
             "final_answer": f"Error executing consensus meeting: {str(e)}",
             "confidence_score": 0.0,
             "team_composition": [],
+            "usage": get_usage_ledger().summary(),
             "execution_path": ["virtual_lab_consensus"],
             "errors": [str(e)]
         }
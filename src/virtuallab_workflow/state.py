@@ -65,6 +65,10 @@ class ResearchState(TypedDict):
     consensus_metadata: Optional[dict]
     """Metadata from consensus: agreement_score, key_agreements, key_disagreements"""
     
+    # Usage accounting
+    usage: Optional[dict]
+    """Token/cost totals for the question, broken down by model, phase and agent"""
+    
     # Metadata
     execution_path: list[str]
     """Track which nodes were executed"""
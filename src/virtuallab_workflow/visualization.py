@@ -3,7 +3,7 @@
 import json
 from pathlib import Path
 from typing import Any, Dict, Optional
-from src.virtuallab_workflow.workflow import create_research_workflow
+from src.virtuallab_workflow.workflow import get_research_workflow
 
 
 def visualize_workflow(
@@ -21,8 +21,8 @@ def visualize_workflow(
     Returns:
         Diagram string in requested format
     """
-    # Create workflow
-    app = create_research_workflow(enable_human_review)
+    # Reuse the compiled workflow
+    app = get_research_workflow(enable_human_review)
     
     # Get graph object
     graph = app.get_graph()
@@ -1,8 +1,18 @@
 """LangGraph workflow orchestration for Virtual Lab."""
 
+import threading
 from typing import Optional
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from src.agent.usage import format_usage_summary, question_scope
+from src.utils.tracing import span
+from src.virtuallab_workflow.checkpointing import (
+    COMPLETED,
+    FAILED,
+    INTERRUPTED,
+    RUNNING,
+    get_checkpointer,
+    record_thread
+)
 from src.virtuallab_workflow.state import ResearchState
 from src.virtuallab_workflow.classifier import classify_question_node, route_by_question_type
 from src.virtuallab_workflow.nodes import (
@@ -16,6 +26,63 @@ from src.virtuallab_workflow.nodes import (
 from src.virtuallab_workflow.nodes_consensus import virtual_lab_consensus_node
 
 
+# Compiled graphs by configuration; a compiled graph is stateless apart from
+# its checkpointer, so one instance serves every question and thread
+_compiled_workflows: dict = {}
+_compiled_lock = threading.Lock()
+
+
+def get_research_workflow(enable_human_review: bool = False):
+    """Compiled research workflow, built once per process and configuration.
+
+    Args:
+        enable_human_review: If True, the variant with the human review checkpoint
+
+    Returns:
+        Compiled StateGraph (shared; pass a thread_id in the config to isolate runs)
+    """
+    key = ("research", enable_human_review)
+    with _compiled_lock:
+        if key not in _compiled_workflows:
+            _compiled_workflows[key] = create_research_workflow(enable_human_review)
+        return _compiled_workflows[key]
+
+
+def get_consensus_workflow():
+    """Compiled consensus workflow, built once per process."""
+    with _compiled_lock:
+        if ("consensus",) not in _compiled_workflows:
+            _compiled_workflows[("consensus",)] = create_consensus_workflow()
+        return _compiled_workflows[("consensus",)]
+
+
+def clear_workflow_cache() -> None:
+    """Drop compiled workflows (e.g. after changing the checkpointer)."""
+    with _compiled_lock:
+        _compiled_workflows.clear()
+
+
+def _initial_input(app, config: dict, initial_state: dict, verbose: bool) -> Optional[dict]:
+    """Input for app.stream(): None to resume an unfinished run of the thread, else the initial state.
+
+    A thread whose last run stopped mid-graph (crash, kill) with the same
+    question resumes after its last completed node. Threads waiting for
+    human review are resumed through continue_after_human_review instead.
+    """
+    snapshot = app.get_state(config)
+    if (snapshot.next and "human_review" not in snapshot.next
+            and snapshot.values.get("question") == initial_state["question"]):
+        if verbose:
+            done = " -> ".join(snapshot.values.get("execution_path", [])) or "start"
+            print(f"Resuming thread {config['configurable']['thread_id']} after: {done}\n")
+        return None
+    return initial_state
+
+
+def _finish_status(app, config: dict) -> str:
+    return INTERRUPTED if app.get_state(config).next else COMPLETED
+
+
 def create_research_workflow(enable_human_review: bool = False) -> StateGraph:
     """Create the complete LangGraph workflow for research questions.
     
@@ -29,7 +96,8 @@ def create_research_workflow(enable_human_review: bool = False) -> StateGraph:
         enable_human_review: If True, adds human-in-the-loop checkpoint
         
     Returns:
-        Compiled StateGraph ready for execution
+        Compiled StateGraph ready for execution. Builds a new graph on every
+        call; runners use get_research_workflow() to reuse one.
     """
     # Create the graph
     workflow = StateGraph(ResearchState)
@@ -86,8 +154,8 @@ def create_research_workflow(enable_human_review: bool = False) -> StateGraph:
         workflow.add_edge("virtual_lab_literature", END)
         workflow.add_edge("virtual_lab_general", END)
     
-    # Add memory checkpointing for state persistence
-    memory = MemorySaver()
+    # Durable checkpoints (one per node), shared by every compiled workflow
+    memory = get_checkpointer()
     
     # Compile the graph
     if enable_human_review:
@@ -106,21 +174,28 @@ def run_research_workflow(
     question: str,
     enable_human_review: bool = False,
     thread_id: str = "default",
-    verbose: bool = True
+    verbose: bool = True,
+    token_budget: Optional[int] = None,
+    cost_budget: Optional[float] = None
 ) -> dict:
     """Run a research question through the LangGraph workflow.
     
     Args:
         question: Research question to answer
         enable_human_review: Enable human-in-the-loop checkpoint
-        thread_id: Unique thread ID for state persistence
+        thread_id: Unique thread ID for state persistence. Re-running an
+            interrupted thread with the same question resumes it after the
+            last completed node.
         verbose: Print execution details
+        token_budget: Stop agent iterations once the question has used this many
+            tokens (defaults to QUESTION_TOKEN_BUDGET env var)
+        cost_budget: Same, in USD (defaults to QUESTION_COST_BUDGET env var)
         
     Returns:
         Final state dictionary with answer and metadata
     """
-    # Create workflow
-    app = create_research_workflow(enable_human_review)
+    # Compiled once per process and reused across questions
+    app = get_research_workflow(enable_human_review)
     
     # Initial state
     initial_state: ResearchState = {
@@ -135,6 +210,7 @@ def run_research_workflow(
         "final_answer": "",
         "confidence_score": 0.0,
         "references": [],
+        "usage": {},
         "execution_path": [],
         "errors": []
     }
@@ -152,36 +228,43 @@ def run_research_workflow(
     # Execute workflow
     try:
         # Stream execution
-        for event in app.stream(initial_state, config):
-            if verbose:
-                for node_name, node_output in event.items():
-                    print(f"\n--- Node: {node_name} ---")
-                    if "execution_path" in node_output:
-                        print(f"Execution Path: {' -> '.join(node_output['execution_path'])}")
-                    if "question_type" in node_output:
-                        print(f"Question Type: {node_output['question_type']}")
-                    if "question_complexity" in node_output:
-                        print(f"Complexity: {node_output['question_complexity']}")
-                    if "team_composition" in node_output:
-                        print(f"Team: {', '.join(node_output['team_composition'])}")
-                    if "errors" in node_output and node_output["errors"]:
-                        print(f"Errors: {node_output['errors']}")
+        record_thread(thread_id, RUNNING, workflow="research", question=question)
+        with question_scope(question, token_budget, cost_budget, workflow="research") as ledger, \
+                span("workflow.research", thread_id=thread_id):
+            for event in app.stream(_initial_input(app, config, initial_state, verbose), config):
+                if verbose:
+                    for node_name, node_output in event.items():
+                        print(f"\n--- Node: {node_name} ---")
+                        if "execution_path" in node_output:
+                            print(f"Execution Path: {' -> '.join(node_output['execution_path'])}")
+                        if "question_type" in node_output:
+                            print(f"Question Type: {node_output['question_type']}")
+                        if "question_complexity" in node_output:
+                            print(f"Complexity: {node_output['question_complexity']}")
+                        if "team_composition" in node_output:
+                            print(f"Team: {', '.join(node_output['team_composition'])}")
+                        if "errors" in node_output and node_output["errors"]:
+                            print(f"Errors: {node_output['errors']}")
         
         # Get final state
         final_state = app.get_state(config)
+        result = {**final_state.values, "usage": ledger.summary()}
+        record_thread(thread_id, _finish_status(app, config))
         
         if verbose:
             print(f"\n{'='*80}")
             print("WORKFLOW COMPLETE")
             print(f"{'='*80}")
-            print(f"Execution Path: {' -> '.join(final_state.values.get('execution_path', []))}")
-            print(f"\nFinal Answer:\n{final_state.values.get('final_answer', 'No answer generated')}")
-            print(f"\nConfidence: {final_state.values.get('confidence_score', 0.0):.2f}")
+            print(f"Execution Path: {' -> '.join(result.get('execution_path', []))}")
+            print(f"\nFinal Answer:\n{result.get('final_answer', 'No answer generated')}")
+            print(f"\nConfidence: {result.get('confidence_score', 0.0):.2f}")
+            print(f"\n{format_usage_summary(result['usage'])}")
             print(f"{'='*80}\n")
         
-        return final_state.values
+        return result
         
     except Exception as e:
+        record_thread(thread_id, FAILED)
         if verbose:
             print(f"\n❌ Workflow execution error: {str(e)}")
         return {
@@ -212,8 +295,8 @@ def continue_after_human_review(
     Returns:
         Final state after continuing execution
     """
-    # Recreate workflow with human review enabled
-    app = create_research_workflow(enable_human_review=True)
+    # Human-review workflow (the thread's state is in the shared checkpointer)
+    app = get_research_workflow(enable_human_review=True)
     
     # Configure thread
     config = {"configurable": {"thread_id": thread_id}}
@@ -238,6 +321,7 @@ def continue_after_human_review(
     try:
         # Update state and continue
         app.update_state(config, updated_state)
+        record_thread(thread_id, RUNNING)
         
         for event in app.stream(None, config):
             if verbose:
@@ -247,6 +331,7 @@ def continue_after_human_review(
                         print(f"Answer: {node_output['final_answer'][:200]}...")
         
         final_state = app.get_state(config)
+        record_thread(thread_id, _finish_status(app, config))
         
         if verbose:
             print(f"\n{'='*80}")
@@ -256,6 +341,7 @@ def continue_after_human_review(
         return final_state.values
         
     except Exception as e:
+        record_thread(thread_id, FAILED)
         if verbose:
             print(f"\n❌ Error continuing workflow: {str(e)}")
         return {
@@ -280,7 +366,7 @@ def create_consensus_workflow() -> StateGraph:
     workflow.add_edge("classifier", "consensus_lab")
     workflow.add_edge("consensus_lab", END)
     
-    return workflow.compile(checkpointer=MemorySaver())
+    return workflow.compile(checkpointer=get_checkpointer())
 
 
 def run_consensus_workflow(
@@ -288,7 +374,9 @@ def run_consensus_workflow(
     team_size: int = 3,
     num_rounds: int = 2,
     thread_id: str = "default",
-    verbose: bool = True
+    verbose: bool = True,
+    token_budget: Optional[int] = None,
+    cost_budget: Optional[float] = None
 ) -> dict:
     """Run a research question through the Consensus LangGraph workflow.
     
@@ -296,14 +384,20 @@ def run_consensus_workflow(
         question: Research question to answer
         team_size: Number of specialists per meeting
         num_rounds: Number of discussion rounds
-        thread_id: Unique thread ID for state persistence
+        thread_id: Unique thread ID for state persistence. Re-running an
+            interrupted thread with the same question resumes it after the
+            last completed node (e.g. skips the classifier after a crash in
+            the consensus meetings).
         verbose: Print execution details
+        token_budget: Stop agent iterations once the question has used this many
+            tokens (defaults to QUESTION_TOKEN_BUDGET env var)
+        cost_budget: Same, in USD (defaults to QUESTION_COST_BUDGET env var)
         
     Returns:
         Final state dictionary with answer and metadata
     """
-    # Create workflow
-    app = create_consensus_workflow()
+    # Compiled once per process and reused across questions
+    app = get_consensus_workflow()
     
     # Initial state
     initial_state: ResearchState = {
@@ -320,6 +414,7 @@ def run_consensus_workflow(
         "final_answer": "",
         "confidence_score": 0.0,
         "references": [],
+        "usage": {},
         "execution_path": [],
         "errors": []
     }
@@ -337,33 +432,40 @@ def run_consensus_workflow(
     # Execute workflow
     try:
         # Stream execution
-        for event in app.stream(initial_state, config):
-            if verbose:
-                for node_name, node_output in event.items():
-                    print(f"\n--- Node: {node_name} ---")
-                    if "execution_path" in node_output:
-                        print(f"Execution Path: {' -> '.join(node_output['execution_path'])}")
-                    if "question_type" in node_output:
-                        print(f"Question Type: {node_output['question_type']}")
-                    if "meeting_transcript" in node_output:
-                        print("Consensus Meeting Complete")
-                        print(f"Agreement Score: {node_output.get('confidence_score', 'N/A')}")
+        record_thread(thread_id, RUNNING, workflow="consensus", question=question)
+        with question_scope(question, token_budget, cost_budget, workflow="consensus") as ledger, \
+                span("workflow.consensus", thread_id=thread_id, team_size=team_size, rounds=num_rounds):
+            for event in app.stream(_initial_input(app, config, initial_state, verbose), config):
+                if verbose:
+                    for node_name, node_output in event.items():
+                        print(f"\n--- Node: {node_name} ---")
+                        if "execution_path" in node_output:
+                            print(f"Execution Path: {' -> '.join(node_output['execution_path'])}")
+                        if "question_type" in node_output:
+                            print(f"Question Type: {node_output['question_type']}")
+                        if "meeting_transcript" in node_output:
+                            print("Consensus Meeting Complete")
+                            print(f"Agreement Score: {node_output.get('confidence_score', 'N/A')}")
         
         # Get final state
         final_state = app.get_state(config)
+        result = {**final_state.values, "usage": ledger.summary()}
+        record_thread(thread_id, _finish_status(app, config))
         
         if verbose:
             print(f"\n{'='*80}")
             print("WORKFLOW COMPLETE")
             print(f"{'='*80}")
-            print(f"Execution Path: {' -> '.join(final_state.values.get('execution_path', []))}")
-            print(f"\nFinal Answer:\n{final_state.values.get('final_answer', 'No answer generated')}")
-            print(f"\nConfidence: {final_state.values.get('confidence_score', 0.0):.2f}")
+            print(f"Execution Path: {' -> '.join(result.get('execution_path', []))}")
+            print(f"\nFinal Answer:\n{result.get('final_answer', 'No answer generated')}")
+            print(f"\nConfidence: {result.get('confidence_score', 0.0):.2f}")
+            print(f"\n{format_usage_summary(result['usage'])}")
             print(f"{'='*80}\n")
         
-        return final_state.values
+        return result
         
     except Exception as e:
+        record_thread(thread_id, FAILED)
         if verbose:
             print(f"\n❌ Workflow execution error: {str(e)}")
         return {
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test adaptive (cheapest-first) consensus against the mock LLM server (no API calls)."""
+
+import os
+import tempfile
+
+from src.benchmark.mock_llm_server import MockLLMServer
+from src.virtuallab_workflow.consensus import order_by_cost, run_consensus_meeting
+
+
+QUESTION = "Which genes drive T-cell exhaustion?"
+
+
+def test_models_are_ordered_cheapest_first():
+    models = ["anthropic/claude-sonnet-4", "unknown/model", "google/gemini-3-pro-preview", "meta/llama:free"]
+    assert order_by_cost(models) == [
+        "meta/llama:free", "google/gemini-3-pro-preview", "anthropic/claude-sonnet-4", "unknown/model",
+    ]
+
+
+def _run(models: list, **kwargs) -> dict:
+    saved = dict(os.environ)
+    with MockLLMServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        os.environ.update(server.client_env())
+        os.environ["CONSENSUS_EMBEDDING_MODEL"] = "lexical"
+        try:
+            result = run_consensus_meeting(
+                QUESTION, models=models, team_size=2, num_rounds=1, data_dir=tmp,
+                verbose=False, adaptive=True, **kwargs
+            )
+            return result
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+def test_stops_once_cheap_models_agree():
+    # The mock gives every model the same answer, so the two free models already agree
+    models = ["anthropic/claude-sonnet-4", "mock/a:free", "google/gemini-3-pro-preview", "mock/b:free"]
+    result = _run(models)
+    assert [r["model"] for r in result["individual_answers"]] == ["mock/a:free", "mock/b:free"]
+    assert result["models_run"] == 2 and result["total_models"] == 4
+    assert result["agreement_trace"][-1]["agreement_score"] >= 0.7
+
+
+def test_escalates_while_agreement_is_below_threshold():
+    models = ["mock/a:free", "mock/b:free", "anthropic/claude-sonnet-4"]
+    result = _run(models, agreement_threshold=1.01)
+    assert [r["model"] for r in result["individual_answers"]] == models  # Configured order kept
+    assert len(result["agreement_trace"]) == 2  # After the first two, then after escalating
+
+
+if __name__ == "__main__":
+    test_models_are_ordered_cheapest_first()
+    test_stops_once_cheap_models_agree()
+    test_escalates_while_agreement_is_below_threshold()
+    print("✓ All adaptive consensus tests passed")
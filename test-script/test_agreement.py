@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test local agreement scoring of consensus answers (no API calls, no model download)."""
+
+from src.virtuallab_workflow.agreement import ClaimEmbedder, analyze_agreement, split_claims
+
+
+ANSWER_A = """## Answer
+- TOX is the master transcription factor driving T-cell exhaustion (PMID: 31207603).
+- PD-1 blockade partially restores the function of exhausted T cells.
+- TCF7 maintains the progenitor exhausted population in chronic infection.
+
+## References
+- PMID: 31207603 (https://pubmed.ncbi.nlm.nih.gov/31207603/)
+"""
+
+ANSWER_B = """TOX is the master transcription factor that drives exhaustion of T cells. \
+PD-1 blockade can partially restore the function of exhausted T cells. \
+Glycolysis inhibitors selectively deplete exhausted clones in tumors."""
+
+
+def _lexical() -> ClaimEmbedder:
+    return ClaimEmbedder("lexical")
+
+
+def test_split_claims():
+    claims = split_claims(ANSWER_A)
+    assert len(claims) == 3
+    assert claims[0].startswith("TOX is the master")
+    assert not any("pubmed.ncbi" in c for c in claims)  # References section dropped
+    assert split_claims("Short. Also short!") == []
+
+
+def test_agreement_and_disagreement_sets():
+    report = analyze_agreement([("model-a", ANSWER_A), ("model-b", ANSWER_B)], embedder=_lexical())
+    assert report.method == "lexical"
+    assert len(report.agreements) == 2
+    assert any("TOX" in claim for claim in report.agreements)
+    single = {(d["model"], d["claim"].split()[0]) for d in report.disagreements}
+    assert single == {("model-a", "TCF7"), ("model-b", "Glycolysis")}
+    assert 0.6 < report.agreement_score < 0.7  # 2 of 3 claims corroborated for each model
+
+
+def test_scores_are_deterministic_and_bounded():
+    answers = [("a", ANSWER_A), ("b", ANSWER_B), ("c", ANSWER_A)]
+    first = analyze_agreement(answers, embedder=_lexical())
+    second = analyze_agreement(answers, embedder=_lexical())
+    assert first.agreement_score == second.agreement_score
+    assert first.agreements == second.agreements
+    assert 0.0 <= first.agreement_score <= 1.0
+
+    assert analyze_agreement([("a", ANSWER_A), ("b", ANSWER_A)], embedder=_lexical()).agreement_score == 1.0
+    assert analyze_agreement([("a", ANSWER_A)], embedder=_lexical()).agreement_score == 1.0
+
+
+def test_embeddings_are_cached():
+    embedder = _lexical()
+    first = embedder.embed(["TOX drives exhaustion in T cells"])
+    assert embedder.embed(["TOX drives exhaustion in T cells"])[0] is first[0]
+
+
+def test_embed_more_texts_than_the_cache_holds():
+    """Vectors evicted during the call are still returned, in order."""
+    embedder = ClaimEmbedder("lexical", cache_size=2)
+    texts = [f"claim number {i} about gene G{i}" for i in range(5)] + ["claim number 0 about gene G0"]
+    vectors = embedder.embed(texts)
+    assert len(vectors) == 6 and vectors[0] == vectors[5]
+    assert vectors == [ClaimEmbedder("lexical").embed([t])[0] for t in texts]
+    assert len(embedder._cache) == 2
+
+
+if __name__ == "__main__":
+    test_split_claims()
+    test_agreement_and_disagreement_sets()
+    test_scores_are_deterministic_and_bounded()
+    test_embeddings_are_cached()
+    test_embed_more_texts_than_the_cache_holds()
+    print("✓ All agreement tests passed")
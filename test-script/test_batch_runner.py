@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test the batch runner: bounded concurrency, timeouts, streamed results and resume."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from src.batch import completed_ids, load_questions, run_batch
+
+
+def _write_jsonl(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_load_questions_from_jsonl_and_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "questions.jsonl")
+        _write_jsonl(path, [
+            {"id": "a", "question": "First?"},
+            {"request_id": "b", "title": "t", "body": "Second?"},
+            {"prompt": "Third?"},
+        ])
+        assert load_questions(path) == [
+            {"id": "a", "question": "First?"},
+            {"id": "b", "question": "Second?"},
+            {"id": "line3", "question": "Third?"},
+        ]
+
+        problems = os.path.join(tmp, "problems")
+        os.mkdir(problems)
+        for name in ("ex2.txt", "ex1.md", "notes.csv"):
+            with open(os.path.join(problems, name), "w") as f:
+                f.write(f"  {name} question \n")
+        assert load_questions(problems) == [
+            {"id": "ex1", "question": "ex1.md question"},
+            {"id": "ex2", "question": "ex2.txt question"},
+        ]
+
+        _write_jsonl(path, [{"id": "a", "question": "x"}, {"id": "a", "question": "y"}])
+        try:
+            load_questions(path)
+            raise AssertionError("expected a duplicate ID error")
+        except ValueError:
+            pass
+
+
+def test_worker_pool_bounds_concurrency_and_streams_results():
+    questions = [{"id": f"q{i}", "question": f"Question {i}"} for i in range(8)]
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    progress = []
+
+    def solve(qid, question):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if qid == "q3":
+            raise RuntimeError("tool crashed")
+        return f"answer to {question}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "out", "results.jsonl")
+        counts = run_batch(questions, solve, output, workers=3,
+                           on_result=lambda record, done, total: progress.append((done, total)))
+
+        assert peak[0] == 3
+        assert counts == {"ok": 7, "error": 1, "timeout": 0, "skipped": 0}
+        assert progress == [(i, 8) for i in range(1, 9)]
+        with open(output) as f:
+            records = {r["id"]: r for r in map(json.loads, f)}
+        assert records["q0"]["answer"] == "answer to Question 0"
+        assert records["q3"]["status"] == "error" and "tool crashed" in records["q3"]["error"]
+
+
+def test_timeout_is_recorded_without_waiting_for_the_run():
+    release = threading.Event()
+
+    def solve(qid, question):
+        if qid == "slow":
+            release.wait(5)
+        return "done"
+
+    questions = [{"id": "slow", "question": "?"}, {"id": "fast", "question": "?"}]
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "results.jsonl")
+        start = time.monotonic()
+        counts = run_batch(questions, solve, output, workers=1, timeout_s=0.2)
+        release.set()
+
+        assert time.monotonic() - start < 2
+        assert counts["timeout"] == 1 and counts["ok"] == 1
+        assert completed_ids(output) == {"fast"}
+
+
+def test_resume_skips_answered_questions_and_retries_failures():
+    questions = [{"id": f"q{i}", "question": "?"} for i in range(4)]
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "results.jsonl")
+        _write_jsonl(output, [
+            {"id": "q0", "status": "ok", "answer": "a"},
+            {"id": "q1", "status": "timeout"},
+        ])
+        with open(output, "a") as f:
+            f.write('{"id": "q2", "status": "o')  # Interrupted mid-write
+
+        solved = []
+        counts = run_batch(questions, lambda qid, q: solved.append(qid) or "a", output, workers=2)
+        assert sorted(solved) == ["q1", "q2", "q3"]
+        assert counts["skipped"] == 1 and counts["ok"] == 3
+        assert completed_ids(output) == {"q0", "q1", "q2", "q3"}
+
+        assert run_batch(questions, lambda qid, q: "a", output)["skipped"] == 4
+
+
+if __name__ == "__main__":
+    test_load_questions_from_jsonl_and_directory()
+    test_worker_pool_bounds_concurrency_and_streams_results()
+    test_timeout_is_recorded_without_waiting_for_the_run()
+    test_resume_skips_answered_questions_and_retries_failures()
+    print("✓ All batch runner tests passed")
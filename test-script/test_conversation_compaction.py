@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test token-budget conversation compaction without API calls."""
+
+import json
+
+from src.agent.compaction import ConversationCompactor, ELIDED_MARKER
+
+
+def _build_history(num_tool_rounds: int) -> list[dict]:
+    """Build an OpenAI-style history with large tool results."""
+    history = [{"role": "user", "content": "Which genes drive T-cell exhaustion?"}]
+    for i in range(num_tool_rounds):
+        history.append({
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "read_file", "arguments": json.dumps({"file_path": f"Q5/file_{i}.csv"})},
+            }],
+        })
+        history.append({
+            "role": "tool",
+            "tool_call_id": f"call_{i}",
+            "name": "read_file",
+            "content": json.dumps({"success": True, "output": "x" * 4500, "error": None}),
+        })
+    return history
+
+
+def test_compaction_respects_budget():
+    """Old tool results are compacted until the history fits the budget."""
+    history = _build_history(10)
+    compactor = ConversationCompactor(token_budget=5000, keep_recent_results=2)
+
+    before = compactor.total_tokens(history)
+    saved = compactor.compact(history)
+    after = compactor.total_tokens(history)
+
+    print(f"Before: ~{before} tokens, after: ~{after} tokens, saved: ~{saved}")
+    assert saved > 0
+    assert after <= 5000
+    assert compactor.get_stats()["tokens_saved"] == saved
+
+    # The two most recent tool results must be untouched
+    recent = [m for m in history if m["role"] == "tool"][-2:]
+    assert all(ELIDED_MARKER not in m["content"] for m in recent)
+
+
+def test_compaction_keeps_tool_pairing():
+    """Every tool_call id still has exactly one matching tool result."""
+    history = _build_history(8)
+    ConversationCompactor(token_budget=1000, keep_recent_results=1).compact(history)
+
+    call_ids = [c["id"] for m in history if m["role"] == "assistant" for c in m["tool_calls"]]
+    result_ids = [m["tool_call_id"] for m in history if m["role"] == "tool"]
+    assert call_ids == result_ids
+
+    compacted = json.loads(history[2]["content"])
+    assert compacted["success"] is True
+    assert compacted["note"] == ELIDED_MARKER
+
+
+def test_compaction_anthropic_blocks():
+    """Anthropic tool_result blocks are compacted in place."""
+    history = [{"role": "user", "content": "question"}]
+    for i in range(6):
+        history.append({"role": "assistant", "content": [
+            {"type": "tool_use", "id": f"toolu_{i}", "name": "read_file", "input": {"file_path": "a.csv"}},
+        ]})
+        history.append({"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": f"toolu_{i}",
+             "content": json.dumps({"success": True, "output": "y" * 4000, "error": None})},
+        ]})
+
+    saved = ConversationCompactor(token_budget=2000, keep_recent_results=1).compact(history)
+    assert saved > 0
+    assert history[2]["content"][0]["tool_use_id"] == "toolu_0"
+    assert ELIDED_MARKER in history[2]["content"][0]["content"]
+
+
+def test_no_compaction_under_budget():
+    """Histories within the budget are left untouched."""
+    history = _build_history(2)
+    snapshot = json.dumps(history)
+    assert ConversationCompactor(token_budget=100000).compact(history) == 0
+    assert json.dumps(history) == snapshot
+
+
+if __name__ == "__main__":
+    test_compaction_respects_budget()
+    test_compaction_keeps_tool_pairing()
+    test_compaction_anthropic_blocks()
+    test_no_compaction_under_budget()
+    print("✓ All compaction tests passed")
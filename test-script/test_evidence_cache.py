@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test evidence reuse across consensus meetings and PubMed searches (no API calls)."""
+
+import copy
+import os
+import tempfile
+from pathlib import Path
+
+from src.benchmark.mock_llm_server import DEFAULT_SCRIPT, MockLLMServer
+from src.tools import implementations
+
+
+EFETCH_XML = """<PubmedArticleSet>{}</PubmedArticleSet>"""
+ARTICLE_XML = """<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>
+<ArticleTitle>Article {pmid}</ArticleTitle><Abstract><AbstractText>Abstract {pmid}.</AbstractText></Abstract>
+</Article></MedlineCitation></PubmedArticle>"""
+
+
+class _Response:
+    def __init__(self, json_data=None, content=b""):
+        self._json = json_data
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._json
+
+
+def test_pubmed_fetches_each_article_once():
+    fetched = []
+
+    def fake_get(url, params=None, timeout=None):
+        if "esearch" in url:
+            ids = {"TOX exhaustion": ["901", "902"], "TOX T cells": ["902", "903"]}[params["term"]]
+            return _Response({"esearchresult": {"idlist": ids}})
+        ids = params["id"].split(",")
+        fetched.extend(ids)
+        return _Response(content=EFETCH_XML.format("".join(ARTICLE_XML.format(pmid=i) for i in ids)).encode())
+
+    original = implementations.requests.get
+    implementations.requests.get = fake_get
+    try:
+        implementations._pubmed_articles.clear()
+        first = implementations.search_pubmed("TOX exhaustion")
+        second = implementations.search_pubmed("TOX T cells")
+    finally:
+        implementations.requests.get = original
+
+    assert [a["pmid"] for a in first.output] == ["901", "902"]
+    assert [a["pmid"] for a in second.output] == ["902", "903"]  # Search order kept
+    assert second.output[0]["abstract"] == "Abstract 902."
+    assert fetched == ["901", "902", "903"]  # 902 came from memory the second time
+
+
+def test_consensus_meetings_share_tool_results():
+    from src.virtuallab_workflow.consensus import run_consensus_meeting
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "exhaustion_markers.csv").write_text("gene,log2fc\nTOX,2.1\n")
+        script = copy.deepcopy(DEFAULT_SCRIPT)
+        script.update(latency=0.0, tokens_per_second=None)
+        agent_rule = next(r for r in script["rules"] if r["name"] == "agent")
+        agent_rule["steps"][0]["tool_calls"] = [
+            {"name": "find_files", "input": {"extension": "csv", "workspace_root": tmp}}
+        ]
+
+        saved = dict(os.environ)
+        with MockLLMServer(script=script) as server:
+            os.environ.update(server.client_env())
+            os.environ["CONSENSUS_EMBEDDING_MODEL"] = "lexical"
+            try:
+                result = run_consensus_meeting(
+                    "Which genes drive T-cell exhaustion?",
+                    models=["mock/consensus-a", "mock/consensus-b", "mock/consensus-c"],
+                    team_size=2, num_rounds=1, data_dir=tmp, verbose=False,
+                )
+            finally:
+                os.environ.clear()
+                os.environ.update(saved)
+
+    stats = result["evidence_cache"]
+    print(f"Evidence cache: {stats}")
+    assert result["successful_models"] == 3
+    assert stats["misses"] == 1  # The first meeting's lookup served everyone else
+    assert stats["hits"] + stats["shared"] >= 8
+
+
+if __name__ == "__main__":
+    test_pubmed_fetches_each_article_once()
+    test_consensus_meetings_share_tool_results()
+    print("✓ All evidence cache tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the persistent, incrementally refreshed file index (no API calls)."""
+
+import os
+import shutil
+import tempfile
+
+from src.utils.file_index import FileIndex, get_file_index
+
+# Directory mtimes are set well in the past so they count as settled
+OLD = 1_600_000_000
+
+TREE = {
+    "README.md": "# workspace",
+    "a/genes.csv": "g1\ng2\n",
+    "a/b/run.py": "print('hi')",
+    "a/b/c/d/e/deep.csv": "x",
+    "a/b/c/d/e/f/too_deep.csv": "x",
+    "node_modules/pkg/skipped.csv": "x",
+    ".hidden/skipped.csv": "x",
+    "data/q5/exhaustion.tsv": "gene\tscore\n",
+}
+
+
+def _make_tree(root):
+    for rel, text in TREE.items():
+        path = os.path.join(root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+    _settle(root, *[dirpath for dirpath, _, _ in os.walk(root)])
+
+
+def _settle(root, *dirs, seconds=OLD):
+    for d in dirs:
+        os.utime(os.path.join(root, d), (seconds, seconds))
+
+
+def _names(index, root):
+    return sorted(os.path.relpath(p, root) for p in index.index)
+
+
+def test_build_follows_scan_rules_and_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "ws")
+        _make_tree(root)
+        db = os.path.join(tmp, "cache", "index.sqlite")
+
+        first = FileIndex(root, persist_path=db, workers=4)
+        first.build_index()
+        assert _names(first, root) == ["README.md", "a/b/c/d/e/deep.csv", "a/b/run.py", "a/genes.csv",
+                                       "data/q5/exhaustion.tsv"]
+        assert first.stats["listed"] == 8 and first.stats["loaded"] == 0
+        meta = first.index[os.path.join(root, "a", "genes.csv")]
+        assert (meta.path, meta.size_bytes, meta.category) == (os.path.join(root, "a", "genes.csv"), 6, "data")
+        first.close()
+
+        second = FileIndex(root, persist_path=db)
+        second.build_index()
+        assert second.stats == {"loaded": 8, "listed": 0}
+        assert second.index == first.index
+        assert [f.name for f in second.find_files(extension="tsv")] == ["exhaustion.tsv"]
+        second.close()
+
+
+def test_refresh_relists_only_changed_directories():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "ws")
+        _make_tree(root)
+        db = os.path.join(tmp, "index.sqlite")
+        index = FileIndex(root, persist_path=db)
+        index.build_index()
+
+        with open(os.path.join(root, "a", "new.csv"), "w") as f:
+            f.write("new")
+        os.remove(os.path.join(root, "a", "b", "run.py"))
+        os.makedirs(os.path.join(root, "a", "x"))
+        with open(os.path.join(root, "a", "x", "added.json"), "w") as f:
+            f.write("{}")
+        shutil.rmtree(os.path.join(root, "data", "q5"))
+        _settle(root, "a", "a/b", "a/x", "data", seconds=OLD + 10)
+
+        # a, a/b, data and the removed data/q5; a/x is new and scanned, not re-listed
+        assert index.refresh() == 4
+        assert _names(index, root) == ["README.md", "a/b/c/d/e/deep.csv", "a/genes.csv", "a/new.csv",
+                                       "a/x/added.json"]
+
+        listed = index.stats["listed"]
+        index.build_index(force_refresh=True)
+        assert index.stats["listed"] == listed
+        index.close()
+
+        reloaded = FileIndex(root, persist_path=db)
+        reloaded.build_index()
+        assert reloaded.stats["listed"] == 0
+        assert reloaded.index == index.index
+        assert reloaded.fingerprint() == index.fingerprint()
+        reloaded.close()
+
+
+def test_data_dir_is_its_own_root_and_indexes_are_shared():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "ws")
+        _make_tree(root)
+        saved = os.environ.get("FILE_INDEX_DB")
+        os.environ["FILE_INDEX_DB"] = os.path.join(tmp, "shared.sqlite")
+        try:
+            data_dir = os.path.join(root, "data")
+            index = get_file_index(root, data_dir)
+            assert get_file_index(root, data_dir) is index
+            assert get_file_index(root) is not index
+            # The workspace scan skips the data directory; it is indexed from its own root
+            assert index.find_files(name_contains="exhaustion")[0].path == os.path.join(data_dir, "q5", "exhaustion.tsv")
+            assert set(index._dirs[os.path.abspath(root)]).isdisjoint(index._dirs[os.path.abspath(data_dir)])
+        finally:
+            if saved is None:
+                os.environ.pop("FILE_INDEX_DB", None)
+            else:
+                os.environ["FILE_INDEX_DB"] = saved
+
+
+if __name__ == "__main__":
+    test_build_follows_scan_rules_and_persists()
+    test_refresh_relists_only_changed_directories()
+    test_data_dir_is_its_own_root_and_indexes_are_shared()
+    print("✓ All file index tests passed")
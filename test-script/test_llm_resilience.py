@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Test retry, circuit breaker and hedging behaviour without API calls."""
+
+import contextvars
+import threading
+import time
+
+from src.agent.resilience import (
+    CircuitOpenError,
+    LLMAPIError,
+    ResilienceRegistry,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+def _flaky(failures: list):
+    """Build an attempt function that raises the queued errors, then succeeds."""
+    calls = {"n": 0}
+
+    def attempt():
+        calls["n"] += 1
+        if failures:
+            raise failures.pop(0)
+        return {"ok": True}
+
+    return attempt, calls
+
+
+def test_retries_transient_errors():
+    """429/503 are retried and the call eventually succeeds."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=3, base_delay=0.0), hedging=False)
+    attempt, calls = _flaky([LLMAPIError("rate limited", 429, retry_after=0.0), LLMAPIError("busy", 503)])
+
+    assert registry.call("openrouter:test", attempt) == {"ok": True}
+    assert calls["n"] == 3
+    stats = registry.get_stats()["openrouter:test"]
+    print(f"Stats: {stats}")
+    assert stats["retries"] == 2 and stats["successes"] == 1
+
+
+def test_non_retryable_error_raises_immediately():
+    """A 400 is surfaced without retrying."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=3, base_delay=0.0), hedging=False)
+    attempt, calls = _flaky([LLMAPIError("bad request", 400)])
+
+    try:
+        registry.call("openrouter:test", attempt)
+        assert False, "expected LLMAPIError"
+    except LLMAPIError as e:
+        assert e.status_code == 400
+    assert calls["n"] == 1
+
+
+def test_circuit_opens_after_consecutive_failures():
+    """Once the breaker opens, calls fail fast without reaching the provider."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=0, base_delay=0.0), hedging=False)
+    attempt, calls = _flaky([LLMAPIError("down", 502) for _ in range(10)])
+
+    for _ in range(5):
+        try:
+            registry.call("anthropic:test", attempt)
+        except LLMAPIError:
+            pass
+
+    try:
+        registry.call("anthropic:test", attempt)
+        assert False, "expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+    assert calls["n"] == 5
+    assert registry.get_stats()["anthropic:test"]["circuit_state"] == "open"
+
+
+def test_rejected_requests_do_not_open_the_circuit():
+    """Bad requests are the caller's problem, not a provider outage."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=0, base_delay=0.0), hedging=False)
+    attempt, calls = _flaky([LLMAPIError("context too long", 400) for _ in range(10)])
+
+    for _ in range(10):
+        try:
+            registry.call("anthropic:test", attempt)
+        except LLMAPIError:
+            pass
+    assert calls["n"] == 10
+    stats = registry.get_stats()["anthropic:test"]
+    assert stats["failures"] == 10 and stats["circuit_state"] == "closed"
+
+
+def test_stats_are_exact_under_concurrency():
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=0), hedging=False)
+
+    def worker():
+        for _ in range(500):
+            registry.call("openrouter:busy", lambda: "ok")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = registry.get_stats()["openrouter:busy"]
+    assert stats["calls"] == stats["successes"] == 4000
+
+
+def test_hedged_request_wins_on_slow_primary():
+    """A duplicate request is sent once the primary exceeds the p95 latency."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=0), hedging=True, min_hedge_samples=3)
+    stats = registry.stats("openrouter:slow")
+    stats.latencies.extend([0.01, 0.01, 0.01])
+
+    calls = {"n": 0}
+
+    def attempt():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            time.sleep(0.5)  # Straggling primary
+            return "primary"
+        return "backup"
+
+    assert registry.call("openrouter:slow", attempt) == "backup"
+    assert stats.hedges == 1 and stats.hedge_wins == 1
+
+
+def test_losing_hedge_is_reported_when_it_completes():
+    """The billed loser reaches on_discarded, in the caller's context, once it finishes."""
+    registry = ResilienceRegistry(policy=RetryPolicy(max_retries=0), hedging=True, min_hedge_samples=3)
+    stats = registry.stats("openrouter:slow")
+    stats.latencies.extend([0.01, 0.01, 0.01])
+    scope = contextvars.ContextVar("scope", default=None)
+    discarded = []
+    settled = threading.Event()
+
+    def on_discarded(result):
+        discarded.append((result, scope.get()))
+        settled.set()
+
+    calls = {"n": 0}
+
+    def attempt():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            time.sleep(0.3)
+            return "primary"
+        return "backup"
+
+    scope.set("question-1")
+    assert registry.call("openrouter:slow", attempt, on_discarded=on_discarded) == "backup"
+    assert not discarded  # The loser is still in flight
+    assert settled.wait(2)
+    assert discarded == [("primary", "question-1")]
+    assert registry.get_stats()["openrouter:slow"]["hedges_discarded"] == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+
+
+if __name__ == "__main__":
+    test_retries_transient_errors()
+    test_non_retryable_error_raises_immediately()
+    test_circuit_opens_after_consecutive_failures()
+    test_rejected_requests_do_not_open_the_circuit()
+    test_stats_are_exact_under_concurrency()
+    test_hedged_request_wins_on_slow_primary()
+    test_losing_hedge_is_reported_when_it_completes()
+    test_parse_retry_after()
+    print("✓ All resilience tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test the background event loop runner and meetings embedded in async code (no API calls)."""
+
+import asyncio
+import contextvars
+import os
+import tempfile
+
+from src.agent.loop_runner import BackgroundLoopRunner
+from src.agent.meeting import VirtualLabMeeting
+from src.benchmark.mock_llm_server import MockLLMServer
+
+
+_label = contextvars.ContextVar("label", default=None)
+
+
+def test_runner_reuses_loop_and_carries_context():
+    runner = BackgroundLoopRunner(name="test-loop")
+    try:
+        async def probe():
+            return asyncio.get_running_loop(), _label.get()
+
+        token = _label.set("round-1")
+        first_loop, label = runner.run(probe())
+        _label.reset(token)
+        second_loop, _ = runner.run(probe())
+        assert label == "round-1"
+        assert first_loop is second_loop  # No per-call loop setup
+
+        # Called from inside another running loop: no deadlock
+        async def caller():
+            return runner.run(probe())[1], await runner.run_async(probe())
+        assert asyncio.run(caller()) == (None, (first_loop, None))
+
+        async def reentrant():
+            coro = probe()
+            try:
+                runner.run(coro)
+            except RuntimeError:
+                return True
+        assert runner.run(reentrant())
+    finally:
+        runner.close()
+
+
+def test_meetings_run_repeatedly_and_inside_event_loops():
+    saved = dict(os.environ)
+    with MockLLMServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        os.environ.update(server.client_env())
+        try:
+            def make_meeting():
+                return VirtualLabMeeting("Which genes drive exhaustion?", model="mock/pi",
+                                         provider="openrouter", max_team_size=2, data_dir=tmp)
+
+            # Several rounds, several meetings: each round used to need a fresh loop
+            for _ in range(2):
+                assert make_meeting().run_meeting(num_rounds=2)
+
+            async def sync_call_from_async():
+                return make_meeting().run_meeting(num_rounds=2)
+            assert asyncio.run(sync_call_from_async())
+
+            async def two_meetings_concurrently():
+                return await asyncio.gather(
+                    make_meeting().run_meeting_async(num_rounds=1),
+                    make_meeting().run_meeting_async(num_rounds=1),
+                )
+            assert all(asyncio.run(two_meetings_concurrently()))
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+if __name__ == "__main__":
+    test_runner_reuses_loop_and_carries_context()
+    test_meetings_run_repeatedly_and_inside_event_loops()
+    print("✓ All loop runner tests passed")
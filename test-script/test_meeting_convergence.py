@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Test early termination of Virtual Lab meetings (no API calls)."""
+
+import copy
+import os
+import tempfile
+import time
+
+from src.agent.convergence import RoundController, parse_critic_verdict, text_similarity
+from src.agent.meeting import CANCELLED_ANSWER, VirtualLabMeeting
+from src.agent.usage import question_scope
+from src.benchmark.mock_llm_server import DEFAULT_SCRIPT, MockLLMServer
+
+
+def test_parse_critic_verdict():
+    assert parse_critic_verdict("Looks solid.\nVERDICT: CONVERGED") is True
+    assert parse_critic_verdict("Sample size missing.\n**VERDICT:** continue") is False
+    assert parse_critic_verdict("VERDICT: CONTINUE\n...\nVERDICT: CONVERGED") is True  # Last one wins
+    assert parse_critic_verdict("No verdict here") is None
+
+
+def test_text_similarity():
+    assert text_similarity("TOX drives exhaustion", "tox DRIVES exhaustion.") > 0.99
+    assert text_similarity("TOX drives exhaustion", "PD-1 blockade restores function") == 0.0
+    assert text_similarity("", "anything") == 0.0
+
+
+def test_controller_rules():
+    controller = RoundController(early_stop=True, min_rounds=2, similarity_threshold=0.9)
+    assert not controller.critics_converged(["VERDICT: CONVERGED"], rounds_done=1)  # Below min_rounds
+    assert controller.critics_converged(["VERDICT: CONVERGED"], rounds_done=2)
+    assert controller.stop_reason == "critic_converged"
+    assert not controller.critics_converged(["VERDICT: CONVERGED", "VERDICT: CONTINUE"], rounds_done=2)
+
+    controller = RoundController(early_stop=False)
+    assert not controller.critics_converged(["VERDICT: CONVERGED"], rounds_done=5)
+    assert not controller.summary_converged("same", 1) and not controller.summary_converged("same", 2)
+
+    controller = RoundController(early_stop=True, token_budget=1000)
+    controller.reset(start_tokens=500)
+    assert not controller.budget_exceeded(1200)
+    assert controller.budget_exceeded(1500) and controller.stop_reason == "token_budget"
+
+    controller = RoundController(time_budget_s=0.05)
+    assert not controller.budget_exceeded(0)  # No round finished yet, nothing to extrapolate from
+    controller.start_round()
+    time.sleep(0.03)
+    controller.end_round()
+    assert controller.budget_exceeded(0) and controller.stop_reason == "time_budget"
+
+
+def _run_meeting(critic_text: str, num_rounds: int, ledger_hook=None, before_run=None, **kwargs) -> VirtualLabMeeting:
+    script = copy.deepcopy(DEFAULT_SCRIPT)
+    script.update(latency=0.0, tokens_per_second=None)
+    for rule in script["rules"]:
+        if rule["name"] == "critic":
+            rule["steps"] = [{"text": critic_text}]
+
+    saved = dict(os.environ)
+    with MockLLMServer(script=script) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(server.client_env())
+        try:
+            meeting = VirtualLabMeeting(
+                "Which genes drive exhaustion?", model="mock/pi", provider="openrouter",
+                max_team_size=2, data_dir=tmp, **kwargs,
+            )
+            with question_scope("Which genes drive exhaustion?") as ledger:
+                if ledger_hook is not None:
+                    ledger.on_record = lambda record: ledger_hook(ledger, record)
+                if before_run is not None:
+                    before_run(meeting)
+                meeting.answer = meeting.run_meeting(num_rounds=num_rounds)
+                meeting.phases = [r.labels.get("phase") for r in ledger.records]
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+    return meeting
+
+
+def test_meeting_stops_when_critic_converges():
+    meeting = _run_meeting("The answer is well supported.\nVERDICT: CONVERGED", num_rounds=3, early_stop=True)
+    print(f"Stopped after {meeting.rounds_completed} round(s): {meeting.stop_reason}")
+    assert meeting.rounds_completed == 1
+    assert meeting.stop_reason == "critic_converged"
+    assert not any("Synthesis" in e["role"] and "Round" in e["role"] for e in meeting.get_transcript())
+
+
+def test_pipelined_meeting_stops_when_critics_converge():
+    meeting = _run_meeting("Sound.\nVERDICT: CONVERGED", num_rounds=3, early_stop=True, pipelined=True)
+    assert meeting.rounds_completed == 1 and meeting.stop_reason == "critic_converged"
+
+
+def test_early_stop_disabled_runs_every_round():
+    meeting = _run_meeting("Fine.\nVERDICT: CONVERGED", num_rounds=2, early_stop=False)
+    assert meeting.rounds_completed == 2
+    assert meeting.stop_reason == "max_rounds"
+
+
+def test_open_issues_keep_discussing():
+    meeting = _run_meeting("Sample size missing.\nVERDICT: CONTINUE", num_rounds=2, early_stop=True)
+    assert meeting.rounds_completed == 2
+
+
+def test_token_budget_ignores_other_meetings_on_the_ledger():
+    # Another model's meeting in the same question scope spends heavily alongside this one
+    def other_meeting(ledger, record):
+        if record.labels.get("meeting") == "mock/pi":
+            ledger.record("openrouter", "mock/other", {"input_tokens": 50_000},
+                          labels={"meeting": "mock/other"})
+
+    meeting = _run_meeting("Fine.\nVERDICT: CONTINUE", num_rounds=2, early_stop=False,
+                           token_budget=20_000, ledger_hook=other_meeting)
+    assert meeting.rounds_completed == 2
+    assert meeting.stop_reason == "max_rounds"
+
+
+def test_cancelled_meeting_skips_remaining_rounds_and_synthesis():
+    meeting = _run_meeting("Fine.\nVERDICT: CONTINUE", num_rounds=2, before_run=lambda m: m.cancel())
+    assert meeting.answer == CANCELLED_ANSWER and meeting.stop_reason == "cancelled"
+    assert meeting.rounds_completed == 0 and meeting.phases == []
+
+    # Cancelled while round 1 runs (as consensus does on a timeout)
+    running = {}
+
+    def cancel_mid_round(ledger, record):
+        if record.labels.get("phase") == "specialists":
+            running["meeting"].cancel()
+
+    meeting = _run_meeting("Fine.\nVERDICT: CONTINUE", num_rounds=3, early_stop=False,
+                           ledger_hook=cancel_mid_round, before_run=lambda m: running.update(meeting=m))
+    assert meeting.answer == CANCELLED_ANSWER and meeting.stop_reason == "cancelled"
+    assert meeting.rounds_completed == 1
+    assert "final_synthesis" not in meeting.phases and "round_synthesis" not in meeting.phases
+
+
+if __name__ == "__main__":
+    test_parse_critic_verdict()
+    test_text_similarity()
+    test_controller_rules()
+    test_meeting_stops_when_critic_converges()
+    test_pipelined_meeting_stops_when_critics_converge()
+    test_early_stop_disabled_runs_every_round()
+    test_open_issues_keep_discussing()
+    test_token_budget_ignores_other_meetings_on_the_ledger()
+    test_cancelled_meeting_skips_remaining_rounds_and_synthesis()
+    print("✓ All meeting convergence tests passed")
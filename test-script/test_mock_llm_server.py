@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test the mock LLM server against the real clients (no network, no API key)."""
+
+import os
+import tempfile
+
+from src.agent.agent import BioinformaticsAgent
+from src.agent.anthropic_client import AnthropicClient
+from src.agent.openrouter_client import OpenRouterClient
+from src.benchmark.mock_llm_server import LatencyModel, MockLLMServer, conversation_step
+
+
+def _patched_env(server: MockLLMServer) -> dict:
+    saved = {k: os.environ.get(k) for k in server.client_env()}
+    os.environ.update(server.client_env())
+    return saved
+
+
+def _restore_env(saved: dict) -> None:
+    for key, value in saved.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def test_agent_runs_scripted_tool_loop():
+    with MockLLMServer(seed=1) as server, tempfile.TemporaryDirectory() as tmp:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        saved = _patched_env(server)
+        try:
+            for stream in (False, True):
+                server.reset_stats()
+                agent = BioinformaticsAgent(model="mock/agent", provider="openrouter", data_dir=tmp, stream=stream)
+                answer = agent.run("Which genes are upregulated?")
+                print(f"stream={stream}: {answer[:60]}...")
+                assert "PMID: 31207603" in answer
+                assert agent.last_run_stats["iterations"] == 2
+                assert server.get_stats()["by_rule"]["agent"]["requests"] == 2
+        finally:
+            _restore_env(saved)
+
+
+def test_anthropic_protocol():
+    with MockLLMServer() as server:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        saved = _patched_env(server)
+        try:
+            client = AnthropicClient(model="mock/claude")
+            response = client.create_message(
+                messages=[{"role": "user", "content": "Respond ONLY in this exact format"}],
+                max_tokens=100,
+            )
+            assert client.get_response_text(response).startswith("TYPE: computational")
+            assert client.get_usage(response)["output_tokens"] > 0
+        finally:
+            _restore_env(saved)
+
+
+def test_clients_reuse_connections():
+    with MockLLMServer() as server:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        saved = _patched_env(server)
+        try:
+            for _ in range(3):
+                for client in (OpenRouterClient(model="mock/pooled"), AnthropicClient(model="mock/pooled")):
+                    client.create_message(messages=[{"role": "user", "content": "Hello"}], max_tokens=50)
+            stats = server.get_stats()
+            assert stats["requests"] == 6
+            assert stats["connections"] == 1  # Every client shares the process-wide session
+        finally:
+            _restore_env(saved)
+
+
+def test_step_selection_and_latency_are_deterministic():
+    messages = [
+        {"role": "user", "content": "q"},
+        {"role": "assistant", "content": "calling tool"},
+        {"role": "tool", "tool_call_id": "1", "content": "result"},
+    ]
+    assert conversation_step(messages) == 1
+    assert conversation_step([{"role": "user", "content": [{"type": "tool_result", "content": "r"}]}]) == 1
+
+    server = MockLLMServer(seed=7)
+    try:
+        body = b'{"messages": [{"role": "user", "content": "hello"}]}'
+        first = server.plan({"messages": [{"role": "user", "content": "hello"}]}, body)
+        second = server.plan({"messages": [{"role": "user", "content": "hello"}]}, body)
+        assert first["latency"] == second["latency"] > 0
+        assert first["rule"] == "agent" and first["step"]["tool_calls"]
+    finally:
+        server._httpd.server_close()
+
+    import random
+    assert LatencyModel(0.25).sample(random.Random(0)) == 0.25
+    assert 1.0 <= LatencyModel({"dist": "uniform", "low": 1, "high": 2}).sample(random.Random(0)) <= 2.0
+
+
+if __name__ == "__main__":
+    test_agent_runs_scripted_tool_loop()
+    test_anthropic_protocol()
+    test_clients_reuse_connections()
+    test_step_selection_and_latency_are_deterministic()
+    print("✓ All mock LLM server tests passed")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Test per-role model fallback chains without API calls."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agent.fallback import (
+    MAX_FALLBACK_EVENTS,
+    FallbackClient,
+    create_llm_client,
+    get_abandoned_calls,
+    get_client_model,
+    get_fallback_models,
+)
+
+
+class _FakeClient:
+    """Stand-in for OpenRouterClient that fails, stalls or answers."""
+
+    provider = "openrouter"
+
+    def __init__(self, model: str, behaviour: str = "ok", delay: float = 0.5):
+        self.model = model
+        self.behaviour = behaviour
+        self.delay = delay
+        self.last_usage = {}
+
+    def create_message(self, **kwargs):
+        if self.behaviour == "error":
+            raise RuntimeError("OpenRouter API error 503: upstream unavailable")
+        if self.behaviour == "slow":
+            time.sleep(self.delay)
+        return {"model": self.model}
+
+
+def _wait_for_abandoned_calls(timeout: float = 2.0) -> int:
+    deadline = time.monotonic() + timeout
+    while get_abandoned_calls() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return get_abandoned_calls()
+
+
+def test_fallback_on_error_and_latency_budget():
+    """Errors and budget overruns move on to the next model, and the winner is recorded."""
+    client = FallbackClient(
+        [_FakeClient("primary", "error"), _FakeClient("backup", "slow"), _FakeClient("last")],
+        latency_budget=0.1,
+        role="specialist",
+    )
+
+    response = client.create_message(messages=[])
+    assert response == {"model": "last"}
+    assert get_client_model(client) == "last"
+    assert [e["reason"] for e in client.fallback_events][1] == "latency_budget"
+    print(f"Fallback events: {client.fallback_events}")
+
+
+def test_budget_covers_only_the_call():
+    """Many concurrent calls each get their full budget instead of queueing for a worker."""
+    client = FallbackClient([_FakeClient("primary", "slow", delay=0.3), _FakeClient("last")], latency_budget=0.6)
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        responses = list(pool.map(lambda _: client.create_message(messages=[]), range(100)))
+    assert all(r == {"model": "primary"} for r in responses)
+    assert client.fallback_count == 0
+
+
+def test_abandoned_calls_are_counted_and_capped():
+    """Overrunning calls are counted until they finish, and past the cap calls wait instead."""
+    release = threading.Event()
+
+    class _Stuck(_FakeClient):
+        def create_message(self, **kwargs):
+            release.wait(5)
+            return {"model": self.model}
+
+    _wait_for_abandoned_calls()  # Left over from earlier tests
+    os.environ["LLM_MAX_ABANDONED_CALLS"] = "2"
+    client = FallbackClient([_Stuck("stuck"), _FakeClient("last")], latency_budget=0.05)
+    try:
+        for _ in range(2):
+            assert client.create_message(messages=[]) == {"model": "last"}
+        assert get_abandoned_calls() == 2
+
+        # At the cap, the next call runs without a budget on the primary model
+        threading.Timer(0.2, release.set).start()
+        assert client.create_message(messages=[]) == {"model": "stuck"}
+        assert _wait_for_abandoned_calls() == 0
+    finally:
+        release.set()
+        del os.environ["LLM_MAX_ABANDONED_CALLS"]
+
+
+def test_all_models_failing_raises():
+    client = FallbackClient([_FakeClient("a", "error"), _FakeClient("b", "error")], role="critic")
+    try:
+        client.create_message(messages=[])
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "critic" in str(e) and "a:" in str(e) and "b:" in str(e)
+
+
+def test_fallback_events_are_bounded():
+    client = FallbackClient([_FakeClient("primary", "error"), _FakeClient("backup")], role="pi")
+    for _ in range(MAX_FALLBACK_EVENTS + 50):
+        client.create_message(messages=[])
+    assert len(client.fallback_events) == MAX_FALLBACK_EVENTS
+    assert client.fallback_count == MAX_FALLBACK_EVENTS + 50
+
+
+def test_chain_configured_per_role():
+    """Fallback models come from FALLBACK_MODELS_<ROLE>; unconfigured roles get a plain client."""
+    os.environ["FALLBACK_MODELS_CLASSIFIER"] = "model-b, model-a ,model-c"
+    os.environ.pop("LLM_LATENCY_BUDGET", None)
+    os.environ.pop("LLM_LATENCY_BUDGET_PI", None)
+    os.environ.pop("FALLBACK_MODELS_PI", None)
+    try:
+        assert get_fallback_models("classifier", "model-a") == ["model-a", "model-b", "model-c"]
+        chained = create_llm_client("openrouter", "model-a", api_key="test", role="classifier")
+        assert isinstance(chained, FallbackClient)
+        assert [c.model for c in chained.clients] == ["model-a", "model-b", "model-c"]
+
+        plain = create_llm_client("openrouter", "model-a", api_key="test", role="pi")
+        assert not isinstance(plain, FallbackClient)
+        assert get_client_model(plain) == "model-a"
+    finally:
+        del os.environ["FALLBACK_MODELS_CLASSIFIER"]
+
+
+if __name__ == "__main__":
+    test_fallback_on_error_and_latency_budget()
+    test_budget_covers_only_the_call()
+    test_abandoned_calls_are_counted_and_capped()
+    test_all_models_failing_raises()
+    test_fallback_events_are_bounded()
+    test_chain_configured_per_role()
+    print("✓ All fallback tests passed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Test parallel consensus meetings against the mock LLM server (no API calls)."""
+
+import os
+import tempfile
+import threading
+import time
+
+from src.agent import loop_runner
+from src.benchmark.mock_llm_server import MockLLMServer
+from src.virtuallab_workflow.consensus import run_consensus_meeting
+
+
+QUESTION = "Which genes drive T-cell exhaustion?"
+MODELS = ["mock/consensus-a", "mock/consensus-b", "mock/consensus-c"]
+
+
+def _run(model_latency: dict, **kwargs) -> tuple[dict, float]:
+    saved = dict(os.environ)
+    with MockLLMServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.script = {**server.script, "latency": 0.05, "tokens_per_second": None,
+                         "model_latency": model_latency}
+        os.environ.update(server.client_env())
+        os.environ["MEETING_EARLY_STOP"] = "0"
+        try:
+            start = time.perf_counter()
+            result = run_consensus_meeting(
+                QUESTION, team_size=2, num_rounds=1, data_dir=tmp, verbose=False, **kwargs
+            )
+            return result, time.perf_counter() - start
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+def test_meetings_run_concurrently_in_model_order():
+    _, sequential = _run({}, models=MODELS, max_parallel=1)
+    result, parallel = _run({}, models=MODELS)
+    print(f"Sequential {sequential:.2f}s, parallel {parallel:.2f}s")
+    assert [r["model"] for r in result["individual_answers"]] == MODELS
+    assert result["successful_models"] == 3
+    assert parallel < sequential * 0.7
+
+
+def test_straggler_times_out_with_partial_consensus():
+    models = ["mock/consensus-a", "mock/slow", "mock/consensus-b"]
+    result, wall = _run({"slow": 2.0}, models=models, model_timeout=1.5)
+    answers = result["individual_answers"]
+    assert [r["model"] for r in answers] == models
+    assert answers[1]["success"] is False and answers[1].get("timed_out")
+    assert answers[0]["success"] and answers[2]["success"]
+    assert result["successful_models"] == 2
+    assert "TOX" in result["consensus_answer"]
+    assert wall < 5.0
+
+
+def test_more_meetings_than_loop_workers_do_not_deadlock():
+    # Meetings block their threads waiting on specialists, which need loop workers
+    models = [f"mock/consensus-{c}" for c in "abcd"]
+    saved_workers = os.environ.get("AGENT_LOOP_WORKERS")
+    os.environ["AGENT_LOOP_WORKERS"] = "2"
+    loop_runner.get_loop_runner().close()
+    loop_runner._runner = None
+    outcome = {}
+    try:
+        run = threading.Thread(target=lambda: outcome.update(result=_run({}, models=models, max_parallel=4)[0]),
+                               daemon=True)
+        run.start()
+        run.join(30)
+        assert not run.is_alive(), "consensus meetings deadlocked on the loop's executor"
+        assert outcome["result"]["successful_models"] == 4
+    finally:
+        if saved_workers is None:
+            os.environ.pop("AGENT_LOOP_WORKERS", None)
+        else:
+            os.environ["AGENT_LOOP_WORKERS"] = saved_workers
+        loop_runner.get_loop_runner().close()
+        loop_runner._runner = None
+
+
+if __name__ == "__main__":
+    test_meetings_run_concurrently_in_model_order()
+    test_straggler_times_out_with_partial_consensus()
+    test_more_meetings_than_loop_workers_do_not_deadlock()
+    print("✓ All parallel consensus tests passed")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Test pipelined meeting rounds against the mock LLM server (no API calls)."""
+
+import os
+import tempfile
+
+from src.agent.meeting import VirtualLabMeeting
+from src.agent.usage import question_scope
+from src.benchmark.mock_llm_server import MockLLMServer
+
+
+def test_each_specialist_is_critiqued_as_it_finishes():
+    saved = dict(os.environ)
+    with MockLLMServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        os.environ.update(server.client_env())
+        try:
+            with question_scope("Which genes drive exhaustion?") as ledger:
+                meeting = VirtualLabMeeting(
+                    "Which genes drive exhaustion?", model="mock/pi", provider="openrouter",
+                    max_team_size=2, data_dir=tmp, pipelined=True,
+                )
+                answer = meeting.run_meeting(num_rounds=1)
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+    assert answer
+    transcript = meeting.get_transcript()
+    speakers = [e["speaker"] for e in transcript]
+    titles = [agent.persona.title for agent in meeting.specialists]
+    print(f"Transcript: {speakers}")
+    assert speakers[0] == "PI" and speakers[-1] == "PI"
+
+    # Every contribution is followed (not necessarily immediately) by its own review
+    for title in titles:
+        contribution = speakers.index(title)
+        review = next(i for i, e in enumerate(transcript) if e["role"] == f"Review of {title}")
+        assert review > contribution
+    assert "Quality Review" not in [e["role"] for e in transcript]
+
+    critic_calls = [r for r in ledger.records if r.labels.get("phase") == "critic"]
+    assert len(critic_calls) == len(titles)
+    assert len({id(c) for c in meeting.specialist_critics}) == len(titles)
+
+
+if __name__ == "__main__":
+    test_each_specialist_is_critiqued_as_it_finishes()
+    print("✓ All pipelined meeting tests passed")
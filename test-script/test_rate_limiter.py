@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test the client-side rate governor without API calls."""
+
+import threading
+import time
+
+from src.agent.rate_limiter import RateGovernor, RateLimits, estimate_request_tokens, litellm_governor_key
+from src.agent.resilience import LLMAPIError
+
+
+def test_max_in_flight_cap():
+    """No more than max_in_flight requests run at once; the rest queue."""
+    governor = RateGovernor(default_limits=RateLimits(max_in_flight=2), overrides={})
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def call():
+        with governor.acquire("openrouter:test"):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = governor.get_stats()["openrouter:test"]
+    print(f"Stats: {stats}")
+    assert active["peak"] == 2
+    assert stats["requests"] == 6 and stats["throttled"] >= 4
+    assert stats["max_wait_s"] > 0 and stats["in_flight"] == 0
+
+
+def test_rpm_bucket_spaces_requests():
+    """With 600 rpm (10/s) and a full bucket of 600, the 601st request waits ~0.1s."""
+    governor = RateGovernor(default_limits=RateLimits(rpm=600, max_in_flight=1000), overrides={})
+    for _ in range(600):
+        with governor.acquire("anthropic:test"):
+            pass
+    start = time.monotonic()
+    with governor.acquire("anthropic:test") as permit:
+        pass
+    assert 0.05 < time.monotonic() - start < 0.5
+    assert permit.wait_time > 0.05
+
+
+def test_tpm_reservation_is_corrected_by_usage():
+    """Unused reserved tokens are returned to the bucket."""
+    governor = RateGovernor(default_limits=RateLimits(tpm=1000), overrides={})
+    with governor.acquire("openrouter:tpm", tokens=900) as permit:
+        permit.used_tokens = 100
+    # 900 tokens are available again without waiting
+    with governor.acquire("openrouter:tpm", tokens=900, timeout=0.05) as permit:
+        assert permit.wait_time < 0.05
+
+
+def test_429_pauses_key_and_overrides_match():
+    governor = RateGovernor(default_limits=RateLimits(), overrides={"openrouter:*:free": {"rpm": 20}})
+    assert governor.limits_for("openrouter:google/gemini-2.0-flash-exp:free").rpm == 20
+    assert governor.limits_for("openrouter:anthropic/claude-sonnet-4").rpm is None
+
+    try:
+        with governor.acquire("openrouter:busy"):
+            raise LLMAPIError("rate limited", 429, retry_after=0.2)
+    except LLMAPIError:
+        pass
+    with governor.acquire("openrouter:busy") as permit:
+        pass
+    assert permit.wait_time >= 0.1
+    assert governor.get_stats()["openrouter:busy"]["pauses"] == 1
+
+
+def test_helpers():
+    assert litellm_governor_key("openrouter/google/gemini-2.0-flash-exp:free") == "openrouter:google/gemini-2.0-flash-exp:free"
+    assert litellm_governor_key("gpt-4o") == "litellm:gpt-4o"
+    payload = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 1000}
+    assert 1100 <= estimate_request_tokens(payload) <= 1150
+
+
+if __name__ == "__main__":
+    test_max_in_flight_cap()
+    test_rpm_bucket_spaces_requests()
+    test_tpm_reservation_is_corrected_by_usage()
+    test_429_pauses_key_and_overrides_match()
+    test_helpers()
+    print("✓ All rate limiter tests passed")
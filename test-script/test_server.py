@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test the HTTP service against the mock LLM server (no API calls)."""
+
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+
+from src.benchmark.mock_llm_server import MockLLMServer
+from src.server import ResearchServer
+
+
+def _request(url, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method="POST" if data is not None else "GET")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def test_jobs_stream_progress_and_share_warm_caches():
+    saved = dict(os.environ)
+    with MockLLMServer() as llm, tempfile.TemporaryDirectory() as tmp:
+        llm.script = {**llm.script, "latency": 0.0, "tokens_per_second": None}
+        os.environ.update(llm.client_env())
+        try:
+            with ResearchServer(port=0, workers=2, model="mock/server", data_dir=tmp) as server:
+                assert "file_index_s" in server.warm_up()
+
+                status, body = _request(f"{server.url}/virtual-lab",
+                                        {"question": "Which genes drive exhaustion?", "rounds": 1, "team_size": 2})
+                assert status == 202
+                job_id = json.loads(body)["job_id"]
+
+                # The events stream stays open until the job finishes
+                status, body = _request(f"{server.url}/jobs/{job_id}/events")
+                events = [json.loads(line) for line in body.splitlines()]
+                assert [e["seq"] for e in events] == list(range(len(events)))
+                assert events[0]["type"] == "queued" and events[-1]["type"] == "succeeded"
+                calls = [e for e in events if e["type"] == "llm_call"]
+                assert calls and {"team_design", "critic"} <= {e.get("phase") for e in calls}
+                assert calls[-1]["job_tokens"] == sum(e["tokens"] for e in calls)
+
+                status, body = _request(f"{server.url}/jobs/{job_id}")
+                job = json.loads(body)
+                assert status == 200 and job["status"] == "succeeded" and job["result"]["answer"]
+                assert job["usage"]["calls"] == len(calls)
+
+                # Resuming the stream part-way only returns the rest
+                status, body = _request(f"{server.url}/jobs/{job_id}/events?after={len(events) - 1}")
+                assert [json.loads(line)["type"] for line in body.splitlines()] == ["succeeded"]
+
+                status, body = _request(f"{server.url}/ask", {"question": "Summarize exhaustion markers."})
+                ask_id = json.loads(body)["job_id"]
+                _request(f"{server.url}/jobs/{ask_id}/events")
+                assert json.loads(_request(f"{server.url}/jobs/{ask_id}")[1])["status"] == "succeeded"
+
+                health = json.loads(_request(f"{server.url}/health")[1])
+                assert health["jobs"] == {"succeeded": 2}
+                assert health["tool_cache"] is not None
+
+                assert _request(f"{server.url}/ask", {"model": "x"})[0] == 400
+                assert _request(f"{server.url}/ask", ["not", "an", "object"])[0] == 400
+                assert _request(f"{server.url}/jobs/{job_id}/events?after=abc")[0] == 400
+                assert _request(f"{server.url}/jobs/{job_id}/events?after=-1")[0] == 400
+                assert _request(f"{server.url}/jobs/nope")[0] == 404
+                assert _request(f"{server.url}/summarize", {"question": "q"})[0] == 404
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+if __name__ == "__main__":
+    test_jobs_stream_progress_and_share_warm_caches()
+    print("✓ All server tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test session recording and replay against the mock LLM server (no API calls)."""
+
+import os
+import tempfile
+
+from src.agent.agent import create_agent
+from src.agent.meeting import run_virtual_lab
+from src.agent.session_recording import load_recording, record_session, replay
+from src.benchmark.mock_llm_server import MockLLMServer
+
+
+QUESTION = "Which genes drive T-cell exhaustion?"
+
+
+def _record(path: str, entrypoint: str, data_dir: str, run) -> str:
+    """Run against a mock server while recording, then take the server away."""
+    saved = dict(os.environ)
+    with MockLLMServer() as server:
+        server.script = {**server.script, "latency": 0.0, "tokens_per_second": None}
+        os.environ.update(server.client_env())
+        try:
+            config = {"model": "mock/pi", "provider": "openrouter", "num_rounds": 1,
+                      "max_team_size": 2, "data_dir": data_dir}
+            with record_session(path, entrypoint=entrypoint, question=QUESTION, config=config):
+                answer = run(config)
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+    # Nothing listens here any more: replay must not touch the network
+    os.environ["OPENROUTER_BASE_URL"] = "http://127.0.0.1:9/api/v1"
+    return answer
+
+
+def test_single_agent_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.jsonl.gz")
+        recorded = _record(path, "agent", tmp, lambda c: create_agent(
+            api_key="mock", model=c["model"], provider=c["provider"], data_dir=tmp).run(QUESTION))
+
+        events = load_recording(path)
+        kinds = [e["type"] for e in events]
+        assert kinds[0] == "session" and kinds.count("llm") == 2 and kinds.count("tool") == 1
+        assert kinds.count("tools") == 1  # Tool definitions stored once
+        assert "tools" not in events[kinds.index("llm")]["request"]
+
+        result = replay(path)
+        print(f"Replay: {result['wall_s']:.3f}s, served {result['llm_served']}")
+        assert result["answer"] == recorded
+        assert result["llm_served"] == 2 and result["tools_served"] == 1
+        assert result["unused"] == {"llm": 0, "tools": 0}
+
+        live = replay(path, live_tools=True)
+        assert live["answer"] == recorded and live["tools_served"] == 0
+
+
+def test_virtual_lab_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "meeting.jsonl")
+        recorded = _record(path, "virtual_lab", tmp, lambda c: run_virtual_lab(
+            QUESTION, api_key="mock", model=c["model"], provider=c["provider"],
+            num_rounds=c["num_rounds"], max_team_size=c["max_team_size"], data_dir=tmp))
+
+        result = replay(path)
+        assert result["answer"] == recorded
+        assert result["unused"]["llm"] == 0
+
+
+if __name__ == "__main__":
+    test_single_agent_round_trip()
+    test_virtual_lab_round_trip()
+    print("✓ All session replay tests passed")
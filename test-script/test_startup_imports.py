@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Test that entry points import silently without loading heavy optional dependencies."""
+
+from src.benchmark.startup_time import measure_imports
+
+
+def test_cli_import_defers_heavy_modules():
+    result = measure_imports("src.cli")
+    print(f"import src.cli: {result['cumulative_ms']:.1f}ms")
+    assert result["deferred_loaded"] == []
+    assert result["output"] == []
+    assert "src.virtuallab_workflow.workflow" not in result["self_ms"]
+    assert "src.agent.meeting" not in result["self_ms"]
+
+
+def test_consensus_module_does_not_need_langgraph():
+    result = measure_imports("src.virtuallab_workflow.consensus")
+    assert "langgraph" not in result["deferred_loaded"]
+
+
+if __name__ == "__main__":
+    test_cli_import_defers_heavy_modules()
+    test_consensus_module_does_not_need_langgraph()
+    print("✓ All startup import tests passed")
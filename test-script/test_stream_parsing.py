@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test SSE parsing and incremental tool-call assembly without API calls."""
+
+import json
+
+import requests
+
+from src.agent.resilience import RetryPolicy, StreamInterruptedError, get_resilience_registry
+from src.agent.streaming import AnthropicStreamParser, OpenAIStreamParser, iter_sse_events
+from src.agent.openrouter_client import OpenRouterClient
+from src.agent.anthropic_client import AnthropicClient
+
+
+def _sse(events: list) -> list[str]:
+    """Encode payloads as SSE lines, the way iter_lines() yields them."""
+    lines = [": OPENROUTER PROCESSING", ""]
+    for event in events:
+        lines.append(f"data: {json.dumps(event)}")
+        lines.append("")
+    lines.extend(["data: [DONE]", ""])
+    return lines
+
+
+def test_openai_stream_emits_tool_call_before_finish():
+    """A tool call is emitted as soon as its arguments are valid JSON."""
+    emitted, texts, events_seen = [], [], []
+    parser = OpenAIStreamParser(on_text=texts.append, on_tool_call=lambda tc: emitted.append((len(events_seen), tc)))
+
+    chunks = [
+        {"id": "gen-1", "choices": [{"delta": {"content": "Let me look "}}]},
+        {"choices": [{"delta": {"content": "at the files."}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "call_a", "type": "function",
+                                                 "function": {"name": "find_files", "arguments": "{\"extension\""}}]}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": ": \"csv\"}"}}]}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 1, "id": "call_b", "type": "function",
+                                                 "function": {"name": "read_file", "arguments": "{\"file_path\": \"Q5/a.csv\"}"}}]}}]},
+        {"choices": [{"delta": {}, "finish_reason": "tool_calls"}],
+         "usage": {"prompt_tokens": 100, "completion_tokens": 20}},
+    ]
+    for chunk in iter_sse_events(_sse(chunks)):
+        events_seen.append(chunk)
+        parser.feed(chunk)
+
+    # First call is complete after the 4th chunk, before finish_reason arrives
+    assert emitted[0][0] == 4
+    assert emitted[0][1] == {"id": "call_a", "name": "find_files", "input": {"extension": "csv"}}
+    assert [tc["id"] for _, tc in emitted] == ["call_a", "call_b"]
+    assert "".join(texts) == "Let me look at the files."
+
+    response = parser.get_response()
+    client = OpenRouterClient.__new__(OpenRouterClient)
+    assert client.get_response_text(response) == "Let me look at the files."
+    assert [tc["name"] for tc in client.extract_tool_calls(response)] == ["find_files", "read_file"]
+    assert response["choices"][0]["finish_reason"] == "tool_calls"
+    assert response["usage"]["prompt_tokens"] == 100
+
+
+def test_anthropic_stream_emits_on_block_stop():
+    """Anthropic tool_use blocks are emitted when their block closes."""
+    emitted, texts = [], []
+    parser = AnthropicStreamParser(on_text=texts.append, on_tool_call=emitted.append)
+
+    events = [
+        {"type": "message_start", "message": {"id": "msg_1", "role": "assistant", "usage": {"input_tokens": 50}}},
+        {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Querying."}},
+        {"type": "content_block_stop", "index": 0},
+        {"type": "content_block_start", "index": 1, "content_block": {"type": "tool_use", "id": "toolu_1", "name": "query_database", "input": {}}},
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": "{\"db_name\": \"gwas\","}},
+        {"type": "content_block_delta", "index": 1, "delta": {"type": "input_json_delta", "partial_json": " \"query\": \"info\"}"}},
+        {"type": "content_block_stop", "index": 1},
+        {"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": 30}},
+    ]
+    for event in events:
+        parser.feed(event)
+
+    assert emitted == [{"id": "toolu_1", "name": "query_database", "input": {"db_name": "gwas", "query": "info"}}]
+    assert texts == ["Querying."]
+
+    response = parser.get_response()
+    client = AnthropicClient.__new__(AnthropicClient)
+    assert client.get_response_text(response) == "Querying."
+    assert client.extract_tool_calls(response)[0]["input"]["db_name"] == "gwas"
+    assert response["stop_reason"] == "tool_use"
+    assert response["usage"] == {"input_tokens": 50, "output_tokens": 30}
+
+
+class _DroppedStream:
+    """Response whose stream breaks after ``fail_after`` SSE lines (None: never)."""
+
+    def __init__(self, lines: list[str], fail_after=None):
+        self.lines = lines
+        self.fail_after = fail_after
+
+    def iter_lines(self, decode_unicode=True):
+        for i, line in enumerate(self.lines):
+            if i == self.fail_after:
+                raise requests.ConnectionError("connection reset mid-stream")
+            yield line
+
+
+def _stream_with_drops(fail_points: list) -> tuple[list, list, list]:
+    """Stream a reply through OpenRouterClient with each attempt's stream breaking as given."""
+    chunks = [
+        {"id": "gen-1", "choices": [{"delta": {"content": "Partial "}}]},
+        {"choices": [{"delta": {"content": "answer."}}]},
+        {"choices": [{"delta": {}, "finish_reason": "stop"}], "usage": {"prompt_tokens": 10, "completion_tokens": 2}},
+    ]
+    client = OpenRouterClient(api_key="test", model="mock/stream-drop")
+    attempts, texts = [], []
+
+    def post(payload, stream=False):
+        attempts.append(1)
+        return _DroppedStream(_sse(chunks), fail_points[len(attempts) - 1])
+
+    client._post = post
+    registry = get_resilience_registry()
+    saved_policy = registry.policy
+    registry.policy = RetryPolicy(max_retries=2, base_delay=0.0)
+    try:
+        try:
+            result = client.create_message(messages=[{"role": "user", "content": "hi"}], stream=True,
+                                           on_text=texts.append)
+        except StreamInterruptedError as e:
+            result = e
+    finally:
+        registry.policy = saved_policy
+    return result, attempts, texts
+
+
+def test_stream_failing_before_output_is_retried():
+    result, attempts, texts = _stream_with_drops([1, None])  # Breaks before the first delta
+    assert len(attempts) == 2
+    assert "".join(texts) == "Partial answer."
+
+
+def test_stream_failing_after_output_is_not_retried():
+    result, attempts, texts = _stream_with_drops([5, None])  # Breaks after "Partial "
+    assert isinstance(result, StreamInterruptedError)
+    assert len(attempts) == 1
+    assert texts == ["Partial "]
+
+
+if __name__ == "__main__":
+    test_openai_stream_emits_tool_call_before_finish()
+    test_anthropic_stream_emits_on_block_stop()
+    test_stream_failing_before_output_is_retried()
+    test_stream_failing_after_output_is_not_retried()
+    print("✓ All stream parsing tests passed")
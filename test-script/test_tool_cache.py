@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Test the shared tool-result cache (no API calls)."""
+
+import os
+import tempfile
+import threading
+import time
+
+from src.agent.agent import BioinformaticsAgent
+from src.tools.tool_cache import ToolCache, cache_key
+
+
+def test_single_flight():
+    cache = ToolCache()
+    calls = []
+    barrier = threading.Barrier(8)
+    statuses = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"success": True, "output": {"rows": [1, 2, 3]}, "error": None}
+
+    def worker():
+        barrier.wait()
+        result, status = cache.call("query_database", {"db_name": "gwas", "query": "info"}, compute)
+        assert result["output"]["rows"] == [1, 2, 3]
+        result["output"]["rows"].append(4)  # Callers get their own copy
+        statuses.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(statuses) == ["miss"] + ["shared"] * 7
+    assert cache.call("query_database", {"query": "info", "db_name": "gwas", "limit": None}, compute)[1] == "hit"
+    print(cache.summary())
+
+
+def test_only_free_text_arguments_ignore_whitespace():
+    assert cache_key("search_pubmed", {"query": "T-cell  exhaustion\n markers"}) == \
+        cache_key("search_pubmed", {"query": "T-cell exhaustion markers"})
+    # Whitespace is significant in paths, database queries and code
+    assert cache_key("read_file", {"file_path": "a  b.csv"}) != cache_key("read_file", {"file_path": "a b.csv"})
+    assert cache_key("query_database", {"db_name": "gwas", "query": " info "}) != \
+        cache_key("query_database", {"db_name": "gwas", "query": "info"})
+    assert cache_key("execute_python", {"code": "if x:\n    y()"}) != cache_key("execute_python", {"code": "if x:\n y()"})
+
+
+def test_file_changes_and_failures_invalidate():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "genes.txt")
+        with open(path, "w") as f:
+            f.write("TOX\n")
+
+        cache = ToolCache()
+        args = {"file_path": "genes.txt", "input_dir": tmp}
+        ok = lambda: {"success": True, "output": "TOX", "error": None}
+        assert cache.call("read_file", args, ok)[1] == "miss"
+        assert cache.call("read_file", args, ok)[1] == "hit"
+
+        with open(path, "a") as f:
+            f.write("PDCD1\n")
+        assert cache.call("read_file", args, ok)[1] == "miss"
+
+        failing = lambda: {"success": False, "output": None, "error": "timeout"}
+        assert cache.call("search_pubmed", {"query": "TOX"}, failing)[1] == "miss"
+        assert cache.call("search_pubmed", {"query": "TOX"}, failing)[1] == "miss"  # Not cached
+        assert cache.call("execute_python", {"code": "1"}, ok)[1] == "uncacheable"
+
+
+def test_find_files_key_follows_nested_changes():
+    saved = os.environ.get("FILE_INDEX_DB")
+    os.environ["FILE_INDEX_DB"] = ""
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "Q5"))
+            args = {"extension": "csv", "workspace_root": tmp, "data_dir": None}
+            before = cache_key("find_files", args)
+            assert cache_key("find_files", args) == before
+
+            with open(os.path.join(tmp, "Q5", "new.csv"), "w") as f:
+                f.write("gene\n")
+            added = cache_key("find_files", args)
+            assert added != before
+
+            os.remove(os.path.join(tmp, "Q5", "new.csv"))
+            assert cache_key("find_files", args) == before
+    finally:
+        if saved is None:
+            os.environ.pop("FILE_INDEX_DB", None)
+        else:
+            os.environ["FILE_INDEX_DB"] = saved
+
+
+def test_persistent_cache_and_agent_integration():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "genes.txt"), "w") as f:
+            f.write("TOX\n")
+        db = os.path.join(tmp, "cache", "tools.sqlite")
+
+        first = ToolCache(persist_path=db)
+        agents = [BioinformaticsAgent(api_key="test", model="test/model", provider="openrouter", data_dir=tmp)
+                  for _ in range(2)]
+        for agent in agents:
+            agent.tool_cache = first
+        a = agents[0].call_tool("read_file", {"file_path": "genes.txt"})
+        b = agents[1].call_tool("read_file", {"file_path": "genes.txt"})
+        assert a == b and a["success"]
+        assert first.stats["hits"] == 1 and first.stats["misses"] == 1
+        first.close()
+
+        second = ToolCache(persist_path=db)
+        agents[0].tool_cache = second
+        assert agents[0].call_tool("read_file", {"file_path": "genes.txt"}) == a
+        assert second.stats["hits"] == 1
+        second.close()
+
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_only_free_text_arguments_ignore_whitespace()
+    test_file_changes_and_failures_invalidate()
+    test_find_files_key_follows_nested_changes()
+    test_persistent_cache_and_agent_integration()
+    print("✓ All tool cache tests passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Test tracing spans and Chrome trace export without API calls."""
+
+import json
+import os
+import tempfile
+import threading
+import contextvars
+
+from src.agent.agent import BioinformaticsAgent
+from src.utils.tracing import enable_tracing, export_trace, span
+
+
+class _OneToolClient:
+    """Fake client: one tool call, then a final answer."""
+
+    provider = "openrouter"
+    model = "test/model"
+    last_queue_wait = 0.0
+
+    def __init__(self):
+        self.calls = 0
+
+    def create_message(self, **kwargs):
+        self.calls += 1
+        with span("llm.call", model=self.model):
+            return {"choices": [{"message": {"role": "assistant", "content": "done"}}]}
+
+    def get_usage(self, response):
+        return {}
+
+    def get_response_text(self, response):
+        return response["choices"][0]["message"]["content"]
+
+    def extract_tool_calls(self, response):
+        if self.calls == 1:
+            return [{"id": "call_1", "name": "no_such_tool", "input": {}}]
+        return []
+
+
+def test_spans_nest_across_threads():
+    tracer = enable_tracing()
+    tracer.spans.clear()
+
+    with span("meeting", model="m") as root:
+        def worker():
+            with span("agent.run", agent="Geneticist"):
+                pass
+        ctx = contextvars.copy_context()
+        t = threading.Thread(target=ctx.run, args=(worker,))
+        t.start()
+        t.join()
+        try:
+            with span("llm.call"):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+    spans = {s.name: s for s in tracer.spans}
+    assert spans["agent.run"].parent_id == root.span_id
+    assert spans["agent.run"].thread_id != root.thread_id
+    assert spans["llm.call"].status == "error" and "boom" in spans["llm.call"].attributes["error"]
+    assert len({s.trace_id for s in tracer.spans}) == 1
+
+
+def test_agent_run_emits_iteration_and_tool_spans():
+    tracer = enable_tracing()
+    tracer.spans.clear()
+
+    agent = BioinformaticsAgent(api_key="test", model="test/model", provider="openrouter")
+    agent.client = _OneToolClient()
+    assert agent.run("question") == "done"
+
+    names = [s.name for s in tracer.spans]
+    print(f"Spans: {names}")
+    assert names.count("agent.iteration") == 2
+    assert names.count("tool.call") == 1 and names[-1] == "agent.run"
+    by_id = {s.span_id: s for s in tracer.spans}
+    tool = next(s for s in tracer.spans if s.name == "tool.call")
+    assert by_id[tool.parent_id].name == "agent.iteration"
+    assert tool.attributes["success"] is False
+
+
+def test_chrome_trace_export():
+    tracer = enable_tracing()
+    tracer.spans.clear()
+    with span("classifier", model="m"):
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = export_trace(os.path.join(tmp, "trace.json"))
+        with open(path) as f:
+            trace = json.load(f)
+
+    events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert events[0]["name"] == "classifier" and events[0]["args"]["model"] == "m"
+    assert events[0]["dur"] >= 0 and "tid" in events[0]
+    assert any(e["ph"] == "M" for e in trace["traceEvents"])
+
+
+if __name__ == "__main__":
+    test_spans_nest_across_threads()
+    test_agent_run_emits_iteration_and_tool_spans()
+    test_chrome_trace_export()
+    print("✓ All tracing tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test the meeting transcript store and its bounded prompt context."""
+
+from src.agent.transcript import TranscriptStore
+
+
+QUESTION = "Which transcription factors drive T-cell exhaustion?"
+
+
+def _entry(speaker: str, content: str, role: str = "Specialist") -> dict:
+    return {"speaker": speaker, "role": role, "content": content, "model": "mock/model"}
+
+
+def _meeting(store: TranscriptStore, rounds: int = 3, filler: int = 400) -> None:
+    """Fill a store like a 3-round, 4-specialist meeting."""
+    store.append(_entry("PI", "Welcome. Today we study T-cell exhaustion.", role="Opening Remarks"))
+    for r in range(1, rounds + 1):
+        store.begin_round(r)
+        store.append(_entry("Immunologist", f"TOX drives T-cell exhaustion (PMID: 3120760{r}). " + "detail " * filler))
+        store.append(_entry("Statistician", "The sample size is small. " + "variance " * filler))
+        store.append(_entry("Chemist", f"Compound screen in screen_{r}.csv shows weak binding. " + "assay " * filler))
+        store.append(_entry("Geneticist", "Transcription factors NR4A1 and TOX drive exhaustion. " + "locus " * filler))
+        store.append(_entry("Critic", "Claims need replication.\nVERDICT: CONTINUE", role="Quality Review"))
+        if r < rounds:
+            summary = f"Round {r}: TOX is the leading candidate."
+            store.append(_entry("PI", summary, role=f"Round {r} Synthesis"))
+            store.set_round_summary(r, summary)
+
+
+def test_behaves_like_a_list():
+    store = TranscriptStore()
+    _meeting(store, rounds=1, filler=1)
+    assert len(store) == 6
+    assert store[0]["speaker"] == "PI" and store[-1]["speaker"] == "Critic"
+    assert [e["speaker"] for e in store[-2:]] == ["Geneticist", "Critic"]
+    assert store.entries is store.entries and list(store) == store.entries
+
+
+def test_small_transcript_is_rendered_in_full():
+    store = TranscriptStore()
+    _meeting(store, rounds=2, filler=1)
+    full = store.synthesis_context(QUESTION)
+    assert full.count("=== ") == len(store)
+    assert "condensed" not in full
+    assert store.recent_context(2) == "[Geneticist]: " + store[-2]["content"] + "\n\n[Critic]: " + store[-1]["content"]
+
+
+def test_long_transcript_is_condensed_within_budget():
+    store = TranscriptStore(synthesis_tokens=3000)
+    _meeting(store)
+    assert store.total_tokens > 3000
+
+    context = store.synthesis_context(QUESTION)
+    assert len(context) / 4 <= 3000 * 1.1
+    assert "Welcome." in context  # Opening kept
+    assert "Round 1: TOX is the leading candidate." in context and "Round 2:" in context
+    assert "=== Round 3 Summary ===" in context  # Digest stands in for the unsummarized last round
+    assert "condensed into round summaries" in context
+    # Citations of dropped contributions survive
+    for r in (1, 2, 3):
+        assert f"PMID: 3120760{r}" in context and f"screen_{r}.csv" in context
+    # Chronological order is preserved
+    assert context.index("Welcome.") < context.index("Round 1:") < context.index("Round 2:")
+
+
+def test_recent_context_prefers_relevant_entries():
+    store = TranscriptStore()
+    _meeting(store, rounds=1, filler=300)
+    context = store.recent_context(5, query=QUESTION, max_tokens=1200)
+    assert context.endswith(store[-1]["content"])  # Newest always kept
+    assert "[Geneticist]" in context  # Most on-topic contribution
+    assert "[Statistician]" not in context
+
+
+def test_round_digest_uses_lead_sentences():
+    store = TranscriptStore()
+    store.begin_round(1)
+    store.append(_entry("Immunologist", "TOX is required. It acts downstream of NFAT."))
+    assert store.round_summary(1) == "- Immunologist: TOX is required."
+    store.set_round_summary(1, "PI view")
+    assert store.round_summary(1) == "PI view"
+
+
+if __name__ == "__main__":
+    test_behaves_like_a_list()
+    test_small_transcript_is_rendered_in_full()
+    test_long_transcript_is_condensed_within_budget()
+    test_recent_context_prefers_relevant_entries()
+    test_round_digest_uses_lead_sentences()
+    print("✓ All transcript store tests passed")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Test that compiled workflows are built once per configuration and reused."""
+
+import os
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+os.environ.setdefault("WORKFLOW_CHECKPOINTER", "memory")
+
+from src.virtuallab_workflow import workflow
+
+
+def test_compiled_workflows_are_reused_per_configuration():
+    workflow.clear_workflow_cache()
+
+    plain = workflow.get_research_workflow(enable_human_review=False)
+    reviewed = workflow.get_research_workflow(enable_human_review=True)
+    consensus = workflow.get_consensus_workflow()
+
+    assert workflow.get_research_workflow(enable_human_review=False) is plain
+    assert workflow.get_research_workflow(enable_human_review=True) is reviewed
+    assert workflow.get_consensus_workflow() is consensus
+    assert len({id(plain), id(reviewed), id(consensus)}) == 3
+
+    # Only the review variant stops before human review
+    assert "human_review" in reviewed.interrupt_before_nodes
+    assert not plain.interrupt_before_nodes
+
+    workflow.clear_workflow_cache()
+    assert workflow.get_research_workflow(enable_human_review=False) is not plain
+
+
+if __name__ == "__main__":
+    test_compiled_workflows_are_reused_per_configuration()
+    print("✓ All workflow cache tests passed")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test durable workflow checkpoints: resume after a crash and compaction."""
+
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import TypedDict
+
+import pytest
+
+pytest.importorskip("langgraph")
+pytest.importorskip("langgraph.checkpoint.sqlite")
+
+from langgraph.graph import END, StateGraph
+
+from src.virtuallab_workflow import checkpointing
+
+
+class _State(TypedDict):
+    question: str
+    execution_path: list[str]
+
+
+@contextmanager
+def _fresh_checkpointer(path: str):
+    """Point the process-wide SQLite checkpointer at a new database for the block."""
+    saved = {k: os.environ.get(k) for k in ("WORKFLOW_CHECKPOINTER", "WORKFLOW_CHECKPOINT_DB")}
+    os.environ.update(WORKFLOW_CHECKPOINTER="sqlite", WORKFLOW_CHECKPOINT_DB=path)
+    checkpointing._checkpointer = None
+    checkpointing._threads_db = None
+    try:
+        yield checkpointing.get_checkpointer()
+    finally:
+        if checkpointing._threads_db is not None:
+            checkpointing._threads_db.close()
+        checkpointing._checkpointer = None
+        checkpointing._threads_db = None
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _graph(calls: list, fail_second: dict):
+    def first(state):
+        calls.append("first")
+        return {"execution_path": state["execution_path"] + ["first"]}
+
+    def second(state):
+        calls.append("second")
+        if fail_second.pop("once", False):
+            raise RuntimeError("simulated crash")
+        return {"execution_path": state["execution_path"] + ["second"]}
+
+    graph = StateGraph(_State)
+    graph.add_node("first", first)
+    graph.add_node("second", second)
+    graph.set_entry_point("first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=checkpointing.get_checkpointer())
+
+
+def test_resume_after_crash_skips_completed_nodes():
+    with tempfile.TemporaryDirectory() as tmp, _fresh_checkpointer(os.path.join(tmp, "workflow.sqlite")) as saver:
+        assert type(saver).__name__ == "SqliteSaver"
+        calls = []
+        config = {"configurable": {"thread_id": "crash-test"}}
+        app = _graph(calls, {"once": True})
+        try:
+            list(app.stream({"question": "q", "execution_path": []}, config))
+            raise AssertionError("expected the simulated crash")
+        except RuntimeError:
+            pass
+        assert app.get_state(config).next == ("second",)
+
+        # A new process would compile the graph again on the same database
+        app = _graph(calls, {})
+        list(app.stream(None, config))
+        assert calls == ["first", "second", "second"]
+        assert app.get_state(config).values["execution_path"] == ["first", "second"]
+        assert not app.get_state(config).next
+
+
+def test_compaction_drops_stale_threads_and_old_checkpoints():
+    with tempfile.TemporaryDirectory() as tmp, _fresh_checkpointer(os.path.join(tmp, "workflow.sqlite")):
+        for thread_id in ("old", "done"):
+            app = _graph([], {})
+            list(app.stream({"question": thread_id, "execution_path": []},
+                            {"configurable": {"thread_id": thread_id}}))
+            checkpointing.record_thread(thread_id, checkpointing.COMPLETED, workflow="test", question=thread_id)
+        checkpointing._threads_db.execute(
+            "UPDATE workflow_threads SET updated_at = ? WHERE thread_id = 'old'", (time.time() - 30 * 86400,)
+        )
+        checkpointing._threads_db.commit()
+
+        result = checkpointing.compact_checkpoints(max_age_days=14)
+        assert result["threads"] == 1 and result["checkpoints"] > 1
+        assert [t["thread_id"] for t in checkpointing.list_threads()] == ["done"]
+
+        count = lambda t: checkpointing._threads_db.execute(
+            "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (t,)).fetchone()[0]
+        assert count("old") == 0 and count("done") == 1
+
+        # The final state of a compacted thread is still readable
+        state = _graph([], {}).get_state({"configurable": {"thread_id": "done"}})
+        assert state.values["execution_path"] == ["first", "second"]
+
+
+if __name__ == "__main__":
+    test_resume_after_crash_skips_completed_nodes()
+    test_compaction_drops_stale_threads_and_old_checkpoints()
+    print("✓ All workflow checkpointing tests passed")